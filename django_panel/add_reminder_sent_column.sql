@@ -0,0 +1,14 @@
+-- Randevu hatırlatmalarının tekrar gönderilmemesi için appointments tablosuna
+-- reminder_sent_at sütunu ekleme
+-- Bu SQL komutunu Supabase Dashboard > SQL Editor'de çalıştırın
+
+ALTER TABLE public.appointments
+ADD COLUMN IF NOT EXISTS reminder_sent_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN public.appointments.reminder_sent_at IS 'Hatırlatma e-postasının gönderildiği zaman (NULL ise gönderilmedi)';
+
+-- Hatırlatma penceresi sorgusu (status = pending, reminder_sent_at IS NULL, date aralığı)
+-- için kısmi index: sadece hatırlatması bekleyen randevular indexlenir
+CREATE INDEX IF NOT EXISTS appointments_reminder_pending_idx
+ON public.appointments (date, time)
+WHERE status = 'pending' AND reminder_sent_at IS NULL;
@@ -0,0 +1,19 @@
+-- Randevu listelerinde hasta adının PostgREST embed ile tek sorguda gelmesi için
+-- Bu SQL komutlarını Supabase Dashboard > SQL Editor'de çalıştırın
+--
+-- appointments.user_id auth.users'a bağlı olduğu için appointments -> user_profiles
+-- arasında doğrudan foreign key yoktur. Aşağıdaki fonksiyon PostgREST'e
+-- "computed relationship" olarak tanıtılır ve şu select'i mümkün kılar:
+--   appointments?select=id,...,doctors(name,surname),services(name),user_profiles(name,surname)
+-- (doctors ve services embed'leri mevcut foreign key'ler üzerinden çalışır.)
+
+CREATE OR REPLACE FUNCTION public.user_profiles(public.appointments)
+RETURNS SETOF public.user_profiles
+ROWS 1
+LANGUAGE sql STABLE
+AS $$
+    SELECT * FROM public.user_profiles WHERE id = $1.user_id
+$$;
+
+-- PostgREST şema önbelleğini yenile
+NOTIFY pgrst, 'reload schema';
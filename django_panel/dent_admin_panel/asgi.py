@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dent_admin_panel.settings')
+# ASGI sunucusu altında sayfaların async view'leri kullanılır (bkz. settings.PANEL_ASYNC_VIEWS)
+os.environ.setdefault('PANEL_ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
@@ -46,13 +46,19 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'panel.middleware.MetricsMiddleware',
+    'panel.middleware.TracingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'panel.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'panel.middleware.RequestStateMiddleware',
+    'panel.middleware.QueryCountMiddleware',
+    'panel.middleware.SlowRequestMiddleware',
 ]
 
 ROOT_URLCONF = 'dent_admin_panel.urls'
@@ -68,6 +74,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'panel.context_processors.hospital_context',
+                'panel.context_processors.data_freshness',
             ],
         },
     },
@@ -136,6 +143,67 @@ PANEL_DATA_DIR = BASE_DIR / 'panel' / 'data'
 SUPABASE_URL = os.getenv('SUPABASE_URL', '')
 SUPABASE_SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY', '')
 SUPABASE_ANON_KEY = os.getenv('SUPABASE_ANON_KEY', '')
+# 'fake': ağ yerine bellek içi sahte Supabase (benchmark/test; bkz. panel/services/fake_supabase.py)
+SUPABASE_BACKEND = os.getenv('SUPABASE_BACKEND', 'supabase')
+# Sahte backend'in seed JSON klasörü (boş: tablolar boş başlar) ve çağrı başına eklenen gecikme (ms)
+SUPABASE_FAKE_SEED_DIR = os.getenv('SUPABASE_FAKE_SEED_DIR', str(BASE_DIR / 'panel' / 'data'))
+SUPABASE_FAKE_LATENCY_MS = float(os.getenv('SUPABASE_FAKE_LATENCY_MS', '0'))
+
+# Supabase HTTP bağlantı havuzu (PostgREST, Storage ve Auth aynı havuzu paylaşır)
+SUPABASE_HTTP_MAX_CONNECTIONS = int(os.getenv('SUPABASE_HTTP_MAX_CONNECTIONS', '20'))
+SUPABASE_HTTP_MAX_KEEPALIVE = int(os.getenv('SUPABASE_HTTP_MAX_KEEPALIVE', '10'))
+SUPABASE_HTTP_KEEPALIVE_EXPIRY = float(os.getenv('SUPABASE_HTTP_KEEPALIVE_EXPIRY', '30'))
+SUPABASE_HTTP_TIMEOUT = float(os.getenv('SUPABASE_HTTP_TIMEOUT', '10'))
+# HTTP/2 için 'h2' paketi gerekir (pip install "httpx[http2]")
+SUPABASE_HTTP2 = os.getenv('SUPABASE_HTTP2', 'False').lower() == 'true'
+# Eşzamanlı özdeş okumalar tek istekte birleştirilir; >0 ise sonuç bu kadar saniye daha paylaşılır
+SUPABASE_SINGLE_FLIGHT_TTL = float(os.getenv('SUPABASE_SINGLE_FLIGHT_TTL', '0'))
+# Hizmet kataloğu ve hastane listesi önbelleğinin süresi (saniye)
+REFERENCE_CACHE_TTL = float(os.getenv('REFERENCE_CACHE_TTL', '300'))
+# Worker'lar arası önbellek geçersizleştirme: hastane bazlı veri sürümlerinin tutulduğu dosya
+DATA_VERSION_DB = os.getenv('DATA_VERSION_DB', str(BASE_DIR / 'data_versions.sqlite3'))
+# Sürüm dosyasının en fazla kaç saniyede bir okunacağı
+DATA_VERSION_CHECK_INTERVAL = float(os.getenv('DATA_VERSION_CHECK_INTERVAL', '1'))
+# Supabase okuma zaman aşımı (saniye); aşılırsa son bilinen sağlam veri gösterilir
+SUPABASE_READ_TIMEOUT = float(os.getenv('SUPABASE_READ_TIMEOUT', '2'))
+# Tablo bazında zaman aşımı: "appointments=4,reviews=3"
+SUPABASE_ENDPOINT_TIMEOUTS = {
+    name.strip(): float(value)
+    for name, _, value in (
+        item.partition('=') for item in os.getenv('SUPABASE_ENDPOINT_TIMEOUTS', '').split(',') if '=' in item
+    )
+}
+# Art arda bu kadar hata veren tablo için devre açılır ve bu kadar saniye Supabase'e gidilmez
+SUPABASE_BREAKER_FAILURES = int(os.getenv('SUPABASE_BREAKER_FAILURES', '5'))
+SUPABASE_BREAKER_RESET_SECONDS = float(os.getenv('SUPABASE_BREAKER_RESET_SECONDS', '30'))
+# Eksik bulunan şema parçası (embed ilişkisi, özet tablosu) bu kadar saniye denenmez, yedek yol kullanılır
+SUPABASE_SCHEMA_RECHECK_SECONDS = float(os.getenv('SUPABASE_SCHEMA_RECHECK_SECONDS', '300'))
+# Zaman aşımlı okumaları ve arka plan yenilemelerini çalıştıran thread sayısı
+SUPABASE_READ_WORKERS = int(os.getenv('SUPABASE_READ_WORKERS', '16'))
+# Dashboard, randevu, takvim ve yorum sayfalarının async (paralel okuyan) sürümleri; asgi.py varsayılan olarak açar.
+# WSGI/runserver altında kapalı kalmalıdır: her istek kendi event loop'unda yeni bir bağlantı havuzu kurar.
+PANEL_ASYNC_VIEWS = os.getenv('PANEL_ASYNC_VIEWS', 'False').lower() == 'true'
+# GET isteklerinin toplam Supabase süre bütçesi (ms, 0: sınırsız); aşılırsa dashboard widget'ları sonradan yüklenir
+REQUEST_DEADLINE_MS = int(os.getenv('REQUEST_DEADLINE_MS', '800'))
+# Sonradan yüklenen dashboard widget'larının süre bütçesi (ms)
+DEFERRED_WIDGET_BUDGET_MS = int(os.getenv('DEFERRED_WIDGET_BUDGET_MS', '5000'))
+# İstek başına Supabase çağrılarını say (DEBUG'da cevaba X-Supabase-* başlıkları eklenir)
+SUPABASE_QUERY_LOG = os.getenv('SUPABASE_QUERY_LOG', str(DEBUG)).lower() == 'true'
+# Aynı şekilli çağrı sayısı bu değere ulaşınca N+1 uyarısı loglanır
+SUPABASE_N_PLUS_ONE_THRESHOLD = int(os.getenv('SUPABASE_N_PLUS_ONE_THRESHOLD', '3'))
+# /metrics için Bearer token (boşsa endpoint sadece DEBUG'da açıktır)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+# Span izleme: servis fonksiyonları, view aşamaları ve Supabase çağrıları (Chrome trace JSON)
+PANEL_TRACE = os.getenv('PANEL_TRACE', 'False').lower() == 'true'
+# Sadece bu süreyi (ms) aşan isteklerin izi dosyaya yazılır
+PANEL_TRACE_MIN_MS = int(os.getenv('PANEL_TRACE_MIN_MS', '500'))
+PANEL_TRACE_DIR = os.getenv('PANEL_TRACE_DIR', str(BASE_DIR / 'traces'))
+# Staff profil kayıtlarından (?_profile=1) process başına en fazla kaç tanesi saklanır
+PROFILE_BUFFER_SIZE = int(os.getenv('PROFILE_BUFFER_SIZE', '20'))
+# Bu süreyi (ms) aşan istekler Supabase çağrı dökümüyle kaydedilir (0: kapalı); bkz. /debug/slow/
+SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', '1500'))
+SLOW_REQUEST_LIMIT = int(os.getenv('SLOW_REQUEST_LIMIT', '200'))
+SLOW_REQUEST_DB = os.getenv('SLOW_REQUEST_DB', str(BASE_DIR / 'slow_requests.sqlite3'))
 
 # Email Configuration (SMTP)
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -17,7 +17,14 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from panel import views as panel_views
+
 urlpatterns = [
+    # Staff teşhis sayfaları (profil, yavaş istekler); admin oturumu ve is_staff gerektirir
+    path('admin/profiles/', admin.site.admin_view(panel_views.profile_list), name='profile_list'),
+    path('admin/profiles/<int:report_id>/', admin.site.admin_view(panel_views.profile_detail), name='profile_detail'),
+    path('debug/slow/', admin.site.admin_view(panel_views.slow_request_list), name='slow_request_list'),
+    path('debug/slow/<int:entry_id>/', admin.site.admin_view(panel_views.slow_request_detail), name='slow_request_detail'),
     path('admin/', admin.site.urls),
     path('', include('panel.urls')),
 ]
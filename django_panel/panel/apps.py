@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class PanelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'panel'
+
+    def ready(self):
+        from .services import tracing
+
+        # Kapalıyken hiçbir fonksiyon sarmalanmaz
+        if tracing.is_enabled():
+            tracing.instrument()
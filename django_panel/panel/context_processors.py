@@ -3,23 +3,39 @@ Context processors for panel app.
 Hospital bilgisi tüm template'lere otomatik olarak eklenir.
 """
 
-from .services import hospital_service
+from .services import hospital_service, request_context
+from .services.resilience import UpstreamUnavailable
 
 
 def hospital_context(request):
     """
     Hospital bilgisini tüm template'lere ekler.
     Bu sayede her view'de tekrar tekrar hospital_service.get_hospital() çağırmaya gerek kalmaz.
+    Async view'ler hastaneyi önceden `request.panel_hospital` olarak yükler;
+    render sırasında event loop'u bloklayan sync sorgu yapılmaz.
     """
+    if hasattr(request, "panel_hospital"):
+        return {
+            "hospital": request.panel_hospital,
+        }
     try:
-        # Session'dan hospital_id al
-        hospital = hospital_service.get_hospital(request)
+        # Session'dan hospital_id al; şablonlar sadece isim ve adresi kullanır
+        hospital = hospital_service.get_hospital(request, columns=hospital_service.HOSPITAL_SUMMARY_COLUMNS)
         return {
             "hospital": hospital,
         }
-    except (ValueError, AttributeError, KeyError, IndexError):
-        # Login olmamışsa veya hastane bulunamazsa boş dict döndür
+    except (ValueError, AttributeError, KeyError, IndexError, UpstreamUnavailable):
+        # Login olmamışsa, hastane bulunamazsa veya süre bütçesi bittiyse boş dict döndür
         return {
             "hospital": None,
         }
 
+
+def data_freshness(request):
+    """
+    Sayfada Supabase'e ulaşılamadığı için önbellekten gösterilen veri olup olmadığını ekler.
+    Fonksiyon olarak verilir; template'te kullanıldığı anda (view verisi yüklendikten sonra) değerlendirilir.
+    """
+    return {
+        "data_stale": request_context.is_stale,
+    }
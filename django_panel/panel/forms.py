@@ -357,6 +357,12 @@ class ServiceAssignmentForm(forms.Form):
 
 
 class ReviewFilterForm(forms.Form):
+    q = forms.CharField(
+        label="Ara",
+        required=False,
+        max_length=200,
+        widget=forms.TextInput(attrs={"placeholder": "Yorum veya yanıt metninde ara"}),
+    )
     doctor = forms.ChoiceField(label="Doktor", required=False)
     min_rating = forms.ChoiceField(
         label="Minimum Puan",
@@ -0,0 +1,106 @@
+"""Panel benchmark'larını sahte Supabase backend'ine karşı çalıştıran yönetim komutu.
+
+Tüm senaryolar, 1x / 10x / 100x veri ölçeğinde:
+    python manage.py bench_panel --scales 1,10,100
+
+Sadece yorum sayfası, çağrı başına 20 ms yapay gecikmeyle:
+    python manage.py bench_panel --scenario reviews --latency-ms 20
+
+generate_dataset ile üretilmiş büyük bir veri setiyle:
+    python manage.py bench_panel --seed-dir datasets/h10 --scales 1
+
+Önceki bir çalıştırmayla karşılaştırma:
+    python manage.py bench_panel --compare benchmarks/bench-20240301-101500.json
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from panel.services import benchmarks
+
+
+def _int_list(value: str) -> list[int]:
+    try:
+        return [int(item) for item in value.split(",") if item.strip()]
+    except ValueError:
+        raise CommandError(f"Geçersiz ölçek listesi: {value}")
+
+
+class Command(BaseCommand):
+    help = "Dashboard, takvim, randevu, yorum, konum ve JSON servislerini farklı veri ölçeklerinde ölçer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", type=_int_list, default=[1, 10, 100], help="Virgülle ayrılmış ölçek katsayıları.")
+        parser.add_argument("--scenario", action="append", help="Senaryo veya grup adı (tekrarlanabilir).")
+        parser.add_argument("--repeat", type=int, default=5, help="Senaryo başına tekrar sayısı.")
+        parser.add_argument("--latency-ms", type=float, default=0, help="Supabase çağrısı başına yapay gecikme.")
+        parser.add_argument("--seed-dir", help="Sahte backend'in seed klasörü (varsayılan: SUPABASE_FAKE_SEED_DIR).")
+        parser.add_argument("--warm", action="store_true", help="Önbellekleri tekrarlar arasında temizleme.")
+        parser.add_argument("--output", help="Sonuç JSON dosyası (varsayılan: benchmarks/bench-<zaman>.json).")
+        parser.add_argument("--compare", help="Karşılaştırılacak önceki sonuç JSON dosyası.")
+        parser.add_argument("--list", action="store_true", help="Senaryoları listele ve çık.")
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for scenario in benchmarks.SCENARIOS:
+                self.stdout.write(f"{scenario.name:<24} {scenario.group}")
+            return
+
+        try:
+            scenarios = benchmarks.select_scenarios(options["scenario"])
+            report = benchmarks.run(
+                options["scales"],
+                scenarios,
+                repeat=options["repeat"],
+                latency_ms=options["latency_ms"],
+                warm=options["warm"],
+                seed_dir=options["seed_dir"],
+                progress=self._write_result,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        output = Path(options["output"] or Path(settings.BASE_DIR) / "benchmarks"
+                      / f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+        benchmarks.save(report, output)
+        self.stdout.write(self.style.SUCCESS(f"Sonuçlar yazıldı: {output}"))
+
+        if options["compare"]:
+            self._write_comparison(benchmarks.compare(benchmarks.load(options["compare"]), report))
+
+    def _write_result(self, result: benchmarks.ScenarioResult):
+        if result.error:
+            self.stdout.write(self.style.ERROR(f"{result.scenario:<24} x{result.scale:<5} HATA: {result.error}"))
+            return
+        wall = result.wall_ms
+        self.stdout.write(
+            f"{result.scenario:<24} x{result.scale:<5} "
+            f"medyan={wall['median']:>9.2f} ms  p95={wall['p95']:>9.2f} ms  "
+            f"supabase={result.upstream_calls:>3} çağrı  bellek={result.peak_memory_kb:>9.1f} KB"
+        )
+        for shape, count in result.n_plus_one:
+            self.stdout.write(self.style.WARNING(f"    Olası N+1: {count}x {shape}"))
+
+    def _write_comparison(self, rows: list[dict]):
+        if not rows:
+            self.stdout.write("Karşılaştırılacak ortak senaryo yok.")
+            return
+        self.stdout.write("\nÖnceki çalıştırmaya göre:")
+        for row in rows:
+            change = row["change_pct"]
+            line = (
+                f"{row['scenario']:<24} x{row['scale']:<5} "
+                f"{row['median_ms'][0]:>9.2f} -> {row['median_ms'][1]:>9.2f} ms "
+                f"({'-' if change is None else f'{change:+.1f}%'})  "
+                f"supabase {row['upstream_calls'][0]} -> {row['upstream_calls'][1]}  "
+                f"bellek {row['peak_memory_kb'][0]} -> {row['peak_memory_kb'][1]} KB"
+            )
+            if change is not None and change > 10:
+                self.stdout.write(self.style.WARNING(line))
+            else:
+                self.stdout.write(line)
@@ -0,0 +1,69 @@
+"""Yavaş istek kayıtlarını döken yönetim komutu.
+
+Özet tablo:
+    python manage.py dump_slow_requests --limit 20
+
+Belirli bir hastanenin randevu sayfası, Supabase çağrılarıyla birlikte:
+    python manage.py dump_slow_requests --hospital 12 --view appointment_management --calls
+
+JSON (başka araçlara aktarmak için):
+    python manage.py dump_slow_requests --json > slow.json
+"""
+
+from __future__ import annotations
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from panel.services import slow_requests
+
+
+class Command(BaseCommand):
+    help = "SLOW_REQUEST_MS eşiğini aşan istek kayıtlarını listeler."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=50, help="En fazla kaç kayıt gösterilecek.")
+        parser.add_argument("--min-ms", type=float, default=0, help="Sadece bu süreyi aşan kayıtlar.")
+        parser.add_argument("--hospital", help="Hastane ID'sine göre süz.")
+        parser.add_argument("--view", help="URL adına göre süz (ör. appointment_management).")
+        parser.add_argument("--calls", action="store_true", help="Her kaydın Supabase çağrılarını da yaz.")
+        parser.add_argument("--json", action="store_true", help="Kayıtları JSON olarak yaz.")
+        parser.add_argument("--clear", action="store_true", help="Tüm kayıtları sil.")
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            deleted = slow_requests.clear()
+            self.stdout.write(self.style.SUCCESS(f"{deleted} kayıt silindi."))
+            return
+
+        entries = slow_requests.list_entries(
+            limit=options["limit"],
+            min_ms=options["min_ms"],
+            hospital_id=options["hospital"],
+            view=options["view"],
+        )
+        if options["json"]:
+            self.stdout.write(json.dumps(entries, ensure_ascii=False, indent=2))
+            return
+        if not entries:
+            self.stdout.write("Kayıt yok.")
+            return
+
+        for entry in entries:
+            details = entry["details"]
+            supabase = details.get("supabase", {})
+            query = " ".join(f"{key}={value}" for key, value in details.get("query", {}).items())
+            self.stdout.write(
+                f"#{entry['id']} {entry['created_at']} {entry['duration_ms']:.0f} ms "
+                f"{entry['method']} {entry['path']} [{entry['view'] or '-'}] "
+                f"hastane={entry['hospital_id'] or '-'} status={entry['status']} "
+                f"supabase={supabase.get('count', 0)}/{supabase.get('duration_ms', 0)} ms "
+                f"render={details.get('timings_ms', {}).get('render', '-')} ms"
+                + (f" ? {query}" if query else "")
+            )
+            for shape, count in supabase.get("n_plus_one", []):
+                self.stdout.write(self.style.WARNING(f"    Olası N+1: {count}x {shape}"))
+            if options["calls"]:
+                for call in supabase.get("calls", []):
+                    self.stdout.write(f"    {call['duration_ms']:>8} ms  {call['status']}  {call['call']}")
@@ -0,0 +1,116 @@
+"""Yük ve ölçek testleri için sentetik veri seti üreten yönetim komutu.
+
+10 hastane, 100 bin randevu; sahte backend'in seed klasörü olarak:
+    python manage.py generate_dataset --hospitals 10 --appointments 100000 --output datasets/h10
+    SUPABASE_BACKEND=fake SUPABASE_FAKE_SEED_DIR=datasets/h10 python manage.py bench_panel --scales 1
+
+Milyonlarca randevu için satır başına bir kayıt (JSONL):
+    python manage.py generate_dataset --hospitals 1000 --appointments 3000000 --format jsonl --output datasets/h1000
+
+Yerel Supabase'e (supabase start) doğrudan yükleme:
+    python manage.py generate_dataset --hospitals 5 --load
+
+Aynı --seed ve --today değerleri her zaman aynı veri setini üretir.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from panel.services import fake_supabase
+from panel.services.dataset_generator import MAX_HOSPITALS, DatasetGenerator, DatasetSpec, load_into_backend, write_files
+from panel.services.supabase_client import get_supabase_client
+
+# Varsayılan randevu sayısı (hastane başına)
+DEFAULT_APPOINTMENTS_PER_HOSPITAL = 2000
+
+_LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1", "host.docker.internal"}
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Geçersiz tarih (YYYY-MM-DD bekleniyor): {value}")
+
+
+class Command(BaseCommand):
+    help = "Panel tablolarının şemasına uygun, seed'li sentetik veri seti üretir."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hospitals", type=int, default=1, help=f"Hastane sayısı (1-{MAX_HOSPITALS}).")
+        parser.add_argument("--appointments", type=int,
+                            help=f"Toplam randevu sayısı (varsayılan: hastane başına {DEFAULT_APPOINTMENTS_PER_HOSPITAL}).")
+        parser.add_argument("--doctors", type=int, default=24, help="Hastane başına doktor sayısı.")
+        parser.add_argument("--patients", type=int, help="Hasta sayısı (varsayılan: randevu sayısının beşte biri).")
+        parser.add_argument("--seed", type=int, default=42, help="Rastgele sayı üreteci seed'i.")
+        parser.add_argument("--today", type=_parse_date, help="Referans gün (YYYY-MM-DD); geçmiş/gelecek randevular buna göre.")
+        parser.add_argument("--days-past", type=int, default=365, help="Bugünden kaç gün geriye randevu üretilecek.")
+        parser.add_argument("--days-future", type=int, default=60, help="Bugünden kaç gün ileriye randevu üretilecek.")
+        parser.add_argument("--output", help="Tablo başına bir dosyanın yazılacağı klasör.")
+        parser.add_argument("--format", choices=("json", "jsonl"), default="json", help="Dosya biçimi.")
+        parser.add_argument("--load", action="store_true", help="Satırları ayarlardaki Supabase'e insert et.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="--load için insert başına satır.")
+        parser.add_argument("--allow-remote", action="store_true",
+                            help="--load'un yerel olmayan bir SUPABASE_URL'e yazmasına izin ver.")
+
+    def handle(self, *args, **options):
+        if not options["output"] and not options["load"]:
+            raise CommandError("--output veya --load seçeneklerinden en az biri gerekli.")
+
+        appointments = options["appointments"]
+        if appointments is None:
+            appointments = options["hospitals"] * DEFAULT_APPOINTMENTS_PER_HOSPITAL
+        spec = DatasetSpec(
+            hospitals=options["hospitals"],
+            appointments=appointments,
+            doctors_per_hospital=options["doctors"],
+            patients=options["patients"],
+            days_past=options["days_past"],
+            days_future=options["days_future"],
+            seed=options["seed"],
+            today=options["today"],
+        )
+        try:
+            generator = DatasetGenerator(spec)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options["output"]:
+            output_dir = Path(options["output"])
+            counts = write_files(generator, output_dir, jsonl=options["format"] == "jsonl", progress=self._progress)
+            self._write_counts(counts)
+            self.stdout.write(self.style.SUCCESS(f"Veri seti yazıldı: {output_dir}"))
+            self.stdout.write(f"Hastane yöneticileri: yonetici<N>@example.com / {spec.owner_password}")
+
+        if options["load"]:
+            self._check_load_target(options["allow_remote"])
+            counts = load_into_backend(generator, get_supabase_client(), batch_size=options["batch_size"],
+                                       progress=self._progress)
+            self._write_counts(counts)
+            self.stdout.write(self.style.SUCCESS("Veri seti Supabase'e yüklendi (Auth kullanıcıları oluşturulmadı)."))
+
+    def _check_load_target(self, allow_remote: bool):
+        if fake_supabase.is_enabled():
+            raise CommandError(
+                "Sahte backend process içidir, yüklenen veri komut bitince kaybolur. "
+                "--output ile yazıp SUPABASE_FAKE_SEED_DIR ile gösterin."
+            )
+        host = urlparse(getattr(settings, "SUPABASE_URL", "") or "").hostname or ""
+        if host not in _LOCAL_HOSTS and not allow_remote:
+            raise CommandError(
+                f"SUPABASE_URL yerel değil ({host or 'tanımsız'}). "
+                "Uzak bir projeye yazmak için --allow-remote kullanın."
+            )
+
+    def _progress(self, table: str, count: int):
+        self.stdout.write(f"  {table}: {count}")
+
+    def _write_counts(self, counts: dict[str, int]):
+        for table, count in counts.items():
+            self.stdout.write(f"{table:<16} {count:>10}")
@@ -0,0 +1,67 @@
+"""Randevu hatırlatma e-postalarını gönderen yönetim komutu.
+
+Tek seferlik çalıştırma (cron için):
+    python manage.py send_appointment_reminders
+
+Sürekli çalışan worker:
+    python manage.py send_appointment_reminders --loop
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from panel.services.reminder_service import (
+    REMINDER_BATCH_SIZE,
+    ReminderScheduler,
+    get_reminder_settings,
+)
+
+# Ayarlar kapalıyken ve hata sonrası bekleme süresi (saniye)
+IDLE_SLEEP_SECONDS = 60
+
+
+class Command(BaseCommand):
+    help = "Yaklaşan randevular için hatırlatma e-postası gönderir."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Sürekli çalışan worker modunda başlat.")
+        parser.add_argument("--batch-size", type=int, default=REMINDER_BATCH_SIZE, help="Tek SMTP turunda gönderilecek e-posta sayısı.")
+
+    def handle(self, *args, **options):
+        reminder_settings = get_reminder_settings()
+        if not options["loop"]:
+            if not reminder_settings["enabled"]:
+                self.stdout.write("Randevu hatırlatmaları ayarlardan kapalı.")
+                return
+            scheduler = ReminderScheduler(reminder_settings["hours_before"], batch_size=options["batch_size"])
+            sent = scheduler.run_once()
+            self.stdout.write(self.style.SUCCESS(f"{sent} hatırlatma gönderildi."))
+            return
+
+        scheduler = None
+        while True:
+            reminder_settings = get_reminder_settings()
+            if not reminder_settings["enabled"]:
+                scheduler = None
+                time.sleep(IDLE_SLEEP_SECONDS)
+                continue
+
+            # Süre ayarı değiştiyse heap yeni değere göre baştan kurulur
+            if scheduler is None or scheduler.hours_before.total_seconds() != reminder_settings["hours_before"] * 3600:
+                scheduler = ReminderScheduler(reminder_settings["hours_before"], batch_size=options["batch_size"])
+
+            try:
+                sent = scheduler.run_once()
+            except Exception as exc:
+                self.stderr.write(f"Hatırlatma gönderim hatası: {exc}")
+                time.sleep(IDLE_SLEEP_SECONDS)
+                continue
+
+            if sent:
+                self.stdout.write(f"{sent} hatırlatma gönderildi.")
+            time.sleep(max(1.0, min(scheduler.seconds_until_next(datetime.now()), IDLE_SLEEP_SECONDS)))
+
@@ -0,0 +1,331 @@
+"""
+Middleware for panel app.
+İstek bazlı servis durumunu yönetir ve Supabase kesintilerini 503 sayfasına çevirir.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+import logging
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+from .services import metrics, profiling, query_counter, request_context, slow_requests, tracing
+from .services.resilience import UpstreamUnavailable
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStateMiddleware:
+    """
+    Her istek için yeni bir istek durumu oluşturur (eski veri işareti, süre bütçesi).
+    GET isteklerinin Supabase okumaları REQUEST_DEADLINE_MS ile sınırlanır;
+    yazma isteklerine bütçe uygulanmaz.
+    Supabase'e ulaşılamadığında ve gösterilecek önceki veri olmadığında
+    500 yerine kısa bir "servis geçici olarak kullanılamıyor" sayfası döner.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # ASGI altında async view'ler thread'e düşmeden çalışsın
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = request_context.begin(self._budget(request))
+        try:
+            response = self.get_response(request)
+            return self._mark_stale(response)
+        finally:
+            request_context.end(token)
+
+    async def __acall__(self, request):
+        token = request_context.begin(self._budget(request))
+        try:
+            response = await self.get_response(request)
+            return self._mark_stale(response)
+        finally:
+            request_context.end(token)
+
+    @staticmethod
+    def _budget(request):
+        if request.method in ("GET", "HEAD"):
+            return getattr(settings, "REQUEST_DEADLINE_MS", 0) / 1000
+        return None
+
+    @staticmethod
+    def _mark_stale(response):
+        if request_context.is_stale():
+            # Eski veri içeren sayfa paylaşılan önbelleklerde tutulmasın
+            response["Cache-Control"] = "no-store"
+        return response
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, UpstreamUnavailable):
+            # Context processor'lar da Supabase'e gideceği için istek olmadan render edilir
+            response = HttpResponse(render_to_string("panel/upstream_unavailable.html"), status=503)
+            response["Retry-After"] = "30"
+            return response
+        return None
+
+
+class QueryCountMiddleware:
+    """
+    İstek boyunca yapılan Supabase çağrılarını sayar ve süresini toplar.
+    Aynı şekilli çağrılar N+1 eşiğini geçerse uyarı loglanır.
+    DEBUG açıkken toplamlar X-Supabase-* başlıklarıyla cevaba eklenir.
+    Kayıt SUPABASE_QUERY_LOG ile açılıp kapatılır (varsayılan: DEBUG).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not query_counter.is_enabled():
+            return self.get_response(request)
+        with query_counter.recording() as log:
+            response = self.get_response(request)
+        return self._report(request, response, log)
+
+    async def __acall__(self, request):
+        if not query_counter.is_enabled():
+            return await self.get_response(request)
+        with query_counter.recording() as log:
+            response = await self.get_response(request)
+        return self._report(request, response, log)
+
+    @staticmethod
+    def _report(request, response, log):
+        patterns = log.n_plus_one()
+        for shape, count in patterns:
+            logger.warning("Olası N+1: %s %s -> %dx %s", request.method, request.path, count, shape)
+        if settings.DEBUG:
+            response["X-Supabase-Queries"] = str(log.count)
+            response["X-Supabase-Query-Time"] = f"{log.duration * 1000:.1f}ms"
+            response["X-Supabase-Query-Breakdown"] = ",".join(
+                f"{api}={count}" for api, count in sorted(log.by_api().items())
+            )
+            duplicates = len(log.duplicates())
+            if duplicates:
+                response["X-Supabase-Duplicate-Queries"] = str(duplicates)
+            if patterns:
+                response["X-Supabase-N-Plus-One"] = "; ".join(f"{count}x {shape}" for shape, count in patterns)
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Her isteğin süresini URL adına (dashboard, appointment_management...) göre
+    histograma, sonucunu durum koduyla sayaca işler (bkz. services.metrics).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            self._observe(request, status, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            self._observe(request, status, time.perf_counter() - started)
+
+    @staticmethod
+    def _observe(request, status, elapsed):
+        match = getattr(request, "resolver_match", None)
+        # Eşleşmeyen yollar tek etikette toplanır; aksi halde her 404 yeni seri açar
+        view = (match.url_name or match.view_name) if match else "unmatched"
+        metrics.REQUEST_DURATION.observe(elapsed, view, request.method)
+        metrics.REQUESTS.inc(view, request.method, str(status))
+
+
+class TracingMiddleware:
+    """
+    PANEL_TRACE açıkken her isteği iz olarak kaydeder. PANEL_TRACE_MIN_MS
+    süresini aşan isteklerin izi PANEL_TRACE_DIR altına Chrome trace dosyası
+    olarak yazılır; DEBUG'da dosya yolu X-Trace-File başlığında döner.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not tracing.is_enabled():
+            return self.get_response(request)
+        with tracing.tracing(f"{request.method} {request.path}") as trace:
+            response = self.get_response(request)
+            self._name(request, trace)
+        return self._export(response, trace)
+
+    async def __acall__(self, request):
+        if not tracing.is_enabled():
+            return await self.get_response(request)
+        with tracing.tracing(f"{request.method} {request.path}") as trace:
+            response = await self.get_response(request)
+            self._name(request, trace)
+        return self._export(response, trace)
+
+    @staticmethod
+    def _name(request, trace):
+        match = getattr(request, "resolver_match", None)
+        if match and match.url_name:
+            trace.name = f"{request.method} {match.url_name}"
+
+    @staticmethod
+    def _export(response, trace):
+        if trace.duration * 1000 < getattr(settings, "PANEL_TRACE_MIN_MS", 0):
+            return response
+        path = tracing.export(trace, trace.name)
+        if path and settings.DEBUG:
+            response["X-Trace-File"] = path
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Staff kullanıcıların `?_profile=1` (veya `X-Panel-Profile: 1`) ile tek bir
+    isteğin profilini almasını sağlar; `?_profile=pyinstrument` yüklüyse
+    pyinstrument kullanır. Sonuç admin altındaki profil sayfasında görünür
+    ve cevaba X-Panel-Profile-Id başlığı eklenir.
+    Tetiklenmeyen isteklerde kullanıcı bile yüklenmez.
+    AuthenticationMiddleware'den sonra gelmelidir.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not profiling.is_requested(request) or not request.user.is_staff:
+            return self.get_response(request)
+        with profiling.profiling(request) as report:
+            response = self.get_response(request)
+            self._annotate(request, response, report)
+        return response
+
+    async def __acall__(self, request):
+        if not profiling.is_requested(request) or not (await request.auser()).is_staff:
+            return await self.get_response(request)
+        with profiling.profiling(request) as report:
+            response = await self.get_response(request)
+            self._annotate(request, response, report)
+        return response
+
+    @staticmethod
+    def _annotate(request, response, report):
+        if report is None:
+            # Başka bir istek profilleniyor
+            response["X-Panel-Profile-Id"] = "busy"
+            return
+        match = getattr(request, "resolver_match", None)
+        report.view = (match.url_name or match.view_name) if match else ""
+        report.status = response.status_code
+        response["X-Panel-Profile-Id"] = str(report.id)
+
+
+class SlowRequestMiddleware:
+    """
+    SLOW_REQUEST_MS süresini aşan istekleri Supabase çağrıları, önbellek
+    isabetleri ve render süresiyle birlikte kaydeder (bkz. services.slow_requests).
+    İstek durumunu okuduğu için RequestStateMiddleware'den sonra gelmelidir.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        threshold = slow_requests.threshold_ms()
+        if not threshold:
+            return self.get_response(request)
+        started = time.perf_counter()
+        with query_counter.recording() as log:
+            response = self.get_response(request)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= threshold:
+            slow_requests.capture(**self._entry(request, response, log, elapsed_ms, request.session.get("hospital_id")))
+        return response
+
+    async def __acall__(self, request):
+        threshold = slow_requests.threshold_ms()
+        if not threshold:
+            return await self.get_response(request)
+        started = time.perf_counter()
+        with query_counter.recording() as log:
+            response = await self.get_response(request)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= threshold:
+            hospital_id = await request.session.aget("hospital_id")
+            entry = self._entry(request, response, log, elapsed_ms, hospital_id)
+            await sync_to_async(slow_requests.capture)(**entry)
+        return response
+
+    @staticmethod
+    def _entry(request, response, log, elapsed_ms, hospital_id):
+        match = getattr(request, "resolver_match", None)
+        return {
+            "method": request.method,
+            "path": request.path,
+            "view": (match.url_name or match.view_name) if match else "",
+            "hospital_id": str(hospital_id) if hospital_id else None,
+            "status": response.status_code,
+            "duration_ms": elapsed_ms,
+            "details": slow_requests.build_details(request, log, request_context.current()),
+        }
@@ -22,7 +22,9 @@ class HospitalContextMixin:
             from .services import hospital_service
             request = getattr(self, 'request', None)
             try:
-                context['hospital'] = hospital_service.get_hospital(request)
+                context['hospital'] = hospital_service.get_hospital(
+                    request, columns=hospital_service.HOSPITAL_SUMMARY_COLUMNS
+                )
             except ValueError:
                 context['hospital'] = None
         return context
@@ -0,0 +1,20 @@
+"""
+Template render yardımcıları.
+Django'nun render/render_to_string fonksiyonlarını sarar ve render süresini
+istek durumuna ekler (yavaş istek dökümünde "render" süresi olarak görünür).
+"""
+
+from django import shortcuts
+from django.template import loader
+
+from .services import request_context
+
+
+def render(request, template_name, context=None, *args, **kwargs):
+    with request_context.timed("render"):
+        return shortcuts.render(request, template_name, context, *args, **kwargs)
+
+
+def render_to_string(template_name, context=None, *args, **kwargs):
+    with request_context.timed("render"):
+        return loader.render_to_string(template_name, context, *args, **kwargs)
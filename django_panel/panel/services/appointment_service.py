@@ -1,38 +1,115 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 from datetime import datetime, date, time
-from typing import List
+from typing import Iterable, List
 
-from .supabase_client import get_supabase_client
-from .hospital_service import _get_active_hospital_id
+from . import data_versions, holiday_index
+from .supabase_client import get_async_supabase_client, get_supabase_client
+from .resilience import (
+    CircuitBreaker,
+    api_error_code,
+    feature_missing,
+    get_breaker,
+    mark_feature_missing,
+    resilient_aexecute,
+    resilient_execute,
+)
+from .hospital_service import _aget_active_hospital_id, _get_active_hospital_id
+from .user_service import aget_users_by_ids, get_users_by_ids
 
+logger = logging.getLogger(__name__)
 
-def get_appointments(request=None) -> List[dict]:
-    """Tüm randevuları Supabase'den getirir."""
-    supabase = get_supabase_client()
+APPOINTMENT_COLUMNS = "id,user_id,hospital_id,doctor_id,date,time,status,service_id,notes,created_at"
+# Listeleme ekranlarının ihtiyaç duyduğu isimler tek sorguda gelir (bkz. appointment_embeds.sql)
+APPOINTMENT_EMBEDS = "doctors(name,surname),services(name),user_profiles(name,surname)"
+# Embed ilişkileri tanımlı değilse PostgREST'in verdiği hata kodu
+MISSING_RELATIONSHIP = "PGRST200"
+EMBEDS_FEATURE = "appointment_embeds"
+
+
+def get_appointments(request=None, with_details: bool = False) -> List[dict]:
+    """Tüm randevuları Supabase'den getirir.
+
+    with_details=True ise doktor, hizmet ve hasta adları da aynı sorguda gelir
+    (doctorName, serviceName, patientName).
+    """
     try:
         hospital_id = _get_active_hospital_id(request)
-        result = supabase.table("appointments").select("*").eq("hospital_id", hospital_id).execute()
     except ValueError:
-        result = supabase.table("appointments").select("*").execute()
-    
-    if not result.data:
-        return []
-    
-    return [_format_appointment_from_db(a) for a in result.data]
+        hospital_id = None
 
+    def build_query(columns):
+        query = get_supabase_client().table("appointments").select(columns)
+        if hospital_id:
+            query = query.eq("hospital_id", hospital_id)
+        return query
+
+    appointments = _execute_appointment_query(build_query, with_details)
+    if with_details:
+        _fill_missing_patient_names(appointments)
+    return appointments
 
-def filter_appointments(status=None, doctor_id=None, service_id=None, start_date=None, end_date=None, request=None):
-    """Randevuları filtreler."""
-    supabase = get_supabase_client()
-    query = supabase.table("appointments").select("*")
 
+def filter_appointments(
+    status=None,
+    doctor_id=None,
+    service_id=None,
+    start_date=None,
+    end_date=None,
+    request=None,
+    with_details: bool = False,
+):
+    """Randevuları filtreler."""
     try:
         hospital_id = _get_active_hospital_id(request)
-        query = query.eq("hospital_id", hospital_id)
     except ValueError:
-        pass
-    
+        hospital_id = None
+
+    def build_query(columns):
+        return _apply_appointment_filters(
+            get_supabase_client().table("appointments").select(columns),
+            hospital_id, status, doctor_id, service_id, start_date, end_date,
+        )
+
+    appointments = _execute_appointment_query(build_query, with_details)
+    if with_details:
+        _fill_missing_patient_names(appointments)
+    return appointments
+
+
+async def afilter_appointments(
+    status=None,
+    doctor_id=None,
+    service_id=None,
+    start_date=None,
+    end_date=None,
+    request=None,
+    with_details: bool = False,
+):
+    """`filter_appointments`'ın async karşılığı."""
+    try:
+        hospital_id = await _aget_active_hospital_id(request)
+    except ValueError:
+        hospital_id = None
+    supabase = await get_async_supabase_client()
+
+    def build_query(columns):
+        return _apply_appointment_filters(
+            supabase.table("appointments").select(columns),
+            hospital_id, status, doctor_id, service_id, start_date, end_date,
+        )
+
+    appointments = await _aexecute_appointment_query(build_query, with_details)
+    if with_details:
+        await _afill_missing_patient_names(appointments)
+    return appointments
+
+
+def _apply_appointment_filters(query, hospital_id, status, doctor_id, service_id, start_date, end_date):
+    if hospital_id:
+        query = query.eq("hospital_id", hospital_id)
     if status:
         query = query.eq("status", status)
     if doctor_id:
@@ -43,13 +120,124 @@ def filter_appointments(status=None, doctor_id=None, service_id=None, start_date
         query = query.gte("date", start_date.isoformat())
     if end_date:
         query = query.lte("date", end_date.isoformat())
-    
-    result = query.execute()
-    
-    if not result.data:
-        return []
-    
-    return [_format_appointment_from_db(a) for a in result.data]
+    return query
+
+
+def _execute_appointment_query(build_query, with_details: bool) -> List[dict]:
+    """Sorguyu çalıştırır; with_details ise isimleri embed ederek getirir.
+
+    build_query, select edilecek kolonları alıp filtrelenmiş sorguyu döndürür.
+    Embed ilişkileri yoksa (PGRST200) bu durum bir süre hatırlanır ve isimler
+    `in` sorgularıyla eklenir; diğer hatalar çağırana iletilir. Profili
+    olmayan hastaların adları burada tamamlanmaz; gösterilecek kayıtlar için
+    `_fill_missing_patient_names` çağrılmalıdır.
+    """
+    if not with_details:
+        result = resilient_execute(build_query(APPOINTMENT_COLUMNS))
+        return [_format_appointment_from_db(a) for a in result.data or []]
+
+    if not feature_missing(EMBEDS_FEATURE):
+        try:
+            result = resilient_execute(build_query(f"{APPOINTMENT_COLUMNS},{APPOINTMENT_EMBEDS}"))
+            return [_format_appointment_from_db(a) for a in result.data or []]
+        except Exception as exc:
+            if api_error_code(exc) != MISSING_RELATIONSHIP:
+                raise
+            mark_feature_missing(EMBEDS_FEATURE)
+
+    # appointment_embeds.sql uygulanmamışsa isimler toplu sorgularla eklenir
+    rows = _attach_details(resilient_execute(build_query(APPOINTMENT_COLUMNS)).data or [])
+    return [_format_appointment_from_db(a) for a in rows]
+
+
+async def _aexecute_appointment_query(build_query, with_details: bool) -> List[dict]:
+    """`_execute_appointment_query`'nin async karşılığı; build_query async client sorgusu döndürmelidir."""
+    if not with_details:
+        result = await resilient_aexecute(build_query(APPOINTMENT_COLUMNS))
+        return [_format_appointment_from_db(a) for a in result.data or []]
+
+    if not feature_missing(EMBEDS_FEATURE):
+        try:
+            result = await resilient_aexecute(build_query(f"{APPOINTMENT_COLUMNS},{APPOINTMENT_EMBEDS}"))
+            return [_format_appointment_from_db(a) for a in result.data or []]
+        except Exception as exc:
+            if api_error_code(exc) != MISSING_RELATIONSHIP:
+                raise
+            mark_feature_missing(EMBEDS_FEATURE)
+
+    result = await resilient_aexecute(build_query(APPOINTMENT_COLUMNS))
+    rows = await _aattach_details(result.data or [])
+    return [_format_appointment_from_db(a) for a in rows]
+
+
+def _attach_details(rows: list[dict]) -> list[dict]:
+    """Embed kullanılamadığında doktor, hizmet ve hasta adlarını `in` sorgularıyla ekler."""
+    supabase = get_supabase_client()
+
+    def related_map(table, columns, key):
+        ids = sorted({str(row[key]) for row in rows if row.get(key)})
+        if not ids:
+            return {}
+        result = resilient_execute(supabase.table(table).select(f"id,{columns}").in_("id", ids))
+        return {str(item["id"]): item for item in result.data or []}
+
+    doctors = related_map("doctors", "name,surname", "doctor_id")
+    services = related_map("services", "name", "service_id")
+    profiles = related_map("user_profiles", "name,surname", "user_id")
+    for row in rows:
+        row["doctors"] = doctors.get(str(row.get("doctor_id", "")))
+        row["services"] = services.get(str(row.get("service_id", "")))
+        row["user_profiles"] = profiles.get(str(row.get("user_id", "")))
+    return rows
+
+
+async def _aattach_details(rows: list[dict]) -> list[dict]:
+    """`_attach_details`'in async karşılığı; üç `in` sorgusu paralel çalışır."""
+    supabase = await get_async_supabase_client()
+
+    async def related_map(table, columns, key):
+        ids = sorted({str(row[key]) for row in rows if row.get(key)})
+        if not ids:
+            return {}
+        result = await resilient_aexecute(supabase.table(table).select(f"id,{columns}").in_("id", ids))
+        return {str(item["id"]): item for item in result.data or []}
+
+    doctors, services, profiles = await asyncio.gather(
+        related_map("doctors", "name,surname", "doctor_id"),
+        related_map("services", "name", "service_id"),
+        related_map("user_profiles", "name,surname", "user_id"),
+    )
+    for row in rows:
+        row["doctors"] = doctors.get(str(row.get("doctor_id", "")))
+        row["services"] = services.get(str(row.get("service_id", "")))
+        row["user_profiles"] = profiles.get(str(row.get("user_id", "")))
+    return rows
+
+
+def _missing_patient_ids(appointments: list[dict]) -> set[str]:
+    return {apt["userId"] for apt in appointments if apt["userId"] and not apt.get("patientName")}
+
+
+def _fill_missing_patient_names(appointments: list[dict]) -> None:
+    """user_profiles kaydı olmayan hastaların adını Supabase Auth'dan tamamlar."""
+    missing = _missing_patient_ids(appointments)
+    if missing:
+        _apply_patient_names(appointments, get_users_by_ids(missing))
+
+
+async def _afill_missing_patient_names(appointments: list[dict]) -> None:
+    """`_fill_missing_patient_names`'in async karşılığı."""
+    missing = _missing_patient_ids(appointments)
+    if missing:
+        _apply_patient_names(appointments, await aget_users_by_ids(missing))
+
+
+def _apply_patient_names(appointments: list[dict], users: dict[str, dict]) -> None:
+    for apt in appointments:
+        if apt.get("patientName") or apt["userId"] not in users:
+            continue
+        user = users[apt["userId"]]
+        apt["patientName"] = f"{user.get('name', '')} {user.get('surname', '')}".strip() or None
 
 
 def update_appointment(appointment_id: str, **changes):
@@ -72,6 +260,8 @@ def update_appointment(appointment_id: str, **changes):
     if not result.data:
         raise ValueError("Randevu bulunamadı veya güncellenemedi")
     
+    data_versions.bump_rows(result.data)
+    
     return _format_appointment_from_db(result.data[0])
 
 
@@ -82,12 +272,13 @@ def delete_appointment(appointment_id: str):
     
     if not result.data:
         raise ValueError("Randevu bulunamadı veya silinemedi")
+    
+    data_versions.bump_rows(result.data)
 
 
 def get_summary(request=None):
     """Randevu özet istatistiklerini getirir."""
     supabase = get_supabase_client()
-    today = datetime.now().date()
     
     # Tüm randevuları al
     query = supabase.table("appointments").select("status,date")
@@ -96,8 +287,24 @@ def get_summary(request=None):
         query = query.eq("hospital_id", hospital_id)
     except ValueError:
         pass
-    all_appointments = query.execute()
-    
+    all_appointments = resilient_execute(query)
+    return _summary_from_rows(all_appointments.data or [])
+
+
+async def aget_summary(request=None):
+    """`get_summary`'nin async karşılığı."""
+    supabase = await get_async_supabase_client()
+    query = supabase.table("appointments").select("status,date")
+    try:
+        query = query.eq("hospital_id", await _aget_active_hospital_id(request))
+    except ValueError:
+        pass
+    result = await resilient_aexecute(query)
+    return _summary_from_rows(result.data or [])
+
+
+def _summary_from_rows(rows: list[dict]) -> dict:
+    today = datetime.now().date()
     stats = {
         "pending": 0,
         "completed": 0,
@@ -105,19 +312,18 @@ def get_summary(request=None):
         "today": 0,
     }
     
-    if all_appointments.data:
-        for apt in all_appointments.data:
-            status = apt.get("status", "")
-            if status == "pending":
-                stats["pending"] += 1
-            elif status == "completed":
-                stats["completed"] += 1
-            elif status == "cancelled":
-                stats["cancelled"] += 1
-            
-            apt_date = apt.get("date", "")
-            if apt_date == today.isoformat():
-                stats["today"] += 1
+    for apt in rows:
+        status = apt.get("status", "")
+        if status == "pending":
+            stats["pending"] += 1
+        elif status == "completed":
+            stats["completed"] += 1
+        elif status == "cancelled":
+            stats["cancelled"] += 1
+        
+        apt_date = apt.get("date", "")
+        if apt_date == today.isoformat():
+            stats["today"] += 1
     
     return stats
 
@@ -125,29 +331,69 @@ def get_summary(request=None):
 def auto_cancel_overdue_appointments(request=None) -> int:
     """
     Randevu tarihinden 5 gün geçmiş ve hala tamamlanmamış randevuları otomatik iptal eder.
+    Bu bir bakım işidir: Supabase'e ulaşılamıyorsa atlanır (sayfa son sağlam
+    verilerle açılır) ve bir sonraki sayfa açılışında tekrar denenir.
     Returns: İptal edilen randevu sayısı
     """
     from datetime import timedelta
     
+    if _upstream_down():
+        return 0
     supabase = get_supabase_client()
     today = date.today()
     five_days_ago = (today - timedelta(days=5)).isoformat()
     
+    # Tek istek: filtre güncellemenin kendisinde; ID listesi URL'e konmaz (uzun birikimde 414 olmasın)
+    query = supabase.table("appointments").update({"status": "cancelled"})
     try:
-        hospital_id = _get_active_hospital_id(request)
-        query = supabase.table("appointments").select("id").eq("hospital_id", hospital_id)
+        query = query.eq("hospital_id", _get_active_hospital_id(request))
     except ValueError:
-        query = supabase.table("appointments").select("id")
+        pass
 
-    result = query.eq("status", "pending").lt("date", five_days_ago).execute()
-    
-    cancelled_count = 0
-    if result.data:
-        for apt in result.data:
-            supabase.table("appointments").update({"status": "cancelled"}).eq("id", apt["id"]).execute()
-            cancelled_count += 1
-    
-    return cancelled_count
+    try:
+        result = query.eq("status", "pending").lt("date", five_days_ago).execute()
+    except Exception as exc:
+        if api_error_code(exc) is not None:
+            raise
+        logger.warning("Gecikmiş randevular iptal edilemedi: %s", exc)
+        return 0
+    cancelled = result.data or []
+    if cancelled:
+        data_versions.bump_rows(cancelled)
+    return len(cancelled)
+
+
+def _upstream_down() -> bool:
+    """Randevu okumalarının devresi açıksa yazma denenmez (her sayfa zaman aşımını beklemesin)."""
+    return get_breaker("appointments").state == CircuitBreaker.OPEN
+
+
+async def aauto_cancel_overdue_appointments(request=None) -> int:
+    """`auto_cancel_overdue_appointments`'ın async karşılığı."""
+    from datetime import timedelta
+
+    if _upstream_down():
+        return 0
+    supabase = await get_async_supabase_client()
+    five_days_ago = (date.today() - timedelta(days=5)).isoformat()
+
+    query = supabase.table("appointments").update({"status": "cancelled"})
+    try:
+        query = query.eq("hospital_id", await _aget_active_hospital_id(request))
+    except ValueError:
+        pass
+
+    try:
+        result = await query.eq("status", "pending").lt("date", five_days_ago).execute()
+    except Exception as exc:
+        if api_error_code(exc) is not None:
+            raise
+        logger.warning("Gecikmiş randevular iptal edilemedi: %s", exc)
+        return 0
+    cancelled = result.data or []
+    if cancelled:
+        data_versions.bump_rows(cancelled)
+    return len(cancelled)
 
 
 def is_appointment_time_blocked(appointment_date: date, appointment_time: str, request=None) -> bool:
@@ -156,46 +402,46 @@ def is_appointment_time_blocked(appointment_date: date, appointment_time: str, r
     Tüm gün tatillerde True döner (randevu alınamaz).
     Saatli tatillerde sadece tatil saatleri içinde True döner.
     """
-    supabase = get_supabase_client()
-    appointment_date_str = appointment_date.isoformat()
-    
-    # Randevu saatini time objesine çevir
-    try:
-        apt_time = datetime.strptime(appointment_time, "%H:%M").time()
-    except (ValueError, TypeError):
-        return False
-    
-    # O tarihteki hastane tatillerini getir
-    query = supabase.table("holidays").select("*").eq("date", appointment_date_str).is_("doctor_id", "null")
+    slot = (appointment_date, appointment_time)
+    return slot in get_blocked_slots([slot], request=request)
+
+
+def get_blocked_slots(slots: Iterable[tuple[date, str]], doctor_id: str | None = None, request=None) -> set[tuple[date, str]]:
+    """
+    Verilen (tarih, "HH:MM") slotlarından hangilerinin tatile denk geldiğini döndürür.
+    Tatiller slotların kapsadığı tarih aralığı için tek seferde yüklenir.
+    doctor_id verilirse hastane tatillerine ek olarak doktorun tatilleri de dikkate alınır.
+    """
+    slots = list(slots)
+    if not slots:
+        return set()
+
     try:
         hospital_id = _get_active_hospital_id(request)
-        query = query.eq("hospital_id", hospital_id)
     except ValueError:
-        pass
-    result = query.execute()
-    
-    if not result.data:
-        return False
-    
-    for holiday in result.data:
-        # Tüm gün tatil
-        if holiday.get("is_full_day", True):
-            return True
-        
-        # Saatli tatil kontrolü
-        start_time_str = holiday.get("start_time")
-        end_time_str = holiday.get("end_time")
-        if start_time_str and end_time_str:
-            try:
-                start_time = datetime.strptime(start_time_str, "%H:%M").time()
-                end_time = datetime.strptime(end_time_str, "%H:%M").time()
-                # Randevu saati tatil saatleri arasındaysa engelle
-                if start_time <= apt_time <= end_time:
-                    return True
-            except (ValueError, TypeError):
-                continue
-    
-    return False
+        hospital_id = None
+
+    dates = [slot_date for slot_date, _ in slots]
+    index = holiday_index.get_holiday_index(hospital_id, min(dates), max(dates))
+
+    blocked = set()
+    for slot_date, slot_time in slots:
+        minute = holiday_index.parse_minutes(slot_time)
+        if minute is None:
+            continue
+        if index.is_blocked(slot_date, minute, doctor_id):
+            blocked.add((slot_date, slot_time))
+    return blocked
+
+
+def _embedded_name(db_appointment: dict, relation: str) -> str | None:
+    """Embed edilen ilişkiden "ad soyad" üretir; ilişki gelmediyse None döner."""
+    related = db_appointment.get(relation)
+    if isinstance(related, list):
+        related = related[0] if related else None
+    if not related:
+        return None
+    return " ".join(part for part in (related.get("name"), related.get("surname")) if part) or None
 
 
 def _format_appointment_from_db(db_appointment: dict) -> dict:
@@ -211,4 +457,7 @@ def _format_appointment_from_db(db_appointment: dict) -> dict:
         "service": str(db_appointment.get("service_id", "")),
         "notes": db_appointment.get("notes", ""),
         "createdAt": db_appointment.get("created_at", ""),
+        "doctorName": _embedded_name(db_appointment, "doctors"),
+        "serviceName": _embedded_name(db_appointment, "services"),
+        "patientName": _embedded_name(db_appointment, "user_profiles"),
     }
@@ -5,10 +5,23 @@ from __future__ import annotations
 from django.conf import settings
 from supabase import create_client, Client
 
+from . import fake_supabase
+from .supabase_client import build_client_options
+
 
 def get_auth_client() -> Client:
-    """Supabase Auth client'ı döndürür (anon key ile)."""
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+    """Supabase Auth client'ı döndürür (anon key ile).
+
+    Giriş yapılan client oturum token'ını kendi üzerinde tuttuğu için istekler
+    arasında paylaşılmaz; bağlantılar ise paylaşılan HTTP havuzundan gelir.
+    """
+    if fake_supabase.is_enabled():
+        return fake_supabase.get_client()
+    return create_client(
+        settings.SUPABASE_URL,
+        settings.SUPABASE_ANON_KEY,
+        options=build_client_options(persist_session=False, auto_refresh_token=False),
+    )
 
 
 def sign_up(email: str, password: str) -> dict:
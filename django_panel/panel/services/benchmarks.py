@@ -0,0 +1,443 @@
+"""Panel view'leri ve sık kullanılan servis fonksiyonları için benchmark'lar.
+
+Senaryolar sahte Supabase backend'ine (bkz. fake_supabase) karşı çalışır;
+ağ gerekmez. Her ölçek için seed verisindeki randevu, yorum, puan ve tatil
+satırları ölçek katsayısı kadar çoğaltılır, böylece aynı hastanenin veri
+hacmi büyür. Her senaryo için duvar saati süresi (min / medyan / p95),
+Supabase çağrı sayısı ve tepe bellek (tracemalloc) ölçülür.
+
+Varsayılan olarak her tekrar soğuk çalışır: referans önbellekleri,
+single-flight sonuçları ve konum lru_cache'leri her tekrardan önce
+temizlenir. Bellek ölçümü süre ölçümlerini bozmamak için ayrı bir
+çalıştırmada yapılır.
+
+Sonuçlar JSON olarak yazılır ve `compare` ile önceki bir çalıştırmayla
+karşılaştırılabilir (bkz. `manage.py bench_panel`).
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from django.conf import settings
+from django.test import RequestFactory, override_settings
+
+from . import (
+    cache, data_versions, fake_supabase, holiday_index, location_service, query_counter, resilience, single_flight,
+)
+
+# Ölçek katsayısıyla çoğaltılan tablolar; puan/yorumların appointment_id'si de kopyaya taşınır
+SCALED_TABLES = ("appointments", "ratings", "reviews", "holidays")
+_APPOINTMENT_REFERENCES = ("ratings", "reviews")
+
+# json_repository senaryolarının kullandığı dosya
+JSON_REPOSITORY_FILE = "appointments"
+
+
+@dataclass
+class BenchContext:
+    """Senaryoların paylaştığı istek, kimlikler ve geçici veri klasörü."""
+
+    request: object
+    hospital_id: str
+    doctor_id: Optional[str]
+    year: int
+    month: int
+    data_dir: Path
+    province_id: Optional[str] = None
+    district_id: Optional[str] = None
+    neighborhood_id: Optional[str] = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    run: Callable[[BenchContext], object]
+    group: str = "service"
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    group: str
+    scale: int
+    rows: dict[str, int]
+    wall_ms: dict[str, float]
+    upstream_calls: int
+    upstream_ms: float
+    n_plus_one: list = field(default_factory=list)
+    peak_memory_kb: float = 0.0
+    error: str = ""
+
+    def as_dict(self) -> dict:
+        return {
+            "scenario": self.scenario,
+            "group": self.group,
+            "scale": self.scale,
+            "rows": self.rows,
+            "wall_ms": self.wall_ms,
+            "upstream_calls": self.upstream_calls,
+            "upstream_ms": self.upstream_ms,
+            "n_plus_one": self.n_plus_one,
+            "peak_memory_kb": self.peak_memory_kb,
+            "error": self.error,
+        }
+
+
+def _dashboard(ctx: BenchContext):
+    from .dashboard_service import load_dashboard_context
+
+    return load_dashboard_context(ctx.request)
+
+
+def _calendar(ctx: BenchContext):
+    from .schedule_service import build_calendar_data
+
+    return build_calendar_data(ctx.year, ctx.month, request=ctx.request)
+
+
+def _calendar_doctor(ctx: BenchContext):
+    from .schedule_service import build_calendar_data
+
+    return build_calendar_data(ctx.year, ctx.month, ctx.doctor_id, request=ctx.request)
+
+
+def _appointments(ctx: BenchContext):
+    from ..views import AppointmentManagementView
+    from .appointment_service import filter_appointments
+
+    appointments = filter_appointments(request=ctx.request, with_details=True)
+    return AppointmentManagementView()._enrich_appointments(appointments)
+
+
+def _appointments_pending(ctx: BenchContext):
+    from ..views import AppointmentManagementView
+    from .appointment_service import filter_appointments
+
+    appointments = filter_appointments(status="pending", request=ctx.request, with_details=True)
+    return AppointmentManagementView()._enrich_appointments(appointments)
+
+
+def _reviews(ctx: BenchContext):
+    from .review_service import get_reviews_with_details
+
+    return get_reviews_with_details(request=ctx.request)
+
+
+def _reviews_filtered(ctx: BenchContext):
+    from .review_service import get_reviews_with_details
+
+    return get_reviews_with_details(doctor_id=ctx.doctor_id, has_reply=False, request=ctx.request)
+
+
+def _reviews_search(ctx: BenchContext):
+    from .review_service import get_reviews_with_details
+
+    return get_reviews_with_details(q="memnun", request=ctx.request)
+
+
+def _locations(ctx: BenchContext):
+    return (
+        location_service.get_provinces(),
+        location_service.get_districts(ctx.province_id),
+        location_service.get_neighborhoods(ctx.district_id),
+        location_service.get_neighborhood(ctx.neighborhood_id),
+    )
+
+
+def _json_read(ctx: BenchContext):
+    from .json_repository import load_json
+
+    return load_json(JSON_REPOSITORY_FILE)
+
+
+def _json_update(ctx: BenchContext):
+    from .json_repository import update_collection
+
+    def touch(item):
+        return {**item, "notes": "bench"}
+
+    return update_collection(JSON_REPOSITORY_FILE, lambda item: item.get("status") == "pending", touch)
+
+
+def _json_append(ctx: BenchContext):
+    from .json_repository import append_to_collection
+
+    return append_to_collection(JSON_REPOSITORY_FILE, {"id": f"bench-{time.perf_counter_ns()}", "status": "pending"})
+
+
+SCENARIOS: list[Scenario] = [
+    Scenario("dashboard", _dashboard, group="view"),
+    Scenario("calendar", _calendar, group="view"),
+    Scenario("calendar_doctor", _calendar_doctor, group="view"),
+    Scenario("appointments", _appointments, group="view"),
+    Scenario("appointments_pending", _appointments_pending, group="view"),
+    Scenario("reviews", _reviews, group="view"),
+    Scenario("reviews_filtered", _reviews_filtered, group="view"),
+    Scenario("reviews_search", _reviews_search, group="view"),
+    Scenario("locations", _locations, group="location"),
+    Scenario("json_read", _json_read, group="json_repository"),
+    Scenario("json_update", _json_update, group="json_repository"),
+    Scenario("json_append", _json_append, group="json_repository"),
+]
+
+
+def select_scenarios(names: Optional[list[str]] = None) -> list[Scenario]:
+    """İsim veya grup adına göre senaryoları seçer; boşsa hepsi."""
+    if not names:
+        return list(SCENARIOS)
+    selected = [scenario for scenario in SCENARIOS if scenario.name in names or scenario.group in names]
+    unknown = set(names) - {scenario.name for scenario in SCENARIOS} - {scenario.group for scenario in SCENARIOS}
+    if unknown:
+        raise ValueError(f"Bilinmeyen senaryo: {', '.join(sorted(unknown))}")
+    return selected
+
+
+def scale_database(db: fake_supabase.FakeDatabase, factor: int) -> dict[str, int]:
+    """Seed satırlarını katsayı kadar çoğaltır; tablo başına satır sayısını döndürür."""
+    if factor < 1:
+        raise ValueError("Ölçek katsayısı en az 1 olmalıdır")
+    with db.lock:
+        originals = {name: [dict(row) for row in db.table(name).rows.values()] for name in SCALED_TABLES}
+        for name, rows in originals.items():
+            clones = []
+            for copy_index in range(1, factor):
+                for row in rows:
+                    clone = dict(row, id=f"{row['id']}-{copy_index}")
+                    if name in _APPOINTMENT_REFERENCES and clone.get("appointment_id") is not None:
+                        clone["appointment_id"] = f"{clone['appointment_id']}-{copy_index}"
+                    clones.append(clone)
+            db.load(name, clones)
+        return {name: len(table.rows) for name, table in sorted(db.tables.items())}
+
+
+def _prepare_json_dir(factor: int) -> Path:
+    """json_repository senaryoları için seed dosyasının çoğaltılmış kopyasını içeren geçici klasör."""
+    data_dir = Path(tempfile.mkdtemp(prefix="panel-bench-"))
+    source = Path(settings.PANEL_DATA_DIR) / f"{JSON_REPOSITORY_FILE}.json"
+    with source.open("r", encoding="utf-8") as fp:
+        records = json.load(fp)
+    scaled = [
+        dict(record, id=f"{record['id']}-{copy_index}") if copy_index else record
+        for copy_index in range(factor)
+        for record in records
+    ]
+    with (data_dir / source.name).open("w", encoding="utf-8") as fp:
+        json.dump(scaled, fp, ensure_ascii=False, indent=2)
+    return data_dir
+
+
+def _reset_caches() -> None:
+    # Sürüm artışları fake_backend'in geçici DATA_VERSION_DB dosyasına yazılır
+    cache.invalidate_all()
+    holiday_index.invalidate()
+    single_flight.forget()
+    resilience.forget()
+    for loader in (location_service._provinces, location_service._districts, location_service._neighborhoods):
+        loader.cache_clear()
+
+
+def _build_context(db: fake_supabase.FakeDatabase, data_dir: Path) -> BenchContext:
+    hospitals = sorted(db.table("hospitals").rows.values(), key=lambda row: str(row.get("id")))
+    if not hospitals:
+        raise ValueError("Sahte veritabanında hastane yok; SUPABASE_FAKE_SEED_DIR'i kontrol edin.")
+    hospital_id = str(hospitals[0]["id"])
+    doctor_id = next(
+        (str(row["id"]) for row in db.table("doctors").rows.values() if str(row.get("hospital_id")) == hospital_id),
+        None,
+    )
+    # Takvim, hastanenin en son randevusunun ayında açılır
+    dates = [str(row.get("date")) for row in db.table("appointments").rows.values()
+             if str(row.get("hospital_id")) == hospital_id and row.get("date")]
+    latest = date.fromisoformat(max(dates)) if dates else date.today()
+
+    request = RequestFactory().get("/")
+    request.session = {"hospital_id": hospital_id}
+
+    province = next(iter(location_service.get_provinces()), None)
+    district = next(iter(location_service.get_districts(province["id"])), None) if province else None
+    neighborhood = next(iter(location_service.get_neighborhoods(district["id"])), None) if district else None
+    return BenchContext(
+        request=request,
+        hospital_id=hospital_id,
+        doctor_id=doctor_id,
+        year=latest.year,
+        month=latest.month,
+        data_dir=data_dir,
+        province_id=province["id"] if province else None,
+        district_id=district["id"] if district else None,
+        neighborhood_id=neighborhood["id"] if neighborhood else None,
+    )
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    # nearest-rank yöntemi
+    index = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+@contextmanager
+def fake_backend(latency_ms: float = 0.0, seed_dir: Optional[str] = None) -> Iterator[fake_supabase.FakeDatabase]:
+    """Blok boyunca SUPABASE_BACKEND=fake ile yeni bir sahte veritabanı kullanır.
+
+    seed_dir verilmezse SUPABASE_FAKE_SEED_DIR ayarı kullanılır (bkz. generate_dataset).
+    Veri sürümleri geçici bir dosyada tutulur; önbellek temizlikleri çalışan
+    sunucuların paylaştığı DATA_VERSION_DB'yi artırmaz.
+    """
+    version_dir = Path(tempfile.mkdtemp(prefix="panel-versions-"))
+    overrides = {
+        "SUPABASE_BACKEND": "fake",
+        "SUPABASE_FAKE_LATENCY_MS": latency_ms,
+        "DATA_VERSION_DB": str(version_dir / "data_versions.sqlite3"),
+    }
+    if seed_dir:
+        overrides["SUPABASE_FAKE_SEED_DIR"] = str(seed_dir)
+    try:
+        with override_settings(**overrides):
+            data_versions.forget()
+            fake_supabase.reset()
+            _reset_caches()
+            try:
+                yield fake_supabase.get_database()
+            finally:
+                fake_supabase.reset()
+                _reset_caches()
+                data_versions.forget()
+    finally:
+        shutil.rmtree(version_dir, ignore_errors=True)
+
+
+def run_scenario(scenario: Scenario, ctx: BenchContext, scale: int, rows: dict[str, int],
+                 repeat: int = 5, warm: bool = False) -> ScenarioResult:
+    """Senaryoyu `repeat` kez ölçer; çağrı sayısı ilk (soğuk) tekrardan alınır."""
+    timings = []
+    first_log = None
+    with override_settings(PANEL_DATA_DIR=ctx.data_dir):
+        try:
+            for iteration in range(repeat):
+                if not warm:
+                    _reset_caches()
+                with query_counter.recording() as log:
+                    started = time.perf_counter()
+                    scenario.run(ctx)
+                    timings.append((time.perf_counter() - started) * 1000)
+                if first_log is None:
+                    first_log = log
+
+            if not warm:
+                _reset_caches()
+            tracemalloc.start()
+            try:
+                scenario.run(ctx)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        except Exception as exc:
+            return ScenarioResult(scenario.name, scenario.group, scale, rows, {}, 0, 0.0,
+                                  error=f"{type(exc).__name__}: {exc}")
+
+    return ScenarioResult(
+        scenario=scenario.name,
+        group=scenario.group,
+        scale=scale,
+        rows=rows,
+        wall_ms={
+            "min": round(min(timings), 3),
+            "median": round(statistics.median(timings), 3),
+            "p95": round(_percentile(timings, 95), 3),
+            "first": round(timings[0], 3),
+        },
+        upstream_calls=first_log.count,
+        upstream_ms=round(first_log.duration * 1000, 3),
+        n_plus_one=first_log.n_plus_one(),
+        peak_memory_kb=round(peak / 1024, 1),
+    )
+
+
+def run(scales: list[int], scenarios: list[Scenario], repeat: int = 5, latency_ms: float = 0.0,
+        warm: bool = False, seed_dir: Optional[str] = None,
+        progress: Optional[Callable[[ScenarioResult], None]] = None) -> dict:
+    """Tüm ölçeklerde senaryoları çalıştırır ve JSON'a yazılabilir rapor döndürür."""
+    if repeat < 1:
+        raise ValueError("Tekrar sayısı en az 1 olmalıdır")
+    results = []
+    for scale in scales:
+        with fake_backend(latency_ms, seed_dir) as db:
+            rows = scale_database(db, scale)
+            data_dir = _prepare_json_dir(scale)
+            try:
+                ctx = _build_context(db, data_dir)
+                for scenario in scenarios:
+                    result = run_scenario(scenario, ctx, scale, rows, repeat=repeat, warm=warm)
+                    results.append(result.as_dict())
+                    if progress:
+                        progress(result)
+            finally:
+                shutil.rmtree(data_dir, ignore_errors=True)
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "seed_dir": str(seed_dir or getattr(settings, "SUPABASE_FAKE_SEED_DIR", "")),
+        "latency_ms": latency_ms,
+        "repeat": repeat,
+        "warm": warm,
+        "results": results,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return output.stdout.strip()
+
+
+def save(report: dict, path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as fp:
+        json.dump(report, fp, ensure_ascii=False, indent=2)
+    return path
+
+
+def load(path: Path) -> dict:
+    with Path(path).open("r", encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+def compare(baseline: dict, current: dict) -> list[dict]:
+    """(senaryo, ölçek) bazında medyan süre, çağrı sayısı ve tepe bellek farkları."""
+    previous = {(item["scenario"], item["scale"]): item for item in baseline.get("results", [])}
+    rows = []
+    for item in current.get("results", []):
+        before = previous.get((item["scenario"], item["scale"]))
+        if before is None or item["error"] or before.get("error"):
+            continue
+        old_median, new_median = before["wall_ms"]["median"], item["wall_ms"]["median"]
+        rows.append({
+            "scenario": item["scenario"],
+            "scale": item["scale"],
+            "median_ms": (old_median, new_median),
+            "change_pct": round((new_median - old_median) / old_median * 100, 1) if old_median else None,
+            "upstream_calls": (before["upstream_calls"], item["upstream_calls"]),
+            "peak_memory_kb": (before["peak_memory_kb"], item["peak_memory_kb"]),
+        })
+    return rows
@@ -0,0 +1,159 @@
+"""Referans tabloları için process içi TTL önbelleği.
+
+Hizmet kataloğu ve hastane seçim listesi gibi nadiren değişen veriler her
+sayfada yeniden çekilmez. İlgili yazma fonksiyonları (`add_service`,
+`save_hospital` vb.) önbelleği temizler; TTL yalnızca başka bir worker'da
+yapılan değişikliklerin en geç ne zaman görüneceğini belirler.
+
+Önbellek bir veri sürümü scope'una bağlanırsa (bkz. data_versions), başka
+bir worker'daki yazma da en geç sürüm kontrol aralığı kadar sonra görülür.
+
+Önbellekten dönen değerler paylaşılır; çağıranlar bunları değiştirmemelidir.
+"""
+
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import Any, Awaitable, Callable, Hashable
+
+from django.conf import settings
+
+from . import data_versions, request_context
+
+_MISSING = object()
+_monotonic = time.monotonic
+
+_registry: dict[str, "TTLCache"] = {}
+
+
+def _default_ttl() -> float:
+    return float(getattr(settings, "REFERENCE_CACHE_TTL", 300))
+
+
+class TTLCache:
+    """Anahtar bazında süreli önbellek; süresi dolan anahtar tek thread tarafından yeniden yüklenir."""
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[Hashable], Any],
+        ttl: float | None = None,
+        scope: str | None = None,
+    ):
+        self.name = name
+        self._loader = loader
+        self._ttl = ttl
+        self.scope = scope
+        # anahtar -> (değer, son geçerlilik anı, yüklendiği veri sürümü)
+        self._entries: dict[Hashable, tuple[Any, float, int]] = {}
+        self._lock = Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        _registry[name] = self
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl if self._ttl is not None else _default_ttl()
+
+    def _version(self) -> int:
+        return data_versions.current(self.scope) if self.scope else 0
+
+    def _is_valid(self, entry) -> bool:
+        return entry is not None and entry[1] > time.monotonic() and entry[2] == self._version()
+
+    def get(self, key: Hashable = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= _monotonic():
+            return self._load(key)
+        # İsabet yolu: istek durumu bir kez okunur, scope sürümü istek başına bir kez hesaplanır
+        state = request_context.current()
+        if self.scope is not None:
+            version = state.versions.get(self.scope) if state is not None else None
+            if version is None:
+                version = data_versions.current(self.scope)
+            if entry[2] != version:
+                return self._load(key)
+        self.hits += 1
+        if state is not None:
+            hits = state.cache_hits
+            hits[self.name] = hits.get(self.name, 0) + 1
+        return entry[0]
+
+    def _load(self, key: Hashable) -> Any:
+        with self._lock:
+            # Kilidi beklerken başka bir thread yüklemiş olabilir
+            entry = self._entries.get(key)
+            if self._is_valid(entry):
+                self.hits += 1
+                request_context.note_cache(self.name, True)
+                return entry[0]
+            self.misses += 1
+            request_context.note_cache(self.name, False)
+            generation = self._generation
+            # Sürüm yüklemeden önce okunur; yükleme sırasında gelen yazma bir sonraki okumada yakalanır
+            version = self._version()
+
+        value = self._loader(key)
+        with self._lock:
+            # Yükleme sırasında invalidate edildiyse eski veri geri yazılmaz
+            if generation == self._generation:
+                self._entries[key] = (value, time.monotonic() + self.ttl, version)
+        return value
+
+    async def aget(self, key: Hashable, aloader: Callable[[Hashable], Awaitable[Any]]) -> Any:
+        """`get`'in async view'ler için karşılığı; ıskada değer aloader ile yüklenir."""
+        entry = self._entries.get(key)
+        if self._is_valid(entry):
+            self.hits += 1
+            request_context.note_cache(self.name, True)
+            return entry[0]
+        request_context.note_cache(self.name, False)
+        with self._lock:
+            self.misses += 1
+            generation = self._generation
+            version = self._version()
+
+        value = await aloader(key)
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (value, time.monotonic() + self.ttl, version)
+        return value
+
+    def invalidate(self, key: Hashable = _MISSING, broadcast: bool = True) -> None:
+        """Anahtarı (verilmezse tüm önbelleği) temizler.
+
+        broadcast=True ise scope sürümü artırılır; diğer worker'lar da önbelleklerini bırakır.
+        """
+        with self._lock:
+            self._generation += 1
+            if key is _MISSING:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        if broadcast and self.scope:
+            data_versions.bump(self.scope)
+
+    def refresh(self, key: Hashable = None) -> Any:
+        """Anahtarı bu process'te hemen yeniden yükler."""
+        self.invalidate(key, broadcast=False)
+        return self.get(key)
+
+
+def get_cache(name: str) -> TTLCache | None:
+    return _registry.get(name)
+
+
+def invalidate_all() -> None:
+    """Tüm referans önbelleklerini temizler (ör. toplu veri yüklemesinden sonra)."""
+    for cache in list(_registry.values()):
+        cache.invalidate()
+
+
+def cache_stats() -> dict[str, dict]:
+    """Önbellek isabet/ıska sayaçları."""
+    return {
+        name: {"hits": cache.hits, "misses": cache.misses, "entries": len(cache._entries)}
+        for name, cache in _registry.items()
+    }
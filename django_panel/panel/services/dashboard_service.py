@@ -1,17 +1,34 @@
 from __future__ import annotations
 
+import asyncio
 from collections import Counter
 from dataclasses import dataclass
 from datetime import date, datetime
 from typing import Any
 
-from .supabase_client import get_supabase_client
-from .hospital_service import _get_active_hospital_id, _format_hospital_from_db
-from .appointment_service import get_appointments, _format_appointment_from_db
-from .doctor_service import get_doctors, _format_doctor_from_db
-from .service_service import get_services
-from .review_service import _load_reviews, _load_ratings
-from .user_service import get_user_map
+from .supabase_client import get_async_supabase_client, get_supabase_client
+from .resilience import UpstreamUnavailable, resilient_aexecute, resilient_execute
+from .hospital_service import (
+    HOSPITAL_SUMMARY_COLUMNS,
+    SERVICE_CHOICE_COLUMNS,
+    _aget_active_hospital_id,
+    _format_hospital_from_db,
+    _get_active_hospital_id,
+    aget_services,
+    get_services,
+)
+from .appointment_service import (
+    _aexecute_appointment_query,
+    _apply_patient_names,
+    _execute_appointment_query,
+    _missing_patient_ids,
+)
+from .doctor_service import _format_doctor_from_db
+from . import rating_service
+from .user_service import aget_users_by_ids, get_users_by_ids
+
+# Doktor durumu ve puan kartları için gereken kolonlar
+DASHBOARD_DOCTOR_COLUMNS = "id,name,surname,specialty,working_hours"
 
 
 @dataclass
@@ -34,106 +51,273 @@ def _today() -> date:
     return datetime.now().date()
 
 
-def load_dashboard_context(request=None) -> dict[str, Any]:
-    """Dashboard için gerekli tüm verileri Supabase'den getirir."""
-    supabase = get_supabase_client()
-    hospital_id = _get_active_hospital_id(request)
-    
-    # Hastane bilgisi
-    hospital_result = supabase.table("hospitals").select("*").eq("id", hospital_id).single().execute()
-    hospital = _format_hospital_from_db(hospital_result.data)
-    
-    # Doktorlar
-    doctors_result = supabase.table("doctors").select("*").eq("hospital_id", hospital_id).execute()
-    doctors = [_format_doctor_from_db(d) for d in doctors_result.data] if doctors_result.data else []
-    
-    # Randevular
-    appointments_result = supabase.table("appointments").select("*").eq("hospital_id", hospital_id).execute()
-    appointments = [_format_appointment_from_db(a) for a in appointments_result.data] if appointments_result.data else []
-    
-    # Hizmetler
-    services_result = supabase.table("services").select("*").execute()
-    services = services_result.data if services_result.data else []
-    
-    # Puanlamalar
-    ratings_result = supabase.table("ratings").select("*").eq("hospital_id", hospital_id).execute()
-    ratings = ratings_result.data if ratings_result.data else []
-    
-    # Yorumlar
-    reviews_result = supabase.table("reviews").select("*").eq("hospital_id", hospital_id).execute()
-    reviews = reviews_result.data if reviews_result.data else []
-    
-    # Kullanıcılar
-    users = get_user_map()
-    
-    # Tatiller
-    holidays_result = supabase.table("holidays").select("*").eq("hospital_id", hospital_id).execute()
-    holidays = holidays_result.data if holidays_result.data else []
-    
-    # KPI hesaplamaları
+class _DashboardData:
+    """Dashboard veri kaynaklarını ilk ihtiyaç duyulduğunda bir kez yükler.
+
+    Süre bütçesi biten veya Supabase'e ulaşılamayan kaynak `missing` kümesine
+    eklenir; bu kaynağa bağlı widget'lar sayfada yer tutucu olarak gösterilir.
+    """
+
+    def __init__(self, supabase, hospital_id: str):
+        self.supabase = supabase
+        self.hospital_id = hospital_id
+        self.missing: set[str] = set()
+        self._values: dict[str, Any] = {}
+        # Hasta ve yorum yazarı adları için; async yolda önceden getirilmiş kullanıcılarla değiştirilir
+        self.lookup_users = get_users_by_ids
+
+    async def aload(self, sources) -> None:
+        """Kaynakları async client ile paralel yükler (supabase async client olmalıdır)."""
+        pending = [source for source in dict.fromkeys(sources) if source not in self._values and source not in self.missing]
+        results = await asyncio.gather(
+            *(_ADASHBOARD_SOURCES[source](self.supabase, self.hospital_id) for source in pending),
+            return_exceptions=True,
+        )
+        for source, result in zip(pending, results):
+            if isinstance(result, UpstreamUnavailable):
+                self.missing.add(source)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                self._values[source] = result
+
+    def get(self, source: str):
+        if source not in self._values:
+            self._values[source] = _DASHBOARD_SOURCES[source](self.supabase, self.hospital_id)
+        return self._values[source]
+
+    def try_all(self, sources) -> bool:
+        """Kaynakları yükler; biri bile yüklenemezse False döner."""
+        ok = True
+        for source in sources:
+            if source in self.missing:
+                ok = False
+                continue
+            try:
+                self.get(source)
+            except UpstreamUnavailable:
+                self.missing.add(source)
+                ok = False
+        return ok
+
+
+def _doctors_query(supabase, hospital_id):
+    return supabase.table("doctors").select(DASHBOARD_DOCTOR_COLUMNS).eq("hospital_id", hospital_id)
+
+
+def _appointments_query_builder(supabase, hospital_id):
+    # Bugünkü kartlar için doktor, hizmet ve hasta adları embed edilir
+    return lambda columns: supabase.table("appointments").select(columns).eq("hospital_id", hospital_id)
+
+
+def _reviews_query(supabase, hospital_id):
+    return supabase.table("reviews").select("user_id,comment,created_at").eq("hospital_id", hospital_id)
+
+
+def _holidays_query(supabase, hospital_id):
+    return supabase.table("holidays").select("date,reason").eq("hospital_id", hospital_id)
+
+
+def _load_doctors(supabase, hospital_id):
+    result = resilient_execute(_doctors_query(supabase, hospital_id))
+    return [_format_doctor_from_db(d) for d in result.data] if result.data else []
+
+
+def _load_appointments(supabase, hospital_id):
+    return _execute_appointment_query(_appointments_query_builder(supabase, hospital_id), with_details=True)
+
+
+def _load_reviews(supabase, hospital_id):
+    result = resilient_execute(_reviews_query(supabase, hospital_id))
+    return result.data if result.data else []
+
+
+def _load_holidays(supabase, hospital_id):
+    result = resilient_execute(_holidays_query(supabase, hospital_id))
+    return result.data if result.data else []
+
+
+async def _aload_doctors(supabase, hospital_id):
+    result = await resilient_aexecute(_doctors_query(supabase, hospital_id))
+    return [_format_doctor_from_db(d) for d in result.data or []]
+
+
+async def _aload_appointments(supabase, hospital_id):
+    return await _aexecute_appointment_query(_appointments_query_builder(supabase, hospital_id), with_details=True)
+
+
+async def _aload_rows(build_query, supabase, hospital_id):
+    result = await resilient_aexecute(build_query(supabase, hospital_id))
+    return result.data or []
+
+
+_DASHBOARD_SOURCES = {
+    "doctors": _load_doctors,
+    "appointments": _load_appointments,
+    "services": lambda supabase, hospital_id: get_services(columns=SERVICE_CHOICE_COLUMNS),
+    # Puan özetleri (trigger ile güncellenen özet tablolarından)
+    "hospital_rating": lambda supabase, hospital_id: rating_service.get_hospital_rating_summary(hospital_id),
+    "doctor_ratings": lambda supabase, hospital_id: rating_service.get_doctor_rating_summaries(hospital_id),
+    "reviews": _load_reviews,
+    "holidays": _load_holidays,
+}
+
+_ADASHBOARD_SOURCES = {
+    "doctors": _aload_doctors,
+    "appointments": _aload_appointments,
+    "services": lambda supabase, hospital_id: aget_services(columns=SERVICE_CHOICE_COLUMNS),
+    "hospital_rating": lambda supabase, hospital_id: rating_service.aget_hospital_rating_summary(hospital_id),
+    "doctor_ratings": lambda supabase, hospital_id: rating_service.aget_doctor_rating_summaries(hospital_id),
+    "reviews": lambda supabase, hospital_id: _aload_rows(_reviews_query, supabase, hospital_id),
+    "holidays": lambda supabase, hospital_id: _aload_rows(_holidays_query, supabase, hospital_id),
+}
+
+
+def _widget_kpi_cards(data: _DashboardData):
+    appointments = data.get("appointments")
     today = _today()
     pending_count = sum(1 for apt in appointments if apt['status'] == 'pending')
     today_count = sum(1 for apt in appointments if _parse_date(apt['date']) == today)
-    doctor_count = len(doctors)
-    
-    # Ortalama puan hesapla
-    hospital_ratings = [r.get('hospital_rating', 0) or 0 for r in ratings]
-    avg_rating = sum(hospital_ratings) / len(hospital_ratings) if hospital_ratings else 0
-    
-    kpi_cards = [
+    doctor_count = len(data.get("doctors"))
+    avg_rating = data.get("hospital_rating")["average"]
+
+    return [
         KPI("Bekleyen Randevu", str(pending_count), "Onay bekleyen randevular", "schedule", "#FDE68A"),
         KPI("Bugünkü Randevu", str(today_count), "Günün toplam randevusu", "today", "#A5F3FC"),
         KPI("Aktif Doktor", str(doctor_count), "Paneldeki toplam doktor", "medical_services", "#C7D2FE"),
         KPI("Ortalama Puan", f"{avg_rating:.1f}", "Hastane ortalaması", "star", "#FBCFE8"),
     ]
-    
-    # Bugünkü randevular
+
+
+def _select_todays(appointments):
+    today = _today()
     upcoming_appointments = sorted(
         appointments,
         key=lambda a: (a['date'], a['time'])
     )
-    todays_appointments = [
-        _build_appointment_card(apt, doctors, services, users)
-        for apt in upcoming_appointments
-        if _parse_date(apt['date']) == today
-    ][:6]
-    
-    # Doktor durumları
-    doctor_status = [_build_doctor_status(doc, today) for doc in doctors]
-    
-    # Hizmet istatistikleri
-    service_stats = _build_service_stats(appointments, services)
-    
-    # Son yorumlar
-    latest_reviews = _build_reviews(reviews, users)
-    
-    # Yaklaşan tatiller
-    upcoming_holidays = _build_upcoming_holidays(holidays, today)
-    
-    # Doktor puanlamaları
-    doctor_ratings = _build_doctor_ratings(doctors, ratings)
+    return [apt for apt in upcoming_appointments if _parse_date(apt['date']) == today][:6]
+
+
+def _select_latest_reviews(reviews):
+    return sorted(reviews, key=lambda r: r.get('created_at', ''), reverse=True)[:3]
+
+
+def _widget_todays_appointments(data: _DashboardData):
+    todays = _select_todays(data.get("appointments"))
+    missing = _missing_patient_ids(todays)
+    if missing:
+        _apply_patient_names(todays, data.lookup_users(missing))
+    return [_build_appointment_card(apt) for apt in todays]
+
+
+# Widget -> (bağlı veri kaynakları, context değerini üreten fonksiyon); sayfadaki sırayla
+DASHBOARD_WIDGETS = {
+    "kpi_cards": (("appointments", "doctors", "hospital_rating"), _widget_kpi_cards),
+    "todays_appointments": (("appointments",), _widget_todays_appointments),
+    "doctor_status": (("doctors",), lambda data: [_build_doctor_status(doc, _today()) for doc in data.get("doctors")]),
+    "service_stats": (
+        ("appointments", "services"),
+        lambda data: _build_service_stats(data.get("appointments"), data.get("services")),
+    ),
+    "doctor_ratings": (
+        ("doctors", "doctor_ratings"),
+        lambda data: _build_doctor_ratings(data.get("doctors"), data.get("doctor_ratings")),
+    ),
+    "latest_reviews": (("reviews",), lambda data: _build_reviews(data.get("reviews"), data.lookup_users)),
+    "upcoming_holidays": (("holidays",), lambda data: _build_upcoming_holidays(data.get("holidays"), _today())),
+}
+
+
+def _build_widgets(data: _DashboardData, names) -> tuple[dict[str, Any], list[str]]:
+    context: dict[str, Any] = {}
+    deferred = []
+    for name in names:
+        sources, build = DASHBOARD_WIDGETS[name]
+        if not data.try_all(sources):
+            deferred.append(name)
+            continue
+        try:
+            context[name] = build(data)
+        except UpstreamUnavailable:
+            # Widget içindeki ek okumalar (ör. yorum yazarları) da bütçeye tabidir
+            deferred.append(name)
+    return context, deferred
+
+
+def load_dashboard_context(request=None) -> dict[str, Any]:
+    """Dashboard için gerekli tüm verileri Supabase'den getirir.
+
+    İsteğin süre bütçesi içinde yüklenemeyen widget'lar `deferred_widgets`
+    listesinde döner; sayfa bunları yer tutucu olarak çizer ve
+    `load_dashboard_widget` ile ayrıca getirir.
+    """
+    supabase = get_supabase_client()
+    hospital_id = _get_active_hospital_id(request)
     
-    return {
-        'hospital': hospital,
-        'kpi_cards': kpi_cards,
-        'todays_appointments': todays_appointments,
-        'doctor_status': doctor_status,
-        'service_stats': service_stats,
-        'latest_reviews': latest_reviews,
-        'upcoming_holidays': upcoming_holidays,
-        'doctor_ratings': doctor_ratings,
-    }
+    # Hastane bilgisi
+    hospital_result = resilient_execute(
+        supabase.table("hospitals").select(HOSPITAL_SUMMARY_COLUMNS).eq("id", hospital_id).single()
+    )
+    hospital = _format_hospital_from_db(hospital_result.data)
+
+    context, deferred = _build_widgets(_DashboardData(supabase, hospital_id), DASHBOARD_WIDGETS)
+    context['hospital'] = hospital
+    context['deferred_widgets'] = deferred
+    return context
+
+
+async def aload_dashboard_context(request=None) -> dict[str, Any]:
+    """`load_dashboard_context`'in async karşılığı.
+
+    Hastane satırı ve tüm veri kaynakları tek seferde paralel istenir; sayfanın
+    süresi kaynakların toplamına değil en yavaşına bağlıdır. Gösterilecek hasta
+    ve yorum yazarı adları ardından tek bir toplu sorguyla tamamlanır.
+    """
+    supabase = await get_async_supabase_client()
+    hospital_id = await _aget_active_hospital_id(request)
+    data = _DashboardData(supabase, hospital_id)
+
+    hospital_result, _ = await asyncio.gather(
+        resilient_aexecute(supabase.table("hospitals").select(HOSPITAL_SUMMARY_COLUMNS).eq("id", hospital_id).single()),
+        data.aload(source for sources, _ in DASHBOARD_WIDGETS.values() for source in sources),
+    )
+
+    user_ids = set()
+    if "appointments" not in data.missing:
+        user_ids |= _missing_patient_ids(_select_todays(data.get("appointments")))
+    if "reviews" not in data.missing:
+        user_ids |= {str(rev['user_id']) for rev in _select_latest_reviews(data.get("reviews")) if rev.get('user_id')}
+    users = await aget_users_by_ids(user_ids)
+    data.lookup_users = lambda wanted: {str(u): users[str(u)] for u in wanted if u and str(u) in users}
+
+    context, deferred = _build_widgets(data, DASHBOARD_WIDGETS)
+    context['hospital'] = _format_hospital_from_db(hospital_result.data)
+    context['deferred_widgets'] = deferred
+    return context
+
+
+def load_dashboard_widget(name: str, request=None) -> dict[str, Any]:
+    """Tek bir dashboard widget'ının context'ini döndürür (yer tutucuların sonradan yüklenmesi için).
+
+    Raises:
+        ValueError: Widget adı geçersizse
+        UpstreamUnavailable: Widget verisi yine yüklenemezse
+    """
+    if name not in DASHBOARD_WIDGETS:
+        raise ValueError(f"Geçersiz widget: {name}")
+    data = _DashboardData(get_supabase_client(), _get_active_hospital_id(request))
+    sources, build = DASHBOARD_WIDGETS[name]
+    for source in sources:
+        data.get(source)
+    return {name: build(data)}
 
 
-def _build_appointment_card(apt, doctors, services, users):
-    doctor = next((d for d in doctors if d['id'] == apt['doctorId']), None)
-    service = next((s for s in services if str(s['id']) == apt['service']), None)
-    user = users.get(apt['userId'])
+def _build_appointment_card(apt):
     return {
         'time': apt['time'],
-        'patient': f"{user['name']} {user['surname']}" if user else 'Hasta',
-        'doctor': doctor['name'] + ' ' + doctor['surname'] if doctor else 'Doktor',
-        'service': service['name'] if service else 'Hizmet',
+        'patient': apt.get('patientName') or 'Hasta',
+        'doctor': apt.get('doctorName') or 'Doktor',
+        'service': apt.get('serviceName') or 'Hizmet',
         'status': apt['status'],
     }
 
@@ -168,10 +352,12 @@ def _build_service_stats(appointments, services):
     return stats[:4]
 
 
-def _build_reviews(reviews, users):
-    sorted_reviews = sorted(reviews, key=lambda r: r.get('created_at', ''), reverse=True)
+def _build_reviews(reviews, lookup_users=get_users_by_ids):
+    sorted_reviews = _select_latest_reviews(reviews)
+    # Sadece gösterilecek yorumların yazarları getirilir
+    users = lookup_users(rev.get('user_id') for rev in sorted_reviews)
     latest = []
-    for rev in sorted_reviews[:3]:
+    for rev in sorted_reviews:
         user_id = str(rev.get('user_id', ''))
         user = users.get(user_id)
         latest.append({
@@ -197,38 +383,27 @@ def _build_upcoming_holidays(holidays, today):
     return parsed[:4]
 
 
-def _build_doctor_ratings(doctors, ratings):
+def _build_doctor_ratings(doctors, rating_summaries):
     """
-    Her doktor için ortalama puanı hesaplar.
-    Sadece aktif hastanenin doktorları için puanları döndürür.
+    Her doktor için ortalama puanı özet tablosundan okur.
+    Sıralama, az oylu doktorları hastane ortalamasına çeken Bayes puanına göre yapılır.
     """
+    prior = rating_service.prior_mean(list(rating_summaries.values()))
     doctor_ratings_list = []
     
     for doctor in doctors:
-        doctor_id = str(doctor['id'])
-        # Bu doktora ait tüm puanları filtrele
-        doctor_ratings_data = [
-            r.get('doctor_rating', 0) or 0 for r in ratings
-            if str(r.get('doctor_id', '')) == doctor_id and r.get('doctor_rating')
-        ]
-        
-        # Ortalama puanı hesapla
-        if doctor_ratings_data:
-            avg_rating = sum(doctor_ratings_data) / len(doctor_ratings_data)
-            rating_count = len(doctor_ratings_data)
-        else:
-            avg_rating = 0.0
-            rating_count = 0
-        
+        summary = rating_summaries.get(str(doctor['id'])) or rating_service.empty_summary()
         doctor_ratings_list.append({
             'id': doctor['id'],
             'name': f"{doctor['name']} {doctor['surname']}",
             'specialty': doctor.get('specialty', ''),
-            'rating': round(avg_rating, 1),
-            'rating_count': rating_count,
+            'rating': round(summary['average'], 1),
+            'rating_count': summary['count'],
+            'histogram': summary['histogram'],
+            'score': round(rating_service.bayesian_score(summary, prior), 2) if summary['count'] else 0.0,
         })
     
-    # Puanına göre sırala (yüksekten düşüğe)
-    doctor_ratings_list.sort(key=lambda d: d['rating'], reverse=True)
+    # Bayes puanına göre sırala (yüksekten düşüğe)
+    doctor_ratings_list.sort(key=lambda d: (d['score'], d['rating_count']), reverse=True)
     
     return doctor_ratings_list
@@ -0,0 +1,149 @@
+"""Worker'lar arası önbellek geçersizleştirme için hastane bazlı veri sürümleri.
+
+Her hastane (ve global referans verileri) için tek yönde artan bir sürüm
+numarası, aynı makinedeki tüm worker'ların paylaştığı bir SQLite dosyasında
+tutulur. Servislerdeki her yazma ilgili sürümü artırır; process içi
+önbellekler yükledikleri sürümü saklar ve kullanmadan önce güncel sürümle
+karşılaştırır. Sürüm dosyası en fazla `DATA_VERSION_CHECK_INTERVAL`
+saniyede bir okunur, bu yüzden kontrol çoğunlukla bir sözlük okumasıdır.
+
+SQLite'a erişilemezse sürümler sadece process içinde tutulur; bu durumda
+diğer worker'lardaki önbellekler kendi TTL'leriyle tazelenir.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+
+from django.conf import settings
+
+from . import request_context
+from .sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+# Tüm hastaneleri etkileyen değişiklikler (hizmet kataloğu, toplu atamalar)
+GLOBAL_SCOPE = "*"
+HOSPITAL_LIST_SCOPE = "hospitals"
+SERVICES_SCOPE = "services"
+
+_lock = threading.Lock()
+# scope -> (sürüm, son okuma anı)
+_known: dict[str, tuple[int, float]] = {}
+
+
+def _db_path() -> str:
+    return str(getattr(settings, "DATA_VERSION_DB", settings.BASE_DIR / "data_versions.sqlite3"))
+
+
+def _check_interval() -> float:
+    return float(getattr(settings, "DATA_VERSION_CHECK_INTERVAL", 1.0))
+
+
+_store = SQLiteStore(
+    _db_path,
+    "CREATE TABLE IF NOT EXISTS data_versions (scope TEXT PRIMARY KEY, version INTEGER NOT NULL)",
+    "Veri sürümü",
+)
+
+
+def _connection() -> Optional[sqlite3.Connection]:
+    return _store.connection()
+
+
+def _read(scope: str) -> Optional[int]:
+    conn = _connection()
+    if conn is None:
+        return None
+    try:
+        row = conn.execute("SELECT version FROM data_versions WHERE scope = ?", (scope,)).fetchone()
+    except sqlite3.Error as exc:
+        logger.warning("Veri sürümü okunamadı: %s", exc)
+        return None
+    return int(row[0]) if row else 0
+
+
+def current(scope: str) -> int:
+    """Scope'un güncel sürümü (en fazla DATA_VERSION_CHECK_INTERVAL saniye eski olabilir).
+
+    İstek içinde her scope bir kez okunur; önbellek isabetleri sonraki
+    kontrollerde yalnızca bir sözlük okuması yapar (bkz. request_context).
+    """
+    state = request_context.current()
+    if state is not None:
+        version = state.versions.get(scope)
+        if version is not None:
+            return version
+    scope = str(scope)
+    now = time.monotonic()
+    known = _known.get(scope)
+    if known is not None and now - known[1] < _check_interval():
+        return known[0]
+
+    version = _read(scope)
+    with _lock:
+        previous = _known.get(scope)
+        if version is None:
+            # Paylaşılan dosya yoksa process içi sürüm geçerlidir
+            version = previous[0] if previous else 0
+        elif previous is not None:
+            version = max(version, previous[0])
+        _known[scope] = (version, now)
+    if state is not None:
+        state.versions[scope] = version
+    return version
+
+
+def hospital_version(hospital_id: Optional[str]) -> tuple[int, int]:
+    """Hastane verisinin sürümü; global değişiklikler de hesaba katılır."""
+    scope = str(hospital_id) if hospital_id else GLOBAL_SCOPE
+    return (current(scope), current(GLOBAL_SCOPE))
+
+
+def bump(scope: Optional[str]) -> int:
+    """Scope'un sürümünü artırır ve yeni sürümü döndürür."""
+    scope = str(scope) if scope else GLOBAL_SCOPE
+    version = None
+    conn = _connection()
+    if conn is not None:
+        try:
+            conn.execute(
+                "INSERT INTO data_versions (scope, version) VALUES (?, 1) "
+                "ON CONFLICT(scope) DO UPDATE SET version = version + 1",
+                (scope,),
+            )
+            version = _read(scope)
+        except sqlite3.Error as exc:
+            logger.warning("Veri sürümü artırılamadı: %s", exc)
+
+    with _lock:
+        previous = _known.get(scope)
+        if version is None:
+            version = (previous[0] if previous else 0) + 1
+        _known[scope] = (version, time.monotonic())
+    state = request_context.current()
+    if state is not None:
+        # Aynı istekteki sonraki okumalar kendi yazmasını görür
+        state.versions[scope] = version
+    return version
+
+
+def bump_hospitals(hospital_ids: Iterable) -> None:
+    """Verilen hastanelerin sürümlerini artırır (boş/None değerler atlanır)."""
+    for hospital_id in {str(h) for h in hospital_ids if h}:
+        bump(hospital_id)
+
+
+def bump_rows(rows: Optional[list[dict]], key: str = "hospital_id") -> None:
+    """Yazma sonucunda dönen satırların hastanelerinin sürümlerini artırır."""
+    bump_hospitals(row.get(key) for row in rows or [])
+
+
+def forget() -> None:
+    """Process içinde bilinen sürümleri unutur (ör. DATA_VERSION_DB değiştiğinde)."""
+    with _lock:
+        _known.clear()
@@ -0,0 +1,467 @@
+"""Yük ve ölçek testleri için sentetik veri seti üreticisi.
+
+Üretilen satırlar Supabase tablolarının kolon adlarını (snake_case) ve
+servislerin beklediği biçimleri kullanır: `_format_hospital_from_db`,
+`_format_doctor_from_db`, `_format_appointment_from_db`, tatiller, puanlar
+ve yorumlar. Çalışma saatleri panel/data'daki gibi gün adı ->
+{isAvailable, start, end} sözlüğüdür.
+
+Aynı `DatasetSpec` (seed dahil) her zaman aynı veri setini üretir; UUID'ler
+de seed'li rastgele sayı üretecinden türetilir. Satırlar tablo sırasıyla
+(hizmetler, kullanıcılar, hastaneler, doktorlar, tatiller, randevular,
+puanlar, yorumlar) akış halinde üretilir; milyonlarca randevu bellekte
+tutulmadan dosyaya yazılabilir.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import IO, Callable, Iterator, Optional
+
+from django.conf import settings
+
+from . import location_service
+
+MAX_HOSPITALS = 1000
+
+# Tablo -> çıktı dosyasının adı (sahte backend'in seed dosya adlarıyla aynı)
+TABLE_FILES = {
+    "services": "services",
+    "user_profiles": "users",
+    "hospitals": "hospitals",
+    "doctors": "doctors",
+    "holidays": "holidays",
+    "appointments": "appointments",
+    "ratings": "ratings",
+    "reviews": "reviews",
+}
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+FIRST_NAMES = (
+    "Ahmet", "Mehmet", "Mustafa", "Ali", "Hüseyin", "Hasan", "İbrahim", "Murat", "Emre", "Burak",
+    "Can", "Deniz", "Efe", "Kerem", "Ozan", "Selim", "Tolga", "Yusuf", "Ayşe", "Fatma",
+    "Emine", "Hatice", "Zeynep", "Elif", "Merve", "Büşra", "Dilara", "Ece", "Gizem", "İrem",
+    "Melis", "Nazlı", "Selin", "Sude", "Yağmur", "Ceren",
+)
+SURNAMES = (
+    "Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Yıldırım", "Öztürk", "Aydın", "Özdemir",
+    "Arslan", "Doğan", "Kılıç", "Aslan", "Çetin", "Kara", "Koç", "Kurt", "Özkan", "Şimşek",
+    "Polat", "Korkmaz", "Ulusoy", "Bulut", "Erdoğan", "Güneş", "Aksoy", "Tekin",
+)
+SPECIALTIES = (
+    "Ortodonti", "Endodonti", "Periodontoloji", "Ağız, Diş ve Çene Cerrahisi", "Pedodonti",
+    "Protetik Diş Tedavisi", "Restoratif Diş Tedavisi", "Ağız, Diş ve Çene Radyolojisi", "Genel Diş Hekimi",
+)
+CLINIC_WORDS = ("Gülümseme", "Beyaz", "İnci", "Sağlıklı", "Parlak", "Modern", "Aile", "Merkez", "Estetik", "Işıl")
+APPOINTMENT_NOTES = (
+    "", "", "", "Kontrol randevusu", "Diş ağrısı şikayeti", "Diş taşı temizliği", "Dolgu yenileme",
+    "Tel kontrolü", "Kanal tedavisi devamı", "İmplant değerlendirmesi", "Beyazlatma seansı",
+)
+REVIEW_OPENINGS = (
+    "Çok memnun kaldım.", "Genel olarak memnunum.", "Beklediğim gibi değildi.", "Harika bir deneyimdi.",
+    "Randevu saatine uyuldu.", "Biraz bekledim ama sonuç iyi.", "Personel çok ilgiliydi.",
+)
+REVIEW_DETAILS = (
+    "Doktor her adımı açıkladı.", "Klinik çok temizdi.", "Fiyatlar makul.", "Tedavi ağrısız geçti.",
+    "Bekleme salonu kalabalıktı.", "Tekrar geleceğim.", "Aileme de tavsiye ettim.", "İletişim biraz zayıftı.",
+)
+REPLIES = (
+    "Değerlendirmeniz için teşekkür ederiz.", "Geri bildiriminiz bizim için çok değerli.",
+    "Yaşadığınız aksaklık için özür dileriz, sizinle iletişime geçeceğiz.", "Sağlıklı günler dileriz.",
+)
+# (ay, gün, sebep) - resmi tatiller; bütün hastane kapalı
+NATIONAL_HOLIDAYS = (
+    (1, 1, "Yılbaşı"),
+    (4, 23, "Ulusal Egemenlik ve Çocuk Bayramı"),
+    (5, 1, "Emek ve Dayanışma Günü"),
+    (5, 19, "Atatürk'ü Anma, Gençlik ve Spor Bayramı"),
+    (7, 15, "Demokrasi ve Milli Birlik Günü"),
+    (8, 30, "Zafer Bayramı"),
+    (10, 29, "Cumhuriyet Bayramı"),
+)
+LEAVE_REASONS = ("Yıllık izin", "Kongre", "Rapor", "Eğitim", "Kişisel izin")
+# 1-5 puan ağırlıkları (gerçek dağılım gibi yüksek puanlara kaymış)
+RATING_WEIGHTS = (3, 5, 12, 30, 50)
+
+
+@dataclass
+class DatasetSpec:
+    """Üretilecek veri setinin boyutları ve oranları."""
+
+    hospitals: int = 1
+    appointments: int = 2000
+    doctors_per_hospital: int = 24
+    patients: Optional[int] = None
+    leave_days_per_doctor: int = 3
+    rating_ratio: float = 0.35
+    review_ratio: float = 0.6
+    reply_ratio: float = 0.4
+    days_past: int = 365
+    days_future: int = 60
+    seed: int = 42
+    today: Optional[date] = None
+    owner_password: str = "123456"
+
+    def validate(self) -> None:
+        if not 1 <= self.hospitals <= MAX_HOSPITALS:
+            raise ValueError(f"Hastane sayısı 1 ile {MAX_HOSPITALS} arasında olmalıdır")
+        if self.appointments < 0:
+            raise ValueError("Randevu sayısı negatif olamaz")
+        if self.doctors_per_hospital < 1:
+            raise ValueError("Hastane başına en az bir doktor olmalıdır")
+        if self.patients is not None and self.patients < 1:
+            raise ValueError("Hasta sayısı en az 1 olmalıdır")
+        for name in ("rating_ratio", "review_ratio", "reply_ratio"):
+            if not 0 <= getattr(self, name) <= 1:
+                raise ValueError(f"{name} 0 ile 1 arasında olmalıdır")
+
+    @property
+    def patient_count(self) -> int:
+        # Varsayılan: hasta başına ortalama beş randevu
+        return self.patients or max(self.appointments // 5, 100)
+
+
+class DatasetGenerator:
+    """`DatasetSpec`'e göre (tablo, satır) çiftleri üretir."""
+
+    def __init__(self, spec: DatasetSpec):
+        spec.validate()
+        self.spec = spec
+        self.today = spec.today or date.today()
+        self.rng = random.Random(spec.seed)
+        self._services: list[dict] = []
+        self._patients: list[str] = []
+        self._codes: list[int] = []
+
+    def _uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _timestamp(self, day: date, earliest: int = 8, latest: int = 20) -> str:
+        moment = datetime.combine(day, time(self.rng.randint(earliest, latest - 1), self.rng.randint(0, 59)),
+                                  tzinfo=timezone.utc)
+        return moment.isoformat().replace("+00:00", "Z")
+
+    def _person(self) -> tuple[str, str]:
+        return self.rng.choice(FIRST_NAMES), self.rng.choice(SURNAMES)
+
+    def _working_hours(self, start: int, end: int, saturday: bool) -> dict:
+        hours = {}
+        for day in WEEKDAYS:
+            if day == "sunday" or (day == "saturday" and not saturday):
+                hours[day] = {"isAvailable": False, "start": None, "end": None}
+            elif day == "saturday":
+                hours[day] = {"isAvailable": True, "start": f"{start + 1:02d}:00", "end": f"{min(start + 5, end):02d}:00"}
+            else:
+                hours[day] = {"isAvailable": True, "start": f"{start:02d}:00", "end": f"{end:02d}:00"}
+        return hours
+
+    def rows(self) -> Iterator[tuple[str, dict]]:
+        """Tüm satırları üretir; her çağrı aynı seed'den baştan başlar."""
+        self.rng = random.Random(self.spec.seed)
+        self._services, self._patients = [], []
+        # Her hastaneye benzersiz 6 haneli kod (giriş için)
+        self._codes = self.rng.sample(range(100000, 1000000), self.spec.hospitals)
+        yield from self._generate_services()
+        yield from self._generate_patients()
+        for index in range(self.spec.hospitals):
+            yield from self._generate_hospital(index)
+
+    def _generate_services(self) -> Iterator[tuple[str, dict]]:
+        with (Path(settings.PANEL_DATA_DIR) / "services.json").open("r", encoding="utf-8") as fp:
+            catalog = json.load(fp)
+        for item in catalog:
+            service = {"id": self._uuid(), "name": item["name"], "description": item.get("description", "")}
+            self._services.append(service)
+            yield "services", service
+
+    def _generate_patients(self) -> Iterator[tuple[str, dict]]:
+        for index in range(self.spec.patient_count):
+            name, surname = self._person()
+            user_id = self._uuid()
+            self._patients.append(user_id)
+            yield "user_profiles", {
+                "id": user_id,
+                "email": f"hasta{index + 1}@example.com",
+                "name": name,
+                "surname": surname,
+                "phone": f"05{self.rng.randint(300000000, 599999999)}",
+                "profile_image": None,
+                "created_at": self._timestamp(self.today - timedelta(days=self.rng.randint(0, self.spec.days_past * 2))),
+            }
+
+    def _location(self) -> dict:
+        provinces = location_service.get_provinces()
+        province = self.rng.choice(provinces)
+        districts = location_service.get_districts(province["id"]) or [{"id": "", "name": ""}]
+        district = self.rng.choice(districts)
+        neighborhoods = location_service.get_neighborhoods(district["id"]) or [{"id": "", "name": ""}]
+        neighborhood = self.rng.choice(neighborhoods)
+        return {
+            "address": f"{neighborhood['name']}, {district['name']}, {province['name']}".strip(", "),
+            "province_id": province["id"],
+            "province_name": province["name"],
+            "district_id": district["id"],
+            "district_name": district["name"],
+            "neighborhood_id": neighborhood["id"],
+            "neighborhood_name": neighborhood["name"],
+        }
+
+    def _generate_hospital(self, index: int) -> Iterator[tuple[str, dict]]:
+        spec = self.spec
+        hospital_id = self._uuid()
+        owner_id = self._uuid()
+        owner_name, owner_surname = self._person()
+        owner_email = f"yonetici{index + 1}@example.com"
+        yield "user_profiles", {
+            "id": owner_id,
+            "email": owner_email,
+            # Sadece sahte backend'in Auth kullanıcısı için; yükleme sırasında atılır
+            "password": spec.owner_password,
+            "name": owner_name,
+            "surname": owner_surname,
+            "phone": f"05{self.rng.randint(300000000, 599999999)}",
+            "profile_image": None,
+            "created_at": self._timestamp(self.today - timedelta(days=spec.days_past + 30)),
+        }
+
+        open_hour, close_hour = self.rng.choice(((8, 18), (9, 18), (9, 19), (10, 20)))
+        hospital_services = self.rng.sample(self._services, k=self.rng.randint(min(4, len(self._services)), len(self._services)))
+        hospital = {
+            "id": hospital_id,
+            "name": f"{self.rng.choice(CLINIC_WORDS)} Diş Kliniği {index + 1}",
+            "latitude": round(self.rng.uniform(36.0, 42.0), 6),
+            "longitude": round(self.rng.uniform(26.0, 45.0), 6),
+            "phone": f"0{self.rng.randint(212, 488)}{self.rng.randint(1000000, 9999999)}",
+            "email": f"info{index + 1}@example.com",
+            "description": "Modern teknoloji ile hizmet veren diş kliniği",
+            "image": None,
+            "gallery": [],
+            "services": [service["id"] for service in hospital_services],
+            "working_hours": self._working_hours(open_hour, close_hour, saturday=self.rng.random() < 0.7),
+            "created_at": self._timestamp(self.today - timedelta(days=spec.days_past + 30)),
+            "hospital_code": str(self._codes[index]),
+            "status": "approved",
+            "owner_email": owner_email,
+            "created_by_user_id": owner_id,
+            **self._location(),
+        }
+        yield "hospitals", hospital
+
+        doctors = []
+        for _ in range(spec.doctors_per_hospital):
+            name, surname = self._person()
+            start = self.rng.choice((open_hour, open_hour + 1))
+            doctor = {
+                "id": self._uuid(),
+                "hospital_id": hospital_id,
+                "name": f"Dr. {name}",
+                "surname": surname,
+                "specialty": self.rng.choice(SPECIALTIES),
+                "image": None,
+                "bio": f"{self.rng.randint(2, 30)} yıllık deneyime sahip diş hekimi",
+                "working_hours": self._working_hours(start, min(start + 8, close_hour), saturday=self.rng.random() < 0.5),
+                "is_active": self.rng.random() < 0.95,
+                "services": [s["id"] for s in self.rng.sample(hospital_services, k=self.rng.randint(1, len(hospital_services)))],
+                "created_at": hospital["created_at"],
+            }
+            doctors.append(doctor)
+            yield "doctors", doctor
+
+        yield from self._generate_holidays(hospital_id, doctors)
+        yield from self._generate_appointments(hospital, doctors, self._share(index))
+
+    def _share(self, index: int) -> int:
+        """Randevuları hastanelere olabildiğince eşit paylaştırır."""
+        base, extra = divmod(self.spec.appointments, self.spec.hospitals)
+        return base + (1 if index < extra else 0)
+
+    def _generate_holidays(self, hospital_id: str, doctors: list[dict]) -> Iterator[tuple[str, dict]]:
+        first = self.today - timedelta(days=self.spec.days_past)
+        last = self.today + timedelta(days=self.spec.days_future)
+        for year in range(first.year, last.year + 1):
+            for month, day, reason in NATIONAL_HOLIDAYS:
+                holiday_date = date(year, month, day)
+                if first <= holiday_date <= last:
+                    yield "holidays", {
+                        "id": self._uuid(), "hospital_id": hospital_id, "doctor_id": None,
+                        "date": holiday_date.isoformat(), "reason": reason,
+                        "is_full_day": True, "start_time": None, "end_time": None,
+                    }
+        span = (last - first).days
+        for doctor in doctors:
+            for _ in range(self.spec.leave_days_per_doctor):
+                full_day = self.rng.random() < 0.7
+                start = self.rng.randint(9, 15)
+                yield "holidays", {
+                    "id": self._uuid(),
+                    "hospital_id": hospital_id,
+                    "doctor_id": doctor["id"],
+                    "date": (first + timedelta(days=self.rng.randint(0, span))).isoformat(),
+                    "reason": self.rng.choice(LEAVE_REASONS),
+                    "is_full_day": full_day,
+                    "start_time": None if full_day else f"{start:02d}:00",
+                    "end_time": None if full_day else f"{start + 2:02d}:00",
+                }
+
+    def _slot(self, doctor: dict) -> tuple[date, str]:
+        """Doktorun çalıştığı bir gün ve 30 dakikalık saat dilimi seçer."""
+        for _ in range(20):
+            day = self.today + timedelta(days=self.rng.randint(-self.spec.days_past, self.spec.days_future))
+            hours = doctor["working_hours"][WEEKDAYS[day.weekday()]]
+            if hours["isAvailable"]:
+                break
+        else:
+            # Hiç çalışma günü denk gelmezse hafta içi varsayılan saatleri kullan
+            hours = {"start": "09:00", "end": "17:00"}
+        start, end = int(hours["start"][:2]), int(hours["end"][:2])
+        slot = self.rng.randrange(max((end - start) * 2, 1))
+        return day, f"{start + slot // 2:02d}:{30 * (slot % 2):02d}"
+
+    def _generate_appointments(self, hospital: dict, doctors: list[dict], count: int) -> Iterator[tuple[str, dict]]:
+        spec = self.spec
+        for _ in range(count):
+            doctor = self.rng.choice(doctors)
+            day, slot = self._slot(doctor)
+            past = day < self.today
+            roll = self.rng.random()
+            if past:
+                status = "completed" if roll < 0.8 else "cancelled"
+            else:
+                status = "pending" if roll < 0.9 else "cancelled"
+            created = day - timedelta(days=self.rng.randint(1, 30))
+            appointment = {
+                "id": self._uuid(),
+                "user_id": self.rng.choice(self._patients),
+                "hospital_id": hospital["id"],
+                "doctor_id": doctor["id"],
+                "date": day.isoformat(),
+                "time": slot,
+                "status": status,
+                "service_id": self.rng.choice(doctor["services"]),
+                "notes": self.rng.choice(APPOINTMENT_NOTES),
+                "created_at": self._timestamp(min(created, self.today)),
+                "reminder_sent_at": self._timestamp(day - timedelta(days=1)) if past and status == "completed" else None,
+            }
+            yield "appointments", appointment
+
+            if status != "completed" or self.rng.random() >= spec.rating_ratio:
+                continue
+            rated_day = min(day + timedelta(days=self.rng.randint(0, 7)), self.today)
+            rated_at = self._timestamp(rated_day)
+            yield "ratings", {
+                "id": self._uuid(),
+                "user_id": appointment["user_id"],
+                "hospital_id": hospital["id"],
+                "doctor_id": doctor["id"],
+                "appointment_id": appointment["id"],
+                "hospital_rating": self.rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0],
+                "doctor_rating": self.rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0],
+                "created_at": rated_at,
+            }
+
+            if self.rng.random() >= spec.review_ratio:
+                continue
+            replied = self.rng.random() < spec.reply_ratio
+            yield "reviews", {
+                "id": self._uuid(),
+                "user_id": appointment["user_id"],
+                "hospital_id": hospital["id"],
+                "doctor_id": doctor["id"],
+                "appointment_id": appointment["id"],
+                "comment": f"{self.rng.choice(REVIEW_OPENINGS)} {self.rng.choice(REVIEW_DETAILS)}",
+                "reply": self.rng.choice(REPLIES) if replied else None,
+                "replied_at": self._timestamp(min(rated_day + timedelta(days=1), self.today)) if replied else None,
+                "created_at": rated_at,
+            }
+
+
+class _TableWriter:
+    """Bir tablonun satırlarını JSON dizisi veya JSONL olarak akış halinde yazar."""
+
+    def __init__(self, path: Path, jsonl: bool):
+        self.path = path
+        self.jsonl = jsonl
+        self.count = 0
+        self._fp: IO[str] = path.open("w", encoding="utf-8")
+        if not jsonl:
+            self._fp.write("[")
+
+    def write(self, row: dict) -> None:
+        line = json.dumps(row, ensure_ascii=False)
+        if self.jsonl:
+            self._fp.write(line + "\n")
+        else:
+            self._fp.write(("," if self.count else "") + "\n  " + line)
+        self.count += 1
+
+    def close(self) -> None:
+        if not self.jsonl:
+            self._fp.write("\n]\n")
+        self._fp.close()
+
+
+def write_files(generator: DatasetGenerator, output_dir: Path, jsonl: bool = False,
+                progress: Optional[Callable[[str, int], None]] = None) -> dict[str, int]:
+    """Veri setini tablo başına bir dosyaya yazar; tablo başına satır sayısını döndürür.
+
+    Dosya adları sahte backend'in seed adlarıyla aynıdır; çıktı klasörü
+    doğrudan SUPABASE_FAKE_SEED_DIR olarak kullanılabilir.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    extension = "jsonl" if jsonl else "json"
+    writers = {
+        table: _TableWriter(output_dir / f"{stem}.{extension}", jsonl)
+        for table, stem in TABLE_FILES.items()
+    }
+    try:
+        for table, row in generator.rows():
+            writer = writers[table]
+            writer.write(row)
+            if progress and writer.count % 100000 == 0:
+                progress(table, writer.count)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return {table: writer.count for table, writer in writers.items()}
+
+
+def load_into_backend(generator: DatasetGenerator, client, batch_size: int = 1000,
+                      progress: Optional[Callable[[str, int], None]] = None) -> dict[str, int]:
+    """Veri setini Supabase client'ı üzerinden toplu insert'lerle yükler.
+
+    Tablolar üretim sırasına göre (önce referans verilenler) yazılır. Auth
+    kullanıcıları oluşturulmaz; `password` alanı user_profiles'a yazılmaz.
+    """
+    if batch_size < 1:
+        raise ValueError("Batch boyutu en az 1 olmalıdır")
+    batches: dict[str, list[dict]] = {table: [] for table in TABLE_FILES}
+    counts = {table: 0 for table in TABLE_FILES}
+
+    def flush(table: str) -> None:
+        rows = batches[table]
+        if rows:
+            client.table(table).insert(rows, returning="minimal").execute()
+            counts[table] += len(rows)
+            if progress:
+                progress(table, counts[table])
+            batches[table] = []
+
+    for table, row in generator.rows():
+        if table == "user_profiles":
+            row = {key: value for key, value in row.items() if key != "password"}
+        batches[table].append(row)
+        if len(batches[table]) >= batch_size:
+            # Yabancı anahtarlar için önce referans verilen tabloların bekleyen satırları yazılır
+            for dependency in TABLE_FILES:
+                flush(dependency)
+                if dependency == table:
+                    break
+    for table in TABLE_FILES:
+        flush(table)
+    return counts
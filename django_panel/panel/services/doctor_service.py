@@ -4,15 +4,50 @@ import uuid
 from datetime import datetime
 from pathlib import Path
 
-from .supabase_client import get_supabase_client
-from .hospital_service import _get_active_hospital_id, get_hospital
-
-
-def get_doctors(request=None) -> list[dict]:
-    """Aktif hastaneye ait doktorları Supabase'den getirir."""
+from . import data_versions, holiday_index
+from .supabase_client import get_async_supabase_client, get_supabase_client
+from .resilience import resilient_aexecute, resilient_execute
+from .hospital_service import (
+    HOLIDAY_COLUMNS,
+    HOSPITAL_HOURS_COLUMNS,
+    _aget_active_hospital_id,
+    _get_active_hospital_id,
+    get_hospital,
+)
+
+# Doktor yönetimi sayfası (formlar) için tüm kolonlar
+DOCTOR_COLUMNS = "id,hospital_id,name,surname,specialty,image,bio,working_hours,is_active,services,created_at"
+# Seçim listeleri ve yorum kartları için
+DOCTOR_SUMMARY_COLUMNS = "id,name,surname,specialty,is_active"
+# Takvim ve müsaitlik hesapları için
+DOCTOR_SCHEDULE_COLUMNS = "id,name,surname,working_hours,is_active"
+# Hizmet atamaları için
+DOCTOR_SERVICES_COLUMNS = "id,name,surname,services"
+
+# Uygulama alanı -> Supabase kolonu
+_DOCTOR_FIELD_COLUMNS = {
+    "id": "id",
+    "hospitalId": "hospital_id",
+    "name": "name",
+    "surname": "surname",
+    "specialty": "specialty",
+    "image": "image",
+    "bio": "bio",
+    "workingHours": "working_hours",
+    "isActive": "is_active",
+    "services": "services",
+    "createdAt": "created_at",
+}
+
+
+def get_doctors(request=None, columns: str = DOCTOR_COLUMNS) -> list[dict]:
+    """Aktif hastaneye ait doktorları Supabase'den getirir.
+
+    columns ile sadece sayfanın gösterdiği kolonlar istenebilir.
+    """
     supabase = get_supabase_client()
     hospital_id = _get_active_hospital_id(request)
-    result = supabase.table("doctors").select("*").eq("hospital_id", hospital_id).execute()
+    result = resilient_execute(supabase.table("doctors").select(columns).eq("hospital_id", hospital_id))
     
     if not result.data:
         return []
@@ -20,6 +55,14 @@ def get_doctors(request=None) -> list[dict]:
     return [_format_doctor_from_db(d) for d in result.data]
 
 
+async def aget_doctors(request=None, columns: str = DOCTOR_COLUMNS) -> list[dict]:
+    """`get_doctors`'un async karşılığı."""
+    supabase = await get_async_supabase_client()
+    hospital_id = await _aget_active_hospital_id(request)
+    result = await resilient_aexecute(supabase.table("doctors").select(columns).eq("hospital_id", hospital_id))
+    return [_format_doctor_from_db(d) for d in result.data or []]
+
+
 # ID generation artık Supabase tarafından yapılıyor (UUID)
 
 
@@ -95,6 +138,8 @@ def add_doctor(data: dict, image_file=None, request=None) -> dict:
     if not result.data:
         raise ValueError("Doktor eklenemedi")
     
+    data_versions.bump_rows(result.data)
+    
     return _format_doctor_from_db(result.data[0])
 
 
@@ -124,6 +169,8 @@ def update_doctor(doctor_id: str, data: dict, image_file=None) -> dict:
     if not result.data:
         raise ValueError("Doktor bulunamadı veya güncellenemedi")
     
+    data_versions.bump_rows(result.data)
+    
     return _format_doctor_from_db(result.data[0])
 
 
@@ -144,6 +191,8 @@ def delete_doctor(doctor_id: str) -> None:
     
     if not result.data:
         raise ValueError("Doktor bulunamadı veya silinemedi")
+    
+    data_versions.bump_rows(result.data)
 
 
 def update_working_hours(doctor_id: str, working_hours: dict) -> None:
@@ -153,6 +202,8 @@ def update_working_hours(doctor_id: str, working_hours: dict) -> None:
     
     if not result.data:
         raise ValueError("Doktor bulunamadı veya güncellenemedi")
+    
+    data_versions.bump_rows(result.data)
 
 
 def build_initial_working_hours(doctor: dict) -> dict:
@@ -206,13 +257,13 @@ def build_working_hours_from_form(cleaned_data: dict) -> dict:
 def get_doctor_holidays(request=None) -> dict[str, list[dict]]:
     """Doktor tatillerini getirir."""
     supabase = get_supabase_client()
-    query = supabase.table("holidays").select("*").not_.is_("doctor_id", "null")
+    query = supabase.table("holidays").select(HOLIDAY_COLUMNS).not_.is_("doctor_id", "null")
     try:
         hospital_id = _get_active_hospital_id(request)
         query = query.eq("hospital_id", hospital_id)
     except ValueError:
         pass
-    result = query.execute()
+    result = resilient_execute(query)
     
     holidays_dict: dict[str, list[dict]] = {}
     if result.data:
@@ -241,6 +292,8 @@ def add_doctor_holiday(doctor_id: str, date_str: str, reason: str, request=None)
     
     if not result.data:
         raise ValueError("Doktor tatili eklenemedi")
+    
+    holiday_index.invalidate(hospital_id)
 
 
 def delete_doctor_holiday(holiday_id: str) -> None:
@@ -250,6 +303,8 @@ def delete_doctor_holiday(holiday_id: str) -> None:
     
     if not result.data:
         raise ValueError("Tatil bulunamadı veya silinemedi")
+    
+    holiday_index.invalidate(result.data[0].get("hospital_id"))
 
 
 def toggle_active(doctor_id: str, is_active: bool) -> None:
@@ -259,6 +314,8 @@ def toggle_active(doctor_id: str, is_active: bool) -> None:
     
     if not result.data:
         raise ValueError("Doktor bulunamadı veya güncellenemedi")
+    
+    data_versions.bump_rows(result.data)
 
 
 def _default_working_hours() -> dict:
@@ -273,7 +330,7 @@ def _default_working_hours() -> dict:
 def _build_default_working_hours(request=None) -> dict:
     """Hastane çalışma saatlerinden varsayılan doktor çalışma saatlerini oluşturur."""
     try:
-        hospital = get_hospital(request)
+        hospital = get_hospital(request, columns=HOSPITAL_HOURS_COLUMNS)
         hospital_hours = hospital.get("workingHours", {}) or {}
     except ValueError:
         hospital_hours = {}
@@ -328,12 +385,18 @@ def _delete_file(file_url_or_path: str | None) -> None:
 def _delete_doctor_holidays(doctor_id: str) -> None:
     """Doktorun tüm tatillerini siler."""
     supabase = get_supabase_client()
-    supabase.table("holidays").delete().eq("doctor_id", doctor_id).execute()
+    result = supabase.table("holidays").delete().eq("doctor_id", doctor_id).execute()
+    
+    for hospital_id in {h.get("hospital_id") for h in (result.data or [])}:
+        holiday_index.invalidate(hospital_id)
 
 
 def _format_doctor_from_db(db_doctor: dict) -> dict:
-    """Supabase'den gelen doktor verisini mevcut formata çevirir."""
-    return {
+    """Supabase'den gelen doktor verisini mevcut formata çevirir.
+
+    Kısmi satırlarda (kolon projeksiyonu) sadece gelen kolonların alanları döner.
+    """
+    doctor = {
         "id": str(db_doctor.get("id", "")),
         "hospitalId": str(db_doctor.get("hospital_id", "")),
         "name": db_doctor.get("name", ""),
@@ -346,6 +409,7 @@ def _format_doctor_from_db(db_doctor: dict) -> dict:
         "services": db_doctor.get("services", []),
         "createdAt": db_doctor.get("created_at", ""),
     }
+    return {key: value for key, value in doctor.items() if _DOCTOR_FIELD_COLUMNS[key] in db_doctor}
 
 
 def _format_holiday_from_db(db_holiday: dict) -> dict:
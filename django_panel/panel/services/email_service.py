@@ -3,9 +3,19 @@
 from __future__ import annotations
 
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection, send_mail
 from django.template.loader import render_to_string
 
+from . import metrics
+
+
+class ReminderDeliveryError(Exception):
+    """Toplu hatırlatma gönderimi yarıda kesildi; `sent_ids` o ana kadar gönderilenlerdir."""
+
+    def __init__(self, sent_ids: list[str]):
+        super().__init__(f"Hatırlatma gönderimi yarıda kesildi ({len(sent_ids)} gönderildi)")
+        self.sent_ids = sent_ids
+
 
 def send_hospital_registration_notification(hospital_data: dict) -> bool:
     """Yeni hastane kayıt isteği için admin'e email gönderir.
@@ -39,13 +49,14 @@ Lütfen Supabase panel'den hastaneyi inceleyip onaylayın veya reddedin.
 Supabase Dashboard: {settings.SUPABASE_URL.replace('https://', 'https://app.supabase.com/project/')}
         """
         
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[settings.ADMIN_EMAIL],
-            fail_silently=False,
-        )
+        with metrics.track_email("hospital_registration"):
+            send_mail(
+                subject=subject,
+                message=message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[settings.ADMIN_EMAIL],
+                fail_silently=False,
+            )
         
         return True
     except Exception as e:
@@ -87,16 +98,79 @@ Not: Giriş kodunuzu güvenli bir yerde saklayın.
 İyi çalışmalar!
         """
         
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[hospital_email],
-            fail_silently=False,
-        )
+        with metrics.track_email("hospital_approval"):
+            send_mail(
+                subject=subject,
+                message=message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[hospital_email],
+                fail_silently=False,
+            )
         
         return True
     except Exception as e:
         print(f"Email gönderim hatası: {e}")
         return False
 
+
+
+def send_appointment_reminders(reminders: list[dict], connection=None) -> list[str]:
+    """Randevu hatırlatmalarını tek bir SMTP bağlantısı üzerinden toplu gönderir.
+    
+    Args:
+        reminders: `appointment_id`, `email`, `patient_name`, `hospital_name`,
+            `date` ve `time` alanlarını içeren hatırlatma listesi
+        connection: Tekrar kullanılacak mail bağlantısı (verilmezse yeni açılır)
+        
+    Returns:
+        list[str]: Başarıyla gönderilen hatırlatmaların randevu ID'leri
+
+    Raises:
+        ReminderDeliveryError: SMTP hatasında; gönderilmiş olanların ID'leriyle
+    """
+    messages = []
+    appointment_ids = []
+    for reminder in reminders:
+        if not reminder.get("email"):
+            continue
+        
+        message = f"""
+Merhaba {reminder.get('patient_name') or ''},
+
+{reminder.get('hospital_name', '')} randevunuzu hatırlatmak isteriz.
+
+Tarih: {reminder.get('date', '')}
+Saat: {reminder.get('time', '')}
+
+Randevunuza gelemeyecekseniz lütfen kliniği bilgilendirin.
+
+Sağlıklı günler dileriz.
+        """
+        messages.append(EmailMessage(
+            subject=f"Randevu Hatırlatması - {reminder.get('hospital_name', '')}",
+            body=message,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[reminder["email"]],
+        ))
+        appointment_ids.append(reminder["appointment_id"])
+    
+    if not messages:
+        return []
+    
+    own_connection = connection is None
+    connection = connection or get_connection(fail_silently=False)
+    sent_ids = []
+    try:
+        if own_connection:
+            connection.open()
+        with metrics.track_email("appointment_reminder"):
+            # Mesajlar tek tek gönderilir; hata anında hangilerinin gittiği bilinir
+            for message, appointment_id in zip(messages, appointment_ids):
+                if connection.send_messages([message]):
+                    sent_ids.append(appointment_id)
+    except Exception as exc:
+        raise ReminderDeliveryError(sent_ids) from exc
+    finally:
+        if own_connection:
+            connection.close()
+    return sent_ids
@@ -0,0 +1,959 @@
+"""Bellek içi sahte Supabase backend'i (ağsız benchmark ve testler için).
+
+SUPABASE_BACKEND=fake olduğunda `get_supabase_client()`,
+`get_async_supabase_client()` ve `get_auth_client()` bu modüldeki client'ı
+döndürür. Client, servislerin kullandığı postgrest-py alt kümesini taklit eder:
+
+    table().select(..., count="exact").eq().neq().in_().is_().not_.gt()
+    .gte().lt().lte().or_().order().limit().range().single().maybe_single()
+    .insert().upsert().update().delete().execute()
+
+ve ayrıca `rpc("search_reviews", ...)`, storage `upload` / `remove` /
+`get_public_url` ile auth `sign_in_with_password` / `sign_up`. Sorgunun
+method, path, parametre ve başlıkları postgrest-py 2.x'teki gibi
+`query.request` altındadır; single-flight ve dayanıklılık katmanı sahte
+backend'de de üretimdeki yoldan geçer.
+
+Tablolar process başına bellekte tutulur ve `panel/data/*.json`
+dosyalarından (camelCase anahtarlar snake_case kolonlara çevrilerek)
+doldurulur. `eq` / `in` filtreleri kolon başına tembel kurulan indekslerden
+aday satır seçer; yazmalar indeksleri düşürür. Puan özet tabloları
+(hospital_rating_stats, doctor_rating_stats) ratings tablosundan türetilir
+ve ratings'e her yazmada yeniden hesaplanır (rating_aggregates.sql'deki
+trigger'ların karşılığı).
+
+Her çağrı SUPABASE_FAKE_LATENCY_MS kadar bekletilir ve gerçek transport
+gibi sorgu sayacına, metriklere ve ize işlenir; böylece N+1 uyarıları ve
+yavaş istek kayıtları sahte backend ile de çalışır.
+
+Sınırlamalar: embed'ler yalnızca `_RELATIONS`'daki ilişkiler için çözülür
+(diğerleri PGRST200 hatası verir, servisler `in` sorgularına düşer);
+`or_` içinde yalnızca düz filtreler ve `and(...)` / `or(...)` grupları
+desteklenir; Auth Admin HTTP uçları taklit edilmez.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Iterable, Optional
+
+import httpx
+from django.conf import settings
+
+try:
+    from postgrest.exceptions import APIError as _APIErrorBase
+except ImportError:  # pragma: no cover - postgrest supabase ile birlikte gelir
+    _APIErrorBase = Exception
+
+FAKE_URL = "http://fake.supabase.local"
+
+_OBJECT_ACCEPT = "application/vnd.pgrst.object+json"
+
+# (tablo, embed edilen tablo) -> (yerel kolon, uzak kolon); uzak kolon "id" ise tekil ilişki
+_RELATIONS = {
+    ("appointments", "doctors"): ("doctor_id", "id"),
+    ("appointments", "services"): ("service_id", "id"),
+    ("appointments", "user_profiles"): ("user_id", "id"),
+    ("appointments", "ratings"): ("id", "appointment_id"),
+    ("reviews", "appointments"): ("appointment_id", "id"),
+    ("ratings", "appointments"): ("appointment_id", "id"),
+}
+
+# tablo -> panel/data altındaki seed dosyası
+_SEED_FILES = {
+    "hospitals": "hospitals.json",
+    "doctors": "doctors.json",
+    "services": "services.json",
+    "appointments": "appointments.json",
+    "holidays": "holidays.json",
+    "ratings": "ratings.json",
+    "reviews": "reviews.json",
+    "user_profiles": "users.json",
+}
+
+# camelCase -> snake_case çevrimiyle karşılanmayan kolon adları
+_SEED_RENAMES = {
+    "appointments": {"service": "service_id"},
+}
+
+_STATS_TABLES = ("hospital_rating_stats", "doctor_rating_stats")
+
+_CAMEL_BOUNDARY = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+class FakeAPIError(_APIErrorBase):
+    """PostgREST hatasının karşılığı (postgrest yüklüyse APIError alt sınıfı)."""
+
+    def __init__(self, message: str, code: str = "PGRST000"):
+        error = {"message": message, "code": code, "hint": None, "details": None}
+        super().__init__(error)
+        self.message = message
+        self.code = code
+
+    def __str__(self) -> str:
+        return f"{self.code}: {self.message}"
+
+
+class FakeAuthError(Exception):
+    """Sahte Auth hatası (gotrue AuthApiError karşılığı)."""
+
+
+def is_enabled() -> bool:
+    return str(getattr(settings, "SUPABASE_BACKEND", "supabase")).lower() == "fake"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _snake(name: str) -> str:
+    return _CAMEL_BOUNDARY.sub("_", name).lower()
+
+
+# --- Filtreler -------------------------------------------------------------
+
+def _split_top_level(text: str) -> list[str]:
+    """Virgülle ayrılmış ifadeyi parantez ve çift tırnak dışındaki virgüllerden böler."""
+    parts, current, depth, quoted = [], [], 0, False
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append("".join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+def _coerce(raw: str, sample: Any) -> Any:
+    """Filtre değerini satırdaki değerin tipine çevirir."""
+    if isinstance(sample, bool):
+        return raw.lower() == "true"
+    if isinstance(sample, (int, float)):
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def _comparable(value: Any) -> Any:
+    if isinstance(value, (bool, int, float)):
+        return value
+    return str(value)
+
+
+def _compare(op: str, value: Any, raw: str) -> bool:
+    if value is None:
+        return False
+    left, right = _comparable(value), _coerce(raw, value)
+    try:
+        if op == "eq":
+            return left == right
+        if op == "neq":
+            return left != right
+        if op == "gt":
+            return left > right
+        if op == "gte":
+            return left >= right
+        if op == "lt":
+            return left < right
+        if op == "lte":
+            return left <= right
+    except TypeError:
+        return False
+    raise FakeAPIError(f"Desteklenmeyen operatör: {op}", code="PGRST100")
+
+
+def _like(pattern: str, flags: int = 0) -> re.Pattern:
+    escaped = re.escape(pattern).replace(r"\*", ".*").replace("%", ".*")
+    return re.compile(f"^{escaped}$", flags | re.DOTALL)
+
+
+def _predicate(column: str, expression: str) -> Callable[[dict], bool]:
+    """`eq.5`, `not.is.null`, `in.(1,2)` gibi PostgREST ifadesini satır testine çevirir."""
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, raw = expression.partition(".")
+
+    if op == "is":
+        target = {"null": None, "true": True, "false": False}.get(raw.lower(), raw)
+        test = lambda row: row.get(column) is target if target is None else row.get(column) == target
+    elif op == "in":
+        values = {_unquote(item) for item in _split_top_level(raw.strip("()"))}
+        test = lambda row: row.get(column) is not None and str(_comparable(row.get(column))) in values
+    elif op in ("like", "ilike"):
+        pattern = _like(_unquote(raw), re.IGNORECASE if op == "ilike" else 0)
+        test = lambda row: row.get(column) is not None and bool(pattern.match(str(row.get(column))))
+    else:
+        raw = _unquote(raw)
+        test = lambda row: _compare(op, row.get(column), raw)
+    return (lambda row: not test(row)) if negate else test
+
+
+def _logic_predicate(expression: str, any_of: bool) -> Callable[[dict], bool]:
+    """`(a.eq.1,and(b.eq.2,c.lt.3))` biçimindeki or/and grubunu satır testine çevirir."""
+    tests = []
+    for item in _split_top_level(expression.strip()[1:-1]):
+        negate = item.startswith("not.")
+        body = item[4:] if negate else item
+        if body.startswith(("and(", "or(")):
+            name, _, group = body.partition("(")
+            test = _logic_predicate(f"({group}", any_of=(name == "or"))
+        else:
+            column, _, rest = body.partition(".")
+            test = _predicate(column, rest)
+        tests.append((lambda row, t=test: not t(row)) if negate else test)
+    if any_of:
+        return lambda row: any(test(row) for test in tests)
+    return lambda row: all(test(row) for test in tests)
+
+
+# --- Select ----------------------------------------------------------------
+
+def _parse_select(columns: str) -> list[tuple]:
+    """Select ifadesini (alan adı, kolon) veya (alan adı, embed tablosu, alt select) listesine çevirir."""
+    fields = []
+    for item in _split_top_level(columns or "*"):
+        if "(" in item:
+            head, _, inner = item.partition("(")
+            alias, _, table = head.rpartition(":")
+            table = table.split("!", 1)[0]
+            fields.append((alias or table, table, inner[:-1]))
+        else:
+            alias, _, column = item.rpartition(":")
+            fields.append((alias or column, column))
+    return fields
+
+
+class _Table:
+    """Bir tablonun satırları ve kolon başına tembel kurulan eşitlik indeksleri."""
+
+    def __init__(self):
+        self.rows: dict[int, dict] = {}
+        self._next_key = 0
+        self._indexes: dict[str, dict[str, set[int]]] = {}
+
+    def add(self, row: dict) -> dict:
+        self._next_key += 1
+        self.rows[self._next_key] = row
+        self._indexes.clear()
+        return row
+
+    def remove(self, keys: Iterable[int]) -> None:
+        for key in keys:
+            self.rows.pop(key, None)
+        self._indexes.clear()
+
+    def touch(self) -> None:
+        self._indexes.clear()
+
+    def index(self, column: str) -> dict[str, set[int]]:
+        index = self._indexes.get(column)
+        if index is None:
+            index = {}
+            for key, row in self.rows.items():
+                value = row.get(column)
+                if value is not None:
+                    index.setdefault(str(_comparable(value)), set()).add(key)
+            self._indexes[column] = index
+        return index
+
+    def candidates(self, hints: list[tuple[str, set[str]]]) -> list[int]:
+        """İndekslenebilir filtrelerden en dar aday kümesini döndürür (sıra eklenme sırasıdır)."""
+        keys: Optional[set[int]] = None
+        for column, values in hints:
+            index = self.index(column)
+            matched = set().union(*(index.get(value, set()) for value in values)) if values else set()
+            keys = matched if keys is None else keys & matched
+        if keys is None:
+            return list(self.rows)
+        return sorted(keys)
+
+
+class FakeDatabase:
+    """Tüm tabloları, storage nesnelerini ve auth kullanıcılarını tutan bellek içi veritabanı."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.tables: dict[str, _Table] = {}
+        self.objects: dict[tuple[str, str], bytes] = {}
+        self.auth_users: dict[str, dict] = {}
+        self.latency = max(latency_ms, 0.0) / 1000
+        # Tabloya özel ek gecikme (saniye); tek bir yavaş okumayı canlandırmak için
+        self.table_latency: dict[str, float] = {}
+        self.lock = threading.RLock()
+
+    def table(self, name: str) -> _Table:
+        with self.lock:
+            return self.tables.setdefault(name, _Table())
+
+    def load(self, name: str, rows: Iterable[dict]) -> None:
+        """Tabloya satır ekler (seed); puan özetleri ratings'e göre güncellenir."""
+        with self.lock:
+            table = self.table(name)
+            for row in rows:
+                table.add(dict(row))
+            if name == "ratings":
+                self.rebuild_rating_stats()
+
+    def seed_from_dir(self, directory) -> None:
+        """`panel/data` biçimindeki JSON (veya satır başına bir kayıt JSONL) dosyalarından tabloları doldurur."""
+        directory = Path(directory)
+        for name, filename in _SEED_FILES.items():
+            records = _read_seed(directory / filename)
+            if records is None:
+                continue
+            renames = _SEED_RENAMES.get(name, {})
+            rows = [
+                {renames.get(key, _snake(key)): value for key, value in record.items()}
+                for record in records
+            ]
+            if name == "user_profiles":
+                for row in rows:
+                    password = row.pop("password", None)
+                    if password:
+                        self.add_auth_user(row.get("email", ""), password, user_id=row["id"],
+                                           metadata={"name": row.get("name", ""), "surname": row.get("surname", "")})
+            self.load(name, rows)
+
+    def add_auth_user(self, email: str, password: str, user_id: Optional[str] = None, metadata: Optional[dict] = None) -> dict:
+        with self.lock:
+            user = {
+                "id": str(user_id or uuid.uuid4()),
+                "email": email,
+                "password": password,
+                "user_metadata": metadata or {},
+                "created_at": _now(),
+            }
+            self.auth_users[email.lower()] = user
+            return user
+
+    def rebuild_rating_stats(self) -> None:
+        """Puan özet tablolarını ratings tablosundan yeniden hesaplar."""
+        hospitals: dict[str, dict] = {}
+        doctors: dict[str, dict] = {}
+
+        def apply(summaries, key, extra, rating):
+            if not key or not isinstance(rating, (int, float)) or not 1 <= rating <= 5:
+                return
+            row = summaries.setdefault(str(key), {
+                **extra, "rating_count": 0, "rating_sum": 0,
+                **{f"rating_{value}": 0 for value in range(1, 6)},
+            })
+            row["rating_count"] += 1
+            row["rating_sum"] += int(rating)
+            row[f"rating_{int(rating)}"] += 1
+
+        with self.lock:
+            for rating in self.table("ratings").rows.values():
+                hospital_id, doctor_id = rating.get("hospital_id"), rating.get("doctor_id")
+                apply(hospitals, hospital_id, {"hospital_id": hospital_id}, rating.get("hospital_rating"))
+                apply(doctors, doctor_id, {"doctor_id": doctor_id, "hospital_id": hospital_id}, rating.get("doctor_rating"))
+            for name, summaries in zip(_STATS_TABLES, (hospitals, doctors)):
+                table = self.tables[name] = _Table()
+                for row in summaries.values():
+                    table.add(row)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.tables.clear()
+            self.objects.clear()
+            self.auth_users.clear()
+
+    def slow_down(self, table: str, latency_ms: float) -> None:
+        """Tablonun PostgREST çağrılarına ek gecikme ekler (0: kaldırır)."""
+        if latency_ms > 0:
+            self.table_latency[table] = latency_ms / 1000
+        else:
+            self.table_latency.pop(table, None)
+
+    def latency_for(self, path: str) -> float:
+        table = path.split("/rest/v1/", 1)[1].split("/", 1)[0] if "/rest/v1/" in path else None
+        return self.latency + self.table_latency.get(table, 0.0)
+
+    def wait(self, path: str = "") -> None:
+        latency = self.latency_for(path)
+        if latency:
+            time.sleep(latency)
+
+    async def await_latency(self, path: str = "") -> None:
+        latency = self.latency_for(path)
+        if latency:
+            await asyncio.sleep(latency)
+
+
+def _read_seed(path: Path) -> Optional[list[dict]]:
+    """Seed dosyasını okur; `.json` yoksa aynı adlı `.jsonl` denenir."""
+    if path.exists():
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    jsonl_path = path.with_suffix(".jsonl")
+    if jsonl_path.exists():
+        with open(jsonl_path, encoding="utf-8") as handle:
+            return [json.loads(line) for line in handle if line.strip()]
+    return None
+
+
+def _observe(method: str, path: str, params=None, body=None, status: Optional[int] = 200,
+             started: float = 0.0, elapsed: float = 0.0) -> None:
+    """Çağrıyı gerçek transport'un kullandığı sayaç, metrik ve ize işler."""
+    from . import http_transport
+
+    content = json.dumps(body, default=str).encode() if body is not None else None
+    request = httpx.Request(method, f"{FAKE_URL}{path}", params=params, content=content)
+    if method != "GET":
+        http_transport._forget_written_table(request)
+    http_transport._observe(request, status, started, elapsed)
+
+
+class _Timed:
+    """Gecikmeyi uygulayıp gözlemleyen sync/async çalıştırıcı."""
+
+    def __init__(self, client: "FakeClient", method: str, path: str, params=None, body=None):
+        self.client = client
+        self.method = method
+        self.path = path
+        self.params = params
+        self.body = body
+
+    def run(self, operation: Callable[[], Any]):
+        if self.client.is_async:
+            return self._arun(operation)
+        started = time.perf_counter()
+        self.client.db.wait(self.path)
+        return self._finish(operation, started)
+
+    async def _arun(self, operation):
+        started = time.perf_counter()
+        await self.client.db.await_latency(self.path)
+        return self._finish(operation, started)
+
+    def _finish(self, operation, started):
+        status = 200
+        try:
+            return operation()
+        except FakeAPIError as exc:
+            status = 404 if exc.code in ("PGRST200", "PGRST202") else 406 if exc.code == "PGRST116" else 400
+            raise
+        except FakeAuthError:
+            status = 400
+            raise
+        finally:
+            _observe(self.method, self.path, self.params, self.body, status, started, time.perf_counter() - started)
+
+
+class FakeResponse:
+    """postgrest APIResponse karşılığı."""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+    def __repr__(self) -> str:
+        return f"FakeResponse(data={self.data!r}, count={self.count!r})"
+
+
+class FakeRequestConfig:
+    """postgrest-py 2.x `ReqConfig` karşılığı: sorgunun method, path, parametre ve başlıkları."""
+
+    def __init__(self, http_method: str, path: str):
+        self.http_method = http_method
+        # Gerçek builder'daki gibi tam URL (ör. http://.../rest/v1/doctors)
+        self.path = httpx.URL(f"{FAKE_URL}/rest/v1{path}")
+        self.headers = httpx.Headers({"Accept": "application/json"})
+        self.pairs: list[tuple[str, str]] = []
+        self.json: Any = None
+
+    @property
+    def params(self) -> httpx.QueryParams:
+        return httpx.QueryParams(self.pairs)
+
+
+class FakeQuery:
+    """postgrest-py request/filter builder karşılığı; filtre metodları self döndürür."""
+
+    def __init__(self, client: "FakeClient", table: str, rpc_params: Optional[dict] = None):
+        self._client = client
+        self._table = table
+        self._rpc_params = rpc_params
+        self._filters: list[Callable[[dict], bool]] = []
+        self._hints: list[tuple[str, set[str]]] = []
+        self._negate_next = False
+        self._columns = "*"
+        self._limit: Optional[int] = None
+        self._offset = 0
+        self._order: list[tuple[str, bool]] = []
+        self._maybe_single = False
+        # Gerçek builder gibi HTTP isteği alanları `request` altında tutulur (bkz. single_flight.request_config)
+        self.request = FakeRequestConfig(
+            "POST" if rpc_params is not None else "GET",
+            f"/rpc/{table}" if rpc_params is not None else f"/{table}",
+        )
+        if rpc_params is not None:
+            self.request.json = rpc_params
+
+    # -- builder --
+    def select(self, *columns: str, count: Optional[str] = None) -> "FakeQuery":
+        self._columns = ",".join(columns) if columns else "*"
+        self._set_param("select", self._columns.replace(" ", ""))
+        if count:
+            self._prefer(f"count={count}")
+        return self
+
+    def insert(self, json: Any, *, returning: str = "representation", upsert: bool = False, **_) -> "FakeQuery":
+        self.request.http_method = "POST"
+        self.request.json = json
+        self._prefer(f"return={returning}")
+        if upsert:
+            self._prefer("resolution=merge-duplicates")
+        return self
+
+    def upsert(self, json: Any, *, returning: str = "representation", on_conflict: str = "", **_) -> "FakeQuery":
+        self.insert(json, returning=returning, upsert=True)
+        if on_conflict:
+            self._set_param("on_conflict", on_conflict)
+        return self
+
+    def update(self, json: dict, *, returning: str = "representation", **_) -> "FakeQuery":
+        self.request.http_method = "PATCH"
+        self.request.json = json
+        self._prefer(f"return={returning}")
+        return self
+
+    def delete(self, *, returning: str = "representation", **_) -> "FakeQuery":
+        self.request.http_method = "DELETE"
+        self._prefer(f"return={returning}")
+        return self
+
+    # -- filtreler --
+    @property
+    def not_(self) -> "FakeQuery":
+        self._negate_next = True
+        return self
+
+    def filter(self, column: str, operator: str, criteria: str) -> "FakeQuery":
+        expression = f"{operator}.{criteria}"
+        if self._negate_next:
+            expression = f"not.{expression}"
+            self._negate_next = False
+        elif operator in ("eq", "in"):
+            values = {_unquote(criteria)} if operator == "eq" else {
+                _unquote(item) for item in _split_top_level(criteria.strip("()"))
+            }
+            self._hints.append((column, values))
+        self.request.pairs.append((column, expression))
+        self._filters.append(_predicate(column, expression))
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "eq", self._format(value))
+
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "neq", self._format(value))
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "gt", self._format(value))
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "gte", self._format(value))
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "lt", self._format(value))
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "lte", self._format(value))
+
+    def like(self, column: str, pattern: str) -> "FakeQuery":
+        return self.filter(column, "like", pattern)
+
+    def ilike(self, column: str, pattern: str) -> "FakeQuery":
+        return self.filter(column, "ilike", pattern)
+
+    def is_(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "is", "null" if value is None else self._format(value))
+
+    def in_(self, column: str, values: Iterable[Any]) -> "FakeQuery":
+        return self.filter(column, "in", "(" + ",".join(self._format(value) for value in values) + ")")
+
+    def or_(self, filters: str, reference_table: Optional[str] = None) -> "FakeQuery":
+        expression = f"({filters})"
+        negate, self._negate_next = self._negate_next, False
+        self.request.pairs.append(("not.or" if negate else "or", expression))
+        test = _logic_predicate(expression, any_of=True)
+        self._filters.append((lambda row: not test(row)) if negate else test)
+        return self
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: bool = False, **_) -> "FakeQuery":
+        self._order.append((column, desc))
+        self._set_param("order", ",".join(f"{col}.desc" if is_desc else col for col, is_desc in self._order))
+        return self
+
+    def limit(self, size: int, **_) -> "FakeQuery":
+        self._limit = size
+        self._set_param("limit", str(size))
+        return self
+
+    def offset(self, size: int) -> "FakeQuery":
+        self._offset = size
+        self._set_param("offset", str(size))
+        return self
+
+    def range(self, start: int, end: int, **_) -> "FakeQuery":
+        self.offset(start)
+        return self.limit(end - start + 1)
+
+    def single(self) -> "FakeQuery":
+        self.request.headers["Accept"] = _OBJECT_ACCEPT
+        return self
+
+    def maybe_single(self) -> "FakeQuery":
+        self._maybe_single = True
+        return self.single()
+
+    # -- çalıştırma --
+    def as_sync(self) -> "FakeQuery":
+        """Aynı sorgunun sync client ile çalışan kopyası (bkz. supabase_client.sync_query)."""
+        twin = copy.copy(self)
+        twin._client = get_client()
+        return twin
+
+    def execute(self):
+        """Sorguyu çalıştırır; async client'ta awaitable döner."""
+        request = self.request
+        timed = _Timed(self._client, request.http_method, request.path.path, request.pairs, request.json)
+        return timed.run(self._run)
+
+    def _run(self) -> FakeResponse:
+        db = self._client.db
+        with db.lock:
+            if self._rpc_params is not None:
+                rows, count = _call_rpc(db, self._table, self._rpc_params), None
+            elif self.request.http_method == "GET":
+                rows, count = self._select(db)
+            elif self.request.http_method == "POST":
+                rows, count = self._insert(db), None
+            elif self.request.http_method == "PATCH":
+                rows, count = self._update(db), None
+            else:
+                rows, count = self._delete(db), None
+            if self._table == "ratings" and self.request.http_method != "GET":
+                db.rebuild_rating_stats()
+
+            if self.request.http_method != "GET" and "return=minimal" in self.request.headers.get("Prefer", ""):
+                return FakeResponse([], count)
+            data = [self._project(db, self._table, row, self._columns) for row in rows]
+
+        if self.request.headers["Accept"] == _OBJECT_ACCEPT:
+            if len(data) == 1:
+                return FakeResponse(data[0], count)
+            if self._maybe_single and not data:
+                return FakeResponse(None, count)
+            raise FakeAPIError(
+                f"JSON object requested, multiple (or no) rows returned ({len(data)} satır)", code="PGRST116"
+            )
+        return FakeResponse(data, count)
+
+    def _matching(self, db: FakeDatabase) -> list[tuple[int, dict]]:
+        table = db.tables.get(self._table)
+        if table is None:
+            # Seed edilmemiş tablolar boş kabul edilir
+            return []
+        matches = []
+        for key in table.candidates(self._hints):
+            row = table.rows[key]
+            if all(test(row) for test in self._filters):
+                matches.append((key, row))
+        return matches
+
+    def _select(self, db: FakeDatabase) -> tuple[list[dict], Optional[int]]:
+        rows = [row for _, row in self._matching(db)]
+        count = len(rows) if "count=" in self.request.headers.get("Prefer", "") else None
+        for column, desc in reversed(self._order):
+            rows.sort(key=lambda row: (row.get(column) is None, _sort_value(row.get(column))), reverse=desc)
+        end = None if self._limit is None else self._offset + self._limit
+        return rows[self._offset:end], count
+
+    def _insert(self, db: FakeDatabase) -> list[dict]:
+        records = self.request.json if isinstance(self.request.json, list) else [self.request.json]
+        merge = "resolution=merge-duplicates" in self.request.headers.get("Prefer", "")
+        table = db.table(self._table)
+        conflict = dict(self.request.pairs).get("on_conflict", "id")
+        inserted = []
+        for record in records:
+            record = copy.deepcopy(record)
+            existing = None
+            if merge and record.get(conflict) is not None:
+                keys = table.index(conflict).get(str(_comparable(record[conflict])), set())
+                existing = table.rows[min(keys)] if keys else None
+            if existing is not None:
+                existing.update(record)
+                table.touch()
+                inserted.append(existing)
+                continue
+            # Supabase kolon varsayılanları
+            record.setdefault("id", str(uuid.uuid4()))
+            record.setdefault("created_at", _now())
+            if table.index("id").get(str(record["id"])):
+                raise FakeAPIError(f"duplicate key value violates unique constraint ({self._table}.id)", code="23505")
+            inserted.append(table.add(record))
+        return inserted
+
+    def _update(self, db: FakeDatabase) -> list[dict]:
+        matches = self._matching(db)
+        for _, row in matches:
+            row.update(copy.deepcopy(self.request.json))
+        db.table(self._table).touch()
+        return [row for _, row in matches]
+
+    def _delete(self, db: FakeDatabase) -> list[dict]:
+        matches = self._matching(db)
+        db.table(self._table).remove(key for key, _ in matches)
+        return [row for _, row in matches]
+
+    def _project(self, db: FakeDatabase, table: str, row: dict, columns: str) -> dict:
+        result = {}
+        for field in _parse_select(columns):
+            if len(field) == 2:
+                name, column = field
+                if column == "*":
+                    result.update(copy.deepcopy(row))
+                else:
+                    result[name] = copy.deepcopy(row.get(column))
+                continue
+            name, child, child_columns = field
+            relation = _RELATIONS.get((table, child))
+            if relation is None:
+                raise FakeAPIError(
+                    f"Could not find a relationship between '{table}' and '{child}'", code="PGRST200"
+                )
+            local, remote = relation
+            value = row.get(local)
+            related = []
+            if value is not None and child in db.tables:
+                child_table = db.tables[child]
+                keys = child_table.index(remote).get(str(_comparable(value)), set())
+                related = [self._project(db, child, child_table.rows[key], child_columns) for key in sorted(keys)]
+            result[name] = (related[0] if related else None) if remote == "id" else related
+        return result
+
+    def _set_param(self, key: str, value: str) -> None:
+        self.request.pairs = [(k, v) for k, v in self.request.pairs if k != key] + [(key, value)]
+
+    def _prefer(self, value: str) -> None:
+        current = self.request.headers.get("Prefer")
+        self.request.headers["Prefer"] = f"{current},{value}" if current else value
+
+    @staticmethod
+    def _format(value: Any) -> str:
+        if isinstance(value, bool):
+            return str(value).lower()
+        return str(value)
+
+
+def _sort_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    return value if isinstance(value, (int, float)) else str(value)
+
+
+def _search_reviews(db: FakeDatabase, params: dict) -> list[dict]:
+    """review_search.sql'deki search_reviews fonksiyonunun basit karşılığı (kelime eşleşmesi)."""
+    terms = [term for term in str(params.get("p_query") or "").lower().split() if term]
+    date_to = params.get("p_date_to")
+    ratings = {
+        str(row.get("appointment_id")): row
+        for row in db.table("ratings").rows.values()
+        if row.get("appointment_id") is not None
+    }
+    results = []
+    for review in db.table("reviews").rows.values():
+        if str(review.get("hospital_id")) != str(params.get("p_hospital_id")):
+            continue
+        if params.get("p_doctor_id") and str(review.get("doctor_id")) != str(params["p_doctor_id"]):
+            continue
+        created_at = str(review.get("created_at") or "")
+        if params.get("p_date_from") and created_at < str(params["p_date_from"]):
+            continue
+        if date_to and created_at[:10] > str(date_to):
+            continue
+        has_reply = params.get("p_has_reply")
+        if has_reply is not None and bool(review.get("reply")) != has_reply:
+            continue
+        text = f"{review.get('comment') or ''} {review.get('reply') or ''}".lower()
+        if not all(term in text for term in terms):
+            continue
+        rating = ratings.get(str(review.get("appointment_id")), {})
+        results.append({
+            **copy.deepcopy(review),
+            "doctor_rating": rating.get("doctor_rating"),
+            "hospital_rating": rating.get("hospital_rating"),
+            "rank": float(sum(text.count(term) for term in terms)),
+        })
+    results.sort(key=lambda row: (row["rank"], str(row.get("created_at") or ""), str(row.get("id"))), reverse=True)
+    offset = int(params.get("p_offset") or 0)
+    return results[offset:offset + int(params.get("p_limit") or len(results))]
+
+
+_RPC_FUNCTIONS: dict[str, Callable[[FakeDatabase, dict], list[dict]]] = {
+    "search_reviews": _search_reviews,
+}
+
+
+def _call_rpc(db: FakeDatabase, name: str, params: dict) -> list[dict]:
+    function = _RPC_FUNCTIONS.get(name)
+    if function is None:
+        raise FakeAPIError(f"Fonksiyon bulunamadı: {name}", code="PGRST202")
+    return function(db, params or {})
+
+
+class _FakeBucket:
+    def __init__(self, client: "FakeClient", bucket: str):
+        self._client = client
+        self._bucket = bucket
+
+    def upload(self, path: str, file: Any, file_options: Optional[dict] = None):
+        def operation():
+            key = (self._bucket, path)
+            upsert = str((file_options or {}).get("upsert", "false")).lower() == "true"
+            with self._client.db.lock:
+                if key in self._client.db.objects and not upsert:
+                    raise FakeAPIError(f"The resource already exists: {self._bucket}/{path}", code="409")
+                self._client.db.objects[key] = file if isinstance(file, bytes) else str(file).encode()
+            return SimpleNamespace(path=path, full_path=f"{self._bucket}/{path}")
+
+        return _Timed(self._client, "POST", f"/storage/v1/object/{self._bucket}/{path}").run(operation)
+
+    def remove(self, paths: list[str]):
+        def operation():
+            removed = []
+            with self._client.db.lock:
+                for path in paths:
+                    if self._client.db.objects.pop((self._bucket, path), None) is not None:
+                        removed.append({"name": path, "bucket_id": self._bucket})
+            return removed
+
+        return _Timed(self._client, "DELETE", f"/storage/v1/object/{self._bucket}", body={"prefixes": paths}).run(operation)
+
+    def get_public_url(self, path: str, options: Optional[dict] = None) -> str:
+        return f"{FAKE_URL}/storage/v1/object/public/{self._bucket}/{path}"
+
+
+class _FakeStorage:
+    def __init__(self, client: "FakeClient"):
+        self._client = client
+
+    def from_(self, bucket: str) -> _FakeBucket:
+        return _FakeBucket(self._client, bucket)
+
+
+class _FakeAuth:
+    def __init__(self, client: "FakeClient"):
+        self._client = client
+
+    def sign_in_with_password(self, credentials: dict):
+        def operation():
+            email = str(credentials.get("email", "")).lower()
+            user = self._client.db.auth_users.get(email)
+            if user is None or user["password"] != credentials.get("password"):
+                raise FakeAuthError("Invalid login credentials")
+            return _auth_response(user)
+
+        return _Timed(self._client, "POST", "/auth/v1/token", params={"grant_type": "password"}).run(operation)
+
+    def sign_up(self, credentials: dict):
+        def operation():
+            email = str(credentials.get("email", ""))
+            if email.lower() in self._client.db.auth_users:
+                raise FakeAuthError("User already registered")
+            options = credentials.get("options") or {}
+            user = self._client.db.add_auth_user(email, credentials.get("password", ""), metadata=options.get("data"))
+            return _auth_response(user)
+
+        return _Timed(self._client, "POST", "/auth/v1/signup").run(operation)
+
+
+def _auth_response(user: dict) -> SimpleNamespace:
+    auth_user = SimpleNamespace(
+        id=user["id"],
+        email=user["email"],
+        user_metadata=dict(user["user_metadata"]),
+        created_at=user["created_at"],
+    )
+    session = SimpleNamespace(access_token=f"fake-{uuid.uuid4().hex}", refresh_token="", user=auth_user)
+    return SimpleNamespace(user=auth_user, session=session)
+
+
+class FakeClient:
+    """supabase Client / AsyncClient karşılığı; is_async ise execute() awaitable döner."""
+
+    def __init__(self, db: FakeDatabase, is_async: bool = False):
+        self.db = db
+        self.is_async = is_async
+        self.storage = _FakeStorage(self)
+        self.auth = _FakeAuth(self)
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[dict] = None) -> FakeQuery:
+        return FakeQuery(self, fn, rpc_params=dict(params or {}))
+
+
+_database: Optional[FakeDatabase] = None
+_database_lock = threading.Lock()
+
+
+def get_database() -> FakeDatabase:
+    """Process'in sahte veritabanını döndürür; ilk çağrıda SUPABASE_FAKE_SEED_DIR'den doldurulur."""
+    global _database
+    with _database_lock:
+        if _database is None:
+            database = FakeDatabase(latency_ms=float(getattr(settings, "SUPABASE_FAKE_LATENCY_MS", 0) or 0))
+            seed_dir = getattr(settings, "SUPABASE_FAKE_SEED_DIR", "")
+            if seed_dir:
+                database.seed_from_dir(seed_dir)
+            else:
+                database.rebuild_rating_stats()
+            _database = database
+        return _database
+
+
+def get_client() -> FakeClient:
+    return FakeClient(get_database())
+
+
+def get_async_client() -> FakeClient:
+    return FakeClient(get_database(), is_async=True)
+
+
+def reset() -> None:
+    """Sahte veritabanını bırakır; bir sonraki çağrıda ayarlardan yeniden kurulur."""
+    global _database
+    with _database_lock:
+        _database = None
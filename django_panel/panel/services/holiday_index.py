@@ -0,0 +1,153 @@
+"""Tatil aralık indeksi.
+
+Bir hastanenin (ve doktorlarının) tatilleri tarih aralığı bazında tek sorguyla
+yüklenir, saatler dakikaya çevrilerek gün bazında aralık listeleri halinde
+tutulur. Böylece slot kontrolleri Supabase'e gitmeden ve `strptime`
+çalıştırmadan yapılır. Tatil eklenip silindiğinde `invalidate` çağrılmalıdır;
+bu hastanenin veri sürümünü de artırdığı için diğer worker'lardaki indeksler
+de bir sonraki kullanımda yeniden yüklenir (bkz. data_versions).
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import date
+from threading import Lock
+
+from . import data_versions
+from .supabase_client import get_supabase_client
+
+# Tam gün tatilin dakika aralığı (uç noktalar dahil)
+FULL_DAY = (0, 24 * 60)
+
+# Veri sürümü paylaşılamadığında başka worker'daki değişikliklerin en geç görüneceği süre
+HOLIDAY_INDEX_TTL_SECONDS = 300
+
+# Hastane bulunamadığında (login olmadan erişim) tüm hastaneler için kullanılan anahtar
+_ALL_HOSPITALS = "*"
+
+_CACHE: dict[str, "HolidayIndex"] = {}
+_CACHE_LOCK = Lock()
+# Yükleme sürerken yapılan invalidate'lerin eski veriyi geri yazmasını önler
+_generation = 0
+
+
+def parse_minutes(value: str | None) -> int | None:
+    """"HH:MM" (veya "HH:MM:SS") formatındaki saati gün içi dakikaya çevirir."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        hour, minute = value.split(":")[:2]
+        return int(hour) * 60 + int(minute)
+    except (ValueError, TypeError):
+        return None
+
+
+class HolidayIndex:
+    """Belirli bir tarih aralığındaki tatillerin gün/doktor bazında indeksi."""
+
+    def __init__(self, hospital_id: str | None, start: date, end: date, rows: list[dict], version=None):
+        self.hospital_id = hospital_id
+        self.start = start
+        self.end = end
+        self.version = version
+        self.loaded_at = time.monotonic()
+        # (doctor_id | None, "YYYY-MM-DD") -> [(başlangıç_dk, bitiş_dk), ...]
+        self._intervals: dict[tuple[str | None, str], list[tuple[int, int]]] = {}
+        for row in rows:
+            self._add(row)
+
+    def _add(self, row: dict) -> None:
+        day = row.get("date")
+        if not day:
+            return
+        doctor_id = str(row["doctor_id"]) if row.get("doctor_id") else None
+
+        if row.get("is_full_day", True):
+            interval = FULL_DAY
+        else:
+            start = parse_minutes(row.get("start_time"))
+            end = parse_minutes(row.get("end_time"))
+            if start is None or end is None:
+                return
+            interval = (start, end)
+        self._intervals.setdefault((doctor_id, day), []).append(interval)
+
+    def covers(self, start: date, end: date) -> bool:
+        return self.start <= start and end <= self.end
+
+    def is_expired(self) -> bool:
+        if time.monotonic() - self.loaded_at > HOLIDAY_INDEX_TTL_SECONDS:
+            return True
+        return self.version != data_versions.hospital_version(self.hospital_id)
+
+    def intervals_for(self, day: date | str, doctor_id: str | None = None) -> list[tuple[int, int]]:
+        """Günün tatil aralıklarını döndürür (doctor_id verilmezse hastane tatilleri)."""
+        day_str = day if isinstance(day, str) else day.isoformat()
+        return self._intervals.get((doctor_id, day_str), [])
+
+    def is_blocked(self, day: date | str, minute: int, doctor_id: str | None = None) -> bool:
+        """Hastane tatili (ve doctor_id verildiyse doktor tatili) o dakikayı kapsıyor mu?"""
+        for start, end in self.intervals_for(day):
+            if start <= minute <= end:
+                return True
+        if doctor_id:
+            for start, end in self.intervals_for(day, doctor_id):
+                if start <= minute <= end:
+                    return True
+        return False
+
+
+def _load_rows(hospital_id: str | None, start: date, end: date) -> list[dict]:
+    supabase = get_supabase_client()
+    query = (
+        supabase.table("holidays")
+        .select("hospital_id,doctor_id,date,is_full_day,start_time,end_time")
+        .gte("date", start.isoformat())
+        .lte("date", end.isoformat())
+    )
+    if hospital_id:
+        query = query.eq("hospital_id", hospital_id)
+    result = query.execute()
+    return result.data if result.data else []
+
+
+def get_holiday_index(hospital_id: str | None, start: date, end: date) -> HolidayIndex:
+    """Hastanenin verilen tarih aralığını kapsayan tatil indeksini döndürür.
+
+    Önbellekteki indeks aralığı kapsamıyorsa, mevcut aralıkla birleştirilerek
+    tek sorguyla yeniden yüklenir.
+    """
+    key = hospital_id or _ALL_HOSPITALS
+    with _CACHE_LOCK:
+        cached = _CACHE.get(key)
+        generation = _generation
+    if cached and not cached.is_expired() and cached.covers(start, end):
+        return cached
+
+    if cached and not cached.is_expired():
+        start = min(start, cached.start)
+        end = max(end, cached.end)
+
+    version = data_versions.hospital_version(hospital_id)
+    index = HolidayIndex(hospital_id, start, end, _load_rows(hospital_id, start, end), version)
+    with _CACHE_LOCK:
+        if generation == _generation:
+            _CACHE[key] = index
+    return index
+
+
+def invalidate(hospital_id: str | None = None) -> None:
+    """Hastanenin tatil indeksini önbellekten çıkarır (ID verilmezse tümünü).
+
+    Hastanenin veri sürümü de artırılır; diğer worker'lar indekslerini yeniden yükler.
+    """
+    global _generation
+    with _CACHE_LOCK:
+        _generation += 1
+        if hospital_id is None:
+            _CACHE.clear()
+        else:
+            _CACHE.pop(str(hospital_id), None)
+            _CACHE.pop(_ALL_HOSPITALS, None)
+    data_versions.bump(hospital_id)
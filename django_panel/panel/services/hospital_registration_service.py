@@ -8,7 +8,7 @@ from .supabase_client import get_supabase_client
 from .auth_service import sign_up
 from .email_service import send_hospital_registration_notification
 from . import location_service
-from .hospital_service import _resolve_location_snapshot
+from .hospital_service import _resolve_location_snapshot, hospital_choices_cache
 
 
 def generate_hospital_code() -> str:
@@ -112,6 +112,7 @@ def register_hospital(form_data: dict, logo_file=None) -> dict:
     if not result.data:
         raise ValueError("Hastane kaydı oluşturulamadı")
     
+    hospital_choices_cache.invalidate()
     hospital = result.data[0]
     
     # 6. Admin'e email gönder
@@ -139,7 +140,13 @@ def approve_hospital(hospital_id: str) -> dict:
     supabase = get_supabase_client()
     
     # 1. Hastane bilgilerini al
-    result = supabase.table("hospitals").select("*").eq("id", hospital_id).single().execute()
+    result = (
+        supabase.table("hospitals")
+        .select("id,name,status,hospital_code,owner_email")
+        .eq("id", hospital_id)
+        .single()
+        .execute()
+    )
     
     if not result.data:
         raise ValueError("Hastane bulunamadı")
@@ -165,6 +172,8 @@ def approve_hospital(hospital_id: str) -> dict:
     if not update_result.data:
         raise ValueError("Hastane onaylanamadı")
     
+    hospital_choices_cache.invalidate()
+    
     # 5. Kullanıcıya email gönder
     from .email_service import send_hospital_approval_notification
     send_hospital_approval_notification(
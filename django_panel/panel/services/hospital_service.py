@@ -7,8 +7,10 @@ from pathlib import Path
 
 from django.conf import settings
 
-from . import location_service
-from .supabase_client import get_supabase_client
+from . import data_versions, holiday_index, location_service
+from .cache import TTLCache
+from .supabase_client import get_async_supabase_client, get_supabase_client, iter_rows
+from .resilience import UpstreamUnavailable, resilient_aexecute, resilient_execute
 
 # Aktif hastane ID'si - Session'dan veya ilk hastaneyi alır
 def _get_active_hospital_id(request=None) -> str:
@@ -19,24 +21,81 @@ def _get_active_hospital_id(request=None) -> str:
     
     # Fallback: İlk hastaneyi al (sadece login olmadan erişim için)
     supabase = get_supabase_client()
-    result = supabase.table("hospitals").select("id").limit(1).execute()
+    result = resilient_execute(supabase.table("hospitals").select("id").limit(1))
     
     if not result.data or len(result.data) == 0:
         raise ValueError("Supabase'de hiç hastane bulunamadı. Lütfen önce bir hastane oluşturun.")
     
     return str(result.data[0]['id'])
 
+
+async def _aget_active_hospital_id(request=None) -> str:
+    """`_get_active_hospital_id`'nin async karşılığı (session async API ile okunur)."""
+    if request and hasattr(request, 'session'):
+        hospital_id = await request.session.aget('hospital_id')
+        if hospital_id:
+            return hospital_id
+
+    supabase = await get_async_supabase_client()
+    result = await resilient_aexecute(supabase.table("hospitals").select("id").limit(1))
+    if not result.data:
+        raise ValueError("Supabase'de hiç hastane bulunamadı. Lütfen önce bir hastane oluşturun.")
+    return str(result.data[0]['id'])
+
+# Hastane sayfası ve kayıt işlemleri için tüm kolonlar
+HOSPITAL_COLUMNS = (
+    "id,name,address,latitude,longitude,phone,email,description,image,gallery,services,"
+    "working_hours,created_at,province_id,province_name,district_id,district_name,"
+    "neighborhood_id,neighborhood_name"
+)
+# Menü ve üst bar sadece isim ve adresi gösterir
+HOSPITAL_SUMMARY_COLUMNS = "id,name,address"
+HOSPITAL_HOURS_COLUMNS = "id,working_hours"
+HOSPITAL_SERVICES_COLUMNS = "id,services"
+
+SERVICE_COLUMNS = "id,name,description"
+SERVICE_CHOICE_COLUMNS = "id,name"
+
+HOLIDAY_COLUMNS = "id,hospital_id,doctor_id,date,reason,is_full_day,start_time,end_time"
+
+# Uygulama alanı -> Supabase kolonu
+_HOSPITAL_FIELD_COLUMNS = {
+    "id": "id",
+    "name": "name",
+    "address": "address",
+    "latitude": "latitude",
+    "longitude": "longitude",
+    "phone": "phone",
+    "email": "email",
+    "description": "description",
+    "image": "image",
+    "gallery": "gallery",
+    "services": "services",
+    "workingHours": "working_hours",
+    "createdAt": "created_at",
+    "provinceId": "province_id",
+    "provinceName": "province_name",
+    "districtId": "district_id",
+    "districtName": "district_name",
+    "neighborhoodId": "neighborhood_id",
+    "neighborhoodName": "neighborhood_name",
+}
+
 # UPLOAD_DIR artık sadece geriye dönük uyumluluk için delete_file_if_exists içinde kullanılıyor
 UPLOAD_DIR = Path(settings.BASE_DIR, "panel", "static", "uploads")
 
 
-def get_hospital(request=None) -> dict:
-    """Aktif hastaneyi Supabase'den getirir (session'dan veya ilk hastaneyi alır)."""
+def get_hospital(request=None, columns: str = HOSPITAL_COLUMNS) -> dict:
+    """Aktif hastaneyi Supabase'den getirir (session'dan veya ilk hastaneyi alır).
+
+    columns ile sadece gereken kolonlar istenebilir; dönen sözlükte yalnızca
+    bu kolonlara karşılık gelen alanlar bulunur.
+    """
     try:
         supabase = get_supabase_client()
         hospital_id = _get_active_hospital_id(request)
 
-        result = supabase.table("hospitals").select("*").eq("id", hospital_id).single().execute()
+        result = resilient_execute(supabase.table("hospitals").select(columns).eq("id", hospital_id).single())
         data = result.data
 
         if isinstance(data, dict):
@@ -47,6 +106,26 @@ def get_hospital(request=None) -> dict:
             raise ValueError("Supabase'den hastane verisi alınamadı.")
 
         return _format_hospital_from_db(hospital)
+    except UpstreamUnavailable:
+        # Kesinti "hastane yok" ile karıştırılmasın; middleware 503 döner
+        raise
+    except Exception as exc:
+        raise ValueError(f"Hastane bulunamadı: {exc}") from exc
+
+
+async def aget_hospital(request=None, columns: str = HOSPITAL_COLUMNS) -> dict:
+    """`get_hospital`'ın async karşılığı."""
+    try:
+        supabase = await get_async_supabase_client()
+        hospital_id = await _aget_active_hospital_id(request)
+        result = await resilient_aexecute(supabase.table("hospitals").select(columns).eq("id", hospital_id).single())
+        data = result.data
+        hospital = data[0] if isinstance(data, list) and data else data
+        if not isinstance(hospital, dict):
+            raise ValueError("Supabase'den hastane verisi alınamadı.")
+        return _format_hospital_from_db(hospital)
+    except UpstreamUnavailable:
+        raise
     except Exception as exc:
         raise ValueError(f"Hastane bulunamadı: {exc}") from exc
 
@@ -62,20 +141,59 @@ def save_hospital(updated: dict, request=None) -> None:
     
     if not result.data:
         raise ValueError("Hastane güncellenemedi")
+    
+    data_versions.bump(hospital_id)
+    hospital_choices_cache.invalidate()
 
 
-def get_services() -> list[dict]:
-    """Tüm hizmetleri Supabase'den getirir."""
+def _load_services(columns: str) -> list[dict]:
     supabase = get_supabase_client()
-    result = supabase.table("services").select("*").execute()
+    result = resilient_execute(supabase.table("services").select(columns))
     return result.data if result.data else []
 
 
+# Hizmet kataloğu; add/update/delete_service çağrıları temizler
+services_cache = TTLCache("services", _load_services, scope=data_versions.SERVICES_SCOPE)
+
+
+def get_services(columns: str = SERVICE_COLUMNS) -> list[dict]:
+    """Tüm hizmetleri getirir (süreli önbellekten; dönen liste değiştirilmemelidir)."""
+    return services_cache.get(columns)
+
+
+async def _aload_services(columns: str) -> list[dict]:
+    supabase = await get_async_supabase_client()
+    result = await resilient_aexecute(supabase.table("services").select(columns))
+    return result.data if result.data else []
+
+
+async def aget_services(columns: str = SERVICE_COLUMNS) -> list[dict]:
+    """`get_services`'in async karşılığı (aynı önbelleği kullanır)."""
+    return await services_cache.aget(columns, _aload_services)
+
+
+def _load_hospital_choices(_key=None) -> list[tuple[str, str]]:
+    supabase = get_supabase_client()
+    rows = iter_rows(lambda: supabase.table("hospitals").select("id,name"))
+    return [(str(h["id"]), h.get("name", "")) for h in rows]
+
+
+# Hastane seçim listesi; hastane kayıt/güncelleme işlemleri temizler
+hospital_choices_cache = TTLCache(
+    "hospital_choices", _load_hospital_choices, scope=data_versions.HOSPITAL_LIST_SCOPE
+)
+
+
+def get_hospital_choices() -> list[tuple[str, str]]:
+    """(id, ad) hastane seçim listesini süreli önbellekten döndürür."""
+    return hospital_choices_cache.get()
+
+
 def get_holidays(request=None) -> list[dict]:
     """Aktif hastaneye ait tatilleri Supabase'den getirir."""
     supabase = get_supabase_client()
     hospital_id = _get_active_hospital_id(request)
-    result = supabase.table("holidays").select("*").eq("hospital_id", hospital_id).is_("doctor_id", "null").execute()
+    result = resilient_execute(supabase.table("holidays").select(HOLIDAY_COLUMNS).eq("hospital_id", hospital_id).is_("doctor_id", "null"))
     
     if not result.data:
         return []
@@ -105,13 +223,15 @@ def add_holiday(date_str: str, reason: str, is_full_day: bool = True, start_time
     if not result.data:
         raise ValueError("Tatil eklenemedi")
     
+    holiday_index.invalidate(hospital_id)
+    
     # Saatli tatil ise, o günün çalışma saatlerini tatil başlangıç saatine kadar kısalt
     if not is_full_day and start_time:
         holiday_date = datetime.strptime(date_str, "%Y-%m-%d").date()
         weekday_names = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
         weekday_name = weekday_names[holiday_date.weekday()]
         
-        hospital = get_hospital(request)
+        hospital = get_hospital(request, columns=HOSPITAL_HOURS_COLUMNS)
         working_hours = hospital.get("workingHours", {})
         day_hours = working_hours.get(weekday_name, {})
         
@@ -131,6 +251,8 @@ def delete_holiday(holiday_id: str) -> None:
     
     if not result.data:
         raise ValueError("Tatil bulunamadı veya silinemedi")
+    
+    holiday_index.invalidate(result.data[0].get("hospital_id"))
 
 
 def save_logo(file) -> str:
@@ -381,13 +503,16 @@ def build_initial_working_hours(hospital: dict) -> dict:
 
 
 def _format_hospital_from_db(db_hospital: dict) -> dict:
-    """Supabase'den gelen hastane verisini mevcut formata çevirir."""
-    return {
+    """Supabase'den gelen hastane verisini mevcut formata çevirir.
+
+    Kısmi satırlarda (kolon projeksiyonu) sadece gelen kolonların alanları döner.
+    """
+    hospital = {
         "id": str(db_hospital.get("id", "")),
         "name": db_hospital.get("name", ""),
         "address": db_hospital.get("address", ""),
-        "latitude": float(db_hospital.get("latitude", 0)),
-        "longitude": float(db_hospital.get("longitude", 0)),
+        "latitude": float(db_hospital.get("latitude") or 0),
+        "longitude": float(db_hospital.get("longitude") or 0),
         "phone": db_hospital.get("phone", ""),
         "email": db_hospital.get("email", ""),
         "description": db_hospital.get("description", ""),
@@ -403,15 +528,20 @@ def _format_hospital_from_db(db_hospital: dict) -> dict:
         "neighborhoodId": db_hospital.get("neighborhood_id", ""),
         "neighborhoodName": db_hospital.get("neighborhood_name", ""),
     }
+    return {key: value for key, value in hospital.items() if _HOSPITAL_FIELD_COLUMNS[key] in db_hospital}
 
 
 def _format_hospital_to_db(hospital: dict) -> dict:
-    """Hastane verisini Supabase formatına çevirir."""
-    return {
+    """Hastane verisini Supabase formatına çevirir.
+
+    Kısmi yüklenmiş bir hastanede olmayan alanlar yazılmaz; böylece
+    yüklenmeyen kolonlar varsayılan değerlerle ezilmez.
+    """
+    db_hospital = {
         "name": hospital.get("name", ""),
         "address": hospital.get("address", ""),
-        "latitude": float(hospital.get("latitude", 0)),
-        "longitude": float(hospital.get("longitude", 0)),
+        "latitude": float(hospital.get("latitude") or 0),
+        "longitude": float(hospital.get("longitude") or 0),
         "phone": hospital.get("phone", ""),
         "email": hospital.get("email", ""),
         "description": hospital.get("description", ""),
@@ -426,6 +556,8 @@ def _format_hospital_to_db(hospital: dict) -> dict:
         "neighborhood_id": hospital.get("neighborhoodId", ""),
         "neighborhood_name": hospital.get("neighborhoodName", ""),
     }
+    present_columns = {_HOSPITAL_FIELD_COLUMNS[key] for key in hospital if key in _HOSPITAL_FIELD_COLUMNS}
+    return {column: value for column, value in db_hospital.items() if column in present_columns}
 
 
 def _format_holiday_from_db(db_holiday: dict) -> dict:
@@ -444,9 +576,5 @@ def _format_holiday_from_db(db_holiday: dict) -> dict:
 def get_hospitals() -> list[dict]:
     """Tüm hastaneleri Supabase'den getirir."""
     supabase = get_supabase_client()
-    result = supabase.table("hospitals").select("*").execute()
-    
-    if not result.data:
-        return []
-    
-    return [_format_hospital_from_db(h) for h in result.data]
+    rows = iter_rows(lambda: supabase.table("hospitals").select(HOSPITAL_COLUMNS))
+    return [_format_hospital_from_db(h) for h in rows]
@@ -0,0 +1,268 @@
+"""Paylaşılan HTTP transport katmanı.
+
+PostgREST, Storage ve Auth admin çağrıları process başına tek bir
+bağlantı havuzu (`MeteredTransport`) üzerinden yapılır. Bağlantı havuzu
+sınırları, keep-alive süresi ve isteğe bağlı HTTP/2 ayarlardan okunur;
+böylece thread'li sunucularda her istek yeni bir TCP/TLS bağlantısı kurmaz.
+ASGI altında çalışan async view'ler aynı ayarlarla event loop başına bir
+havuz kullanır.
+
+Havuz paylaşılır, `httpx.Client` paylaşılmaz: service role ve anon auth
+client'ları farklı anahtar ve base URL kullanır; supabase kütüphaneleri
+kendilerine verilen client'ın header ve base_url'ini değiştirebildiğinden
+her Supabase client'ı `build_http_client()` ile kendi httpx client'ını alır.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import time
+import weakref
+from threading import Lock
+from typing import Optional
+
+import httpx
+from django.conf import settings
+
+from . import metrics, query_counter, single_flight, tracing
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.Client] = None
+_transport: Optional["MeteredTransport"] = None
+_client_lock = Lock()
+# event loop -> AsyncMeteredTransport / AsyncClient; async havuzlar loop'lar arasında paylaşılamaz
+_async_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncMeteredTransport]" = weakref.WeakKeyDictionary()
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+class MeteredTransport(httpx.BaseTransport):
+    """Havuzlu transport'u saran ve istek sayaçlarını tutan transport."""
+
+    def __init__(self, transport: httpx.HTTPTransport):
+        self._transport = transport
+        self._lock = Lock()
+        self.requests_total = 0
+        self.errors_total = 0
+        self.in_flight = 0
+        self.duration_total = 0.0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            _forget_written_table(request)
+        with self._lock:
+            self.requests_total += 1
+            self.in_flight += 1
+        started = time.perf_counter()
+        status = None
+        try:
+            response = self._transport.handle_request(request)
+            status = response.status_code
+            return response
+        except Exception:
+            with self._lock:
+                self.errors_total += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.in_flight -= 1
+                self.duration_total += elapsed
+            _observe(request, status, started, elapsed)
+
+    def close(self) -> None:
+        # Havuz birden fazla client arasında paylaşılır; client kapanınca havuz açık kalır
+        pass
+
+    def shutdown(self) -> None:
+        self._transport.close()
+
+    def pool_connections(self) -> list:
+        """httpcore havuzundaki bağlantılar (iç API; erişilemezse boş liste)."""
+        pool = getattr(self._transport, "_pool", None)
+        return list(getattr(pool, "connections", []) or [])
+
+
+class AsyncMeteredTransport(httpx.AsyncBaseTransport):
+    """MeteredTransport'un async karşılığı (tek event loop içinde kullanılır, kilit gerekmez)."""
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport):
+        self._transport = transport
+        self.requests_total = 0
+        self.errors_total = 0
+        self.in_flight = 0
+        self.duration_total = 0.0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            _forget_written_table(request)
+        self.requests_total += 1
+        self.in_flight += 1
+        started = time.perf_counter()
+        status = None
+        try:
+            response = await self._transport.handle_async_request(request)
+            status = response.status_code
+            return response
+        except Exception:
+            self.errors_total += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.in_flight -= 1
+            self.duration_total += elapsed
+            _observe(request, status, started, elapsed)
+
+    async def aclose(self) -> None:
+        # Havuz loop'taki tüm client'lar arasında paylaşılır
+        pass
+
+
+def _observe(request: httpx.Request, status: Optional[int], started: float, elapsed: float) -> None:
+    """Çağrıyı istek bazlı sayaca, process metriklerine ve etkin ize işler."""
+    query_counter.record(request, status, elapsed)
+    api, target = query_counter.describe(request)
+    metrics.record_supabase_call(api, target, request.method, status, elapsed)
+    tracing.add_completed(f"{request.method} {api}:{target}", "supabase", started, elapsed, status=status)
+
+
+def _forget_written_table(request: httpx.Request) -> None:
+    """PostgREST yazmalarında o tablonun kısa süreli okuma sonuçlarını düşürür."""
+    path = request.url.path
+    marker = "/rest/v1/"
+    if marker in path:
+        table = path.split(marker, 1)[1].split("/", 1)[0]
+        single_flight.forget(table or None)
+
+
+def _http2_enabled() -> bool:
+    if not getattr(settings, "SUPABASE_HTTP2", False):
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("SUPABASE_HTTP2 açık fakat 'h2' paketi yüklü değil; HTTP/1.1 kullanılıyor.")
+        return False
+    return True
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=getattr(settings, "SUPABASE_HTTP_MAX_CONNECTIONS", 20),
+        max_keepalive_connections=getattr(settings, "SUPABASE_HTTP_MAX_KEEPALIVE", 10),
+        keepalive_expiry=getattr(settings, "SUPABASE_HTTP_KEEPALIVE_EXPIRY", 30.0),
+    )
+
+
+def _client_kwargs() -> dict:
+    return {
+        "timeout": httpx.Timeout(getattr(settings, "SUPABASE_HTTP_TIMEOUT", 10.0)),
+        "headers": {"Accept-Encoding": "gzip, deflate"},
+        "follow_redirects": True,
+    }
+
+
+def get_transport() -> MeteredTransport:
+    """Process genelinde paylaşılan havuzlu transport'u döndürür (thread-safe)."""
+    global _transport
+    if _transport is None:
+        with _client_lock:
+            if _transport is None:
+                _transport = MeteredTransport(
+                    httpx.HTTPTransport(limits=_limits(), http2=_http2_enabled(), retries=1)
+                )
+    return _transport
+
+
+def build_http_client() -> httpx.Client:
+    """Paylaşılan havuzu kullanan yeni bir httpx client'ı döndürür.
+
+    Header ve base_url'ini kendisi ayarlayan Supabase client'ları için;
+    her çağıran kendi client'ına sahip olur.
+    """
+    return httpx.Client(transport=get_transport(), **_client_kwargs())
+
+
+def get_http_client() -> httpx.Client:
+    """Tam URL ve header'larla yapılan doğrudan çağrılar için paylaşılan httpx client'ı döndürür."""
+    global _client
+    if _client is None:
+        client = build_http_client()
+        with _client_lock:
+            if _client is None:
+                _client = client
+    return _client
+
+
+def _get_async_transport() -> AsyncMeteredTransport:
+    loop = asyncio.get_running_loop()
+    transport = _async_transports.get(loop)
+    if transport is None:
+        transport = AsyncMeteredTransport(
+            httpx.AsyncHTTPTransport(limits=_limits(), http2=_http2_enabled(), retries=1)
+        )
+        _async_transports[loop] = transport
+    return transport
+
+
+def build_async_http_client() -> httpx.AsyncClient:
+    """Çalışan event loop'un havuzunu kullanan yeni bir httpx.AsyncClient döndürür.
+
+    Sadece bir event loop içinden (async view, async servis fonksiyonu) çağrılmalıdır.
+    """
+    return httpx.AsyncClient(transport=_get_async_transport(), **_client_kwargs())
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Çalışan event loop'a ait, doğrudan çağrılar için paylaşılan httpx.AsyncClient'ı döndürür."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = build_async_http_client()
+    return client
+
+
+def get_pool_metrics() -> dict:
+    """Bağlantı havuzu ve istek sayaçlarını döndürür."""
+    transport = _transport
+    async_transports = list(_async_transports.values())
+    async_metrics = {
+        "async_requests_total": sum(t.requests_total for t in async_transports),
+        "async_in_flight": sum(t.in_flight for t in async_transports),
+    }
+    if transport is None:
+        return {
+            "requests_total": 0,
+            "errors_total": 0,
+            "in_flight": 0,
+            "avg_duration_ms": 0.0,
+            "connections": 0,
+            "idle_connections": 0,
+            "max_connections": getattr(settings, "SUPABASE_HTTP_MAX_CONNECTIONS", 20),
+            **async_metrics,
+        }
+    connections = transport.pool_connections()
+    idle = sum(1 for conn in connections if getattr(conn, "is_idle", lambda: False)())
+    requests_total = transport.requests_total
+    return {
+        "requests_total": requests_total,
+        "errors_total": transport.errors_total,
+        "in_flight": transport.in_flight,
+        "avg_duration_ms": round(transport.duration_total / requests_total * 1000, 2) if requests_total else 0.0,
+        "connections": len(connections),
+        "idle_connections": idle,
+        "max_connections": getattr(settings, "SUPABASE_HTTP_MAX_CONNECTIONS", 20),
+        **async_metrics,
+    }
+
+
+def close_http_client() -> None:
+    """Paylaşılan client'ı ve havuzu kapatır (test ve yeniden yapılandırma için)."""
+    global _client, _transport
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        if _transport is not None:
+            _transport.shutdown()
+        _client = None
+        _transport = None
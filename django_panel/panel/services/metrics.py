@@ -0,0 +1,207 @@
+"""Process içi metrikler (Prometheus metin formatı).
+
+Sayaçlar ve histogramlar bellekte tutulur, `/metrics` isteğinde Prometheus
+metin formatında döndürülür; harici bir toplayıcı gerekmez. Histogram
+kovaları sabittir; p50/p95/p99 Prometheus tarafında `histogram_quantile`
+ile hesaplanır.
+
+Değerler worker process başınadır. Birden fazla worker varsa her biri ayrı
+ayrı kazınmalı (veya sonuçlar toplanmalıdır).
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Callable, Iterable, Iterator, Optional
+
+# Saniye cinsinden gecikme kovaları
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_OPERATIONS = {"GET": "select", "HEAD": "select", "POST": "insert", "PATCH": "update", "PUT": "upsert", "DELETE": "delete"}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: dict[tuple, float] = {}
+        self._lock = Lock()
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # etiketler -> [kova sayaçları..., toplam adet, toplam süre]
+        self._values: dict[tuple, list] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [0] * len(self.buckets) + [0, 0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        for label_values, series in items:
+            for bound, count in zip(self.buckets, series):
+                labels = _format_labels(self.labels, label_values, f'le="{_format_number(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labels, label_values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {series[-2]}")
+            plain = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_count{plain} {series[-2]}")
+            lines.append(f"{self.name}_sum{plain} {_format_number(series[-1])}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "panel_request_duration_seconds", "Panel sayfalarının cevap süresi.", ("view", "method")
+)
+REQUESTS = Counter("panel_requests_total", "Panel istekleri.", ("view", "method", "status"))
+SUPABASE_DURATION = Histogram(
+    "panel_supabase_call_duration_seconds", "Supabase çağrı süresi.", ("api", "target", "operation")
+)
+SUPABASE_CALLS = Counter(
+    "panel_supabase_calls_total", "Supabase çağrıları.", ("api", "target", "operation", "status")
+)
+EMAIL_DURATION = Histogram("panel_email_send_duration_seconds", "E-posta gönderim süresi.", ("kind",))
+EMAILS = Counter("panel_email_sends_total", "E-posta gönderim işlemleri.", ("kind", "result"))
+
+_METRICS = (REQUEST_DURATION, REQUESTS, SUPABASE_DURATION, SUPABASE_CALLS, EMAIL_DURATION, EMAILS)
+# Kazıma anında okunan sayaçlar (önbellekler, bağlantı havuzu, devreler)
+_collectors: list[Callable[[], list[str]]] = []
+
+
+def register_collector(collector: Callable[[], list[str]]) -> None:
+    _collectors.append(collector)
+
+
+def record_supabase_call(api: str, target: str, method: str, status: Optional[int], duration: float) -> None:
+    operation = _OPERATIONS.get(method, method.lower())
+    if api == "storage" and method in ("POST", "PUT"):
+        operation = "upload"
+    SUPABASE_DURATION.observe(duration, api, target, operation)
+    SUPABASE_CALLS.inc(api, target, operation, str(status) if status is not None else "error")
+
+
+@contextmanager
+def track_email(kind: str) -> Iterator[None]:
+    """E-posta gönderim süresini ve sonucunu kaydeder."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        EMAILS.inc(kind, "error")
+        raise
+    else:
+        EMAILS.inc(kind, "sent")
+    finally:
+        EMAIL_DURATION.observe(time.perf_counter() - started, kind)
+
+
+def _gauge(name: str, documentation: str, samples: list[tuple[str, float]], kind: str = "gauge") -> list[str]:
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{labels} {_format_number(value)}" for labels, value in samples)
+    return lines
+
+
+def _collect_caches() -> list[str]:
+    from .cache import cache_stats
+
+    stats = cache_stats()
+    samples = []
+    for name, values in sorted(stats.items()):
+        samples.append((f'{{cache="{_escape(name)}",result="hit"}}', values["hits"]))
+        samples.append((f'{{cache="{_escape(name)}",result="miss"}}', values["misses"]))
+    lines = _gauge("panel_cache_requests_total", "Referans önbelleği isabet/ıska sayıları.", samples, "counter")
+    lines += _gauge(
+        "panel_cache_entries",
+        "Referans önbelleğindeki anahtar sayısı.",
+        [(f'{{cache="{_escape(name)}"}}', values["entries"]) for name, values in sorted(stats.items())],
+    )
+    return lines
+
+
+def _collect_pool() -> list[str]:
+    from .http_transport import get_pool_metrics
+
+    pool = get_pool_metrics()
+    return (
+        _gauge("panel_http_connections", "Havuzdaki HTTP bağlantıları.", [("", pool["connections"])])
+        + _gauge("panel_http_idle_connections", "Boşta bekleyen HTTP bağlantıları.", [("", pool["idle_connections"])])
+        + _gauge("panel_http_in_flight", "Devam eden HTTP istekleri.", [("", pool["in_flight"] + pool["async_in_flight"])])
+    )
+
+
+def _collect_breakers() -> list[str]:
+    from .resilience import breaker_states
+
+    samples = [
+        (f'{{endpoint="{_escape(endpoint)}"}}', 0 if state["state"] == "closed" else 1)
+        for endpoint, state in sorted(breaker_states().items())
+    ]
+    return _gauge("panel_supabase_breaker_open", "Devre kesici açık mı (1: açık veya yarı açık).", samples)
+
+
+register_collector(_collect_caches)
+register_collector(_collect_pool)
+register_collector(_collect_breakers)
+
+
+def render() -> str:
+    """Tüm metrikleri Prometheus metin formatında döndürür."""
+    lines: list[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,177 @@
+"""İstek bazlı profil çıkarma (cProfile / pyinstrument + tracemalloc).
+
+Sadece staff kullanıcılar, `?_profile=1` parametresi veya `X-Panel-Profile: 1`
+başlığıyla tek bir isteğin profilini alabilir (bkz. ProfilingMiddleware).
+Çağrı grafiği, en çok bellek ayıran satırlar ve Supabase çağrı dökümü process
+içindeki sınırlı bir halka tamponda tutulur ve admin altındaki profil
+sayfasından görüntülenir. Tetiklenmeyen isteklerde profil kodu hiç çalışmaz.
+
+cProfile ve tracemalloc process geneli araçlardır; aynı anda tek profil
+alınır. Async view'lerde profil, aynı event loop'ta o sırada çalışan diğer
+isteklerin kodunu da içerebilir; `sync_to_async` thread'leri profile girmez.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import importlib.util
+import io
+import itertools
+import pstats
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from threading import Lock
+from typing import Iterator, Optional
+
+from django.conf import settings
+
+from . import query_counter
+
+# Rapor için saklanan satır sayıları
+PROFILE_TOP_FUNCTIONS = 60
+PROFILE_TOP_ALLOCATIONS = 25
+
+_buffer: Optional[deque] = None
+_buffer_lock = Lock()
+# cProfile/tracemalloc aynı anda tek istek için çalışabilir
+_active = Lock()
+_ids = itertools.count(1)
+
+
+@dataclass
+class ProfileReport:
+    id: int
+    method: str
+    path: str
+    engine: str
+    started_at: datetime
+    duration_ms: float = 0.0
+    status: Optional[int] = None
+    view: str = ""
+    call_graph: str = ""
+    allocations: list[dict] = field(default_factory=list)
+    peak_memory_kb: float = 0.0
+    supabase: dict = field(default_factory=dict)
+
+
+def _get_buffer() -> deque:
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = deque(maxlen=max(getattr(settings, "PROFILE_BUFFER_SIZE", 20), 1))
+    return _buffer
+
+
+def is_requested(request) -> bool:
+    """İstek profil istiyor mu? (kullanıcı kontrolü yapılmaz; ucuz ön kontrol)"""
+    return bool(request.GET.get("_profile") or request.headers.get("X-Panel-Profile"))
+
+
+def requested_engine(request) -> str:
+    engine = (request.GET.get("_profile") or request.headers.get("X-Panel-Profile") or "").lower()
+    if engine == "pyinstrument" and importlib.util.find_spec("pyinstrument") is not None:
+        return "pyinstrument"
+    return "cprofile"
+
+
+def _cprofile_report(profiler: cProfile.Profile) -> str:
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+    stats.sort_stats("tottime").print_callers(PROFILE_TOP_FUNCTIONS // 3)
+    return output.getvalue()
+
+
+def _allocations(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> list[dict]:
+    rows = []
+    for stat in after.compare_to(before, "lineno")[:PROFILE_TOP_ALLOCATIONS]:
+        frame = stat.traceback[0]
+        rows.append({
+            "location": f"{frame.filename}:{frame.lineno}",
+            "size_kb": round(stat.size_diff / 1024, 1),
+            "count": stat.count_diff,
+        })
+    return rows
+
+
+def _supabase_breakdown(log: query_counter.QueryLog) -> dict:
+    return {
+        "count": log.count,
+        "duration_ms": round(log.duration * 1000, 1),
+        "by_api": log.by_api(),
+        "n_plus_one": log.n_plus_one(),
+        "calls": [
+            {"call": record.identity, "status": record.status, "duration_ms": round(record.duration * 1000, 1)}
+            for record in log.records
+        ],
+    }
+
+
+@contextmanager
+def profiling(request) -> Iterator[Optional[ProfileReport]]:
+    """Blok süresince profil alır; başka bir profil sürüyorsa None verir ve profil almaz."""
+    if not _active.acquire(blocking=False):
+        yield None
+        return
+    engine = requested_engine(request)
+    report = ProfileReport(
+        id=next(_ids),
+        method=request.method,
+        path=request.get_full_path(),
+        engine=engine,
+        started_at=datetime.now(),
+    )
+    tracemalloc_started = not tracemalloc.is_tracing()
+    try:
+        if tracemalloc_started:
+            tracemalloc.start(10)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+
+        if engine == "pyinstrument":
+            from pyinstrument import Profiler
+
+            profiler = Profiler(async_mode="enabled")
+            start, stop = profiler.start, profiler.stop
+        else:
+            profiler = cProfile.Profile()
+            start, stop = profiler.enable, profiler.disable
+
+        started = time.perf_counter()
+        with query_counter.recording() as log:
+            start()
+            try:
+                yield report
+            finally:
+                stop()
+        report.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        after = tracemalloc.take_snapshot()
+        report.peak_memory_kb = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        report.allocations = _allocations(before, after)
+        report.call_graph = (
+            profiler.output_text(unicode=True, color=False) if engine == "pyinstrument" else _cprofile_report(profiler)
+        )
+        report.supabase = _supabase_breakdown(log)
+        _get_buffer().append(report)
+    finally:
+        if tracemalloc_started:
+            tracemalloc.stop()
+        _active.release()
+
+
+def list_reports() -> list[ProfileReport]:
+    """Saklanan profiller, en yeni önce."""
+    return list(reversed(_get_buffer()))
+
+
+def get_report(report_id: int) -> Optional[ProfileReport]:
+    for report in list(_get_buffer()):
+        if report.id == report_id:
+            return report
+    return None
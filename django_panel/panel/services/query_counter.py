@@ -0,0 +1,212 @@
+"""Supabase çağrı sayacı ve N+1 dedektörü.
+
+Paylaşılan HTTP transport'u (bkz. http_transport) her PostgREST, Storage ve
+Auth çağrısını etkin kayıt kapsamına yazar. Kayıt kapsamı middleware
+tarafından istek başına, testlerde `assert_max_queries` ile açılır; kapsam
+yoksa kayıt yapılmaz.
+
+Aynı URL'e (ve gövdeye) yapılan tekrar çağrılar "aynı", yalnızca filtre
+değerleri farklı olan çağrılar "aynı şekilli" kabul edilir. Aynı şekilli
+çağrıların eşik sayısını geçmesi tipik N+1 desenidir (ör. satır başına
+güncelleme, gün başına sorgu).
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from threading import Lock
+from typing import Iterator, Optional
+
+from django.conf import settings
+
+# Aynı şekilli çağrı sayısı bu değere ulaşınca N+1 olarak işaretlenir
+DEFAULT_N_PLUS_ONE_THRESHOLD = 3
+
+_API_MARKERS = (
+    ("/rest/v1/", "rest"),
+    ("/storage/v1/", "storage"),
+    ("/auth/v1/", "auth"),
+)
+# Yol içindeki kayıt kimlikleri (UUID, sayı) şekilden çıkarılır
+_ID_SEGMENT = re.compile(r"^(?:[0-9a-fA-F-]{32,36}|\d+)$")
+
+
+@dataclass(frozen=True)
+class QueryRecord:
+    api: str
+    method: str
+    target: str
+    shape: str
+    identity: str
+    status: Optional[int]
+    duration: float
+
+
+class QueryLog:
+    """Bir kapsam (istek, test bloğu) içinde yapılan Supabase çağrıları."""
+
+    def __init__(self, parent: Optional["QueryLog"] = None):
+        self.parent = parent
+        self.records: list[QueryRecord] = []
+        self._lock = Lock()
+
+    def add(self, record: QueryRecord) -> None:
+        log = self
+        # İç içe kapsamlarda (test bloğu içindeki istek) dış kapsam da sayar
+        while log is not None:
+            with log._lock:
+                log.records.append(record)
+            log = log.parent
+
+    @property
+    def count(self) -> int:
+        return len(self.records)
+
+    @property
+    def duration(self) -> float:
+        return sum(record.duration for record in self.records)
+
+    def by_api(self) -> dict[str, int]:
+        return dict(Counter(record.api for record in self.records))
+
+    def duplicates(self) -> list[tuple[str, int]]:
+        """Birebir aynı tekrarlanan çağrılar: (çağrı, adet)."""
+        counts = Counter(record.identity for record in self.records)
+        return [(identity, count) for identity, count in counts.most_common() if count > 1]
+
+    def n_plus_one(self, threshold: Optional[int] = None) -> list[tuple[str, int]]:
+        """Eşik sayısı kadar tekrarlanan aynı şekilli çağrılar: (şekil, adet)."""
+        threshold = threshold or n_plus_one_threshold()
+        counts = Counter(record.shape for record in self.records)
+        return [(shape, count) for shape, count in counts.most_common() if count >= threshold]
+
+    def summary(self) -> str:
+        lines = [f"{self.count} Supabase çağrısı, {self.duration * 1000:.1f} ms"]
+        for record in self.records:
+            lines.append(f"  {record.identity} -> {record.status} ({record.duration * 1000:.1f} ms)")
+        return "\n".join(lines)
+
+
+_current: ContextVar[Optional[QueryLog]] = ContextVar("panel_query_log", default=None)
+
+
+def n_plus_one_threshold() -> int:
+    return getattr(settings, "SUPABASE_N_PLUS_ONE_THRESHOLD", DEFAULT_N_PLUS_ONE_THRESHOLD)
+
+
+def is_enabled() -> bool:
+    """İstek bazlı kayıt açık mı? Varsayılan olarak sadece DEBUG'da açıktır."""
+    return getattr(settings, "SUPABASE_QUERY_LOG", settings.DEBUG)
+
+
+@contextmanager
+def recording() -> Iterator[QueryLog]:
+    """Blok içindeki Supabase çağrılarını kaydeden yeni bir kapsam açar."""
+    log = QueryLog(parent=_current.get())
+    token = _current.set(log)
+    try:
+        yield log
+    finally:
+        _current.reset(token)
+
+
+def current() -> Optional[QueryLog]:
+    return _current.get()
+
+
+def record(request, status: Optional[int], duration: float) -> None:
+    """Transport'tan çağrılır; etkin kapsam yoksa hiçbir şey yapmaz."""
+    log = _current.get()
+    if log is None:
+        return
+    api, path = _split_api(request.url.path)
+    method = request.method
+    params = request.url.params
+    shape_params = "&".join(sorted(_shape_param(key, value) for key, value in params.multi_items()))
+    identity = f"{api}:{path}"
+    if request.url.query:
+        identity += "?" + request.url.query.decode("ascii", "replace")
+    body = _body_of(request)
+    if body:
+        identity += f" body={hash(body) & 0xFFFFFFFF:08x}"
+    log.add(QueryRecord(
+        api=api,
+        method=method,
+        target=_target(api, path),
+        shape=f"{method} {api}:{_shape_path(path)}" + (f"?{shape_params}" if shape_params else ""),
+        identity=f"{method} {identity}",
+        status=status,
+        duration=duration,
+    ))
+
+
+def describe(request) -> tuple[str, str]:
+    """Çağrının API'si (rest, storage, auth) ve düşük kardinaliteli hedefi (tablo, bucket)."""
+    api, path = _split_api(request.url.path)
+    return api, _target(api, path)
+
+
+def _target(api: str, path: str) -> str:
+    if api == "rest":
+        return path.split("/", 1)[0]
+    # storage: object/<bucket>, auth: admin/users gibi; dosya adları ve kimlikler atılır
+    segments = [segment for segment in _shape_path(path).split("/") if segment and segment != "*"]
+    return "/".join(segments[:2])
+
+
+def _split_api(path: str) -> tuple[str, str]:
+    for marker, api in _API_MARKERS:
+        if marker in path:
+            return api, path.split(marker, 1)[1]
+    return "other", path.lstrip("/")
+
+
+def _shape_path(path: str) -> str:
+    return "/".join("*" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+def _shape_param(key: str, value: str) -> str:
+    # select kolonları şeklin parçasıdır; filtrelerde yalnızca operatör (eq, in, gte...) tutulur
+    if key == "select":
+        return f"select={value}"
+    if key in ("limit", "offset", "order"):
+        return key
+    operator = value.split(".", 1)[0] if "." in value else ""
+    return f"{key}={operator}" if operator else key
+
+
+def _body_of(request) -> bytes:
+    try:
+        return request.content
+    except Exception:
+        # Stream gövdeler okunmadan kimliğe katılmaz
+        return b""
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, allow_n_plus_one: bool = False, threshold: Optional[int] = None):
+    """Blok içindeki Supabase çağrılarının sayısını sınırlar (testler için).
+
+    Kullanım:
+        with assert_max_queries(6):
+            client.get(reverse("dashboard"))
+
+    allow_n_plus_one verilmezse aynı şekilli çağrılar eşiği geçtiğinde de hata verir.
+
+    Raises:
+        AssertionError: Sınır aşıldığında veya N+1 deseni bulunduğunda
+    """
+    with recording() as log:
+        yield log
+    if log.count > max_queries:
+        raise AssertionError(
+            f"En fazla {max_queries} Supabase çağrısı bekleniyordu, {log.count} yapıldı.\n{log.summary()}"
+        )
+    patterns = [] if allow_n_plus_one else log.n_plus_one(threshold)
+    if patterns:
+        details = "\n".join(f"  {count}x {shape}" for shape, count in patterns)
+        raise AssertionError(f"N+1 deseni bulundu:\n{details}\n{log.summary()}")
@@ -0,0 +1,190 @@
+"""Puan özetleri servisi.
+
+Hastane ve doktor puanları `hospital_rating_stats` / `doctor_rating_stats`
+tablolarından okunur. Bu tablolar ratings tablosundaki trigger ile artımlı
+olarak güncellenir (bkz. rating_aggregates.sql). Migration henüz
+uygulanmamışsa (42P01 / PGRST205) özetler ratings tablosundan tek geçişte
+hesaplanır ve tabloların eksik olduğu SUPABASE_SCHEMA_RECHECK_SECONDS
+boyunca hatırlanır.
+"""
+
+from __future__ import annotations
+
+from .supabase_client import get_async_supabase_client, get_supabase_client
+from .resilience import (
+    api_error_code,
+    feature_missing,
+    mark_feature_missing,
+    resilient_aexecute,
+    resilient_execute,
+)
+
+STATS_COLUMNS = "rating_count,rating_sum,rating_1,rating_2,rating_3,rating_4,rating_5"
+
+# Özet tabloları yoksa PostgREST'in verdiği hata kodları (Postgres'te tablo yok / şema önbelleğinde yok)
+MISSING_TABLE_CODES = ("42P01", "PGRST205")
+STATS_FEATURE = "rating_aggregates"
+
+# Bayes düzeltmesinde önsel ortalamanın kaç oy ağırlığında sayılacağı
+BAYES_PRIOR_WEIGHT = 5
+
+
+def empty_summary() -> dict:
+    """Hiç oy almamış hastane/doktor için özet."""
+    return {"count": 0, "sum": 0, "histogram": [0, 0, 0, 0, 0], "average": 0.0}
+
+
+def _summary_from_row(row: dict | None) -> dict:
+    """Özet tablosu satırını uygulama formatına çevirir."""
+    if not row:
+        return empty_summary()
+    count = int(row.get("rating_count") or 0)
+    total = int(row.get("rating_sum") or 0)
+    return {
+        "count": count,
+        "sum": total,
+        "histogram": [int(row.get(f"rating_{star}") or 0) for star in range(1, 6)],
+        "average": total / count if count else 0.0,
+    }
+
+
+def _add_rating(summary: dict, value) -> None:
+    if not isinstance(value, int) or not 1 <= value <= 5:
+        return
+    summary["count"] += 1
+    summary["sum"] += value
+    summary["histogram"][value - 1] += 1
+    summary["average"] = summary["sum"] / summary["count"]
+
+
+def _rollup_from_ratings(hospital_id: str) -> tuple[dict, dict[str, dict]]:
+    """Özet tabloları yoksa hastane ve doktor özetlerini ratings'ten tek geçişte hesaplar."""
+    supabase = get_supabase_client()
+    result = resilient_execute(
+        supabase.table("ratings")
+        .select("doctor_id,hospital_rating,doctor_rating")
+        .eq("hospital_id", hospital_id)
+    )
+    return _rollup_rows(result.data or [])
+
+
+async def _arollup_from_ratings(hospital_id: str) -> tuple[dict, dict[str, dict]]:
+    supabase = await get_async_supabase_client()
+    result = await resilient_aexecute(
+        supabase.table("ratings")
+        .select("doctor_id,hospital_rating,doctor_rating")
+        .eq("hospital_id", hospital_id)
+    )
+    return _rollup_rows(result.data or [])
+
+
+def _stats_table_missing(exc: Exception) -> bool:
+    """Hata özet tablosunun olmamasından kaynaklanıyorsa bunu hatırlar ve True döner."""
+    if api_error_code(exc) not in MISSING_TABLE_CODES:
+        return False
+    mark_feature_missing(STATS_FEATURE)
+    return True
+
+
+def _rollup_rows(rows: list[dict]) -> tuple[dict, dict[str, dict]]:
+    hospital_summary = empty_summary()
+    doctor_summaries: dict[str, dict] = {}
+    for rating in rows:
+        _add_rating(hospital_summary, rating.get("hospital_rating"))
+        doctor_id = str(rating.get("doctor_id") or "")
+        if doctor_id:
+            _add_rating(doctor_summaries.setdefault(doctor_id, empty_summary()), rating.get("doctor_rating"))
+    return hospital_summary, doctor_summaries
+
+
+def get_hospital_rating_summary(hospital_id: str) -> dict:
+    """Hastanenin puan özetini döndürür: count, sum, histogram (1-5), average."""
+    if feature_missing(STATS_FEATURE):
+        return _rollup_from_ratings(hospital_id)[0]
+    supabase = get_supabase_client()
+    try:
+        result = resilient_execute(
+            supabase.table("hospital_rating_stats")
+            .select(STATS_COLUMNS)
+            .eq("hospital_id", hospital_id)
+            .limit(1)
+        )
+    except Exception as exc:
+        if not _stats_table_missing(exc):
+            raise
+        return _rollup_from_ratings(hospital_id)[0]
+    return _summary_from_row(result.data[0] if result.data else None)
+
+
+def get_doctor_rating_summaries(hospital_id: str) -> dict[str, dict]:
+    """Hastanedeki doktorların puan özetlerini doctor_id -> özet olarak döndürür."""
+    if feature_missing(STATS_FEATURE):
+        return _rollup_from_ratings(hospital_id)[1]
+    supabase = get_supabase_client()
+    try:
+        result = resilient_execute(
+            supabase.table("doctor_rating_stats")
+            .select(f"doctor_id,{STATS_COLUMNS}")
+            .eq("hospital_id", hospital_id)
+        )
+    except Exception as exc:
+        if not _stats_table_missing(exc):
+            raise
+        return _rollup_from_ratings(hospital_id)[1]
+    return {str(row["doctor_id"]): _summary_from_row(row) for row in result.data or []}
+
+
+async def aget_hospital_rating_summary(hospital_id: str) -> dict:
+    """`get_hospital_rating_summary`'nin async karşılığı."""
+    if feature_missing(STATS_FEATURE):
+        return (await _arollup_from_ratings(hospital_id))[0]
+    supabase = await get_async_supabase_client()
+    try:
+        result = await resilient_aexecute(
+            supabase.table("hospital_rating_stats")
+            .select(STATS_COLUMNS)
+            .eq("hospital_id", hospital_id)
+            .limit(1)
+        )
+    except Exception as exc:
+        if not _stats_table_missing(exc):
+            raise
+        return (await _arollup_from_ratings(hospital_id))[0]
+    return _summary_from_row(result.data[0] if result.data else None)
+
+
+async def aget_doctor_rating_summaries(hospital_id: str) -> dict[str, dict]:
+    """`get_doctor_rating_summaries`'in async karşılığı."""
+    if feature_missing(STATS_FEATURE):
+        return (await _arollup_from_ratings(hospital_id))[1]
+    supabase = await get_async_supabase_client()
+    try:
+        result = await resilient_aexecute(
+            supabase.table("doctor_rating_stats")
+            .select(f"doctor_id,{STATS_COLUMNS}")
+            .eq("hospital_id", hospital_id)
+        )
+    except Exception as exc:
+        if not _stats_table_missing(exc):
+            raise
+        return (await _arollup_from_ratings(hospital_id))[1]
+    return {str(row["doctor_id"]): _summary_from_row(row) for row in result.data or []}
+
+
+def bayesian_score(summary: dict, prior_mean: float, prior_weight: int = BAYES_PRIOR_WEIGHT) -> float:
+    """Az oylu kayıtları önsel ortalamaya çeken sıralama puanı.
+
+    score = (prior_weight * prior_mean + sum) / (prior_weight + count)
+    """
+    denominator = prior_weight + summary["count"]
+    if denominator <= 0:
+        return 0.0
+    return (prior_weight * prior_mean + summary["sum"]) / denominator
+
+
+def prior_mean(summaries: list[dict]) -> float:
+    """Özet listesinin oy ağırlıklı genel ortalaması."""
+    total_count = sum(s["count"] for s in summaries)
+    if not total_count:
+        return 0.0
+    return sum(s["sum"] for s in summaries) / total_count
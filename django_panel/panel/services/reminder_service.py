@@ -0,0 +1,257 @@
+"""Randevu hatırlatma servisi.
+
+`settings.json` içindeki `notifications.appointment_reminder` ve
+`reminder_hours_before` ayarlarına göre yaklaşan randevulara e-posta gönderir.
+Randevular tarih penceresiyle çekilir ve gönderim zamanına göre bir heap'te
+tutulur; tablo hiçbir zaman baştan sona taranmaz, yalnızca hatırlatma
+penceresindeki birkaç gün okunur. Gönderilen randevular
+`reminder_sent_at` kolonuyla işaretlenir, böylece yeniden başlatmada aynı
+hatırlatma ikinci kez gönderilmez (bkz. add_reminder_sent_column.sql).
+"""
+
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator
+
+from django.core.mail import get_connection
+
+from .email_service import ReminderDeliveryError, send_appointment_reminders
+from .settings_service import get_settings
+from .supabase_client import get_supabase_client, iter_rows
+
+REMINDER_BATCH_SIZE = 100
+# Pencerenin gönderim anının ne kadar ötesine kadar önceden yükleneceği
+REMINDER_LOOKAHEAD = timedelta(minutes=30)
+# Yeni eklenen ve saati değişen randevular için pencerenin ne sıklıkla yeniden yükleneceği
+REMINDER_REFILL_INTERVAL = timedelta(minutes=5)
+
+
+@dataclass(order=True)
+class _ScheduledReminder:
+    send_at: datetime
+    appointment_id: str = field(compare=False)
+    # Hatırlatmanın planlandığı randevu zamanı; randevu taşınırsa kayıt geçersiz olur
+    appointment_at: datetime = field(compare=False)
+
+
+def get_reminder_settings() -> dict:
+    """Hatırlatma ayarlarını döndürür."""
+    notifications = get_settings().get("notifications", {})
+    return {
+        "enabled": bool(notifications.get("email_enabled", True))
+        and bool(notifications.get("appointment_reminder", False)),
+        "hours_before": int(notifications.get("reminder_hours_before", 24) or 24),
+    }
+
+
+def _parse_appointment_datetime(row: dict) -> datetime | None:
+    try:
+        return datetime.strptime(f"{row.get('date')} {row.get('time')}", "%Y-%m-%d %H:%M")
+    except (ValueError, TypeError):
+        return None
+
+
+def _load_window(start: date, end: date) -> Iterator[dict]:
+    """Tarih aralığındaki, hatırlatması gönderilmemiş bekleyen randevuları sayfa sayfa verir."""
+    supabase = get_supabase_client()
+
+    def build_query():
+        return (
+            supabase.table("appointments")
+            .select("id,date,time")
+            .eq("status", "pending")
+            .is_("reminder_sent_at", "null")
+            .gte("date", start.isoformat())
+            .lte("date", end.isoformat())
+        )
+
+    return iter_rows(build_query)
+
+
+class ReminderScheduler:
+    """Yaklaşan hatırlatmaları gönderim zamanına göre sıralı tutan zamanlayıcı.
+
+    Tek bir worker üzerinde uzun süre çalışacak şekilde tasarlanmıştır. Her
+    tazelemede yalnızca bugünden pencere sonuna kadarki bekleyen randevular
+    okunur (kısmi index'le, birkaç günlük aralık); böylece sonradan eklenen
+    ve tarihi/saati değiştirilen randevular da yakalanır. Taşınan randevunun
+    eski heap kaydı atlanır, yenisi yeni zamana göre eklenir.
+    """
+
+    def __init__(
+        self,
+        hours_before: int,
+        batch_size: int = REMINDER_BATCH_SIZE,
+        lookahead: timedelta = REMINDER_LOOKAHEAD,
+        refill_interval: timedelta = REMINDER_REFILL_INTERVAL,
+    ):
+        self.hours_before = timedelta(hours=hours_before)
+        self.batch_size = batch_size
+        self.lookahead = lookahead
+        self.refill_interval = refill_interval
+        self._heap: list[_ScheduledReminder] = []
+        # randevu ID -> hatırlatmanın planlandığı randevu zamanı
+        self._scheduled: dict[str, datetime] = {}
+        self._next_refill: datetime | None = None
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    def refill(self, now: datetime) -> int:
+        """Penceredeki yeni veya taşınmış randevuları heap'e ekler. Eklenen kayıt sayısını döndürür."""
+        horizon = (now + self.hours_before + self.lookahead).date()
+        added = sum(self._schedule(row, now) for row in _load_window(now.date(), horizon))
+        self._next_refill = now + self.refill_interval
+        return added
+
+    def _schedule(self, row: dict, now: datetime) -> bool:
+        appointment_id = str(row.get("id", ""))
+        appointment_at = _parse_appointment_datetime(row)
+        if not appointment_id or appointment_at is None or appointment_at < now:
+            return False
+        if self._scheduled.get(appointment_id) == appointment_at:
+            return False
+        heapq.heappush(
+            self._heap,
+            _ScheduledReminder(appointment_at - self.hours_before, appointment_id, appointment_at),
+        )
+        self._scheduled[appointment_id] = appointment_at
+        return True
+
+    def pop_due(self, now: datetime) -> list[_ScheduledReminder]:
+        """Gönderim zamanı gelmiş kayıtları heap'ten çıkarır (taşınmış randevuların eski kayıtları atlanır)."""
+        due = []
+        while self._heap and self._heap[0].send_at <= now:
+            entry = heapq.heappop(self._heap)
+            if self._scheduled.get(entry.appointment_id) == entry.appointment_at:
+                due.append(entry)
+        return due
+
+    def seconds_until_next(self, now: datetime) -> float:
+        """Bir sonraki gönderim veya tazeleme anına kalan süre."""
+        candidates = []
+        if self._heap:
+            candidates.append(self._heap[0].send_at)
+        if self._next_refill is not None:
+            candidates.append(self._next_refill)
+        if not candidates:
+            return 0.0
+        return max((min(candidates) - now).total_seconds(), 0.0)
+
+    def run_once(self, now: datetime | None = None) -> int:
+        """Gerekirse pencereyi tazeler ve zamanı gelen hatırlatmaları gönderir.
+
+        Randevular gönderimden hemen önce yeniden okunur; tarihi veya saati
+        planlandığı zamandan farklıysa gönderilmez, yeni zamanına göre kuyruğa
+        geri konur.
+        """
+        now = now or datetime.now()
+        if self._next_refill is None or now >= self._next_refill:
+            self.refill(now)
+
+        due = self.pop_due(now)
+        if not due:
+            return 0
+
+        planned = {entry.appointment_id: entry.appointment_at for entry in due}
+        appointment_ids = list(planned)
+        sent_count = 0
+        try:
+            connection = get_connection(fail_silently=False)
+            with connection:
+                for start in range(0, len(appointment_ids), self.batch_size):
+                    current = []
+                    for apt in _fetch_pending(appointment_ids[start:start + self.batch_size]):
+                        if _parse_appointment_datetime(apt) == planned[str(apt["id"])]:
+                            current.append(apt)
+                        else:
+                            self._schedule(apt, now)
+                    sent_count += _send_reminders(current, connection=connection)
+        except Exception:
+            # Gönderilemeyenler işaretlenmedi; bir sonraki çalıştırmada pencere yeniden yüklenir
+            self._next_refill = None
+            raise
+        finally:
+            for appointment_id, appointment_at in planned.items():
+                # Yeni zamanla kuyruğa geri konanlar kalır
+                if self._scheduled.get(appointment_id) == appointment_at:
+                    del self._scheduled[appointment_id]
+        return sent_count
+
+
+def send_reminder_batch(appointment_ids: list[str], connection=None) -> int:
+    """Verilen randevular için hatırlatma gönderir ve gönderilenleri işaretler.
+
+    Randevular gönderimden hemen önce yeniden okunur; bu arada iptal edilen ya da
+    başka bir worker tarafından işaretlenen kayıtlar atlanır.
+    """
+    if not appointment_ids:
+        return 0
+    return _send_reminders(_fetch_pending(appointment_ids), connection=connection)
+
+
+def _fetch_pending(appointment_ids: list[str]) -> list[dict]:
+    """Randevuların hâlâ bekleyen ve hatırlatması gönderilmemiş olanlarını güncel haliyle okur."""
+    result = (
+        get_supabase_client().table("appointments")
+        .select("id,user_id,hospital_id,date,time")
+        .in_("id", appointment_ids)
+        .eq("status", "pending")
+        .is_("reminder_sent_at", "null")
+        .execute()
+    )
+    return result.data if result.data else []
+
+
+def _send_reminders(appointments: list[dict], connection=None) -> int:
+    if not appointments:
+        return 0
+
+    supabase = get_supabase_client()
+
+    user_ids = sorted({str(a["user_id"]) for a in appointments if a.get("user_id")})
+    hospital_ids = sorted({str(a["hospital_id"]) for a in appointments if a.get("hospital_id")})
+
+    users = {}
+    if user_ids:
+        users_result = supabase.table("user_profiles").select("id,name,surname,email").in_("id", user_ids).execute()
+        users = {str(u["id"]): u for u in (users_result.data or [])}
+    hospitals = {}
+    if hospital_ids:
+        hospitals_result = supabase.table("hospitals").select("id,name").in_("id", hospital_ids).execute()
+        hospitals = {str(h["id"]): h for h in (hospitals_result.data or [])}
+
+    reminders = []
+    for apt in appointments:
+        user = users.get(str(apt.get("user_id", ""))) or {}
+        hospital = hospitals.get(str(apt.get("hospital_id", ""))) or {}
+        reminders.append({
+            "appointment_id": str(apt["id"]),
+            "email": user.get("email"),
+            "patient_name": f"{user.get('name', '')} {user.get('surname', '')}".strip(),
+            "hospital_name": hospital.get("name", ""),
+            "date": apt.get("date", ""),
+            "time": apt.get("time", ""),
+        })
+
+    # E-postası olmayan hastalar da işaretlenir; aksi halde her pencerede tekrar seçilirler
+    no_email_ids = [r["appointment_id"] for r in reminders if not r["email"]]
+    try:
+        sent_ids = send_appointment_reminders(reminders, connection=connection)
+    except ReminderDeliveryError as exc:
+        # Hatadan önce gidenler işaretlenmezse sonraki çalıştırmada ikinci kez gönderilir
+        _mark_reminders_sent(exc.sent_ids + no_email_ids)
+        raise
+    _mark_reminders_sent(sent_ids + no_email_ids)
+    return len(sent_ids)
+
+
+def _mark_reminders_sent(appointment_ids: list[str]) -> None:
+    if not appointment_ids:
+        return
+    get_supabase_client().table("appointments").update({
+        "reminder_sent_at": datetime.now(timezone.utc).isoformat(),
+    }).in_("id", appointment_ids).execute()
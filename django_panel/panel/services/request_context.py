@@ -0,0 +1,105 @@
+"""İstek bazlı durum (contextvar).
+
+Middleware her istek başında yeni bir durum oluşturur; servis katmanı bu
+durumu istek nesnesine erişmeden okur ve günceller (ör. eski veri
+gösterildiğinde veya isteğin süre bütçesi kontrol edilirken).
+İstek dışında (management command, shell) çağrılar etkisizdir.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Callable, Iterator, Optional
+
+
+class RequestState:
+    __slots__ = ("stale_endpoints", "deadline", "cache_hits", "cache_misses", "timings", "versions")
+
+    def __init__(self, deadline: Optional[float] = None):
+        # Son bilinen sağlam veriyle cevaplanan endpoint'ler
+        self.stale_endpoints: set[str] = set()
+        # time.monotonic() cinsinden isteğin bitmesi gereken an (None: sınırsız)
+        self.deadline = deadline
+        # önbellek adı -> bu istekteki isabet/ıska sayısı
+        self.cache_hits: dict[str, int] = {}
+        self.cache_misses: dict[str, int] = {}
+        # aşama adı (ör. "render") -> toplam süre (saniye)
+        self.timings: dict[str, float] = {}
+        # veri sürümü scope'u -> bu istekte okunan sürüm (bkz. data_versions.current)
+        self.versions: dict[str, int] = {}
+
+
+_state: ContextVar[Optional[RequestState]] = ContextVar("panel_request_state", default=None)
+
+
+def begin(budget: Optional[float] = None) -> Token:
+    """Yeni istek durumu oluşturur; dönen token `end` ile geri verilmelidir.
+
+    budget verilirse (saniye) isteğin Supabase okumaları bu süreyle sınırlanır.
+    """
+    return _state.set(RequestState(_deadline_from(budget)))
+
+
+def end(token: Token) -> None:
+    _state.reset(token)
+
+
+# Önbellek isabet yolunda çağrıldığı için ContextVar.get'in kendisidir (ek çağrı katmanı yok)
+current: "Callable[[], Optional[RequestState]]" = _state.get
+
+
+def _deadline_from(budget: Optional[float]) -> Optional[float]:
+    if budget is None or budget <= 0:
+        return None
+    return time.monotonic() + budget
+
+
+def set_budget(budget: Optional[float]) -> None:
+    """İsteğin süre bütçesini şu andan itibaren yeniden ayarlar (None/0: sınırsız)."""
+    state = _state.get()
+    if state is not None:
+        state.deadline = _deadline_from(budget)
+
+
+def remaining() -> Optional[float]:
+    """Bütçeden kalan süre (saniye); bütçe yoksa None."""
+    state = _state.get()
+    if state is None or state.deadline is None:
+        return None
+    return state.deadline - time.monotonic()
+
+
+def mark_stale(endpoint: str) -> None:
+    state = _state.get()
+    if state is not None:
+        state.stale_endpoints.add(endpoint)
+
+
+def is_stale() -> bool:
+    """Bu istekte eski (önbellekten) veri gösterildi mi?"""
+    state = _state.get()
+    return bool(state and state.stale_endpoints)
+
+
+def note_cache(name: str, hit: bool) -> None:
+    """Bu istekte bir önbellek isabeti/ıskası kaydeder (yavaş istek dökümü için)."""
+    state = _state.get()
+    if state is not None:
+        counts = state.cache_hits if hit else state.cache_misses
+        counts[name] = counts.get(name, 0) + 1
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Bloğun süresini isteğin ilgili aşamasına ekler."""
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        state.timings[phase] = state.timings.get(phase, 0.0) + time.perf_counter() - started
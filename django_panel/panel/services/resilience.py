@@ -0,0 +1,365 @@
+"""Supabase okumaları için dayanıklılık katmanı.
+
+Her okuma endpoint (tablo) bazında bir zaman aşımıyla çalıştırılır. Art arda
+hata veren endpoint'in devresi açılır ve bir süre Supabase'e gidilmez.
+Async view'ler aynı devreleri ve son sağlam değerleri `resilient_aexecute`
+ile kullanır; arka plan yenilemeleri onlar için de sync okuma havuzunda
+çalışır, çünkü isteğin event loop'u (WSGI altında) view dönünce kapanır.
+Başarılı her okumanın sonucu "son bilinen sağlam" değer olarak saklanır.
+Okuma başarısız olduğunda ya da devre açıkken bu değer döndürülür, istek
+"eski veri" olarak işaretlenir (arayüzde uyarı gösterilir) ve arka planda
+yeniden deneme başlatılır. Böylece sayfa süresi Supabase'in en kötü
+durumuna değil, buradaki zaman aşımına bağlı kalır.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import copy
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from threading import Lock
+from typing import Optional
+
+from django.conf import settings
+
+from . import request_context
+from .single_flight import coalesced_aexecute, coalesced_execute, query_key, request_config
+from .supabase_client import sync_query
+
+try:
+    from postgrest.exceptions import APIError
+except ImportError:  # pragma: no cover - postgrest supabase ile birlikte gelir
+    APIError = None
+
+logger = logging.getLogger(__name__)
+
+# Son bilinen sağlam sonuçların üst sınırı
+_MAX_LAST_GOOD = 512
+
+
+class UpstreamUnavailable(ConnectionError):
+    """Supabase'e ulaşılamıyor ve gösterilecek önceki bir sonuç yok."""
+
+
+class DeadlineExceeded(UpstreamUnavailable):
+    """İsteğin süre bütçesi bitti ve gösterilecek önceki bir sonuç yok."""
+
+
+class CircuitBreaker:
+    """Kapalı -> (art arda hata) -> açık -> (bekleme) -> yarı açık -> kapalı."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self.state = self.CLOSED
+        self._lock = Lock()
+
+    def allow(self) -> bool:
+        """İsteğin Supabase'e gönderilip gönderilmeyeceği."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Tek bir deneme isteğine izin ver
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("Supabase devresi açıldı: %s (%s hata)", self.name, self.failures)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+_lock = Lock()
+_breakers: dict[str, CircuitBreaker] = {}
+_last_good: dict[tuple, object] = {}
+_refreshing: set[tuple] = set()
+_executor: Optional[ThreadPoolExecutor] = None
+# Şemada bulunmadığı görülen parça (embed ilişkisi, özet tablosu) -> yeniden denenecek zaman
+_missing_features: dict[str, float] = {}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "SUPABASE_READ_WORKERS", 16),
+                    thread_name_prefix="supabase-read",
+                )
+    return _executor
+
+
+def _endpoint(query) -> str:
+    """Sorgunun tablo (veya rpc/<ad>) adı; path tam URL olsa da aynı sonucu verir."""
+    path = str(getattr(request_config(query), "path", "") or "")
+    if "/rest/v1/" in path:
+        path = path.split("/rest/v1/", 1)[1]
+    return path.strip("/") or "?"
+
+
+def _read_key(query) -> Optional[tuple]:
+    """Okuma sorgusunun anahtarı; yazmalar için None.
+
+    Anahtar üretilemiyorsa katman sessizce atlanmaz, hata verilir: aksi halde
+    zaman aşımı, devre kesici ve süre bütçesi fark edilmeden devre dışı kalır.
+    """
+    key = query_key(query)
+    if key is None:
+        raise TypeError(
+            f"Supabase sorgusundan anahtar üretilemedi ({type(query).__name__}); "
+            "dayanıklılık katmanı bu postgrest sürümünü tanımıyor."
+        )
+    return key if key[0] == "GET" else None
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        with _lock:
+            breaker = _breakers.setdefault(endpoint, CircuitBreaker(
+                endpoint,
+                failure_threshold=getattr(settings, "SUPABASE_BREAKER_FAILURES", 5),
+                reset_timeout=getattr(settings, "SUPABASE_BREAKER_RESET_SECONDS", 30.0),
+            ))
+    return breaker
+
+
+def endpoint_timeout(endpoint: str) -> float:
+    """Endpoint'in zaman aşımı (saniye); SUPABASE_ENDPOINT_TIMEOUTS ile tablo bazında değiştirilebilir."""
+    overrides = getattr(settings, "SUPABASE_ENDPOINT_TIMEOUTS", {}) or {}
+    if endpoint in overrides:
+        return float(overrides[endpoint])
+    return float(getattr(settings, "SUPABASE_READ_TIMEOUT", 2.0))
+
+
+def _is_upstream_failure(exc: BaseException) -> bool:
+    """Supabase cevap verip sorguyu reddettiyse (ör. eksik tablo) bu bir kesinti değildir."""
+    return not (APIError is not None and isinstance(exc, APIError))
+
+
+def api_error_code(exc: BaseException) -> Optional[str]:
+    """PostgREST hatasının kodu (ör. PGRST200, 42P01); başka hatalarda None."""
+    if APIError is None or not isinstance(exc, APIError):
+        return None
+    return getattr(exc, "code", None)
+
+
+def feature_missing(name: str) -> bool:
+    """Şema parçası yakın zamanda eksik bulunduysa True (yedek yol kullanılmalı)."""
+    retry_at = _missing_features.get(name)
+    return retry_at is not None and retry_at > time.monotonic()
+
+
+def mark_feature_missing(name: str) -> None:
+    """Şema parçasını SUPABASE_SCHEMA_RECHECK_SECONDS boyunca eksik sayar."""
+    recheck = float(getattr(settings, "SUPABASE_SCHEMA_RECHECK_SECONDS", 300.0))
+    logger.info("%s şemada bulunamadı; %.0f sn boyunca yedek sorgular kullanılacak", name, recheck)
+    _missing_features[name] = time.monotonic() + recheck
+
+
+def _remember(key: tuple, result) -> None:
+    with _lock:
+        if len(_last_good) >= _MAX_LAST_GOOD and key not in _last_good:
+            # En eski kaydı at (dict ekleme sırasını korur)
+            _last_good.pop(next(iter(_last_good)))
+        _last_good[key] = copy.deepcopy(result)
+
+
+def _refresh_in_background(query, key: tuple, breaker: CircuitBreaker) -> None:
+    with _lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def run():
+        try:
+            if not breaker.allow():
+                return
+            result = coalesced_execute(query)
+        except Exception as exc:
+            if _is_upstream_failure(exc):
+                breaker.record_failure()
+            logger.info("Arka plan yenilemesi başarısız (%s): %s", breaker.name, exc)
+        else:
+            breaker.record_success()
+            _remember(key, result)
+        finally:
+            with _lock:
+                _refreshing.discard(key)
+
+    _get_executor().submit(run)
+
+
+def _refresh_async_in_background(query, key: tuple, breaker: CircuitBreaker) -> None:
+    """Async sorguyu sync kopyasıyla okuma havuzunda yeniler; event loop kapansa da tamamlanır."""
+    _refresh_in_background(sync_query(query), key, breaker)
+
+
+def _serve_stale(query, key: tuple, endpoint: str, breaker: CircuitBreaker, error: Exception, refresh=None):
+    cached = _last_good.get(key)
+    if cached is None:
+        if isinstance(error, UpstreamUnavailable):
+            raise error
+        raise UpstreamUnavailable(f"Supabase'e ulaşılamıyor ({endpoint}): {error}") from error
+    request_context.mark_stale(endpoint)
+    (refresh or _refresh_in_background)(query, key, breaker)
+    return copy.deepcopy(cached)
+
+
+def _remember_when_done(future, key: tuple, breaker: CircuitBreaker) -> None:
+    """Bütçe yüzünden beklenmeyen sorgunun sonucunu bittiğinde devreye ve son sağlam değere işler."""
+
+    def done(finished):
+        if finished.cancelled():
+            return
+        error = finished.exception()
+        if error is None:
+            breaker.record_success()
+            _remember(key, finished.result())
+        elif _is_upstream_failure(error):
+            breaker.record_failure()
+
+    future.add_done_callback(done)
+
+
+def resilient_execute(query, timeout: Optional[float] = None):
+    """Okuma sorgusunu zaman aşımı, devre kesici ve son bilinen sağlam değerle çalıştırır.
+
+    Zaman aşımı, endpoint süresi ile isteğin kalan süre bütçesinin küçüğüdür
+    (bkz. request_context). Bütçe yüzünden yarıda bırakılan sorgular devreyi
+    açmaz; Supabase yavaş değil, sayfa acele ediyordur.
+
+    Raises:
+        DeadlineExceeded: Bütçe bitti ve daha önce başarılı bir sonucu yoksa
+        UpstreamUnavailable: Sorgu başarısız ve daha önce başarılı bir sonucu yoksa
+    """
+    key = _read_key(query)
+    if key is None:
+        return query.execute()
+
+    endpoint = _endpoint(query)
+    breaker = get_breaker(endpoint)
+    budget = request_context.remaining()
+    if budget is not None and budget <= 0:
+        return _serve_stale(query, key, endpoint, breaker, DeadlineExceeded(f"Süre bütçesi doldu ({endpoint})"))
+    if not breaker.allow():
+        return _serve_stale(query, key, endpoint, breaker, UpstreamUnavailable(f"Supabase devresi açık ({endpoint})"))
+
+    limit = timeout if timeout is not None else endpoint_timeout(endpoint)
+    deadline_bound = budget is not None and budget < limit
+    if deadline_bound:
+        limit = budget
+
+    # İstek bağlamı (süre bütçesi, çağrı sayacı) okuma thread'ine taşınır
+    future = _get_executor().submit(contextvars.copy_context().run, coalesced_execute, query)
+    try:
+        result = future.result(timeout=limit)
+    except FutureTimeoutError as exc:
+        if deadline_bound:
+            _remember_when_done(future, key, breaker)
+            return _serve_stale(query, key, endpoint, breaker, DeadlineExceeded(f"Süre bütçesi doldu ({endpoint})"))
+        breaker.record_failure()
+        return _serve_stale(query, key, endpoint, breaker, exc)
+    except Exception as exc:
+        if not _is_upstream_failure(exc):
+            breaker.record_success()
+            raise
+        breaker.record_failure()
+        return _serve_stale(query, key, endpoint, breaker, exc)
+
+    breaker.record_success()
+    _remember(key, result)
+    return result
+
+
+async def resilient_aexecute(query, timeout: Optional[float] = None):
+    """`resilient_execute`'un async karşılığı; sorgu async client'tan gelmelidir.
+
+    Zaman aşımı thread yerine `asyncio.wait_for` ile uygulanır; devreler, son
+    sağlam değerler ve süre bütçesi sync yol ile ortaktır.
+
+    Raises:
+        DeadlineExceeded: Bütçe bitti ve daha önce başarılı bir sonucu yoksa
+        UpstreamUnavailable: Sorgu başarısız ve daha önce başarılı bir sonucu yoksa
+    """
+    key = _read_key(query)
+    if key is None:
+        return await query.execute()
+
+    endpoint = _endpoint(query)
+    breaker = get_breaker(endpoint)
+    budget = request_context.remaining()
+    if budget is not None and budget <= 0:
+        return _serve_stale(
+            query, key, endpoint, breaker, DeadlineExceeded(f"Süre bütçesi doldu ({endpoint})"), _refresh_async_in_background
+        )
+    if not breaker.allow():
+        return _serve_stale(
+            query, key, endpoint, breaker, UpstreamUnavailable(f"Supabase devresi açık ({endpoint})"), _refresh_async_in_background
+        )
+
+    limit = timeout if timeout is not None else endpoint_timeout(endpoint)
+    deadline_bound = budget is not None and budget < limit
+    if deadline_bound:
+        limit = budget
+
+    try:
+        result = await asyncio.wait_for(coalesced_aexecute(query), timeout=limit)
+    except asyncio.TimeoutError as exc:
+        if deadline_bound:
+            # Yarıda kalan sorgu okuma havuzunda tamamlanır; sonucu sonraki istekler için saklanır
+            _refresh_async_in_background(query, key, breaker)
+            return _serve_stale(
+                query, key, endpoint, breaker, DeadlineExceeded(f"Süre bütçesi doldu ({endpoint})"), _refresh_async_in_background
+            )
+        breaker.record_failure()
+        return _serve_stale(query, key, endpoint, breaker, exc, _refresh_async_in_background)
+    except Exception as exc:
+        if not _is_upstream_failure(exc):
+            breaker.record_success()
+            raise
+        breaker.record_failure()
+        return _serve_stale(query, key, endpoint, breaker, exc, _refresh_async_in_background)
+
+    breaker.record_success()
+    _remember(key, result)
+    return result
+
+
+def breaker_states() -> dict[str, dict]:
+    """Endpoint bazında devre durumları (izleme için)."""
+    return {
+        name: {"state": breaker.state, "failures": breaker.failures}
+        for name, breaker in _breakers.items()
+    }
+
+
+def forget() -> None:
+    """Son sağlam değerleri, devreleri ve eksik şema kayıtlarını sıfırlar (ör. sahte backend yeniden kurulduğunda)."""
+    with _lock:
+        _last_good.clear()
+        _missing_features.clear()
+        _breakers.clear()
+        _refreshing.clear()
@@ -2,31 +2,159 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime, timedelta, timezone
 from typing import Optional
 
-from .supabase_client import get_supabase_client
-from .doctor_service import get_doctors
-from .hospital_service import get_hospital
-from .user_service import get_user_map
+import asyncio
 
-from .hospital_service import _get_active_hospital_id
+from .supabase_client import get_async_supabase_client, get_supabase_client
+from . import data_versions
+from .doctor_service import DOCTOR_SUMMARY_COLUMNS, aget_doctors, get_doctors
+from .hospital_service import HOSPITAL_SUMMARY_COLUMNS, aget_hospital, get_hospital
+from .user_service import aget_users_by_ids, get_users_by_ids
 
+from .hospital_service import _aget_active_hospital_id, _get_active_hospital_id
+from .rating_service import aget_hospital_rating_summary, get_hospital_rating_summary
 
-def _load_reviews() -> list[dict]:
-    """Tüm yorumları Supabase'den getirir."""
+
+# Yorum listesinde kullanılan kolonlar
+REVIEW_COLUMNS = "id,user_id,hospital_id,doctor_id,appointment_id,comment,reply,replied_at,created_at"
+RATING_COLUMNS = "appointment_id,hospital_id,doctor_id,hospital_rating,doctor_rating"
+# Puanlar, yorumun appointment_id'si üzerinden randevuya bağlı ratings satırından gömülür
+REVIEW_RATING_EMBED = "appointments(ratings(doctor_rating,hospital_rating))"
+
+RECENT_REVIEW_DAYS = 30
+DEFAULT_REVIEW_PAGE_SIZE = 20
+# Sayfalama olmadan yapılan aramada döndürülecek en fazla sonuç
+SEARCH_RESULT_LIMIT = 100
+# Puan filtresiyle sayfa doldurulurken tek seferde çekilecek en az yorum
+RATING_FILTER_BATCH_SIZE = 50
+
+
+def encode_cursor(db_review: dict) -> str:
+    """Son yorumun (created_at, id) ikilisinden sayfa imlecini üretir."""
+    raw = f"{db_review.get('created_at', '')}|{db_review.get('id', '')}"
+    return urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """Sayfa imlecini (created_at, id) ikilisine çevirir."""
+    try:
+        created_at, review_id = urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+    except (ValueError, UnicodeError):
+        raise ValueError("Geçersiz sayfa imleci")
+    if not created_at or not review_id:
+        raise ValueError("Geçersiz sayfa imleci")
+    return created_at, review_id
+
+
+def encode_search_cursor(offset: int) -> str:
+    """Arama sonuçları ilgiye göre sıralandığından imleç sonuç sırasını (offset) taşır."""
+    return urlsafe_b64encode(f"#{offset}".encode("utf-8")).decode("ascii")
+
+
+def decode_search_cursor(cursor: str) -> int:
+    try:
+        raw = urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        if raw.startswith("#"):
+            return max(int(raw[1:]), 0)
+    except (ValueError, UnicodeError):
+        pass
+    raise ValueError("Geçersiz sayfa imleci")
+
+
+def _apply_cursor(query, cursor: str):
+    """(created_at, id) azalan sıralamasında imleçten sonraki kayıtları seçer."""
+    created_at, review_id = decode_cursor(cursor)
+    # Zaman damgası ':' ve '+' içerdiği için or_ filtresinde tırnaklanır
+    return query.or_(
+        f'created_at.lt."{created_at}",'
+        f'and(created_at.eq."{created_at}",id.lt."{review_id}")'
+    )
+
+
+def _load_reviews(hospital_id: Optional[str] = None) -> list[dict]:
+    """Yorumları Supabase'den getirir (hospital_id verilirse sadece o hastanenin)."""
     supabase = get_supabase_client()
-    result = supabase.table("reviews").select("*").execute()
+    query = supabase.table("reviews").select(REVIEW_COLUMNS)
+    if hospital_id:
+        query = query.eq("hospital_id", hospital_id)
+    result = query.execute()
     return result.data if result.data else []
 
 
-def _load_ratings() -> list[dict]:
-    """Tüm puanlamaları Supabase'den getirir."""
+def _load_ratings(hospital_id: Optional[str] = None) -> list[dict]:
+    """Puanlamaları Supabase'den getirir (hospital_id verilirse sadece o hastanenin)."""
     supabase = get_supabase_client()
-    result = supabase.table("ratings").select("*").execute()
+    query = supabase.table("ratings").select(RATING_COLUMNS)
+    if hospital_id:
+        query = query.eq("hospital_id", hospital_id)
+    result = query.execute()
     return result.data if result.data else []
 
 
+def _parse_filter_date(value) -> Optional[date]:
+    """YYYY-MM-DD biçimindeki filtre değerini date'e çevirir; geçersiz değerler yok sayılır."""
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value), "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def _apply_review_filters(query, hospital_id, doctor_id=None, date_from=None, date_to=None, has_reply=None):
+    """Yorum filtrelerini PostgREST sorgusuna ekler."""
+    query = query.eq("hospital_id", hospital_id)
+    if doctor_id:
+        query = query.eq("doctor_id", doctor_id)
+    date_from = _parse_filter_date(date_from)
+    if date_from:
+        # Günün başından itibaren
+        query = query.gte("created_at", date_from.isoformat())
+    date_to = _parse_filter_date(date_to)
+    if date_to:
+        # date_to günü dahil olacak şekilde bir sonraki günün başına kadar
+        query = query.lt("created_at", (date_to + timedelta(days=1)).isoformat())
+    if has_reply is True:
+        query = query.not_.is_("reply", "null").neq("reply", "")
+    elif has_reply is False:
+        query = query.or_("reply.is.null,reply.eq.")
+    return query
+
+
+def _known_doctor_id(doctor_id, doctors: list[dict]) -> Optional[str]:
+    """Filtredeki doktor ID'si hastanenin doktorlarından biri değilse filtre yok sayılır.
+
+    URL'den gelen bozuk bir değer (ör. UUID olmayan metin) Supabase'e
+    gönderilmez; aksi halde uuid dönüşüm hatası sayfayı 500'e düşürür.
+    """
+    if not doctor_id:
+        return None
+    doctor_id = str(doctor_id)
+    return doctor_id if any(d["id"] == doctor_id for d in doctors) else None
+
+
+def _extract_rating(db_review: dict) -> Optional[dict]:
+    """Gömülü appointments -> ratings ilişkisinden puan satırını çıkarır."""
+    appointment = db_review.get("appointments")
+    if isinstance(appointment, list):
+        appointment = appointment[0] if appointment else None
+    if not appointment:
+        return None
+    ratings = appointment.get("ratings")
+    if isinstance(ratings, list):
+        return ratings[0] if ratings else None
+    return ratings or None
+
+
+def _has_active_filters(doctor_id, min_rating, max_rating, date_from, date_to, has_reply) -> bool:
+    return any([doctor_id, min_rating, max_rating, date_from, date_to, has_reply is not None])
+
+
 def get_reviews_with_details(
     doctor_id: Optional[str] = None,
     min_rating: Optional[int] = None,
@@ -34,117 +162,461 @@ def get_reviews_with_details(
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
     has_reply: Optional[bool] = None,
+    q: Optional[str] = None,
     request=None,
 ) -> list[dict]:
-    """Yorumları detaylı bilgilerle birlikte getirir."""
-    reviews = _load_reviews()
-    ratings = _load_ratings()
-    user_map = get_user_map()
-    doctors = {d["id"]: d for d in get_doctors(request)}
-    hospital = get_hospital(request)
+    """Yorumları detaylı bilgilerle birlikte getirir.
+
+    q verilirse yorum ve yanıt metinlerinde tam metin arama yapılır ve sonuçlar
+    ilgiye göre sıralanır.
+    """
+    return _fetch_reviews(
+        doctor_id, min_rating, max_rating, date_from, date_to, has_reply, q=q, request=request
+    )["reviews"]
+
+
+async def aget_reviews_with_details(
+    doctor_id: Optional[str] = None,
+    min_rating: Optional[int] = None,
+    max_rating: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    has_reply: Optional[bool] = None,
+    q: Optional[str] = None,
+    request=None,
+) -> list[dict]:
+    """`get_reviews_with_details`'in async karşılığı."""
+    page = await _afetch_reviews(
+        doctor_id, min_rating, max_rating, date_from, date_to, has_reply, q=q, request=request
+    )
+    return page["reviews"]
+
+
+def _fetch_reviews(
+    doctor_id=None,
+    min_rating=None,
+    max_rating=None,
+    date_from=None,
+    date_to=None,
+    has_reply=None,
+    q: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    request=None,
+) -> dict:
+    """Yorumları getirir; limit verilirse imleçle sayfalar.
+
+    Returns:
+        dict: "reviews" ve bir sonraki sayfa yoksa None olan "next_cursor"
+    """
     hospital_id = _get_active_hospital_id(request)
+    doctors = get_doctors(request, columns=DOCTOR_SUMMARY_COLUMNS)
+    doctor_id = _known_doctor_id(doctor_id, doctors)
+    query_text = q.strip() if q else ""
+    if query_text:
+        def fetch(page_cursor, page_limit):
+            return _search_review_rows(
+                hospital_id, query_text, doctor_id, date_from, date_to, has_reply, page_cursor, page_limit
+            )
+        cursor_after = _search_cursor_after
+    else:
+        def fetch(page_cursor, page_limit):
+            return _list_review_rows(
+                hospital_id, doctor_id, date_from, date_to, has_reply, page_cursor, page_limit
+            )
+        cursor_after = _list_cursor_after
+
+    rows, next_cursor = _fill_rating_page(fetch, cursor_after, min_rating, max_rating, cursor, limit)
+    return {
+        "reviews": _enrich_reviews(rows, doctors, request),
+        "next_cursor": next_cursor,
+    }
 
-    # Rating'leri appointment_id'ye göre map'le
-    rating_map = {str(r.get("appointment_id", "")): r for r in ratings}
 
-    result = []
-    for review in reviews:
-        # Sadece aktif hastaneye ait yorumları al
-        if str(review.get("hospital_id", "")) != hospital_id:
-            continue
+async def _afetch_reviews(
+    doctor_id=None,
+    min_rating=None,
+    max_rating=None,
+    date_from=None,
+    date_to=None,
+    has_reply=None,
+    q: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    request=None,
+) -> dict:
+    """`_fetch_reviews`'un async karşılığı; yorumlar, doktorlar ve hastane paralel getirilir."""
+    hospital_id = await _aget_active_hospital_id(request)
+    supabase = await get_async_supabase_client()
+    doctors = None
+    if doctor_id:
+        # Filtre doğrulanmadan sorgu gönderilmez; filtresiz sayfada doktorlar paralel okunur
+        doctors = await aget_doctors(request, columns=DOCTOR_SUMMARY_COLUMNS)
+        doctor_id = _known_doctor_id(doctor_id, doctors)
+    query_text = q.strip() if q else ""
+    if query_text:
+        async def fetch(page_cursor, page_limit):
+            params, offset, page_size = _search_review_params(
+                hospital_id, query_text, doctor_id, date_from, date_to, has_reply, page_cursor, page_limit
+            )
+            result = await supabase.rpc("search_reviews", params).execute()
+            return _search_rows_from_result(result.data or [], offset, page_size)
+        cursor_after = _search_cursor_after
+    else:
+        async def fetch(page_cursor, page_limit):
+            result = await _list_review_query(
+                supabase, hospital_id, doctor_id, date_from, date_to, has_reply, page_cursor, page_limit
+            ).execute()
+            return _list_rows_from_result(result.data or [], page_limit)
+        cursor_after = _list_cursor_after
+
+    async def load_doctors():
+        if doctors is not None:
+            return doctors
+        return await aget_doctors(request, columns=DOCTOR_SUMMARY_COLUMNS)
+
+    (rows, next_cursor), doctors, hospital = await asyncio.gather(
+        _afill_rating_page(fetch, cursor_after, min_rating, max_rating, cursor, limit),
+        load_doctors(),
+        aget_hospital(request, columns=HOSPITAL_SUMMARY_COLUMNS),
+    )
+    user_map = await aget_users_by_ids(review.get("user_id") for review, _ in rows)
+    return {
+        "reviews": _assemble_reviews(rows, user_map, doctors, hospital),
+        "next_cursor": next_cursor,
+    }
 
-        # Filtreleme
-        if doctor_id and str(review.get("doctor_id", "")) != doctor_id:
-            continue
 
-        rating = rating_map.get(str(review.get("appointment_id", "")))
-        if rating:
-            doctor_rating = rating.get("doctor_rating", 0) or 0
-            hospital_rating = rating.get("hospital_rating", 0) or 0
-            avg_rating = (doctor_rating + hospital_rating) / 2
+def _average_rating(rating: Optional[dict]) -> float:
+    if not rating:
+        return 0
+    return ((rating.get("doctor_rating") or 0) + (rating.get("hospital_rating") or 0)) / 2
 
-            if min_rating and avg_rating < min_rating:
-                continue
-            if max_rating and avg_rating > max_rating:
-                continue
-        else:
-            avg_rating = 0
-
-        # Tarih filtresi (ISO format string karşılaştırması)
-        created_at = review.get("created_at", "")
-        if date_from:
-            # date_from "YYYY-MM-DD" formatında gelir, ISO string ile karşılaştır
-            date_from_str = str(date_from) if date_from else ""
-            if created_at and date_from_str and created_at[:10] < date_from_str:
-                continue
-        if date_to:
-            # date_to "YYYY-MM-DD" formatında gelir, ISO string ile karşılaştır
-            date_to_str = str(date_to) if date_to else ""
-            if created_at and date_to_str and created_at[:10] > date_to_str:
-                continue
-
-        # Yanıt durumu filtresi
-        has_reply_value = bool(review.get("reply"))
-        if has_reply is not None and has_reply_value != has_reply:
+
+def _rating_in_range(rating: Optional[dict], min_rating, max_rating) -> bool:
+    """Ortalama puan filtresi; puanı olmayan yorumlar filtreden etkilenmez."""
+    if not rating:
+        return True
+    avg_rating = _average_rating(rating)
+    if min_rating and avg_rating < min_rating:
+        return False
+    if max_rating and avg_rating > max_rating:
+        return False
+    return True
+
+
+def _list_cursor_after(batch_cursor, index, review) -> str:
+    return encode_cursor(review)
+
+
+def _search_cursor_after(batch_cursor, index, review) -> str:
+    offset = decode_search_cursor(batch_cursor) if batch_cursor else 0
+    return encode_search_cursor(offset + index + 1)
+
+
+def _collect_rated_rows(matched, rows, batch_cursor, cursor_after, min_rating, max_rating, limit) -> bool:
+    """Puan filtresine uyan satırları (yorum, puan, imleç) olarak matched'e ekler.
+
+    Sayfa dolduktan sonra uyan bir satır daha bulunursa True döndürür.
+    """
+    for index, (review, rating) in enumerate(rows):
+        if not _rating_in_range(rating, min_rating, max_rating):
             continue
+        if len(matched) == limit:
+            return True
+        matched.append((review, rating, cursor_after(batch_cursor, index, review)))
+    return False
+
+
+def _fill_rating_page(fetch, cursor_after, min_rating, max_rating, cursor, limit):
+    """Bir sayfa satır ve sonraki sayfanın imlecini döndürür.
+
+    Ortalama puan iki kolondan türetildiği için puan filtresi satırlar çekildikten
+    sonra uygulanır; sayfa dolana ya da kayıtlar bitene kadar sonraki satırlar
+    çekilir. Aksi halde sayfalar kısa/boş döner ve sonsuz kaydırma takılır.
+    fetch(imleç, limit) -> (satırlar, sonraki imleç) biçimindedir.
+    """
+    if not (min_rating or max_rating):
+        return fetch(cursor, limit)
+    if not limit:
+        rows, _ = fetch(cursor, None)
+        return [row for row in rows if _rating_in_range(row[1], min_rating, max_rating)], None
+
+    matched = []
+    while True:
+        rows, batch_next = fetch(cursor, max(limit, RATING_FILTER_BATCH_SIZE))
+        if _collect_rated_rows(matched, rows, cursor, cursor_after, min_rating, max_rating, limit):
+            return [(review, rating) for review, rating, _ in matched], matched[-1][2]
+        if batch_next is None:
+            return [(review, rating) for review, rating, _ in matched], None
+        cursor = batch_next
+
+
+async def _afill_rating_page(fetch, cursor_after, min_rating, max_rating, cursor, limit):
+    """`_fill_rating_page`'in async karşılığı; fetch bir coroutine fonksiyonudur."""
+    if not (min_rating or max_rating):
+        return await fetch(cursor, limit)
+    if not limit:
+        rows, _ = await fetch(cursor, None)
+        return [row for row in rows if _rating_in_range(row[1], min_rating, max_rating)], None
+
+    matched = []
+    while True:
+        rows, batch_next = await fetch(cursor, max(limit, RATING_FILTER_BATCH_SIZE))
+        if _collect_rated_rows(matched, rows, cursor, cursor_after, min_rating, max_rating, limit):
+            return [(review, rating) for review, rating, _ in matched], matched[-1][2]
+        if batch_next is None:
+            return [(review, rating) for review, rating, _ in matched], None
+        cursor = batch_next
+
+
+def _list_review_query(supabase, hospital_id, doctor_id, date_from, date_to, has_reply, cursor, limit):
+    query = supabase.table("reviews").select(f"{REVIEW_COLUMNS},{REVIEW_RATING_EMBED}")
+    query = _apply_review_filters(query, hospital_id, doctor_id, date_from, date_to, has_reply)
+    if cursor:
+        query = _apply_cursor(query, cursor)
+    # Tarihe göre sırala (en yeni önce); id aynı zamanlı kayıtlarda sırayı sabitler
+    query = query.order("created_at", desc=True).order("id", desc=True)
+    if limit:
+        # Bir fazla kayıt istenerek sonraki sayfanın varlığı anlaşılır
+        query = query.limit(limit + 1)
+    return query
+
+
+def _list_review_rows(hospital_id, doctor_id, date_from, date_to, has_reply, cursor, limit):
+    """Yorumları (created_at, id) azalan sırasında, puanları gömülü olarak getirir."""
+    query = _list_review_query(
+        get_supabase_client(), hospital_id, doctor_id, date_from, date_to, has_reply, cursor, limit
+    )
+    result = query.execute()
+    return _list_rows_from_result(result.data if result.data else [], limit)
+
+
+def _list_rows_from_result(db_reviews: list[dict], limit):
+    next_cursor = None
+    if limit and len(db_reviews) > limit:
+        db_reviews = db_reviews[:limit]
+        next_cursor = encode_cursor(db_reviews[-1])
+    return [(review, _extract_rating(review)) for review in db_reviews], next_cursor
+
+
+def _search_review_params(hospital_id, q, doctor_id, date_from, date_to, has_reply, cursor, limit):
+    """search_reviews RPC parametreleri, offset ve sayfa boyutu."""
+    offset = decode_search_cursor(cursor) if cursor else 0
+    page_size = limit or SEARCH_RESULT_LIMIT
+    date_from, date_to = _parse_filter_date(date_from), _parse_filter_date(date_to)
+    params = {
+        "p_hospital_id": hospital_id,
+        "p_query": q,
+        "p_doctor_id": doctor_id,
+        "p_date_from": date_from.isoformat() if date_from else None,
+        "p_date_to": date_to.isoformat() if date_to else None,
+        "p_has_reply": has_reply,
+        "p_limit": page_size + 1,
+        "p_offset": offset,
+    }
+    return params, offset, page_size
+
 
-        # Detaylı bilgileri ekle
-        user = user_map.get(str(review.get("user_id", "")))
-        doctor = doctors.get(str(review.get("doctor_id", "")))
+def _search_review_rows(hospital_id, q, doctor_id, date_from, date_to, has_reply, cursor, limit):
+    """search_reviews RPC'si ile ilgiye göre sıralı yorumları getirir (bkz. review_search.sql)."""
+    params, offset, page_size = _search_review_params(
+        hospital_id, q, doctor_id, date_from, date_to, has_reply, cursor, limit
+    )
+    result = get_supabase_client().rpc("search_reviews", params).execute()
+    return _search_rows_from_result(result.data if result.data else [], offset, page_size)
+
+
+def _search_rows_from_result(db_reviews: list[dict], offset: int, page_size: int):
+    next_cursor = None
+    if len(db_reviews) > page_size:
+        db_reviews = db_reviews[:page_size]
+        next_cursor = encode_search_cursor(offset + page_size)
+    rows = []
+    for review in db_reviews:
+        rating = None
+        if review.get("doctor_rating") is not None or review.get("hospital_rating") is not None:
+            rating = {
+                "doctor_rating": review.get("doctor_rating"),
+                "hospital_rating": review.get("hospital_rating"),
+            }
+        rows.append((review, rating))
+    return rows, next_cursor
+
+
+def _enrich_reviews(rows, doctors, request) -> list[dict]:
+    """Yorum satırlarını kullanıcı, doktor ve puan bilgileriyle zenginleştirir."""
+    user_map = get_users_by_ids(review.get("user_id") for review, _ in rows)
+    hospital = get_hospital(request, columns=HOSPITAL_SUMMARY_COLUMNS)
+    return _assemble_reviews(rows, user_map, doctors, hospital)
+
+
+def _assemble_reviews(rows, user_map, doctors, hospital) -> list[dict]:
+    doctors = {d["id"]: d for d in doctors}
+    reviews = []
+    for review, rating in rows:
+        avg_rating = _average_rating(rating)
 
         # Review'ı mevcut formata çevir
         formatted_review = _format_review_from_db(review)
         formatted_review.update({
-            "user": user,
-            "doctor": doctor,
+            "user": user_map.get(str(review.get("user_id", ""))),
+            "doctor": doctors.get(str(review.get("doctor_id", ""))),
             "hospital": hospital,
             "rating": rating,
             "doctor_rating": rating.get("doctor_rating", 0) if rating else 0,
             "hospital_rating": rating.get("hospital_rating", 0) if rating else 0,
             "avg_rating": avg_rating,
-            "has_reply": has_reply_value,
+            "has_reply": bool(review.get("reply")),
+            "searchRank": review.get("rank"),
         })
-        
-        result.append(formatted_review)
+        reviews.append(formatted_review)
+
+    return reviews
+
+
+def get_reviews_page(
+    doctor_id: Optional[str] = None,
+    min_rating: Optional[int] = None,
+    max_rating: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    has_reply: Optional[bool] = None,
+    q: Optional[str] = None,
+    cursor: Optional[str] = None,
+    page_size: int = DEFAULT_REVIEW_PAGE_SIZE,
+    with_statistics: bool = True,
+    request=None,
+) -> dict:
+    """Yorum sayfası için bir sayfa yorum ve (istenirse) istatistikleri getirir.
+
+    Sayfa maliyeti page_size ile sınırlıdır. Filtresiz ilk sayfa hastanenin tüm
+    yorumlarını içeriyorsa istatistikler aynı sonuçtan hesaplanır; aksi halde
+    satır taşımayan sayım sorguları kullanılır.
+
+    Returns:
+        dict: "reviews", "next_cursor" ve "statistics" (with_statistics=False ise None)
+    """
+    page = _fetch_reviews(
+        doctor_id, min_rating, max_rating, date_from, date_to, has_reply,
+        q=q, cursor=cursor, limit=page_size, request=request,
+    )
+    statistics = None
+    if with_statistics:
+        is_complete = not cursor and page["next_cursor"] is None
+        if is_complete and not q and not _has_active_filters(doctor_id, min_rating, max_rating, date_from, date_to, has_reply):
+            hospital_id = _get_active_hospital_id(request)
+            statistics = _statistics_from_reviews(page["reviews"], get_hospital_rating_summary(hospital_id))
+        else:
+            statistics = get_review_statistics(request=request)
+    page["statistics"] = statistics
+    return page
+
+
+async def aget_reviews_page(
+    doctor_id: Optional[str] = None,
+    min_rating: Optional[int] = None,
+    max_rating: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    has_reply: Optional[bool] = None,
+    q: Optional[str] = None,
+    cursor: Optional[str] = None,
+    page_size: int = DEFAULT_REVIEW_PAGE_SIZE,
+    with_statistics: bool = True,
+    request=None,
+) -> dict:
+    """`get_reviews_page`'in async karşılığı."""
+    page = await _afetch_reviews(
+        doctor_id, min_rating, max_rating, date_from, date_to, has_reply,
+        q=q, cursor=cursor, limit=page_size, request=request,
+    )
+    statistics = None
+    if with_statistics:
+        is_complete = not cursor and page["next_cursor"] is None
+        if is_complete and not q and not _has_active_filters(doctor_id, min_rating, max_rating, date_from, date_to, has_reply):
+            hospital_id = await _aget_active_hospital_id(request)
+            statistics = _statistics_from_reviews(page["reviews"], await aget_hospital_rating_summary(hospital_id))
+        else:
+            statistics = await aget_review_statistics(request=request)
+    page["statistics"] = statistics
+    return page
+
+
+def _recent_cutoff() -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=RECENT_REVIEW_DAYS)).isoformat()
+
+
+def _statistics_from_reviews(reviews: list[dict], rating_summary: dict) -> dict:
+    """Hastanenin tüm yorumlarını içeren listeden istatistik üretir."""
+    cutoff = _recent_cutoff()
+    replied_count = sum(1 for r in reviews if r.get("has_reply", False))
+    return {
+        "total_reviews": len(reviews),
+        "average_rating": round(rating_summary["average"], 1),
+        "rating_histogram": rating_summary["histogram"],
+        "replied_count": replied_count,
+        "not_replied_count": len(reviews) - replied_count,
+        "recent_count": sum(1 for r in reviews if _normalize_timestamp(r.get("createdAt", "")) >= cutoff),
+    }
+
 
-    # Tarihe göre sırala (en yeni önce)
-    result.sort(key=lambda x: x.get("createdAt", ""), reverse=True)
-    return result
+def _normalize_timestamp(value: str) -> str:
+    """"...Z" biçimindeki zaman damgasını isoformat karşılaştırması için "+00:00"a çevirir."""
+    return value.replace("Z", "+00:00") if value else ""
+
+
+def _count_query(supabase, hospital_id: str, has_reply: Optional[bool] = None, created_since: Optional[str] = None):
+    query = supabase.table("reviews").select("id", count="exact")
+    query = _apply_review_filters(query, hospital_id, has_reply=has_reply)
+    if created_since:
+        query = query.gte("created_at", created_since)
+    return query.limit(1)
+
+
+def _count_reviews(hospital_id: str, has_reply: Optional[bool] = None, created_since: Optional[str] = None) -> int:
+    """Filtreye uyan yorum sayısını satır taşımadan (count=exact) döndürür."""
+    result = _count_query(get_supabase_client(), hospital_id, has_reply, created_since).execute()
+    return result.count or 0
 
 
 def get_review_statistics(request=None) -> dict:
-    """Yorum istatistiklerini hesaplar."""
-    reviews = get_reviews_with_details(request=request)
-    ratings = _load_ratings()
+    """Yorum istatistiklerini satır çekmeden sayım sorgularıyla hesaplar."""
     hospital_id = _get_active_hospital_id(request)
-    hospital_ratings = [
-        r.get("hospital_rating", 0) or 0
-        for r in ratings
-        if str(r.get("hospital_id", "")) == hospital_id
-    ]
+    rating_summary = get_hospital_rating_summary(hospital_id)
 
-    now = datetime.now()
-    thirty_days_ago = (now - timedelta(days=30)).isoformat() + "Z"
+    total = _count_reviews(hospital_id)
+    replied_count = _count_reviews(hospital_id, has_reply=True)
 
-    recent_reviews = [
-        r for r in reviews
-        if r.get("createdAt", "") >= thirty_days_ago
-    ]
+    return {
+        "total_reviews": total,
+        "average_rating": round(rating_summary["average"], 1),
+        "rating_histogram": rating_summary["histogram"],
+        "replied_count": replied_count,
+        "not_replied_count": total - replied_count,
+        "recent_count": _count_reviews(hospital_id, created_since=_recent_cutoff()),
+    }
 
-    replied_count = sum(1 for r in reviews if r.get("has_reply", False))
-    not_replied_count = len(reviews) - replied_count
 
-    avg_rating = (
-        sum(hospital_ratings) / len(hospital_ratings)
-        if hospital_ratings else 0
+async def aget_review_statistics(request=None) -> dict:
+    """`get_review_statistics`'in async karşılığı; sayım sorguları paralel çalışır."""
+    hospital_id = await _aget_active_hospital_id(request)
+    supabase = await get_async_supabase_client()
+    rating_summary, total, replied, recent = await asyncio.gather(
+        aget_hospital_rating_summary(hospital_id),
+        _count_query(supabase, hospital_id).execute(),
+        _count_query(supabase, hospital_id, has_reply=True).execute(),
+        _count_query(supabase, hospital_id, created_since=_recent_cutoff()).execute(),
     )
-
+    total_count = total.count or 0
+    replied_count = replied.count or 0
     return {
-        "total_reviews": len(reviews),
-        "average_rating": round(avg_rating, 1),
+        "total_reviews": total_count,
+        "average_rating": round(rating_summary["average"], 1),
+        "rating_histogram": rating_summary["histogram"],
         "replied_count": replied_count,
-        "not_replied_count": not_replied_count,
-        "recent_count": len(recent_reviews),
+        "not_replied_count": total_count - replied_count,
+        "recent_count": recent.count or 0,
     }
 
 
@@ -159,6 +631,8 @@ def add_reply(review_id: str, reply_text: str) -> dict:
     if not result.data:
         raise ValueError("Yorum bulunamadı veya güncellenemedi")
     
+    data_versions.bump_rows(result.data)
+    
     return _format_review_from_db(result.data[0])
 
 
@@ -173,6 +647,8 @@ def delete_reply(review_id: str) -> dict:
     if not result.data:
         raise ValueError("Yorum bulunamadı veya güncellenemedi")
     
+    data_versions.bump_rows(result.data)
+    
     return _format_review_from_db(result.data[0])
 
 
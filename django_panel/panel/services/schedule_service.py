@@ -1,17 +1,33 @@
 from __future__ import annotations
 
+import asyncio
 from calendar import monthrange
 from datetime import date, datetime, timedelta
 
-from .supabase_client import get_supabase_client
-from .hospital_service import _get_active_hospital_id, get_hospital
-from .doctor_service import get_doctors
+from . import holiday_index
+from .supabase_client import get_async_supabase_client, get_supabase_client
+from .hospital_service import (
+    HOLIDAY_COLUMNS,
+    HOSPITAL_HOURS_COLUMNS,
+    _aget_active_hospital_id,
+    _get_active_hospital_id,
+    aget_hospital,
+    get_hospital,
+)
+from .doctor_service import DOCTOR_SCHEDULE_COLUMNS, get_doctors
+from .resilience import api_error_code, feature_missing, mark_feature_missing, resilient_execute
+
+# Müsaitlik motorunun varsayılan slot uzunluğu (dakika)
+SLOT_MINUTES = 30
+# services.duration_minutes kolonu yoksa (bkz. service_durations.sql) PostgREST'in verdiği hata kodu
+UNDEFINED_COLUMN = "42703"
+SERVICE_DURATIONS_FEATURE = "service_durations"
 
 
 def get_hospital_working_hours(request=None) -> dict:
     """Hastane çalışma saatlerini getirir."""
     try:
-        hospital = get_hospital(request)
+        hospital = get_hospital(request, columns=HOSPITAL_HOURS_COLUMNS)
         return hospital.get("workingHours", {})
     except:
         return {}
@@ -32,51 +48,123 @@ def get_doctor_working_hours(doctor_id: str | None = None) -> dict:
 
 def get_holidays_for_month(year: int, month: int, doctor_id: str | None = None, request=None) -> list[dict]:
     """Belirli bir ay için tatilleri getirir."""
-    supabase = get_supabase_client()
-    hospital_id = _get_active_hospital_id(request)
-    
-    query = supabase.table("holidays").select("*").eq("hospital_id", hospital_id)
+    first_day = date(year, month, 1)
+    last_day = date(year, month, monthrange(year, month)[1])
+    return get_holidays_between(first_day, last_day, doctor_id, request=request)
+
+
+def _holidays_query(supabase, hospital_id: str, start_date: date, end_date: date, doctor_id: str | None):
+    query = (
+        supabase.table("holidays")
+        .select(HOLIDAY_COLUMNS)
+        .eq("hospital_id", hospital_id)
+        .gte("date", start_date.isoformat())
+        .lte("date", end_date.isoformat())
+    )
     
     if doctor_id:
-        query = query.eq("doctor_id", doctor_id)
-    else:
-        query = query.is_("doctor_id", "null")
-    
-    result = query.execute()
-    
-    if not result.data:
-        return []
-    
+        return query.eq("doctor_id", doctor_id)
+    return query.is_("doctor_id", "null")
+
+
+def get_holidays_between(start_date: date, end_date: date, doctor_id: str | None = None, request=None) -> list[dict]:
+    """Tarih aralığındaki tatilleri tek sorguyla getirir."""
+    hospital_id = _get_active_hospital_id(request)
+    result = _holidays_query(get_supabase_client(), hospital_id, start_date, end_date, doctor_id).execute()
+    return _format_holidays(result.data or [])
+
+
+async def aget_holidays_between(start_date: date, end_date: date, doctor_id: str | None = None, request=None) -> list[dict]:
+    """`get_holidays_between`'in async karşılığı."""
+    hospital_id = await _aget_active_hospital_id(request)
+    supabase = await get_async_supabase_client()
+    result = await _holidays_query(supabase, hospital_id, start_date, end_date, doctor_id).execute()
+    return _format_holidays(result.data or [])
+
+
+def _format_holidays(rows: list[dict]) -> list[dict]:
     holidays = []
-    for holiday in result.data:
+    for holiday in rows:
         h_date_str = holiday.get("date")
         if h_date_str:
-            try:
-                h_date = datetime.strptime(h_date_str, "%Y-%m-%d").date()
-                if h_date.year == year and h_date.month == month:
-                    # Format dönüştür
-                    holidays.append({
-                        "id": str(holiday.get("id", "")),
-                        "hospitalId": str(holiday.get("hospital_id", "")),
-                        "doctorId": str(holiday.get("doctor_id", "")) if holiday.get("doctor_id") else None,
-                        "date": h_date_str,
-                        "reason": holiday.get("reason", ""),
-                        "isFullDay": holiday.get("is_full_day", True),
-                        "startTime": holiday.get("start_time"),
-                        "endTime": holiday.get("end_time"),
-                    })
-            except ValueError:
-                continue
+            # Format dönüştür
+            holidays.append({
+                "id": str(holiday.get("id", "")),
+                "hospitalId": str(holiday.get("hospital_id", "")),
+                "doctorId": str(holiday.get("doctor_id", "")) if holiday.get("doctor_id") else None,
+                "date": h_date_str,
+                "reason": holiday.get("reason", ""),
+                "isFullDay": holiday.get("is_full_day", True),
+                "startTime": holiday.get("start_time"),
+                "endTime": holiday.get("end_time"),
+            })
     
     return holidays
 
 
-def build_calendar_data(year: int, month: int, selected_doctor_id: str | None = None, request=None) -> dict:
-    """Takvim verilerini oluşturur."""
+def _calendar_range(year: int, month: int) -> tuple[date, date]:
+    """Takvimin ilk haftasının pazartesisi ile son haftasının pazarı."""
     first_day = date(year, month, 1)
     last_day = date(year, month, monthrange(year, month)[1])
-    start_cal = first_day - timedelta(days=first_day.weekday())
-    end_cal = last_day + timedelta(days=(6 - last_day.weekday()))
+    return first_day - timedelta(days=first_day.weekday()), last_day + timedelta(days=(6 - last_day.weekday()))
+
+
+def build_calendar_data(year: int, month: int, selected_doctor_id: str | None = None, request=None) -> dict:
+    """Takvim verilerini oluşturur."""
+    start_cal, end_cal = _calendar_range(year, month)
+    # Çalışma saatleri ve tatiller tüm takvim aralığı için bir kez yüklenir
+    return _assemble_calendar(
+        year,
+        month,
+        selected_doctor_id,
+        get_hospital_working_hours(request) or {},
+        (get_doctor_working_hours(selected_doctor_id) or {}) if selected_doctor_id else {},
+        get_holidays_between(start_cal, end_cal, selected_doctor_id, request=request),
+    )
+
+
+async def abuild_calendar_data(year: int, month: int, selected_doctor_id: str | None = None, request=None) -> dict:
+    """`build_calendar_data`'nın async karşılığı; çalışma saatleri ve tatiller paralel getirilir."""
+    start_cal, end_cal = _calendar_range(year, month)
+    hospital_working_hours, doctor_working_hours, holidays = await asyncio.gather(
+        _aget_hospital_working_hours(request),
+        _aget_doctor_working_hours(selected_doctor_id),
+        aget_holidays_between(start_cal, end_cal, selected_doctor_id, request=request),
+    )
+    return _assemble_calendar(year, month, selected_doctor_id, hospital_working_hours, doctor_working_hours, holidays)
+
+
+async def _aget_hospital_working_hours(request=None) -> dict:
+    try:
+        hospital = await aget_hospital(request, columns=HOSPITAL_HOURS_COLUMNS)
+        return hospital.get("workingHours") or {}
+    except ValueError:
+        return {}
+
+
+async def _aget_doctor_working_hours(doctor_id: str | None = None) -> dict:
+    if not doctor_id:
+        return {}
+    try:
+        supabase = await get_async_supabase_client()
+        result = await supabase.table("doctors").select("working_hours").eq("id", doctor_id).single().execute()
+        return (result.data.get("working_hours") or {}) if result.data else {}
+    except Exception:
+        return {}
+
+
+def _assemble_calendar(
+    year: int,
+    month: int,
+    selected_doctor_id: str | None,
+    hospital_working_hours: dict,
+    doctor_working_hours: dict,
+    holidays: list[dict],
+) -> dict:
+    start_cal, end_cal = _calendar_range(year, month)
+    holidays_by_date: dict[str, list[dict]] = {}
+    for holiday in holidays:
+        holidays_by_date.setdefault(holiday["date"], []).append(holiday)
     
     weeks = []
     current = start_cal
@@ -93,20 +181,16 @@ def build_calendar_data(year: int, month: int, selected_doctor_id: str | None =
                 "doctor_hours": None,
             }
             weekday_name = _get_weekday_name(current.weekday())
-            hospital_hours = get_hospital_working_hours(request).get(weekday_name, {})
+            hospital_hours = hospital_working_hours.get(weekday_name, {})
             if hospital_hours.get("isAvailable"):
                 day_data["hospital_hours"] = f"{hospital_hours.get('start')} - {hospital_hours.get('end')}"
             
             if selected_doctor_id:
-                doctor_hours = get_doctor_working_hours(selected_doctor_id).get(weekday_name, {})
+                doctor_hours = doctor_working_hours.get(weekday_name, {})
                 if doctor_hours.get("isAvailable"):
                     day_data["doctor_hours"] = f"{doctor_hours.get('start')} - {doctor_hours.get('end')}"
             
-            month_holidays = get_holidays_for_month(current.year, current.month, selected_doctor_id, request=request)
-            day_holidays = [
-                h for h in month_holidays 
-                if datetime.strptime(h["date"], "%Y-%m-%d").date() == current
-            ]
+            day_holidays = holidays_by_date.get(current.isoformat(), [])
             day_data["holidays"] = day_holidays
             
             # Tüm gün tatil kontrolü
@@ -153,7 +237,7 @@ def get_day_details(day_date: date, doctor_id: str | None = None, request=None)
     hospital_id = _get_active_hospital_id(request)
     day_str = day_date.isoformat()
     
-    query = supabase.table("holidays").select("*").eq("hospital_id", hospital_id).eq("date", day_str)
+    query = supabase.table("holidays").select(HOLIDAY_COLUMNS).eq("hospital_id", hospital_id).eq("date", day_str)
     
     if doctor_id:
         query = query.eq("doctor_id", doctor_id)
@@ -191,7 +275,7 @@ def get_day_details(day_date: date, doctor_id: str | None = None, request=None)
     # Çalışan doktorları getir
     doctors_working = []
     if not doctor_id:
-        doctors = get_doctors()
+        doctors = get_doctors(columns=DOCTOR_SCHEDULE_COLUMNS)
         for doctor in doctors:
             doc_hours = doctor.get("workingHours", {}).get(weekday_name, {})
             if doc_hours.get("isAvailable"):
@@ -208,3 +292,206 @@ def get_day_details(day_date: date, doctor_id: str | None = None, request=None)
         "holidays": holidays,
         "doctors_working": doctors_working,
     }
+
+
+# ---------------------------------------------------------------------------
+# Müsaitlik motoru
+#
+# Her doktor-günü, günün slotlarını temsil eden bir bitmap (int) olarak tutulur:
+# i. bit, i * slot_minutes dakikasında başlayan slotun açık olduğunu gösterir.
+# Hastane saatleri, doktor saatleri, tatiller ve dolu randevular bitwise
+# işlemlerle kesiştirilir; tarih aralığı için her kaynak tek sorguyla yüklenir.
+# ---------------------------------------------------------------------------
+
+
+def _hours_mask(day_hours: dict | None, slot_minutes: int) -> int:
+    """Çalışma saatleri içine tamamen sığan slotların bitmap'ini döndürür."""
+    if not day_hours or not day_hours.get("isAvailable"):
+        return 0
+    start = holiday_index.parse_minutes(day_hours.get("start"))
+    end = holiday_index.parse_minutes(day_hours.get("end"))
+    if start is None or end is None or end <= start:
+        return 0
+    first_slot = -(-start // slot_minutes)  # yukarı yuvarla
+    last_slot = (end - slot_minutes) // slot_minutes
+    if last_slot < first_slot:
+        return 0
+    return ((1 << (last_slot - first_slot + 1)) - 1) << first_slot
+
+
+def _intervals_mask(intervals: list[tuple[int, int]], slot_minutes: int) -> int:
+    """Başlangıç dakikası tatil aralığına düşen slotların bitmap'ini döndürür.
+
+    is_appointment_time_blocked ile aynı şekilde aralık uçları dahildir.
+    """
+    mask = 0
+    for start, end in intervals:
+        first_slot = -(-start // slot_minutes)
+        last_slot = end // slot_minutes
+        if last_slot >= first_slot:
+            mask |= ((1 << (last_slot - first_slot + 1)) - 1) << first_slot
+    return mask
+
+
+def _mask_to_times(mask: int, slot_minutes: int) -> list[str]:
+    times = []
+    while mask:
+        low_bit = mask & -mask
+        minute = (low_bit.bit_length() - 1) * slot_minutes
+        times.append(f"{minute // 60:02d}:{minute % 60:02d}")
+        mask ^= low_bit
+    return times
+
+
+def _service_durations(service_ids: set[str]) -> dict[str, int]:
+    """Hizmetlerin süresini (dakika) döndürür; süresi tanımlı olmayanlar dönmez."""
+    if not service_ids or feature_missing(SERVICE_DURATIONS_FEATURE):
+        return {}
+    supabase = get_supabase_client()
+    try:
+        result = resilient_execute(
+            supabase.table("services").select("id,duration_minutes").in_("id", sorted(service_ids))
+        )
+    except Exception as exc:
+        if api_error_code(exc) != UNDEFINED_COLUMN:
+            raise
+        mark_feature_missing(SERVICE_DURATIONS_FEATURE)
+        return {}
+    return {
+        str(row["id"]): int(row["duration_minutes"])
+        for row in result.data or []
+        if row.get("duration_minutes")
+    }
+
+
+def _load_booked_masks(
+    hospital_id: str,
+    start_date: date,
+    end_date: date,
+    doctor_ids: list[str] | None,
+    slot_minutes: int,
+) -> dict[tuple[str, str], int]:
+    """İptal edilmemiş randevuları (doktor, gün) -> dolu slot bitmap'i olarak döndürür.
+
+    Randevu, hizmetinin süresi boyunca çakıştığı tüm slotları doldurur; süresi
+    tanımlı olmayan hizmetler bir slot uzunluğunda sayılır.
+    """
+    supabase = get_supabase_client()
+    query = (
+        supabase.table("appointments")
+        .select("doctor_id,service_id,date,time")
+        .eq("hospital_id", hospital_id)
+        .neq("status", "cancelled")
+        .gte("date", start_date.isoformat())
+        .lte("date", end_date.isoformat())
+    )
+    if doctor_ids:
+        query = query.in_("doctor_id", doctor_ids)
+    appointments = query.execute().data or []
+    durations = _service_durations({str(a["service_id"]) for a in appointments if a.get("service_id")})
+
+    booked: dict[tuple[str, str], int] = {}
+    for apt in appointments:
+        minute = holiday_index.parse_minutes(apt.get("time"))
+        if minute is None:
+            continue
+        duration = durations.get(str(apt.get("service_id", "")), slot_minutes)
+        first_slot = minute // slot_minutes
+        last_slot = (minute + duration - 1) // slot_minutes
+        key = (str(apt.get("doctor_id", "")), apt.get("date", ""))
+        booked[key] = booked.get(key, 0) | (((1 << (last_slot - first_slot + 1)) - 1) << first_slot)
+    return booked
+
+
+def build_availability_bitmaps(
+    start_date: date,
+    end_date: date,
+    doctor_ids: list[str] | None = None,
+    slot_minutes: int = SLOT_MINUTES,
+    request=None,
+) -> dict[str, dict[str, int]]:
+    """Doktorların tarih aralığındaki boş slotlarını bitmap olarak hesaplar.
+
+    Returns:
+        {doctor_id: {"YYYY-MM-DD": bitmap}} - sadece boş slotu olan günler döner
+    """
+    if end_date < start_date:
+        return {}
+
+    hospital_id = _get_active_hospital_id(request)
+    hospital_hours = get_hospital_working_hours(request) or {}
+    doctors = [d for d in get_doctors(request, columns=DOCTOR_SCHEDULE_COLUMNS) if d.get("isActive", True)]
+    if doctor_ids:
+        wanted = {str(doctor_id) for doctor_id in doctor_ids}
+        doctors = [d for d in doctors if d["id"] in wanted]
+    if not doctors:
+        return {}
+
+    holidays = holiday_index.get_holiday_index(hospital_id, start_date, end_date)
+    booked = _load_booked_masks(hospital_id, start_date, end_date, [d["id"] for d in doctors], slot_minutes)
+
+    hospital_week = {
+        name: _hours_mask(hospital_hours.get(name), slot_minutes)
+        for name in map(_get_weekday_name, range(7))
+    }
+
+    # Geçmiş slotlar randevuya açık değildir
+    now = datetime.now()
+    today = now.date()
+    past_today_mask = (1 << (-(-(now.hour * 60 + now.minute) // slot_minutes))) - 1
+
+    days = []
+    current = start_date
+    while current <= end_date:
+        if current >= today:
+            day_str = current.isoformat()
+            weekday_name = _get_weekday_name(current.weekday())
+            open_mask = hospital_week[weekday_name] & ~_intervals_mask(holidays.intervals_for(day_str), slot_minutes)
+            if current == today:
+                open_mask &= ~past_today_mask
+            days.append((day_str, weekday_name, open_mask))
+        current += timedelta(days=1)
+
+    availability: dict[str, dict[str, int]] = {}
+    for doctor in doctors:
+        doctor_id = doctor["id"]
+        doctor_hours = doctor.get("workingHours") or {}
+        doctor_week = {
+            name: _hours_mask(doctor_hours.get(name), slot_minutes)
+            for name in hospital_week
+        }
+        doctor_days = {}
+        for day_str, weekday_name, open_mask in days:
+            mask = open_mask & doctor_week[weekday_name]
+            if not mask:
+                continue
+            doctor_holidays = holidays.intervals_for(day_str, doctor_id)
+            if doctor_holidays:
+                mask &= ~_intervals_mask(doctor_holidays, slot_minutes)
+            mask &= ~booked.get((doctor_id, day_str), 0)
+            if mask:
+                doctor_days[day_str] = mask
+        availability[doctor_id] = doctor_days
+    return availability
+
+
+def get_free_slots(
+    start_date: date,
+    end_date: date,
+    doctor_ids: list[str] | None = None,
+    slot_minutes: int = SLOT_MINUTES,
+    request=None,
+) -> dict[str, dict[str, list[str]]]:
+    """Doktorların tarih aralığındaki boş slot saatlerini döndürür.
+
+    Returns:
+        {doctor_id: {"YYYY-MM-DD": ["09:00", "09:30", ...]}}
+    """
+    bitmaps = build_availability_bitmaps(start_date, end_date, doctor_ids, slot_minutes, request=request)
+    return {
+        doctor_id: {
+            day_str: _mask_to_times(mask, slot_minutes)
+            for day_str, mask in days.items()
+        }
+        for doctor_id, days in bitmaps.items()
+    }
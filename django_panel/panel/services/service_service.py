@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-from .supabase_client import get_supabase_client
+from . import data_versions
+from .hospital_service import SERVICE_COLUMNS, services_cache
+from .supabase_client import get_supabase_client, iter_rows
 
 
-def get_services() -> list[dict]:
-    """Tüm hizmetleri Supabase'den getirir."""
-    supabase = get_supabase_client()
-    result = supabase.table("services").select("*").execute()
-    return result.data if result.data else []
+def get_services(columns: str = SERVICE_COLUMNS) -> list[dict]:
+    """Tüm hizmetleri getirir (süreli önbellekten; dönen liste değiştirilmemelidir)."""
+    return services_cache.get(columns)
 
 
 def add_service(data: dict) -> dict:
@@ -23,6 +23,8 @@ def add_service(data: dict) -> dict:
     if not result.data:
         raise ValueError("Hizmet eklenemedi")
     
+    services_cache.invalidate()
+    
     return result.data[0]
 
 
@@ -39,6 +41,8 @@ def update_service(service_id: str, data: dict) -> dict:
     if not result.data:
         raise ValueError("Hizmet bulunamadı veya güncellenemedi")
     
+    services_cache.invalidate()
+    
     return result.data[0]
 
 
@@ -49,10 +53,13 @@ def delete_service(service_id: str) -> None:
     # Doktorlardan ve hastanelerden hizmeti kaldır
     _remove_service_from_doctors(service_id)
     _remove_service_from_hospitals(service_id)
+    data_versions.bump(data_versions.GLOBAL_SCOPE)
     
     # Hizmeti sil
     result = supabase.table("services").delete().eq("id", service_id).execute()
     
+    services_cache.invalidate()
+    
     if not result.data:
         raise ValueError("Hizmet bulunamadı veya silinemedi")
 
@@ -61,13 +68,8 @@ def update_doctor_assignments(service_id: str, doctor_ids: list[str]) -> None:
     """Doktorlara hizmet ataması yapar."""
     supabase = get_supabase_client()
     
-    # Tüm doktorları getir
-    all_doctors = supabase.table("doctors").select("id,services").execute()
-    
-    if not all_doctors.data:
-        return
-    
-    for doctor in all_doctors.data:
+    # Tüm doktorları sayfa sayfa dolaş (satır limitine takılmadan hepsi güncellenir)
+    for doctor in iter_rows(lambda: supabase.table("doctors").select("id,services")):
         services = set(doctor.get("services", []))
         doctor_id = str(doctor.get("id", ""))
         
@@ -78,19 +80,17 @@ def update_doctor_assignments(service_id: str, doctor_ids: list[str]) -> None:
         
         # Güncelle
         supabase.table("doctors").update({"services": list(services)}).eq("id", doctor_id).execute()
+    
+    # Birden fazla hastanenin kaydı değişti
+    data_versions.bump(data_versions.GLOBAL_SCOPE)
 
 
 def update_hospital_assignments(service_id: str, hospital_ids: list[str]) -> None:
     """Hastanelere hizmet ataması yapar."""
     supabase = get_supabase_client()
     
-    # Tüm hastaneleri getir
-    all_hospitals = supabase.table("hospitals").select("id,services").execute()
-    
-    if not all_hospitals.data:
-        return
-    
-    for hospital in all_hospitals.data:
+    # Tüm hastaneleri sayfa sayfa dolaş (satır limitine takılmadan hepsi güncellenir)
+    for hospital in iter_rows(lambda: supabase.table("hospitals").select("id,services")):
         services = set(hospital.get("services", []))
         hospital_id = str(hospital.get("id", ""))
         
@@ -101,19 +101,17 @@ def update_hospital_assignments(service_id: str, hospital_ids: list[str]) -> Non
         
         # Güncelle
         supabase.table("hospitals").update({"services": list(services)}).eq("id", hospital_id).execute()
+    
+    # Birden fazla hastanenin kaydı değişti
+    data_versions.bump(data_versions.GLOBAL_SCOPE)
 
 
 def _remove_service_from_doctors(service_id: str) -> None:
     """Doktorlardan hizmeti kaldırır."""
     supabase = get_supabase_client()
     
-    # Tüm doktorları getir
-    all_doctors = supabase.table("doctors").select("id,services").execute()
-    
-    if not all_doctors.data:
-        return
-    
-    for doctor in all_doctors.data:
+    # Tüm doktorları sayfa sayfa dolaş (satır limitine takılmadan hepsi güncellenir)
+    for doctor in iter_rows(lambda: supabase.table("doctors").select("id,services")):
         services = set(doctor.get("services", []))
         services.discard(service_id)
         
@@ -125,13 +123,8 @@ def _remove_service_from_hospitals(service_id: str) -> None:
     """Hastanelerden hizmeti kaldırır."""
     supabase = get_supabase_client()
     
-    # Tüm hastaneleri getir
-    all_hospitals = supabase.table("hospitals").select("id,services").execute()
-    
-    if not all_hospitals.data:
-        return
-    
-    for hospital in all_hospitals.data:
+    # Tüm hastaneleri sayfa sayfa dolaş (satır limitine takılmadan hepsi güncellenir)
+    for hospital in iter_rows(lambda: supabase.table("hospitals").select("id,services")):
         services = set(hospital.get("services", []))
         services.discard(service_id)
         
@@ -9,7 +9,7 @@ from django.conf import settings
 from django.http import HttpResponse
 
 from .json_repository import load_json, save_json
-from .hospital_service import get_hospitals
+from . import hospital_service
 
 
 def get_settings() -> dict:
@@ -120,7 +120,6 @@ def export_data_as_json() -> bytes:
 
 
 def get_hospital_choices() -> list[tuple[str, str]]:
-    """Hastane seçim listesi oluşturur."""
-    hospitals = get_hospitals()
-    return [(h["id"], h["name"]) for h in hospitals]
+    """Hastane seçim listesi oluşturur (sadece id ve ad, süreli önbellekten)."""
+    return hospital_service.get_hospital_choices()
 
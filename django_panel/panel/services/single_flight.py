@@ -0,0 +1,228 @@
+"""Aynı anda yapılan özdeş Supabase okumalarını birleştiren katman.
+
+Aynı tablo, filtre ve projeksiyonla eşzamanlı gelen sorgulardan yalnızca biri
+Supabase'e gider; diğer thread'ler onun sonucunu bekleyip paylaşır. İsteğe
+bağlı kısa bir TTL ile, istek bitiminden hemen sonra gelen aynı sorgular da
+tekrar gönderilmez (dashboard açılışlarındaki ani yığılmalar için).
+Async view'lerde aynı işi `coalesced_aexecute` event loop içinde yapar.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import logging
+import time
+import weakref
+from threading import Event, Lock
+from typing import Any, Optional
+
+from django.conf import settings
+
+from . import request_context
+
+logger = logging.getLogger(__name__)
+
+# Kısa süreli sonuç önbelleğinin üst sınırı (aşıldığında süresi dolanlar temizlenir)
+_MAX_RECENT = 256
+
+_lock = Lock()
+_inflight: dict[tuple, "_Call"] = {}
+_recent: dict[tuple, tuple[float, Any]] = {}
+# event loop -> {anahtar: asyncio.Future}
+_ainflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+# Anahtar üretilemeyen sorgu tipi için uyarı bir kez yazılır
+_unkeyed_warned = False
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+def _default_ttl() -> float:
+    return float(getattr(settings, "SUPABASE_SINGLE_FLIGHT_TTL", 0.0) or 0.0)
+
+
+def request_config(query):
+    """Sorgunun HTTP isteği alanlarını (http_method, path, params, headers) taşıyan nesne.
+
+    postgrest-py 2.x bu alanları `query.request` altında tutar; eski sürümlerde
+    sorgu nesnesinin kendisindedir.
+    """
+    request = getattr(query, "request", None)
+    if request is not None and hasattr(request, "params"):
+        return request
+    return query
+
+
+def query_key(query) -> Optional[tuple]:
+    """PostgREST sorgusunun method, path, parametre ve başlıklarından anahtar üretir.
+
+    Sorgu nesnesi beklenen alanları taşımıyorsa None döner (birleştirme yapılmaz)
+    ve bu durum process başına bir kez loglanır.
+    """
+    request = request_config(query)
+    try:
+        params = request.params
+        headers = request.headers
+        items = params.multi_items() if hasattr(params, "multi_items") else list(params.items())
+        return (
+            str(request.http_method).upper(),
+            str(request.path),
+            tuple(sorted((str(k), str(v)) for k, v in items)),
+            headers.get("Accept", ""),
+            headers.get("Prefer", ""),
+        )
+    except AttributeError:
+        _warn_unkeyed(query)
+        return None
+
+
+def _warn_unkeyed(query) -> None:
+    global _unkeyed_warned
+    if _unkeyed_warned:
+        return
+    _unkeyed_warned = True
+    logger.warning(
+        "Supabase sorgusundan anahtar üretilemedi (%s); eşzamanlı okumalar birleştirilmiyor. "
+        "postgrest sürümünün istek alanları değişmiş olabilir.",
+        type(query).__name__,
+    )
+
+
+def coalesced_execute(query, ttl: Optional[float] = None):
+    """Sorguyu çalıştırır; aynı sorgu zaten çalışıyorsa onun sonucunu bekler.
+
+    Sadece okuma (GET) sorgularında kullanılmalıdır. Bekleyen çağıranlara ve
+    TTL içindeki tekrarlara sonucun kopyası verilir; böylece bir çağıranın
+    satırlar üzerinde yaptığı değişiklik diğerlerini etkilemez.
+    """
+    key = query_key(query)
+    if key is None or key[0] != "GET":
+        return query.execute()
+
+    ttl = _default_ttl() if ttl is None else ttl
+    with _lock:
+        if ttl > 0:
+            cached = _recent.get(key)
+            if cached and cached[0] > time.monotonic():
+                request_context.note_cache("single_flight", True)
+                return copy.deepcopy(cached[1])
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _Call()
+            _inflight[key] = call
+
+    if not leader:
+        request_context.note_cache("single_flight", True)
+        call.event.wait()
+        if call.error is not None:
+            raise call.error
+        return copy.deepcopy(call.result)
+
+    try:
+        call.result = query.execute()
+    except BaseException as exc:
+        call.error = exc
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+            if ttl > 0 and call.error is None:
+                _remember(key, call.result, ttl)
+        call.event.set()
+    return call.result
+
+
+def _cached(key: tuple, ttl: float):
+    if ttl <= 0:
+        return None
+    with _lock:
+        cached = _recent.get(key)
+        if cached and cached[0] > time.monotonic():
+            return copy.deepcopy(cached[1])
+    return None
+
+
+async def coalesced_aexecute(query, ttl: Optional[float] = None):
+    """`coalesced_execute`'un async karşılığı; sorgu async client'tan gelmelidir.
+
+    Aynı event loop içindeki özdeş sorgular tek bir `execute()` sonucunu paylaşır.
+    """
+    key = query_key(query)
+    if key is None or key[0] != "GET":
+        return await query.execute()
+
+    ttl = _default_ttl() if ttl is None else ttl
+    cached = _cached(key, ttl)
+    if cached is not None:
+        request_context.note_cache("single_flight", True)
+        return cached
+
+    loop = asyncio.get_running_loop()
+    inflight = _ainflight.setdefault(loop, {})
+    future = inflight.get(key)
+    if future is not None:
+        request_context.note_cache("single_flight", True)
+        try:
+            # shield: bekleyenlerden biri iptal edilirse ortak sorgu iptal olmasın
+            return copy.deepcopy(await asyncio.shield(future))
+        except asyncio.CancelledError:
+            # Lider (ör. süre bütçesi biten istek) vazgeçtiyse sorgu bu bekleyen için yeniden yapılır
+            if not future.cancelled() or asyncio.current_task().cancelling():
+                raise
+            return await coalesced_aexecute(query, ttl)
+
+    future = loop.create_future()
+    inflight[key] = future
+    try:
+        result = await query.execute()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as exc:
+        future.set_exception(exc)
+        # Bekleyen yoksa "exception never retrieved" uyarısı çıkmasın
+        future.exception()
+        raise
+    else:
+        future.set_result(result)
+        if ttl > 0:
+            with _lock:
+                _remember(key, result, ttl)
+        return result
+    finally:
+        inflight.pop(key, None)
+
+
+def _remember(key: tuple, result, ttl: float) -> None:
+    now = time.monotonic()
+    if len(_recent) >= _MAX_RECENT:
+        for stale_key in [k for k, (expires, _) in _recent.items() if expires <= now]:
+            del _recent[stale_key]
+        if len(_recent) >= _MAX_RECENT:
+            _recent.clear()
+    _recent[key] = (now + ttl, copy.deepcopy(result))
+
+
+def forget(table: Optional[str] = None) -> None:
+    """Kısa süreli sonuçları temizler (tablo verilirse sadece o tabloya ait olanları).
+
+    Paylaşılan HTTP transport'u her PostgREST yazmasında bunu çağırır; böylece
+    yazmadan hemen sonraki okuma TTL içinde bile güncel veriyi görür.
+    """
+    with _lock:
+        if not _recent:
+            return
+        if table is None:
+            _recent.clear()
+            return
+        suffix = f"/{table}"
+        for key in [k for k in _recent if k[1].endswith(suffix)]:
+            del _recent[key]
@@ -0,0 +1,188 @@
+"""Yavaş istek kayıtları.
+
+Süresi SLOW_REQUEST_MS değerini aşan her istek; URL, hastane, GET
+filtreleri, filtreleriyle birlikte tüm Supabase çağrıları, önbellek
+isabetleri ve render süresiyle kaydedilir. Kayıtlar aynı makinedeki tüm
+worker'ların ve yönetim komutlarının okuyabildiği bir SQLite dosyasında
+tutulur; en yeni SLOW_REQUEST_LIMIT kayıt saklanır, eskiler silinir.
+
+Dosyaya erişilemezse kayıt atlanır; istek etkilenmez.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+
+from .query_counter import QueryLog
+from .request_context import RequestState
+from .sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+
+def threshold_ms() -> int:
+    """Kayıt eşiği (ms); 0 ise kayıt kapalıdır."""
+    return int(getattr(settings, "SLOW_REQUEST_MS", 0) or 0)
+
+
+def _db_path() -> str:
+    return str(getattr(settings, "SLOW_REQUEST_DB", settings.BASE_DIR / "slow_requests.sqlite3"))
+
+
+def _limit() -> int:
+    return max(int(getattr(settings, "SLOW_REQUEST_LIMIT", 200)), 1)
+
+
+_store = SQLiteStore(
+    _db_path,
+    "CREATE TABLE IF NOT EXISTS slow_requests ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+    "created_at TEXT NOT NULL, "
+    "method TEXT NOT NULL, "
+    "path TEXT NOT NULL, "
+    "view TEXT, "
+    "hospital_id TEXT, "
+    "status INTEGER, "
+    "duration_ms REAL NOT NULL, "
+    "details TEXT NOT NULL)",
+    "Yavaş istek",
+)
+
+
+def _connection() -> Optional[sqlite3.Connection]:
+    return _store.connection()
+
+
+def build_details(request, log: QueryLog, state: Optional[RequestState]) -> dict:
+    """İsteğin filtre, Supabase çağrısı, önbellek ve aşama sürelerini toplar."""
+    state_fields = {}
+    if state is not None:
+        state_fields = {
+            "cache_hits": dict(state.cache_hits),
+            "cache_misses": dict(state.cache_misses),
+            "stale_endpoints": sorted(state.stale_endpoints),
+            "timings_ms": {phase: round(value * 1000, 1) for phase, value in state.timings.items()},
+        }
+    return {
+        "query": {key: values if len(values) > 1 else values[0] for key, values in request.GET.lists()},
+        "supabase": {
+            "count": log.count,
+            "duration_ms": round(log.duration * 1000, 1),
+            "by_api": log.by_api(),
+            "n_plus_one": log.n_plus_one(),
+            "calls": [
+                {
+                    "call": record.identity,
+                    "target": record.target,
+                    "status": record.status,
+                    "duration_ms": round(record.duration * 1000, 1),
+                }
+                for record in log.records
+            ],
+        },
+        **state_fields,
+    }
+
+
+def capture(
+    *,
+    method: str,
+    path: str,
+    view: str,
+    hospital_id: Optional[str],
+    status: Optional[int],
+    duration_ms: float,
+    details: dict,
+) -> None:
+    """Yavaş isteği kaydeder ve en yeni SLOW_REQUEST_LIMIT kaydı bırakır."""
+    conn = _connection()
+    if conn is None:
+        return
+    try:
+        cursor = conn.execute(
+            "INSERT INTO slow_requests (created_at, method, path, view, hospital_id, status, duration_ms, details) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                datetime.now().isoformat(timespec="seconds"),
+                method,
+                path,
+                view,
+                hospital_id,
+                status,
+                round(duration_ms, 1),
+                json.dumps(details, ensure_ascii=False, default=str),
+            ),
+        )
+        conn.execute("DELETE FROM slow_requests WHERE id <= ?", (cursor.lastrowid - _limit(),))
+    except sqlite3.Error as exc:
+        logger.warning("Yavaş istek kaydedilemedi: %s", exc)
+
+
+def _row_to_entry(row) -> dict:
+    return {
+        "id": row[0],
+        "created_at": row[1],
+        "method": row[2],
+        "path": row[3],
+        "view": row[4],
+        "hospital_id": row[5],
+        "status": row[6],
+        "duration_ms": row[7],
+        "details": json.loads(row[8]),
+    }
+
+
+def list_entries(
+    limit: int = 100,
+    min_ms: float = 0,
+    hospital_id: Optional[str] = None,
+    view: Optional[str] = None,
+) -> list[dict]:
+    """Kayıtları en yeni önce döndürür."""
+    conn = _connection()
+    if conn is None:
+        return []
+    sql = "SELECT id, created_at, method, path, view, hospital_id, status, duration_ms, details FROM slow_requests WHERE duration_ms >= ?"
+    params: list = [min_ms]
+    if hospital_id:
+        sql += " AND hospital_id = ?"
+        params.append(str(hospital_id))
+    if view:
+        sql += " AND view = ?"
+        params.append(view)
+    sql += " ORDER BY id DESC LIMIT ?"
+    params.append(limit)
+    try:
+        return [_row_to_entry(row) for row in conn.execute(sql, params).fetchall()]
+    except sqlite3.Error as exc:
+        logger.warning("Yavaş istekler okunamadı: %s", exc)
+        return []
+
+
+def get_entry(entry_id: int) -> Optional[dict]:
+    conn = _connection()
+    if conn is None:
+        return None
+    try:
+        row = conn.execute(
+            "SELECT id, created_at, method, path, view, hospital_id, status, duration_ms, details FROM slow_requests WHERE id = ?",
+            (entry_id,),
+        ).fetchone()
+    except sqlite3.Error as exc:
+        logger.warning("Yavaş istek okunamadı: %s", exc)
+        return None
+    return _row_to_entry(row) if row else None
+
+
+def clear() -> int:
+    """Tüm kayıtları siler; silinen kayıt sayısını döndürür."""
+    conn = _connection()
+    if conn is None:
+        return 0
+    return conn.execute("DELETE FROM slow_requests").rowcount
@@ -0,0 +1,64 @@
+"""Worker'ların paylaştığı küçük SQLite dosyaları için bağlantı yardımcısı.
+
+Veri sürümleri (bkz. data_versions) ve yavaş istek kayıtları (bkz.
+slow_requests) aynı makinedeki tüm worker'ların ve yönetim komutlarının
+okuyup yazdığı SQLite dosyalarında tutulur. Her ikisi de thread başına bir
+bağlantı, WAL modu ve ilk açılışta şema kurulumu gerektirir; bu modül o
+ortak kısmı üstlenir.
+
+Bağlantılar dosya yoluna göre tutulur: ayar değiştiğinde (ör. testlerde
+override_settings ile geçici dosya) yeni dosya açılır ve şeması kurulur.
+Dosya açılamazsa `connection` None döndürür; çağıran taraf bu durumda
+SQLite'sız devam eder.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Kilitli dosyada yazma için beklenecek en uzun süre (saniye)
+BUSY_TIMEOUT_SECONDS = 2.0
+
+
+class SQLiteStore:
+    """Yolu ayardan okunan, thread başına bağlantı açan SQLite dosyası."""
+
+    def __init__(self, path: Callable[[], str], schema: str, label: str):
+        self._path = path
+        self.schema = schema
+        self.label = label
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Şeması bu process'te kurulmuş dosya yolları
+        self._ready: set[str] = set()
+
+    @property
+    def path(self) -> str:
+        return str(self._path())
+
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """Thread başına (ve dosya başına) bir SQLite bağlantısı döndürür."""
+        path = self.path
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get(path)
+        if conn is not None:
+            return conn
+        try:
+            conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            if path not in self._ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(self.schema)
+                with self._lock:
+                    self._ready.add(path)
+        except sqlite3.Error as exc:
+            logger.warning("%s dosyası açılamadı (%s): %s", self.label, path, exc)
+            return None
+        connections[path] = conn
+        return conn
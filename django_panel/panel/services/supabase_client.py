@@ -2,12 +2,41 @@
 
 from __future__ import annotations
 
+import asyncio
+import copy
 import os
-from typing import Optional
+import weakref
+from typing import Any, Callable, Iterator, Optional
 
-from supabase import create_client, Client
+from postgrest._sync import request_builder as sync_request_builder
+from supabase import AsyncClient, AsyncClientOptions, ClientOptions, acreate_client, create_client, Client
 from django.conf import settings
 
+from . import fake_supabase
+from .http_transport import build_async_http_client, build_http_client
+
+
+def build_client_options(**kwargs) -> ClientOptions:
+    """Paylaşılan HTTP havuzunu kullanan ClientOptions döndürür.
+
+    Her Supabase client'ı havuzu paylaşan kendi httpx client'ını alır; böylece
+    bir client'ın header / base_url ayarı diğerininkini ezmez. `httpx_client`
+    seçeneğini desteklemeyen eski supabase sürümlerinde client kendi
+    bağlantılarını kurar.
+    """
+    try:
+        return ClientOptions(httpx_client=build_http_client(), **kwargs)
+    except TypeError:
+        return ClientOptions(**kwargs)
+
+
+def build_async_client_options(**kwargs) -> AsyncClientOptions:
+    """Event loop'un havuzunu kullanan kendi httpx.AsyncClient'ıyla AsyncClientOptions döndürür."""
+    try:
+        return AsyncClientOptions(httpx_client=build_async_http_client(), **kwargs)
+    except TypeError:
+        return AsyncClientOptions(**kwargs)
+
 
 class SupabaseClient:
     """Supabase client singleton sınıfı.
@@ -49,7 +78,7 @@ class SupabaseClient:
             )
         
         try:
-            self._client = create_client(supabase_url, supabase_key)
+            self._client = create_client(supabase_url, supabase_key, options=build_client_options())
         except Exception as e:
             raise ConnectionError(
                 f"Supabase client oluşturulamadı: {str(e)}. "
@@ -88,8 +117,120 @@ def get_supabase_client() -> Client:
         result = supabase.table('hospitals').select('*').execute()
     
     Returns:
-        Client: Supabase client instance
+        Client: Supabase client instance (SUPABASE_BACKEND=fake ise bellek içi sahte client)
     """
+    if fake_supabase.is_enabled():
+        return fake_supabase.get_client()
     client_manager = SupabaseClient()
     return client_manager.get_client()
 
+
+# event loop -> AsyncClient; async client'lar oluşturuldukları loop'a bağlıdır
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+async def get_async_supabase_client() -> AsyncClient:
+    """Çalışan event loop için async Supabase client'ı döndürür (async view'ler için).
+
+    Sorgu oluşturma API'si sync client ile aynıdır; sadece `execute()` await edilir.
+
+    Raises:
+        ValueError: Supabase ayarları eksikse
+        ConnectionError: Client oluşturulamadıysa
+    """
+    if fake_supabase.is_enabled():
+        return fake_supabase.get_async_client()
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is not None:
+        return client
+
+    supabase_url = getattr(settings, 'SUPABASE_URL', None)
+    supabase_key = getattr(settings, 'SUPABASE_SERVICE_ROLE_KEY', None)
+    if not supabase_url or not supabase_key:
+        raise ValueError("SUPABASE_URL veya SUPABASE_SERVICE_ROLE_KEY ayarı bulunamadı.")
+    try:
+        client = await acreate_client(supabase_url, supabase_key, options=build_async_client_options())
+    except Exception as e:
+        raise ConnectionError(f"Async Supabase client oluşturulamadı: {str(e)}") from e
+    return _async_clients.setdefault(loop, client)
+
+
+def sync_query(query):
+    """Async client'tan gelen sorgunun aynı isteği sync client ile yapan kopyası.
+
+    Event loop'tan bağımsız çalışması gereken işler (ör. arka plan yenilemesi)
+    sync okuma havuzunda çalışır; WSGI altında isteğin event loop'u view
+    döndüğünde kapanır. Sync sorgular olduğu gibi döner.
+    """
+    if fake_supabase.is_enabled():
+        return query.as_sync()
+    name = type(query).__name__
+    if not name.startswith("Async"):
+        return query
+    builder = getattr(sync_request_builder, "Sync" + name[len("Async"):])
+    request = copy.copy(query.request)
+    request.session = get_supabase_client().postgrest.session
+    return builder(request)
+
+
+# Supabase'de PostgREST max-rows varsayılanı 1000'dir; sayfa boyutu bunu aşmamalı
+DEFAULT_PAGE_SIZE = 1000
+
+
+def iter_row_pages(
+    build_query: Callable[[], Any],
+    page_size: int = DEFAULT_PAGE_SIZE,
+    key: Optional[str] = "id",
+) -> Iterator[list[dict]]:
+    """Tabloyu sayfa sayfa okuyan generator; her adımda bir sayfalık satır listesi verir.
+
+    build_query her çağrıldığında filtrelenmiş yeni bir sorgu (select dahil)
+    döndürmelidir. key verilirse keyset sayfalama yapılır (`key > son değer`,
+    key'e göre sıralı); select'te key kolonu bulunmalıdır. key=None ise
+    `range()` ile offset sayfalama yapılır, bu durumda sorgu kendi sıralamasını
+    belirlemelidir.
+
+    Bir sonraki sayfa ancak tüketici önceki sayfayı işleyip devam ettiğinde
+    istenir; böylece bellekte en fazla bir sayfa tutulur. Projenin max-rows
+    ayarı page_size'dan küçükse sayfalar kısa gelir; bu yüzden okuma kısa
+    sayfada değil, boş sayfa geldiğinde biter.
+    """
+    if page_size <= 0:
+        raise ValueError("Sayfa boyutu pozitif olmalıdır")
+
+    last_key = None
+    offset = 0
+    while True:
+        query = build_query()
+        if key:
+            if last_key is not None:
+                query = query.gt(key, last_key)
+            query = query.order(key).limit(page_size)
+        else:
+            query = query.range(offset, offset + page_size - 1)
+
+        rows = query.execute().data or []
+        if not rows:
+            return
+        yield rows
+
+        if key:
+            last_key = rows[-1][key]
+        else:
+            offset += len(rows)
+
+
+def iter_rows(
+    build_query: Callable[[], Any],
+    page_size: int = DEFAULT_PAGE_SIZE,
+    key: Optional[str] = "id",
+) -> Iterator[dict]:
+    """Tablodaki satırları tek tek veren generator (bkz. iter_row_pages).
+
+    Usage:
+        for row in iter_rows(lambda: supabase.table("appointments").select("id,user_id")):
+            ...
+    """
+    for page in iter_row_pages(build_query, page_size=page_size, key=key):
+        yield from page
@@ -0,0 +1,301 @@
+"""İstek bazlı span izleme (tracing).
+
+İzleme açıkken (PANEL_TRACE) her istek için bir iz başlatılır; servis
+fonksiyonları, view aşamaları (context oluşturma, form, render) ve Supabase
+HTTP çağrıları iç içe span'ler olarak kaydedilir. Süresi PANEL_TRACE_MIN_MS
+değerini geçen istekler PANEL_TRACE_DIR altına Chrome trace (JSON) dosyası
+olarak yazılır; dosya chrome://tracing, Perfetto veya speedscope ile flame
+chart olarak açılabilir. Harici bir toplayıcı gerekmez.
+
+İzleme kapalıyken fonksiyonlar sarmalanmaz; ek maliyet yoktur.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import importlib
+import inspect
+import json
+import logging
+import os
+import pkgutil
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Iterator, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Bir izde tutulacak en fazla span (satır başına çağrılan yardımcılar dosyayı şişirmesin)
+MAX_SPANS = 20000
+
+# İzleme altyapısının kendisi sarmalanmaz
+_SKIPPED_MODULES = {
+    "panel.services.tracing",
+    "panel.services.metrics",
+    "panel.services.query_counter",
+    "panel.services.request_context",
+    "panel.services.http_transport",
+}
+
+
+class Trace:
+    """Tek isteğin span'leri (Chrome trace "complete" olayları)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.started_at = datetime.now()
+        self.events: list[dict] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._lanes: dict[Any, int] = {}
+
+    def lane(self) -> int:
+        """Span'in çizileceği satır: thread ya da asyncio görevi başına bir satır."""
+        try:
+            owner = asyncio.current_task() or threading.get_ident()
+        except RuntimeError:
+            owner = threading.get_ident()
+        with self._lock:
+            return self._lanes.setdefault(owner, len(self._lanes) + 1)
+
+    def add(self, name: str, category: str, started: float, duration: float, lane: int, args: Optional[dict]) -> None:
+        with self._lock:
+            if len(self.events) >= MAX_SPANS:
+                self.dropped += 1
+                return
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((started - self.started) * 1_000_000, 1),
+                "dur": round(duration * 1_000_000, 1),
+                "pid": os.getpid(),
+                "tid": lane,
+            }
+            if args:
+                event["args"] = args
+            self.events.append(event)
+
+    @property
+    def duration(self) -> float:
+        return time.perf_counter() - self.started
+
+    def to_chrome(self) -> dict:
+        with self._lock:
+            events = sorted(self.events, key=lambda event: (event["tid"], event["ts"]))
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "name": self.name,
+                "started_at": self.started_at.isoformat(),
+                "dropped_spans": self.dropped,
+            },
+        }
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("panel_trace", default=None)
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "PANEL_TRACE", False)
+
+
+def current() -> Optional[Trace]:
+    return _trace.get()
+
+
+@contextmanager
+def tracing(name: str) -> Iterator[Trace]:
+    """Yeni bir iz başlatır; blok bitince izin kök span'i (trace.name) eklenir."""
+    trace = Trace(name)
+    token = _trace.set(trace)
+    lane = trace.lane()
+    try:
+        yield trace
+    finally:
+        _trace.reset(token)
+        trace.add(trace.name, "request", trace.started, trace.duration, lane, None)
+
+
+@contextmanager
+def span(name: str, category: str = "function", **args) -> Iterator[None]:
+    """Etkin bir iz varsa bloğu span olarak kaydeder."""
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    lane = trace.lane()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, category, started, time.perf_counter() - started, lane, args or None)
+
+
+def add_completed(name: str, category: str, started: float, duration: float, **args) -> None:
+    """Süresi zaten ölçülmüş bir işlemi span olarak ekler (ör. HTTP transport)."""
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(name, category, started, duration, trace.lane(), args or None)
+
+
+def traced(func=None, *, name: Optional[str] = None, category: str = "function"):
+    """Fonksiyonu (sync veya async) span ile sarmalar."""
+    if func is None:
+        return functools.partial(traced, name=name, category=category)
+    span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if _trace.get() is None:
+                return await func(*args, **kwargs)
+            with span(span_name, category):
+                return await func(*args, **kwargs)
+        async_wrapper.__traced__ = True
+        return async_wrapper
+
+    if inspect.isgeneratorfunction(func):
+        # Span, çağrı anında değil generator tüketilirken açık kalır (ör. iter_rows sayfaları)
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            if _trace.get() is None:
+                return (yield from func(*args, **kwargs))
+            with span(span_name, category):
+                return (yield from func(*args, **kwargs))
+        generator_wrapper.__traced__ = True
+        return generator_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _trace.get() is None:
+            return func(*args, **kwargs)
+        with span(span_name, category):
+            return func(*args, **kwargs)
+    wrapper.__traced__ = True
+    return wrapper
+
+
+def _module_functions(module) -> dict[str, Any]:
+    return {
+        attr: value
+        for attr, value in vars(module).items()
+        if inspect.isfunction(value)
+        and value.__module__ == module.__name__
+        and not getattr(value, "__traced__", False)
+    }
+
+
+def _registry_entry(value, module, name: str, category: str, wrapped: dict[Any, Any]):
+    if not inspect.isfunction(value) or getattr(value, "__traced__", False):
+        return value
+    if value in wrapped:
+        return wrapped[value]
+    if value.__module__ == module.__name__ and value.__name__ == "<lambda>":
+        return traced(value, name=name, category=category)
+    return value
+
+
+def _rebind_registries(module, category: str, wrapped: dict[Any, Any]) -> None:
+    """Modül düzeyindeki kayıt sözlüklerindeki fonksiyonları sarmalanmış sürümle değiştirir.
+
+    Sözlüğe tanım anında konan referanslar (ör. dashboard_service.DASHBOARD_WIDGETS)
+    modül niteliği değiştirilince güncellenmez; içlerindeki lambda'lar da
+    kayıt adıyla span alır.
+    """
+    short_name = module.__name__.rsplit(".", 1)[-1]
+    for attr, registry in list(vars(module).items()):
+        if type(registry) is not dict or attr.startswith("__"):
+            continue
+        for key, value in list(registry.items()):
+            name = f"{short_name}.{attr}[{key}]"
+            if type(value) is tuple:
+                replacement = tuple(_registry_entry(item, module, name, category, wrapped) for item in value)
+            else:
+                replacement = _registry_entry(value, module, name, category, wrapped)
+            if replacement != value:
+                registry[key] = replacement
+
+
+def instrument() -> None:
+    """panel.services fonksiyonlarını, view'leri, formları ve render'ı span'lerle sarmalar.
+
+    `from x import f` ile alınmış referanslar ve kayıt sözlüklerindeki
+    fonksiyonlar da sarmalanmış sürümle değiştirilir. Uygulama açılışında bir
+    kez çağrılır (bkz. PanelConfig.ready).
+    """
+    from django import forms as django_forms
+    from django.views import View
+
+    from .. import context_processors, forms, rendering, views
+    from .. import services
+
+    modules = [
+        importlib.import_module(f"{services.__name__}.{info.name}")
+        for info in pkgutil.iter_modules(services.__path__)
+    ]
+    modules = [module for module in modules if module.__name__ not in _SKIPPED_MODULES]
+
+    wrapped: dict[Any, Any] = {}
+    for module in modules:
+        for attr, func in _module_functions(module).items():
+            wrapped[func] = traced(func, category="service")
+    wrapped[rendering.render] = traced(rendering.render, name="render", category="template")
+    wrapped[rendering.render_to_string] = traced(rendering.render_to_string, name="render_to_string", category="template")
+
+    # View fonksiyonları ve context processor'lar
+    for module in (views, context_processors):
+        for attr, func in _module_functions(module).items():
+            wrapped.setdefault(func, traced(func, category="view"))
+
+    for module in modules + [views, context_processors]:
+        for attr, value in list(vars(module).items()):
+            try:
+                replacement = wrapped.get(value)
+            except TypeError:
+                # hash'lenemeyen modül değişkenleri
+                continue
+            if replacement is not None:
+                setattr(module, attr, replacement)
+        _rebind_registries(module, "view" if module in (views, context_processors) else "service", wrapped)
+
+    # View aşamaları: get/post/_build_context/_assemble_context...
+    for value in list(vars(views).values()):
+        if inspect.isclass(value) and issubclass(value, View) and value.__module__ == views.__name__:
+            for attr, method in list(vars(value).items()):
+                if inspect.isfunction(method) and attr != "dispatch" and not getattr(method, "__traced__", False):
+                    setattr(value, attr, traced(method, category="view"))
+
+    # Form oluşturma
+    for value in list(vars(forms).values()):
+        if inspect.isclass(value) and issubclass(value, django_forms.BaseForm) and value.__module__ == forms.__name__:
+            if "__init__" in vars(value):
+                value.__init__ = traced(value.__init__, name=f"{value.__name__}()", category="form")
+
+
+def _safe_filename(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", value).strip("_") or "request"
+
+
+def export(trace: Trace, label: str) -> Optional[str]:
+    """İzi PANEL_TRACE_DIR altına Chrome trace dosyası olarak yazar; yolunu döndürür."""
+    directory = getattr(settings, "PANEL_TRACE_DIR", "traces")
+    os.makedirs(directory, exist_ok=True)
+    filename = f"{trace.started_at:%Y%m%d-%H%M%S}-{_safe_filename(label)}-{trace.duration * 1000:.0f}ms.json"
+    path = os.path.join(directory, filename)
+    try:
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(trace.to_chrome(), handle, ensure_ascii=False)
+    except OSError as exc:
+        logger.warning("İz dosyası yazılamadı (%s): %s", path, exc)
+        return None
+    return path
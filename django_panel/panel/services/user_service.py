@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-import requests
+import asyncio
+
 from django.conf import settings
-from .supabase_client import get_supabase_client
+
+from . import fake_supabase
+from .http_transport import get_async_http_client, get_http_client
+from .supabase_client import get_async_supabase_client, get_supabase_client, iter_rows
 
 
 def get_users() -> list[dict]:
@@ -11,192 +15,169 @@ def get_users() -> list[dict]:
     Önce user_profiles tablosundan kullanıcıları getirir.
     Eğer user_profiles tablosunda kullanıcı yoksa, Supabase Auth'dan bilgileri alır.
     """
+    return list(get_user_map().values())
+
+
+def get_user_map() -> dict[str, dict]:
+    """Kullanıcıları ID'ye göre map'ler.
+    
+    user_profiles tablosunda olmayan kullanıcılar için,
+    Supabase Auth'dan bilgileri alır. Tablolar sayfa sayfa okunur; böylece
+    PostgREST satır limitine takılmadan tüm kayıtlar görülür.
+    """
     supabase = get_supabase_client()
     users_dict = {}
     
     # 1. Önce user_profiles tablosundan kullanıcıları getir
     try:
-        result = supabase.table("user_profiles").select("*").execute()
-        if result.data:
-            for u in result.data:
-                user_id = str(u.get("id", ""))
-                if user_id:
-                    users_dict[user_id] = _format_user_from_db(u)
+        for u in iter_rows(lambda: supabase.table("user_profiles").select("*")):
+            user_id = str(u.get("id", ""))
+            if user_id:
+                users_dict[user_id] = _format_user_from_db(u)
     except Exception:
         pass
     
-    # 2. Appointments tablosundaki tüm user_id'leri topla
+    # 2. Appointments tablosundaki user_id'leri topla
+    missing_user_ids = set()
     try:
-        appointments_result = supabase.table("appointments").select("user_id").execute()
-        if appointments_result.data:
-            user_ids_from_appointments = set()
-            for apt in appointments_result.data:
-                user_id = str(apt.get("user_id", ""))
-                if user_id and user_id not in users_dict:
-                    user_ids_from_appointments.add(user_id)
-            
-            # 3. user_profiles'da olmayan kullanıcılar için Supabase Auth'dan bilgileri al
-            # Supabase Admin REST API kullanarak auth.users tablosuna erişim
-            if user_ids_from_appointments:
-                try:
-                    supabase_url = getattr(settings, 'SUPABASE_URL', None)
-                    service_role_key = getattr(settings, 'SUPABASE_SERVICE_ROLE_KEY', None)
-                    
-                    if supabase_url and service_role_key:
-                        # Her kullanıcı için Supabase Admin API'den bilgileri al
-                        for user_id in user_ids_from_appointments:
-                            if user_id not in users_dict:
-                                try:
-                                    # Supabase Admin API: GET /auth/v1/admin/users/{user_id}
-                                    url = f"{supabase_url}/auth/v1/admin/users/{user_id}"
-                                    headers = {
-                                        "apikey": service_role_key,
-                                        "Authorization": f"Bearer {service_role_key}",
-                                    }
-                                    response = requests.get(url, headers=headers, timeout=5)
-                                    
-                                    if response.status_code == 200:
-                                        auth_user = response.json()
-                                        user_metadata = auth_user.get("user_metadata", {})
-                                        
-                                        users_dict[user_id] = {
-                                            "id": user_id,
-                                            "email": auth_user.get("email", ""),
-                                            "password": "",
-                                            "name": user_metadata.get("name", ""),
-                                            "surname": user_metadata.get("surname", ""),
-                                            "phone": user_metadata.get("phone", ""),
-                                            "profileImage": None,
-                                            "createdAt": auth_user.get("created_at", ""),
-                                        }
-                                    else:
-                                        # API'den bilgi alınamazsa minimal obje oluştur
-                                        users_dict[user_id] = {
-                                            "id": user_id,
-                                            "email": "",
-                                            "password": "",
-                                            "name": "",
-                                            "surname": "",
-                                            "phone": "",
-                                            "profileImage": None,
-                                            "createdAt": "",
-                                        }
-                                except Exception:
-                                    # Hata durumunda minimal obje oluştur
-                                    users_dict[user_id] = {
-                                        "id": user_id,
-                                        "email": "",
-                                        "password": "",
-                                        "name": "",
-                                        "surname": "",
-                                        "phone": "",
-                                        "profileImage": None,
-                                        "createdAt": "",
-                                    }
-                except Exception:
-                    pass
+        for apt in iter_rows(lambda: supabase.table("appointments").select("id,user_id")):
+            user_id = str(apt.get("user_id", ""))
+            if user_id and user_id not in users_dict:
+                missing_user_ids.add(user_id)
     except Exception:
         pass
     
-    return list(users_dict.values())
+    # 3. user_profiles'da olmayan kullanıcılar için Supabase Auth'dan bilgileri al
+    for user_id in missing_user_ids:
+        users_dict[user_id] = _fetch_auth_user(user_id)
+    
+    return users_dict
 
 
-def get_user_map() -> dict[str, dict]:
-    """Kullanıcıları ID'ye göre map'ler.
+def get_users_by_ids(user_ids) -> dict[str, dict]:
+    """Sadece verilen kullanıcıları ID'ye göre map'ler.
     
-    user_profiles tablosunda olmayan kullanıcılar için,
-    Supabase Auth'dan bilgileri alır.
+    Tüm kullanıcı tablosunu yüklemek yerine user_profiles'tan tek bir `in` sorgusu
+    yapılır; profili olmayanlar için Supabase Auth'a gidilir.
     """
+    user_ids = sorted({str(user_id) for user_id in user_ids if user_id})
+    if not user_ids:
+        return {}
+    
     supabase = get_supabase_client()
     users_dict = {}
-    
-    # 1. Önce user_profiles tablosundan kullanıcıları getir
     try:
-        result = supabase.table("user_profiles").select("*").execute()
-        if result.data:
-            for u in result.data:
-                user_id = str(u.get("id", ""))
-                if user_id:
-                    users_dict[user_id] = _format_user_from_db(u)
+        result = supabase.table("user_profiles").select("*").in_("id", user_ids).execute()
+        for u in result.data or []:
+            users_dict[str(u.get("id", ""))] = _format_user_from_db(u)
     except Exception:
         pass
     
-    # 2. Appointments tablosundaki tüm user_id'leri topla
+    for user_id in user_ids:
+        if user_id not in users_dict:
+            users_dict[user_id] = _fetch_auth_user(user_id)
+    
+    return users_dict
+
+
+async def aget_users_by_ids(user_ids) -> dict[str, dict]:
+    """`get_users_by_ids`'in async karşılığı; profili olmayanlar Auth'dan paralel getirilir."""
+    user_ids = sorted({str(user_id) for user_id in user_ids if user_id})
+    if not user_ids:
+        return {}
+
+    supabase = await get_async_supabase_client()
+    users_dict = {}
     try:
-        appointments_result = supabase.table("appointments").select("user_id").execute()
-        if appointments_result.data:
-            user_ids_from_appointments = set()
-            for apt in appointments_result.data:
-                user_id = str(apt.get("user_id", ""))
-                if user_id and user_id not in users_dict:
-                    user_ids_from_appointments.add(user_id)
-            
-            # 3. user_profiles'da olmayan kullanıcılar için Supabase Auth'dan bilgileri al
-            # Supabase Admin REST API kullanarak auth.users tablosuna erişim
-            if user_ids_from_appointments:
-                try:
-                    supabase_url = getattr(settings, 'SUPABASE_URL', None)
-                    service_role_key = getattr(settings, 'SUPABASE_SERVICE_ROLE_KEY', None)
-                    
-                    if supabase_url and service_role_key:
-                        # Her kullanıcı için Supabase Admin API'den bilgileri al
-                        for user_id in user_ids_from_appointments:
-                            if user_id not in users_dict:
-                                try:
-                                    # Supabase Admin API: GET /auth/v1/admin/users/{user_id}
-                                    url = f"{supabase_url}/auth/v1/admin/users/{user_id}"
-                                    headers = {
-                                        "apikey": service_role_key,
-                                        "Authorization": f"Bearer {service_role_key}",
-                                    }
-                                    response = requests.get(url, headers=headers, timeout=5)
-                                    
-                                    if response.status_code == 200:
-                                        auth_user = response.json()
-                                        user_metadata = auth_user.get("user_metadata", {})
-                                        
-                                        users_dict[user_id] = {
-                                            "id": user_id,
-                                            "email": auth_user.get("email", ""),
-                                            "password": "",
-                                            "name": user_metadata.get("name", ""),
-                                            "surname": user_metadata.get("surname", ""),
-                                            "phone": user_metadata.get("phone", ""),
-                                            "profileImage": None,
-                                            "createdAt": auth_user.get("created_at", ""),
-                                        }
-                                    else:
-                                        # API'den bilgi alınamazsa minimal obje oluştur
-                                        users_dict[user_id] = {
-                                            "id": user_id,
-                                            "email": "",
-                                            "password": "",
-                                            "name": "",
-                                            "surname": "",
-                                            "phone": "",
-                                            "profileImage": None,
-                                            "createdAt": "",
-                                        }
-                                except Exception:
-                                    # Hata durumunda minimal obje oluştur
-                                    users_dict[user_id] = {
-                                        "id": user_id,
-                                        "email": "",
-                                        "password": "",
-                                        "name": "",
-                                        "surname": "",
-                                        "phone": "",
-                                        "profileImage": None,
-                                        "createdAt": "",
-                                    }
-                except Exception:
-                    pass
+        result = await supabase.table("user_profiles").select("*").in_("id", user_ids).execute()
+        for u in result.data or []:
+            users_dict[str(u.get("id", ""))] = _format_user_from_db(u)
     except Exception:
         pass
-    
+
+    missing = [user_id for user_id in user_ids if user_id not in users_dict]
+    for user in await asyncio.gather(*(_afetch_auth_user(user_id) for user_id in missing)):
+        users_dict[user["id"]] = user
     return users_dict
 
 
+def _empty_user(user_id: str) -> dict:
+    return {
+        "id": user_id,
+        "email": "",
+        "password": "",
+        "name": "",
+        "surname": "",
+        "phone": "",
+        "profileImage": None,
+        "createdAt": "",
+    }
+
+
+def _auth_request(user_id: str):
+    """Supabase Admin API isteğinin URL ve başlıkları; ayarlar eksikse None."""
+    if fake_supabase.is_enabled():
+        # Sahte backend Auth Admin API'sini taklit etmez; user_profiles yeterlidir
+        return None
+    supabase_url = getattr(settings, 'SUPABASE_URL', None)
+    service_role_key = getattr(settings, 'SUPABASE_SERVICE_ROLE_KEY', None)
+    if not supabase_url or not service_role_key:
+        return None
+    # Supabase Admin API: GET /auth/v1/admin/users/{user_id}
+    url = f"{supabase_url}/auth/v1/admin/users/{user_id}"
+    headers = {
+        "apikey": service_role_key,
+        "Authorization": f"Bearer {service_role_key}",
+    }
+    return url, headers
+
+
+def _apply_auth_user(user: dict, auth_user: dict) -> dict:
+    user_metadata = auth_user.get("user_metadata", {})
+    user.update({
+        "email": auth_user.get("email", ""),
+        "name": user_metadata.get("name", ""),
+        "surname": user_metadata.get("surname", ""),
+        "phone": user_metadata.get("phone", ""),
+        "createdAt": auth_user.get("created_at", ""),
+    })
+    return user
+
+
+def _fetch_auth_user(user_id: str) -> dict:
+    """Supabase Admin API'den kullanıcıyı getirir; alınamazsa minimal obje döndürür."""
+    user = _empty_user(user_id)
+    auth_request = _auth_request(user_id)
+    if auth_request is None:
+        return user
+    
+    try:
+        url, headers = auth_request
+        response = get_http_client().get(url, headers=headers, timeout=5)
+        if response.status_code == 200:
+            _apply_auth_user(user, response.json())
+    except Exception:
+        pass
+    return user
+
+
+async def _afetch_auth_user(user_id: str) -> dict:
+    """`_fetch_auth_user`'ın async karşılığı."""
+    user = _empty_user(user_id)
+    auth_request = _auth_request(user_id)
+    if auth_request is None:
+        return user
+
+    try:
+        url, headers = auth_request
+        response = await get_async_http_client().get(url, headers=headers, timeout=5)
+        if response.status_code == 200:
+            _apply_auth_user(user, response.json())
+    except Exception:
+        pass
+    return user
+
+
 def _format_user_from_db(db_user: dict) -> dict:
     """Supabase'den gelen kullanıcı verisini mevcut formata çevirir."""
     return {
@@ -0,0 +1,32 @@
+/**
+ * Dashboard JavaScript
+ * Süre bütçesi içinde yüklenemeyen widget'ları sayfa açıldıktan sonra getirir.
+ */
+(function() {
+    'use strict';
+
+    const MAX_ATTEMPTS = 4;
+    const RETRY_DELAY_MS = 3000;
+
+    function loadWidget(placeholder, attempt) {
+        fetch(placeholder.dataset.url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(response.status);
+                }
+                return response.json();
+            })
+            .then(data => {
+                placeholder.outerHTML = data.html;
+            })
+            .catch(() => {
+                if (attempt + 1 < MAX_ATTEMPTS) {
+                    setTimeout(() => loadWidget(placeholder, attempt + 1), RETRY_DELAY_MS);
+                } else {
+                    placeholder.innerHTML = '<p class="empty-state">Veriler şu anda yüklenemedi. Sayfayı yenileyin.</p>';
+                }
+            });
+    }
+
+    document.querySelectorAll('.widget-placeholder').forEach(placeholder => loadWidget(placeholder, 0));
+})();
@@ -15,3 +15,58 @@ function toggleReplyForm(reviewId) {
     }
 }
 
+
+/**
+ * Yorumların sonraki sayfasını imleçle getirip listeye ekler.
+ * Liste sonu görünür olduğunda otomatik olarak tetiklenir (sonsuz kaydırma).
+ */
+let reviewPageLoading = false;
+let reviewPageObserver = null;
+
+function loadMoreReviews() {
+    'use strict';
+    const more = document.getElementById('review-list-more');
+    const list = document.getElementById('review-list');
+    if (!more || !list || reviewPageLoading || !more.dataset.cursor) {
+        return;
+    }
+
+    reviewPageLoading = true;
+    const url = more.dataset.url + '&cursor=' + encodeURIComponent(more.dataset.cursor);
+    fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+        .then(response => response.json())
+        .then(data => {
+            if (data.html) {
+                list.insertAdjacentHTML('beforeend', data.html);
+            }
+            if (data.next_cursor) {
+                more.dataset.cursor = data.next_cursor;
+            } else {
+                more.remove();
+            }
+        })
+        .catch(() => {
+            // Hata durumunda buton görünür kalır, kullanıcı tekrar deneyebilir
+        })
+        .finally(() => {
+            reviewPageLoading = false;
+            // Liste sonu hâlâ görünürse gözlem yenilenir; yeni bir kesişim bildirimi gelir
+            if (reviewPageObserver && more.isConnected) {
+                reviewPageObserver.unobserve(more);
+                reviewPageObserver.observe(more);
+            }
+        });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const more = document.getElementById('review-list-more');
+    if (!more || !('IntersectionObserver' in window)) {
+        return;
+    }
+    reviewPageObserver = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) {
+            loadMoreReviews();
+        }
+    }, { rootMargin: '200px' });
+    reviewPageObserver.observe(more);
+});
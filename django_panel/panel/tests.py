@@ -1,3 +1,717 @@
-from django.test import TestCase
+import sqlite3
+import threading
+import time
+import timeit
+from datetime import date, datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .services import (
+    appointment_service,
+    data_versions,
+    fake_supabase,
+    dashboard_service,
+    holiday_index,
+    query_counter,
+    rating_service,
+    reminder_service,
+    request_context,
+    resilience,
+    review_service,
+    schedule_service,
+    service_service,
+    single_flight,
+    supabase_client,
+    tracing,
+)
+from .services.benchmarks import fake_backend
+from .services.cache import TTLCache
+from .services.email_service import ReminderDeliveryError
+from .services.supabase_client import get_supabase_client
+from .urls import build_urlpatterns
+
+
+@override_settings(SUPABASE_QUERY_LOG=True, SLOW_REQUEST_MS=0, PANEL_TRACE=False)
+class FakeBackendTestCase(TestCase):
+    """View'leri ağ olmadan, seed verisiyle dolu sahte Supabase'e karşı çalıştırır."""
+
+    hospital_id = "1"
+
+    def setUp(self):
+        self.db = self.enterContext(fake_backend())
+        session = self.client.session
+        session["user_id"] = "1"
+        session["hospital_id"] = self.hospital_id
+        session.save()
+
+
+def wait_for_background_refresh(timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while resilience._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class AsyncURLConf:
+    """ASGI'deki gibi async sayfa view'leriyle URLconf (bkz. PANEL_ASYNC_VIEWS)."""
+
+    urlpatterns = build_urlpatterns(async_views=True)
+
+
+class ViewQueryBudgetTests(FakeBackendTestCase):
+    """Sayfa başına Supabase çağrı bütçeleri; aşılırsa veya N+1 deseni varsa test kırılır."""
+
+    def assert_page(self, url_name, max_queries):
+        with query_counter.assert_max_queries(max_queries) as log:
+            response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(log.count, 0)
+        return response
+
+    def test_dashboard(self):
+        self.assert_page("dashboard", 9)
+
+    def test_appointments(self):
+        self.assert_page("appointment_management", 6)
+
+    def test_schedule(self):
+        self.assert_page("schedule_management", 4)
+
+    def test_reviews(self):
+        self.assert_page("review_management", 7)
+
+
+@override_settings(ROOT_URLCONF=AsyncURLConf)
+class AsyncViewQueryBudgetTests(ViewQueryBudgetTests):
+    """Aynı bütçeler async sayfa view'leri için de geçerlidir."""
+
+
+class NPlusOneDetectorTests(FakeBackendTestCase):
+
+    def fetch_doctors_one_by_one(self, count):
+        supabase = get_supabase_client()
+        for doctor_id in range(1, count + 1):
+            supabase.table("doctors").select("*").eq("id", str(doctor_id)).execute()
+
+    def test_same_shaped_calls_are_reported(self):
+        with self.assertRaisesMessage(AssertionError, "N+1"):
+            with query_counter.assert_max_queries(10, threshold=3):
+                self.fetch_doctors_one_by_one(3)
+
+    def test_calls_below_threshold_pass(self):
+        with query_counter.assert_max_queries(10, threshold=3) as log:
+            self.fetch_doctors_one_by_one(2)
+        self.assertEqual(log.count, 2)
+        self.assertEqual(log.n_plus_one(3), [])
+
+    def test_allow_n_plus_one(self):
+        with query_counter.assert_max_queries(10, allow_n_plus_one=True, threshold=3) as log:
+            self.fetch_doctors_one_by_one(3)
+        self.assertEqual(len(log.n_plus_one(3)), 1)
+
+    def test_budget_exceeded(self):
+        with self.assertRaisesMessage(AssertionError, "En fazla 1 Supabase çağrısı"):
+            with query_counter.assert_max_queries(1, allow_n_plus_one=True):
+                self.fetch_doctors_one_by_one(2)
+
+
+class DeferredWidgetTests(FakeBackendTestCase):
+    """Süre bütçesini aşan okuma sayfayı bekletmez; bağlı widget yer tutucu olarak çizilir."""
+
+    @override_settings(REQUEST_DEADLINE_MS=100)
+    def test_slow_read_renders_placeholder(self):
+        self.db.slow_down("reviews", 500)
+
+        response = self.client.get(reverse("dashboard"))
+
+        self.assertEqual(response.status_code, 200)
+        # Sync yolda kaynaklar sırayla okunur; yavaş okumadan sonrakiler de bütçe dışında kalır
+        deferred = response.context["deferred_widgets"]
+        self.assertIn("latest_reviews", deferred)
+        self.assertNotIn("kpi_cards", deferred)
+        self.assertContains(response, f'data-url="{reverse("dashboard_widget", args=["latest_reviews"])}"')
+
+    @override_settings(REQUEST_DEADLINE_MS=100, ROOT_URLCONF=AsyncURLConf)
+    def test_slow_read_renders_placeholder_async(self):
+        self.db.slow_down("reviews", 500)
+
+        response = self.client.get(reverse("dashboard"))
+
+        self.assertEqual(response.status_code, 200)
+        # Async yolda kaynaklar paralel okunur; sadece yavaş kaynağa bağlı widget ertelenir
+        self.assertEqual(response.context["deferred_widgets"], ["latest_reviews"])
+
+    @override_settings(REQUEST_DEADLINE_MS=100, ROOT_URLCONF=AsyncURLConf)
+    def test_late_async_result_outlives_the_request_loop(self):
+        self.db.slow_down("reviews", 300)
+        self.client.get(reverse("dashboard"))
+
+        # Yarıda kalan okuma sync havuzda tamamlanır ve son sağlam değer olarak saklanır
+        wait_for_background_refresh()
+        response = self.client.get(reverse("dashboard"))
+
+        self.assertEqual(response.context["deferred_widgets"], [])
+        self.assertEqual(response["Cache-Control"], "no-store")
+
+    def test_deferred_widget_loads_later(self):
+        self.db.slow_down("reviews", 50)
+
+        response = self.client.get(reverse("dashboard_widget", args=["latest_reviews"]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("html", response.json())
+
+
+class TTLCacheTimingTests(TestCase):
+    """İstek içindeki önbellek isabetleri mikrosaniyenin altında kalmalıdır."""
+
+    def test_scoped_hit_is_sub_microsecond_in_a_request(self):
+        services = TTLCache("timing_test", lambda key: [key], scope=data_versions.SERVICES_SCOPE)
+        token = request_context.begin()
+        try:
+            services.get("hit")
+            rounds = 20000
+            best = min(timeit.repeat(lambda: services.get("hit"), number=rounds, repeat=5)) / rounds
+        finally:
+            request_context.end(token)
+            services.invalidate(broadcast=False)
+        self.assertLess(best, 1e-6)
+
+
+class AppointmentEmbedFallbackTests(FakeBackendTestCase):
+    """Embed ilişkisi yoksa (PGRST200) `in` sorgularına düşülür ve bu durum hatırlanır."""
+
+    def build_query(self, columns):
+        return get_supabase_client().table("appointments").select(columns).eq("hospital_id", self.hospital_id)
+
+    def test_missing_relationship_is_remembered(self):
+        with mock.patch.dict(fake_supabase._RELATIONS):
+            del fake_supabase._RELATIONS[("appointments", "user_profiles")]
+            with query_counter.recording() as first_log:
+                first = appointment_service._execute_appointment_query(self.build_query, True)
+            with query_counter.recording() as second_log:
+                second = appointment_service._execute_appointment_query(self.build_query, True)
+
+        self.assertTrue(resilience.feature_missing(appointment_service.EMBEDS_FEATURE))
+        # İkinci çağrı embed'li sorguyu tekrar denemez
+        self.assertEqual(second_log.count, first_log.count - 1)
+        self.assertEqual(first, second)
+        self.assertTrue(any(apt["doctorName"] for apt in first))
+
+    def test_other_errors_are_raised(self):
+        def build_query(columns):
+            query = self.build_query(columns)
+            return query.filter("id", "bogus", "1") if "doctors(" in columns else query
+
+        with self.assertRaises(fake_supabase.FakeAPIError):
+            appointment_service._execute_appointment_query(build_query, True)
+        self.assertFalse(resilience.feature_missing(appointment_service.EMBEDS_FEATURE))
+
+
+class RatingStatsFallbackTests(FakeBackendTestCase):
+    """Özet tabloları yoksa puanlar ratings'ten hesaplanır; diğer hatalar yutulmaz."""
+
+    def fail_stats_tables(self, code):
+        real_execute = fake_supabase.FakeQuery.execute
+        calls = []
+
+        def execute(query):
+            if query._table in fake_supabase._STATS_TABLES:
+                calls.append(query._table)
+                raise fake_supabase.FakeAPIError("relation does not exist", code=code)
+            return real_execute(query)
+
+        self.enterContext(mock.patch.object(fake_supabase.FakeQuery, "execute", execute))
+        return calls
+
+    def test_missing_tables_are_remembered(self):
+        expected = rating_service.get_hospital_rating_summary(self.hospital_id)
+        calls = self.fail_stats_tables("42P01")
+
+        first = rating_service.get_hospital_rating_summary(self.hospital_id)
+        second = rating_service.get_doctor_rating_summaries(self.hospital_id)
+
+        self.assertEqual(first, expected)
+        self.assertTrue(second)
+        self.assertEqual(calls, ["hospital_rating_stats"])
+
+    def test_other_errors_are_raised(self):
+        self.fail_stats_tables("42501")
+
+        with self.assertRaises(fake_supabase.FakeAPIError):
+            rating_service.get_hospital_rating_summary(self.hospital_id)
+        self.assertFalse(resilience.feature_missing(rating_service.STATS_FEATURE))
+
+
+class ReminderSchedulerTests(FakeBackendTestCase):
+    """Hatırlatmalar heap'ten zamanında çıkar; taşınan randevular yeni zamanına göre gönderilir."""
+
+    now = datetime(2030, 1, 1, 8, 0)
+
+    def add_appointment(self, appointment_id, day, at, user_id="1"):
+        get_supabase_client().table("appointments").insert({
+            "id": appointment_id, "user_id": user_id, "hospital_id": self.hospital_id, "doctor_id": "1",
+            "date": day, "time": at, "status": "pending", "reminder_sent_at": None,
+        }).execute()
+
+    def move_appointment(self, appointment_id, day, at):
+        get_supabase_client().table("appointments").update({"date": day, "time": at}).eq("id", appointment_id).execute()
+
+    def reminder_sent(self, appointment_id):
+        row = get_supabase_client().table("appointments").select("reminder_sent_at").eq("id", appointment_id).execute().data[0]
+        return row["reminder_sent_at"] is not None
+
+    def test_reminders_leave_the_heap_in_send_order(self):
+        self.add_appointment("r-late", "2030-01-02", "11:00")
+        self.add_appointment("r-early", "2030-01-02", "09:00")
+        scheduler = reminder_service.ReminderScheduler(hours_before=24)
+
+        self.assertEqual(scheduler.refill(self.now), 2)
+        self.assertEqual(scheduler.pop_due(self.now), [])
+        due = scheduler.pop_due(self.now + timedelta(hours=3))
+        self.assertEqual([entry.appointment_id for entry in due], ["r-early", "r-late"])
+        self.assertEqual(scheduler.seconds_until_next(self.now), 300.0)
+
+    def test_refill_picks_up_new_and_moved_appointments(self):
+        self.add_appointment("r-moved", "2030-01-02", "09:00")
+        scheduler = reminder_service.ReminderScheduler(hours_before=24)
+        scheduler.refill(self.now)
+
+        self.add_appointment("r-new", "2030-01-02", "10:00")
+        self.move_appointment("r-moved", "2030-01-02", "12:00")
+        later = self.now + timedelta(minutes=5)
+
+        self.assertEqual(scheduler.refill(later), 2)
+        self.assertEqual(scheduler.refill(later), 0)
+        # Taşınan randevunun eski (09:00) kaydı atlanır
+        due = scheduler.pop_due(self.now + timedelta(hours=2, minutes=30))
+        self.assertEqual([entry.appointment_id for entry in due], ["r-new"])
+
+    def test_moved_appointment_is_requeued_at_send_time(self):
+        self.add_appointment("r-moved", "2030-01-02", "09:00")
+        scheduler = reminder_service.ReminderScheduler(hours_before=24, refill_interval=timedelta(days=1))
+        scheduler.refill(self.now)
+        self.move_appointment("r-moved", "2030-01-02", "15:00")
+
+        self.assertEqual(scheduler.run_once(self.now + timedelta(hours=1)), 0)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(self.reminder_sent("r-moved"))
+
+        self.assertEqual(scheduler.run_once(self.now + timedelta(hours=7)), 1)
+        self.assertIn("15:00", mail.outbox[0].body)
+        self.assertTrue(self.reminder_sent("r-moved"))
+
+    def test_partial_smtp_failure_marks_only_sent_reminders(self):
+        self.add_appointment("r-sent", "2030-01-02", "09:00")
+        self.add_appointment("r-failed", "2030-01-02", "09:30")
+
+        def send_until_failure(reminders, connection=None):
+            raise ReminderDeliveryError(["r-sent"])
+
+        with mock.patch.object(reminder_service, "send_appointment_reminders", send_until_failure):
+            with self.assertRaises(ReminderDeliveryError):
+                reminder_service.send_reminder_batch(["r-sent", "r-failed"])
+
+        self.assertTrue(self.reminder_sent("r-sent"))
+        self.assertFalse(self.reminder_sent("r-failed"))
+
+
+class AvailabilityBitmapTests(FakeBackendTestCase):
+    """Boş slotlar çalışma saatleri, tatiller, randevular ve geçmiş saatlerle kesiştirilir."""
+
+    monday = date(2030, 1, 7)
+
+    def setUp(self):
+        super().setUp()
+        self.supabase = get_supabase_client()
+
+    def free_slots(self, start, end):
+        return schedule_service.get_free_slots(start, end, ["1"])["1"]
+
+    def book(self, day, at, service_id):
+        self.supabase.table("appointments").insert({
+            "id": f"b-{day}-{at}", "user_id": "1", "hospital_id": self.hospital_id, "doctor_id": "1",
+            "service_id": service_id, "date": day, "time": at, "status": "pending",
+        }).execute()
+
+    def test_working_hours(self):
+        slots = self.free_slots(self.monday - timedelta(days=1), self.monday)
+
+        # Pazar kapalı; pazartesi doktorun 09:00-17:00 saatleri hastanenin 09:00-19:00 saatlerine sığar
+        self.assertNotIn("2030-01-06", slots)
+        self.assertEqual(slots["2030-01-07"][0], "09:00")
+        self.assertEqual(slots["2030-01-07"][-1], "16:30")
+        self.assertEqual(len(slots["2030-01-07"]), 16)
+
+    def test_holidays(self):
+        self.supabase.table("holidays").insert([
+            {"id": "h-doctor", "hospital_id": self.hospital_id, "doctor_id": "1", "date": "2030-01-08",
+             "is_full_day": False, "start_time": "12:00", "end_time": "13:00"},
+            {"id": "h-hospital", "hospital_id": self.hospital_id, "doctor_id": None, "date": "2030-01-09",
+             "is_full_day": True},
+        ]).execute()
+        holiday_index.invalidate(self.hospital_id)
+
+        slots = self.free_slots(self.monday + timedelta(days=1), self.monday + timedelta(days=2))
+
+        # Aralık uçları dahildir
+        for blocked in ("12:00", "12:30", "13:00"):
+            self.assertNotIn(blocked, slots["2030-01-08"])
+        self.assertIn("11:30", slots["2030-01-08"])
+        self.assertIn("13:30", slots["2030-01-08"])
+        self.assertNotIn("2030-01-09", slots)
+
+    def test_bookings_block_their_service_duration(self):
+        self.supabase.table("services").update({"duration_minutes": 60}).eq("id", "1").execute()
+        self.book("2030-01-07", "10:15", "1")
+        self.book("2030-01-07", "14:00", "2")
+
+        slots = self.free_slots(self.monday, self.monday)["2030-01-07"]
+
+        # 10:15-11:15 üç slota taşar; süresi tanımsız hizmet tek slot doldurur
+        for blocked in ("10:00", "10:30", "11:00", "14:00"):
+            self.assertNotIn(blocked, slots)
+        for free in ("09:30", "11:30", "13:30", "14:30"):
+            self.assertIn(free, slots)
+
+    def test_past_slots_of_today_are_closed(self):
+        class FrozenDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return cls(2030, 1, 7, 11, 10)
+
+        with mock.patch.object(schedule_service, "datetime", FrozenDatetime):
+            slots = self.free_slots(self.monday - timedelta(days=1), self.monday + timedelta(days=1))
+
+        self.assertEqual(slots["2030-01-07"][0], "11:30")
+        self.assertEqual(slots["2030-01-08"][0], "09:00")
+
+
+class ReviewDoctorFilterTests(FakeBackendTestCase):
+    """URL'deki doktor filtresi hastanenin doktorlarıyla doğrulanır."""
+
+    def review_doctors(self, query=""):
+        response = self.client.get(reverse("review_management") + query)
+        self.assertEqual(response.status_code, 200)
+        return [card["data"]["doctorId"] for card in response.context["review_cards"]]
+
+    def test_unknown_doctor_is_ignored(self):
+        self.assertEqual(self.review_doctors("?doctor=not-a-uuid"), self.review_doctors())
+
+    def test_known_doctor_filters(self):
+        doctors = self.review_doctors("?doctor=1")
+        self.assertTrue(doctors)
+        self.assertEqual(set(doctors), {"1"})
+
+    @override_settings(ROOT_URLCONF=AsyncURLConf)
+    def test_unknown_doctor_is_ignored_async(self):
+        self.assertEqual(self.review_doctors("?doctor=not-a-uuid"), self.review_doctors())
+
+
+class HolidayIndexTests(FakeBackendTestCase):
+    """Tatil indeksi aralıkları birleştirerek yükler ve veri sürümü değişince yenilenir."""
+
+    def setUp(self):
+        super().setUp()
+        self.supabase = get_supabase_client()
+
+    def add_holiday(self, holiday_id, day, **fields):
+        self.supabase.table("holidays").insert({
+            "id": holiday_id, "hospital_id": self.hospital_id, "doctor_id": None, "date": day,
+            "is_full_day": True, **fields,
+        }).execute()
+
+    def test_ranges_are_merged_into_one_index(self):
+        self.add_holiday("h-early", "2030-01-02")
+        self.add_holiday("h-late", "2030-01-20", is_full_day=False, start_time="10:00", end_time="12:00")
+
+        holiday_index.get_holiday_index(self.hospital_id, date(2030, 1, 1), date(2030, 1, 5))
+        with query_counter.recording() as log:
+            index = holiday_index.get_holiday_index(self.hospital_id, date(2030, 1, 18), date(2030, 1, 22))
+        self.assertEqual(log.count, 1)
+        self.assertEqual((index.start, index.end), (date(2030, 1, 1), date(2030, 1, 22)))
+        self.assertEqual(index.intervals_for("2030-01-02"), [holiday_index.FULL_DAY])
+        self.assertEqual(index.intervals_for("2030-01-20"), [(600, 720)])
+
+        # Birleşik aralığın içi tekrar sorgulanmaz
+        with query_counter.recording() as log:
+            holiday_index.get_holiday_index(self.hospital_id, date(2030, 1, 3), date(2030, 1, 19))
+        self.assertEqual(log.count, 0)
+
+    @override_settings(DATA_VERSION_CHECK_INTERVAL=0)
+    def test_version_bump_from_another_worker_reloads_the_index(self):
+        index = holiday_index.get_holiday_index(self.hospital_id, date(2030, 1, 1), date(2030, 1, 5))
+        self.assertEqual(index.intervals_for("2030-01-03"), [])
+
+        # Başka bir worker tatil ekleyip sürümü artırdı; bu process'in önbelleği temizlenmedi
+        self.add_holiday("h-other", "2030-01-03")
+        data_versions.bump(self.hospital_id)
+
+        self.assertTrue(index.is_expired())
+        index = holiday_index.get_holiday_index(self.hospital_id, date(2030, 1, 1), date(2030, 1, 5))
+        self.assertEqual(index.intervals_for("2030-01-03"), [holiday_index.FULL_DAY])
+
+
+class ReviewCursorTests(FakeBackendTestCase):
+    """Yorum sayfaları (created_at, id) imleciyle atlamadan ve tekrarlamadan ilerler."""
+
+    def all_pages(self, page_size, **filters):
+        pages, cursor = [], None
+        while True:
+            page = review_service.get_reviews_page(
+                cursor=cursor, page_size=page_size, with_statistics=False, **filters
+            )
+            pages.append([review["id"] for review in page["reviews"]])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return pages
+
+    def test_cursor_round_trip(self):
+        cursor = review_service.encode_cursor({"created_at": "2030-01-01T10:00:00+00:00", "id": "42"})
+        self.assertEqual(review_service.decode_cursor(cursor), ("2030-01-01T10:00:00+00:00", "42"))
+
+    def test_malformed_cursors_are_rejected(self):
+        for cursor in ("not-base64!", review_service.encode_search_cursor(3), "fA=="):
+            with self.assertRaises(ValueError):
+                review_service.decode_cursor(cursor)
+
+        response = self.client.get(reverse("review_page"), {"cursor": "not-base64!"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_pages_cover_every_review_once(self):
+        everything = self.all_pages(page_size=100)[0]
+        pages = self.all_pages(page_size=4)
+
+        self.assertTrue(all(len(page) == 4 for page in pages[:-1]))
+        self.assertEqual(sum(pages, []), everything)
+
+    def test_ties_on_created_at(self):
+        get_supabase_client().table("reviews").insert([
+            {"id": f"tie-{n}", "user_id": "1", "hospital_id": self.hospital_id, "doctor_id": "1",
+             "comment": "Aynı anda", "created_at": "2030-01-01T00:00:00+00:00"}
+            for n in range(5)
+        ]).execute()
+
+        ids = sum(self.all_pages(page_size=2), [])
+
+        tied = [review_id for review_id in ids if review_id.startswith("tie-")]
+        self.assertEqual(tied, [f"tie-{n}" for n in range(4, -1, -1)])
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_rating_filter_fills_pages(self):
+        everything = review_service.get_reviews_page(page_size=100, with_statistics=False)["reviews"]
+        expected = [r["id"] for r in everything if not r["rating"] or r["avg_rating"] >= 5]
+        self.assertLess(len(expected), len(everything))
+
+        # Küçük partilerle sayfa, filtreye uyan satırlar bulunana kadar sonraki partilerden doldurulur
+        with mock.patch.object(review_service, "RATING_FILTER_BATCH_SIZE", 1):
+            pages = self.all_pages(page_size=2, min_rating=5)
+
+        self.assertTrue(all(len(page) == 2 for page in pages[:-1]))
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_empty_last_page(self):
+        total = len(self.all_pages(page_size=100)[0])
+        first = review_service.get_reviews_page(page_size=total - 1, with_statistics=False)
+
+        last = review_service.get_reviews_page(cursor=first["next_cursor"], page_size=1, with_statistics=False)
+        self.assertEqual(len(last["reviews"]), 1)
+        self.assertIsNone(last["next_cursor"])
+
+        after_last = review_service.encode_cursor({"created_at": "2000-01-01T00:00:00+00:00", "id": "0"})
+        empty = review_service.get_reviews_page(cursor=after_last, page_size=5, with_statistics=False)
+        self.assertEqual(empty["reviews"], [])
+        self.assertIsNone(empty["next_cursor"])
+
+
+class SingleFlightTests(FakeBackendTestCase):
+    """Eşzamanlı özdeş okumalar tek Supabase çağrısında birleşir."""
+
+    def run_concurrently(self, *queries):
+        real_execute = fake_supabase.FakeQuery.execute
+        calls = []
+
+        def slow_execute(query):
+            calls.append(query.request.params)
+            time.sleep(0.1)
+            return real_execute(query)
+
+        results = [None] * len(queries)
+
+        def run(index, query):
+            results[index] = single_flight.coalesced_execute(query, ttl=0)
+
+        with mock.patch.object(fake_supabase.FakeQuery, "execute", slow_execute):
+            threads = [threading.Thread(target=run, args=item) for item in enumerate(queries)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return calls, results
+
+    def doctors_query(self, hospital_id):
+        return get_supabase_client().table("doctors").select("id,name").eq("hospital_id", hospital_id)
+
+    def test_identical_reads_share_one_call(self):
+        calls, results = self.run_concurrently(*(self.doctors_query(self.hospital_id) for _ in range(4)))
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(results[0].data)
+        self.assertTrue(all(result.data == results[0].data for result in results))
+        # Bekleyenler kopya alır
+        self.assertIsNot(results[1].data, results[0].data)
+
+    def test_different_requests_are_not_coalesced(self):
+        first, second = self.doctors_query(self.hospital_id), self.doctors_query("2")
+        self.assertNotEqual(single_flight.query_key(first), single_flight.query_key(second))
+
+        calls, _ = self.run_concurrently(first, second)
+
+        self.assertEqual(len(calls), 2)
+
+
+class ScopedCacheInvalidationTests(FakeBackendTestCase):
+    """Yazma scope sürümünü artırır; aynı scope'taki diğer önbellekler de yeniden yükler."""
+
+    def test_write_invalidates_another_workers_cache(self):
+        loads = []
+        # Aynı scope'a bağlı ikinci bir önbellek, başka bir worker'daki services_cache yerine geçer
+        other_worker = TTLCache(
+            "other_worker_services", lambda key: loads.append(key) or len(loads), scope=data_versions.SERVICES_SCOPE
+        )
+        self.addCleanup(other_worker.invalidate, broadcast=False)
+        before = data_versions.current(data_versions.SERVICES_SCOPE)
+        self.assertEqual(other_worker.get("all"), 1)
+        self.assertEqual(other_worker.get("all"), 1)
+
+        service_service.add_service({"name": "Gece Muayenesi"})
+
+        self.assertEqual(data_versions.current(data_versions.SERVICES_SCOPE), before + 1)
+        self.assertEqual(other_worker.get("all"), 2)
+
+    @override_settings(DATA_VERSION_CHECK_INTERVAL=0)
+    def test_bump_in_another_process_is_seen(self):
+        loads = []
+        services = TTLCache("process_services", lambda key: loads.append(key) or len(loads), scope=data_versions.SERVICES_SCOPE)
+        self.addCleanup(services.invalidate, broadcast=False)
+        self.assertEqual(services.get("all"), 1)
+
+        # Diğer process sürüm dosyasına doğrudan yazar
+        with sqlite3.connect(settings.DATA_VERSION_DB) as conn:
+            conn.execute(
+                "INSERT INTO data_versions (scope, version) VALUES (?, 100) "
+                "ON CONFLICT(scope) DO UPDATE SET version = version + 100",
+                (data_versions.SERVICES_SCOPE,),
+            )
+
+        self.assertEqual(services.get("all"), 2)
+
+
+@override_settings(SUPABASE_BREAKER_FAILURES=2, SUPABASE_BREAKER_RESET_SECONDS=30)
+class ResilienceTests(FakeBackendTestCase):
+    """Devre kesici durumları, son sağlam veriyle sayfa ve önceki veri yoksa 503."""
+
+    def test_breaker_states(self):
+        breaker = resilience.CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+        self.assertTrue(breaker.allow())
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, breaker.CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, breaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, breaker.HALF_OPEN)
+        # Yarı açıkta tek deneme; başarısızsa devre yeniden açılır
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, breaker.OPEN)
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, breaker.CLOSED)
+        self.assertEqual(breaker.failures, 0)
+
+    def break_upstream(self):
+        calls = []
+
+        def failing_execute(query):
+            calls.append(query._table)
+            raise ConnectionError("Supabase'e ulaşılamıyor")
+
+        self.enterContext(mock.patch.object(fake_supabase.FakeQuery, "execute", failing_execute))
+        return calls
+
+    def test_last_good_data_is_served_while_open(self):
+        warm = self.client.get(reverse("appointment_management"))
+        self.assertEqual(warm.status_code, 200)
+        calls = self.break_upstream()
+
+        for _ in range(2):
+            response = self.client.get(reverse("appointment_management"))
+            wait_for_background_refresh()
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Cache-Control"], "no-store")
+        self.assertEqual(resilience.get_breaker("appointments").state, resilience.CircuitBreaker.OPEN)
+
+        # Devre açıkken Supabase'e gidilmez
+        calls.clear()
+        response = self.client.get(reverse("appointment_management"))
+        wait_for_background_refresh()
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("appointments", calls)
+
+    def test_unavailable_page_without_cached_data(self):
+        self.break_upstream()
+
+        response = self.client.get(reverse("appointment_management"))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "30")
+
+
+class TracingInstrumentTests(FakeBackendTestCase):
+    """instrument() kayıt sözlüklerini ve generator'ları da izlemeli."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Sarmalayıcılar iz yokken doğrudan asıl fonksiyonu çağırır; diğer testleri etkilemez
+        tracing.instrument()
+
+    def span_events(self, trace, name):
+        return [event for event in trace.events if event["name"] == name]
+
+    def test_dashboard_registries_point_to_traced_functions(self):
+        for registry in (dashboard_service._DASHBOARD_SOURCES, dashboard_service._ADASHBOARD_SOURCES):
+            for key, loader in registry.items():
+                self.assertTrue(getattr(loader, "__traced__", False), key)
+        for key, (_sources, builder) in dashboard_service.DASHBOARD_WIDGETS.items():
+            self.assertTrue(getattr(builder, "__traced__", False), key)
+
+    def test_instrument_is_idempotent(self):
+        before = dict(dashboard_service.DASHBOARD_WIDGETS)
+        tracing.instrument()
+        self.assertEqual(dashboard_service.DASHBOARD_WIDGETS, before)
+
+    def test_generator_span_covers_iteration(self):
+        supabase = get_supabase_client()
+        consumed = 0
+        with tracing.tracing("test") as trace:
+            for _row in supabase_client.iter_rows(lambda: supabase.table("doctors").select("id"), page_size=2):
+                consumed += 1
+                time.sleep(0.005)
+
+        rows_span, = self.span_events(trace, "supabase_client.iter_rows")
+        pages_span, = self.span_events(trace, "supabase_client.iter_row_pages")
+        self.assertGreater(consumed, 2)
+        # Tüketicinin beklemesi de span'e dahildir (µs)
+        self.assertGreaterEqual(rows_span["dur"], consumed * 5000)
+        self.assertGreaterEqual(pages_span["ts"], rows_span["ts"])
+        self.assertLessEqual(pages_span["ts"] + pages_span["dur"], rows_span["ts"] + rows_span["dur"])
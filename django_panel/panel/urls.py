@@ -1,20 +1,47 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
 
-urlpatterns = [
-    path('login/', views.login_view, name='login'),
-    path('register/', views.register_view, name='register'),
-    path('logout/', views.logout_view, name='logout'),
-    path('', views.dashboard, name='dashboard'),
-    path('hospital/', views.HospitalSettingsView.as_view(), name='hospital_settings'),
-    path('doctors/', views.DoctorManagementView.as_view(), name='doctor_management'),
-    path('appointments/', views.AppointmentManagementView.as_view(), name='appointment_management'),
-    path('schedule/', views.ScheduleManagementView.as_view(), name='schedule_management'),
-    path('services/', views.ServiceManagementView.as_view(), name='service_management'),
-    path('reviews/', views.ReviewManagementView.as_view(), name='review_management'),
-    path('settings/', views.SettingsView.as_view(), name='settings'),
-    path('api/locations/provinces/', views.location_provinces, name='location_provinces'),
-    path('api/locations/districts/<str:province_id>/', views.location_districts, name='location_districts'),
-    path('api/locations/neighborhoods/<str:district_id>/', views.location_neighborhoods, name='location_neighborhoods'),
-]
+
+def build_urlpatterns(async_views: bool = False) -> list:
+    """Panel URL'leri; async_views ise sık kullanılan sayfalar async view'lerle sunulur (sadece ASGI)."""
+    if async_views:
+        page_views = {
+            "dashboard": views.adashboard,
+            "appointments": views.AsyncAppointmentManagementView.as_view(),
+            "schedule": views.AsyncScheduleManagementView.as_view(),
+            "reviews": views.AsyncReviewManagementView.as_view(),
+            "review_page": views.areview_page,
+        }
+    else:
+        page_views = {
+            "dashboard": views.dashboard,
+            "appointments": views.AppointmentManagementView.as_view(),
+            "schedule": views.ScheduleManagementView.as_view(),
+            "reviews": views.ReviewManagementView.as_view(),
+            "review_page": views.review_page,
+        }
+    return [
+        path('login/', views.login_view, name='login'),
+        path('register/', views.register_view, name='register'),
+        path('logout/', views.logout_view, name='logout'),
+        path('', page_views["dashboard"], name='dashboard'),
+        path('dashboard/widgets/<str:name>/', views.dashboard_widget, name='dashboard_widget'),
+        path('metrics', views.metrics_view, name='metrics'),
+        path('hospital/', views.HospitalSettingsView.as_view(), name='hospital_settings'),
+        path('doctors/', views.DoctorManagementView.as_view(), name='doctor_management'),
+        path('appointments/', page_views["appointments"], name='appointment_management'),
+        path('schedule/', page_views["schedule"], name='schedule_management'),
+        path('services/', views.ServiceManagementView.as_view(), name='service_management'),
+        path('reviews/', page_views["reviews"], name='review_management'),
+        path('reviews/page/', page_views["review_page"], name='review_page'),
+        path('settings/', views.SettingsView.as_view(), name='settings'),
+        path('api/availability/', views.schedule_availability, name='schedule_availability'),
+        path('api/locations/provinces/', views.location_provinces, name='location_provinces'),
+        path('api/locations/districts/<str:province_id>/', views.location_districts, name='location_districts'),
+        path('api/locations/neighborhoods/<str:district_id>/', views.location_neighborhoods, name='location_neighborhoods'),
+    ]
+
+
+urlpatterns = build_urlpatterns(settings.PANEL_ASYNC_VIEWS)
@@ -1,14 +1,19 @@
-from datetime import datetime, date
+import asyncio
+import hmac
+from datetime import datetime, date, timedelta
 from functools import wraps
 
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.http import HttpResponse, JsonResponse
-from django.shortcuts import redirect, render
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import redirect
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.http import require_GET
 
+from .rendering import render, render_to_string
 from .forms import (
     AppearanceSettingsForm,
     AppointmentFilterForm,
@@ -46,17 +51,29 @@ from .services import (
     user_service,
     location_service,
 )
-from .services.dashboard_service import load_dashboard_context
+from .services.dashboard_service import aload_dashboard_context, load_dashboard_context, load_dashboard_widget
 from .services import schedule_service, service_service, review_service, settings_service
 from .services.auth_service import sign_in
 from .services.hospital_registration_service import register_hospital
 from .services.supabase_client import get_supabase_client
+from .services import metrics, profiling, request_context, slow_requests
+from .services.resilience import UpstreamUnavailable
 from .forms import LoginForm, HospitalRegistrationForm
 
 
 # Login required decorator
 def login_required(view_func):
-    """Kullanıcının giriş yapmış olmasını kontrol eder."""
+    """Kullanıcının giriş yapmış olmasını kontrol eder (async view'leri de destekler)."""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped_async_view(request, *args, **kwargs):
+            # Session async API ile yüklenir; sonraki sync erişimler önbellekten okunur
+            if not await request.session.aget('user_id') or not await request.session.aget('hospital_id'):
+                messages.warning(request, "Lütfen giriş yapın.")
+                return redirect('login')
+            return await view_func(request, *args, **kwargs)
+        return _wrapped_async_view
+
     @wraps(view_func)
     def _wrapped_view(request, *args, **kwargs):
         if not request.session.get('user_id') or not request.session.get('hospital_id'):
@@ -178,15 +195,134 @@ def logout_view(request):
     return redirect('login')
 
 
+async def _aload_hospital_summary(request):
+    """Async view'lerde üst bar için hastane özetini getirir.
+
+    Sonuç request'e konur; context processor render sırasında event loop'u
+    bloklayan sync bir sorgu yapmaz.
+    """
+    try:
+        hospital = await hospital_service.aget_hospital(request, columns=hospital_service.HOSPITAL_SUMMARY_COLUMNS)
+    except (ValueError, UpstreamUnavailable):
+        hospital = None
+    request.panel_hospital = hospital
+    return hospital
+
+
 @login_required
 def dashboard(request):
     """Panel ana sayfası: JSON verilerinden özet metrikleri oluşturur."""
     context = load_dashboard_context(request)
     context["page_title"] = "Genel Bakış"
-    # hospital context processor tarafından otomatik ekleniyor
+    # Dashboard hastane özetini zaten yükledi; context processor tekrar sorgulamaz
+    request.panel_hospital = context["hospital"]
     return render(request, "panel/dashboard.html", context)
 
 
+@login_required
+async def adashboard(request):
+    """`dashboard`'un ASGI karşılığı (bkz. PANEL_ASYNC_VIEWS); veri kaynakları paralel yüklenir."""
+    context = await aload_dashboard_context(request)
+    context["page_title"] = "Genel Bakış"
+    request.panel_hospital = context["hospital"]
+    return render(request, "panel/dashboard.html", context)
+
+
+@require_GET
+@login_required
+def dashboard_widget(request, name: str):
+    """Süre bütçesine sığmayan dashboard widget'ını HTML parçası olarak döndürür."""
+    # Sayfanın kendisi zaten çizildi; parça isteğine daha geniş bir bütçe tanınır
+    request_context.set_budget(settings.DEFERRED_WIDGET_BUDGET_MS / 1000)
+    try:
+        context = load_dashboard_widget(name, request)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=404)
+    except UpstreamUnavailable as exc:
+        return JsonResponse({"error": str(exc)}, status=503)
+
+    # Parçada hastane bilgisi kullanılmaz; context processor'ların tekrar çalışmasına gerek yok
+    html = render_to_string(f"panel/includes/dashboard/{name}.html", context)
+    return JsonResponse({"html": html})
+
+
+@require_GET
+def metrics_view(request):
+    """Process içi metrikleri Prometheus metin formatında döndürür.
+
+    METRICS_TOKEN ayarlıysa `Authorization: Bearer <token>` başlığı gerekir;
+    ayarlı değilse endpoint sadece DEBUG modunda açıktır.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        provided = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(provided.encode(), token.encode()):
+            return HttpResponse("Yetkisiz", status=401, content_type="text/plain; charset=utf-8")
+    elif not settings.DEBUG:
+        raise Http404
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def profile_list(request):
+    """Staff profil kayıtlarının listesi (admin.site.admin_view ile korunur, bkz. urls)."""
+    from django.contrib import admin
+
+    context = {
+        **admin.site.each_context(request),
+        "title": "İstek profilleri",
+        "reports": profiling.list_reports(),
+        "buffer_size": settings.PROFILE_BUFFER_SIZE,
+    }
+    return render(request, "panel/admin/profiles.html", context)
+
+
+def profile_detail(request, report_id: int):
+    """Tek bir profilin çağrı grafiği, bellek ayırmaları ve Supabase dökümü."""
+    from django.contrib import admin
+
+    report = profiling.get_report(report_id)
+    if report is None:
+        raise Http404("Profil bulunamadı (tampondan düşmüş olabilir).")
+    context = {
+        **admin.site.each_context(request),
+        "title": f"Profil #{report.id}",
+        "report": report,
+    }
+    return render(request, "panel/admin/profile_detail.html", context)
+
+
+def slow_request_list(request):
+    """Yavaş istek kayıtları; hastane ve view'e göre süzülebilir (staff, bkz. urls)."""
+    from django.contrib import admin
+
+    hospital_id = request.GET.get("hospital") or None
+    view_name = request.GET.get("view") or None
+    context = {
+        **admin.site.each_context(request),
+        "title": "Yavaş istekler",
+        "entries": slow_requests.list_entries(limit=200, hospital_id=hospital_id, view=view_name),
+        "threshold_ms": slow_requests.threshold_ms(),
+        "hospital_filter": hospital_id or "",
+        "view_filter": view_name or "",
+    }
+    return render(request, "panel/admin/slow_requests.html", context)
+
+
+def slow_request_detail(request, entry_id: int):
+    """Tek bir yavaş isteğin Supabase çağrıları, önbellek ve aşama süreleri."""
+    from django.contrib import admin
+
+    entry = slow_requests.get_entry(entry_id)
+    if entry is None:
+        raise Http404("Kayıt bulunamadı.")
+    context = {
+        **admin.site.each_context(request),
+        "title": f"Yavaş istek #{entry['id']}",
+        "entry": entry,
+    }
+    return render(request, "panel/admin/slow_request_detail.html", context)
+
+
 class HospitalSettingsView(View):
     template_name = "panel/hospital_settings.html"
     
@@ -201,7 +337,7 @@ class HospitalSettingsView(View):
     def post(self, request):
         action = request.POST.get("form_type")
         hospital = hospital_service.get_hospital(request)
-        services = hospital_service.get_services()
+        services = hospital_service.get_services(columns=hospital_service.SERVICE_CHOICE_COLUMNS)
 
         if action == "general":
             province_choices = location_service.as_choice_tuples(location_service.get_provinces())
@@ -366,7 +502,7 @@ class HospitalSettingsView(View):
 
     def _build_context(self, request=None, general_form: HospitalGeneralForm | None = None):
         hospital = hospital_service.get_hospital(request)
-        services = hospital_service.get_services()
+        services = hospital_service.get_services(columns=hospital_service.SERVICE_CHOICE_COLUMNS)
         holidays = hospital_service.get_holidays(request)
         province_choices = location_service.as_choice_tuples(location_service.get_provinces())
         selected_province = hospital.get("provinceId")
@@ -478,7 +614,7 @@ class DoctorManagementView(View):
 
     def post(self, request):
         action = request.POST.get("form_type")
-        services = hospital_service.get_services()
+        services = hospital_service.get_services(columns=hospital_service.SERVICE_CHOICE_COLUMNS)
         service_choices = build_service_choices(services)
 
         if action == "create_doctor":
@@ -542,7 +678,7 @@ class DoctorManagementView(View):
 
     def _build_context(self, request):
         # hospital context processor tarafından otomatik ekleniyor
-        services = hospital_service.get_services()
+        services = hospital_service.get_services(columns=hospital_service.SERVICE_CHOICE_COLUMNS)
         service_choices = build_service_choices(services)
         doctors = doctor_service.get_doctors(request)
         holidays_map = doctor_service.get_doctor_holidays(request)
@@ -631,12 +767,16 @@ class AppointmentManagementView(View):
     def _build_context(self, request):
         # Otomatik iptal kontrolü - her sayfa yüklendiğinde
         cancelled_count = appointment_service.auto_cancel_overdue_appointments(request=request)
-        if cancelled_count > 0:
-            messages.info(request, f"{cancelled_count} randevu otomatik olarak iptal edildi (5 gün geçmiş).")
-        
         # hospital context processor tarafından otomatik ekleniyor
-        doctors = doctor_service.get_doctors(request)
-        services = hospital_service.get_services()
+        doctors = doctor_service.get_doctors(request, columns=doctor_service.DOCTOR_SUMMARY_COLUMNS)
+        services = hospital_service.get_services(columns=hospital_service.SERVICE_CHOICE_COLUMNS)
+        filter_form, filters = self._filter_form(request, doctors, services)
+        appointments = appointment_service.filter_appointments(request=request, with_details=True, **filters)
+        summary = appointment_service.get_summary(request=request)
+        return self._assemble_context(request, cancelled_count, filter_form, appointments, summary)
+
+    def _filter_form(self, request, doctors, services):
+        """Filtre formunu oluşturur; formdan filter_appointments parametrelerini döndürür."""
         doctor_choices = build_doctor_choices(doctors)
         service_choices = build_service_choices(services)
 
@@ -647,22 +787,24 @@ class AppointmentManagementView(View):
         )
 
         filters = filter_form.cleaned_data if filter_form.is_valid() else {}
-        start_date = filters.get("start_date")
-        end_date = filters.get("end_date")
+        return filter_form, {
+            "status": filters.get("status") or None,
+            "doctor_id": filters.get("doctor") or None,
+            "service_id": filters.get("service") or None,
+            "start_date": filters.get("start_date"),
+            "end_date": filters.get("end_date"),
+        }
+
+    def _assemble_context(self, request, cancelled_count, filter_form, appointments, summary):
+        if cancelled_count > 0:
+            messages.info(request, f"{cancelled_count} randevu otomatik olarak iptal edildi (5 gün geçmiş).")
+
+        filters = filter_form.cleaned_data if filter_form.is_valid() else {}
         # per_page değerini form'dan al, yoksa GET parametresinden al
         per_page = filters.get("per_page") or request.GET.get("per_page", "10")
-        
-        appointments = appointment_service.filter_appointments(
-            status=filters.get("status") or None,
-            doctor_id=filters.get("doctor") or None,
-            service_id=filters.get("service") or None,
-            start_date=start_date,
-            end_date=end_date,
-            request=request,
-        )
 
         # Sıralama: Bekleyen randevular önce (tarih/saat), tamamlanan en altta
-        enriched = self._enrich_appointments(appointments, doctors, services)
+        enriched = self._enrich_appointments(appointments)
         enriched = self._sort_appointments(enriched)
 
         # Pagination
@@ -685,7 +827,7 @@ class AppointmentManagementView(View):
             # hospital context processor tarafından otomatik ekleniyor
             "filter_form": filter_form,
             "appointments": page_obj,
-            "summary": appointment_service.get_summary(request=request),
+            "summary": summary,
             "paginator": paginator,
         }
         return context
@@ -725,15 +867,10 @@ class AppointmentManagementView(View):
         # Bekleyen önce, sonra iptal, en son tamamlanan
         return pending + cancelled + completed
 
-    def _enrich_appointments(self, appointments, doctors, services):
-        doctor_map = {doc["id"]: doc for doc in doctors}
-        service_map = {svc["id"]: svc for svc in services}
-        user_map = user_service.get_user_map()
+    def _enrich_appointments(self, appointments):
+        # Doktor, hizmet ve hasta adları randevu sorgusunda embed edilerek gelir
         enriched = []
         for apt in appointments:
-            doctor = doctor_map.get(apt["doctorId"])
-            service = service_map.get(apt["service"])
-            user = user_map.get(apt["userId"])
             status_label, status_class = self.STATUS_LABELS.get(
                 apt["status"], (apt["status"], "pending")
             )
@@ -744,9 +881,9 @@ class AppointmentManagementView(View):
             enriched.append(
                 {
                     "data": apt,
-                    "patient": f"{user['name']} {user['surname']}" if user else "Hasta",
-                    "doctor": f"{doctor['name']} {doctor['surname']}" if doctor else "Doktor",
-                    "service": service["name"] if service else "Hizmet",
+                    "patient": apt.get("patientName") or "Hasta",
+                    "doctor": apt.get("doctorName") or "Doktor",
+                    "service": apt.get("serviceName") or "Hizmet",
                     "status_label": status_label,
                     "status_class": status_class,
                     "formatted_date": formatted_date,
@@ -761,6 +898,36 @@ class AppointmentManagementView(View):
         return enriched
 
 
+class AsyncAppointmentManagementView(AppointmentManagementView):
+    """ASGI altında kullanılır (bkz. PANEL_ASYNC_VIEWS); okumalar paralel yapılır."""
+
+    @method_decorator(login_required)
+    async def dispatch(self, request, *args, **kwargs):
+        return await View.dispatch(self, request, *args, **kwargs)
+
+    async def get(self, request):
+        context = await self._abuild_context(request)
+        return render(request, self.template_name, context)
+
+    async def post(self, request):
+        # Yazma işlemleri nadir; sync servislerle thread'de çalıştırılır
+        return await sync_to_async(super().post)(request)
+
+    async def _abuild_context(self, request):
+        """_build_context'in async karşılığı; bağımsız okumalar paralel yapılır."""
+        # Otomatik iptal okumalardan önce biter; özet ve liste iptal edilenleri bekleyen saymaz
+        cancelled_count = await appointment_service.aauto_cancel_overdue_appointments(request=request)
+        doctors, services, summary, _ = await asyncio.gather(
+            doctor_service.aget_doctors(request, columns=doctor_service.DOCTOR_SUMMARY_COLUMNS),
+            hospital_service.aget_services(columns=hospital_service.SERVICE_CHOICE_COLUMNS),
+            appointment_service.aget_summary(request=request),
+            _aload_hospital_summary(request),
+        )
+        filter_form, filters = self._filter_form(request, doctors, services)
+        appointments = await appointment_service.afilter_appointments(request=request, with_details=True, **filters)
+        return self._assemble_context(request, cancelled_count, filter_form, appointments, summary)
+
+
 class ScheduleManagementView(View):
     template_name = "panel/schedule_management.html"
     
@@ -769,6 +936,15 @@ class ScheduleManagementView(View):
         return super().dispatch(request, *args, **kwargs)
 
     def get(self, request):
+        year, month, selected_doctor_id = self._calendar_params(request)
+        doctors = doctor_service.get_doctors(request, columns=doctor_service.DOCTOR_SUMMARY_COLUMNS)
+        calendar_data = schedule_service.build_calendar_data(
+            year, month, selected_doctor_id if selected_doctor_id else None, request=request
+        )
+        return self._render_page(request, year, month, selected_doctor_id, doctors, calendar_data)
+
+    @staticmethod
+    def _calendar_params(request):
         from datetime import date
 
         today = date.today()
@@ -776,9 +952,9 @@ class ScheduleManagementView(View):
         # Ay değeri artık string olarak gelebilir (form'dan) veya int olarak (URL'den)
         month_param = request.GET.get("month", str(today.month))
         month = int(month_param) if month_param else today.month
-        selected_doctor_id = request.GET.get("doctor", "")
+        return year, month, request.GET.get("doctor", "")
 
-        doctors = doctor_service.get_doctors(request)
+    def _render_page(self, request, year, month, selected_doctor_id, doctors, calendar_data):
         doctor_choices = build_doctor_choices(doctors)
 
         filter_form = ScheduleFilterForm(
@@ -786,10 +962,6 @@ class ScheduleManagementView(View):
             doctor_choices=doctor_choices,
         )
 
-        calendar_data = schedule_service.build_calendar_data(
-            year, month, selected_doctor_id if selected_doctor_id else None, request=request
-        )
-
         # hospital context processor tarafından otomatik ekleniyor
         holiday_form = ScheduleHolidayForm(doctor_choices=doctor_choices)
 
@@ -837,6 +1009,30 @@ class ScheduleManagementView(View):
             params += f"&doctor={doctor}"
         return redirect(f"/schedule/?{params}")
 
+
+class AsyncScheduleManagementView(ScheduleManagementView):
+    """ASGI altında kullanılır (bkz. PANEL_ASYNC_VIEWS); okumalar paralel yapılır."""
+
+    @method_decorator(login_required)
+    async def dispatch(self, request, *args, **kwargs):
+        return await View.dispatch(self, request, *args, **kwargs)
+
+    async def get(self, request):
+        year, month, selected_doctor_id = self._calendar_params(request)
+        # Doktorlar, takvim ve hastane özeti birbirinden bağımsız; paralel yüklenir
+        doctors, calendar_data, _ = await asyncio.gather(
+            doctor_service.aget_doctors(request, columns=doctor_service.DOCTOR_SUMMARY_COLUMNS),
+            schedule_service.abuild_calendar_data(
+                year, month, selected_doctor_id if selected_doctor_id else None, request=request
+            ),
+            _aload_hospital_summary(request),
+        )
+        return self._render_page(request, year, month, selected_doctor_id, doctors, calendar_data)
+
+    async def post(self, request):
+        return await sync_to_async(super().post)(request)
+
+
 class ServiceManagementView(View):
     template_name = "panel/service_management.html"
     
@@ -874,9 +1070,9 @@ class ServiceManagementView(View):
 
     def _build_context(self, request):
         all_services = service_service.get_services()
-        doctors = doctor_service.get_doctors(request)
+        doctors = doctor_service.get_doctors(request, columns=doctor_service.DOCTOR_SERVICES_COLUMNS)
         # hospital iş mantığı için gerekli (services listesini filtrelemek için)
-        hospital = hospital_service.get_hospital(request)
+        hospital = hospital_service.get_hospital(request, columns=hospital_service.HOSPITAL_SERVICES_COLUMNS)
         
         # Sadece hastanenin seçtiği hizmetleri göster
         selected_service_ids = set(hospital.get("services", []))
@@ -958,7 +1154,16 @@ class ReviewManagementView(View):
         return render(request, self.template_name, context)
 
     def _build_context(self, request):
-        doctors = doctor_service.get_doctors(request)
+        doctors = doctor_service.get_doctors(request, columns=doctor_service.DOCTOR_SUMMARY_COLUMNS)
+        # Yorumların ilk sayfası ve istatistikler
+        page_data = review_service.get_reviews_page(
+            page_size=_review_page_size(),
+            request=request,
+            **_review_filter_params(request),
+        )
+        return self._assemble_context(request, doctors, page_data)
+
+    def _assemble_context(self, request, doctors, page_data):
         doctor_choices = build_doctor_choices(doctors)
 
         # Filtre formu
@@ -967,80 +1172,146 @@ class ReviewManagementView(View):
             doctor_choices=doctor_choices,
         )
 
-        # Filtreleme parametreleri
-        doctor_id = request.GET.get("doctor") or None
-        min_rating = int(request.GET.get("min_rating")) if request.GET.get("min_rating") else None
-        max_rating = int(request.GET.get("max_rating")) if request.GET.get("max_rating") else None
-        date_from = request.GET.get("date_from") or None
-        date_to = request.GET.get("date_to") or None
-        has_reply_str = request.GET.get("has_reply")
-        has_reply = None
-        if has_reply_str == "true":
-            has_reply = True
-        elif has_reply_str == "false":
-            has_reply = False
-
-        # Yorumları getir
-        reviews = review_service.get_reviews_with_details(
-            doctor_id=doctor_id,
-            min_rating=min_rating,
-            max_rating=max_rating,
-            date_from=date_from,
-            date_to=date_to,
-            has_reply=has_reply,
-            request=request,
-        )
-
-        # İstatistikler
-        stats = review_service.get_review_statistics(request=request)
-
-        # Her yorum için yanıt formu ve tarih formatını düzelt
-        from datetime import datetime
-        review_cards = []
-        for review in reviews:
-            # Tarih formatını düzelt (ISO string'den datetime'a)
-            created_at = review.get("createdAt", "")
-            if created_at:
-                try:
-                    dt_str = created_at.replace("Z", "+00:00")
-                    review["created_at_dt"] = datetime.fromisoformat(dt_str)
-                except (ValueError, AttributeError):
-                    review["created_at_dt"] = None
-            else:
-                review["created_at_dt"] = None
-            
-            replied_at = review.get("repliedAt", "")
-            if replied_at:
-                try:
-                    dt_str = replied_at.replace("Z", "+00:00")
-                    review["replied_at_dt"] = datetime.fromisoformat(dt_str)
-                except (ValueError, AttributeError):
-                    review["replied_at_dt"] = None
-            else:
-                review["replied_at_dt"] = None
-            
-            reply_form = ReviewReplyForm(initial={
-                "review_id": review["id"],
-                "reply": review.get("reply", ""),
-            })
-            review_cards.append({
-                "data": review,
-                "reply_form": reply_form,
-            })
-
         # hospital context processor tarafından otomatik ekleniyor
 
         context = {
             "page_title": "Yorumlar & Yanıtlar",
             # hospital context processor tarafından otomatik ekleniyor
             "filter_form": filter_form,
-            "review_cards": review_cards,
-            "statistics": stats,
+            "review_cards": _build_review_cards(page_data["reviews"]),
+            "next_cursor": page_data["next_cursor"],
+            "statistics": page_data["statistics"],
             "doctor_choices": doctor_choices,
         }
         return context
 
 
+class AsyncReviewManagementView(ReviewManagementView):
+    """ASGI altında kullanılır (bkz. PANEL_ASYNC_VIEWS); okumalar paralel yapılır."""
+
+    @method_decorator(login_required)
+    async def dispatch(self, request, *args, **kwargs):
+        return await View.dispatch(self, request, *args, **kwargs)
+
+    async def get(self, request):
+        doctors, page_data, _ = await asyncio.gather(
+            doctor_service.aget_doctors(request, columns=doctor_service.DOCTOR_SUMMARY_COLUMNS),
+            review_service.aget_reviews_page(
+                page_size=_review_page_size(),
+                request=request,
+                **_review_filter_params(request),
+            ),
+            _aload_hospital_summary(request),
+        )
+        context = self._assemble_context(request, doctors, page_data)
+        return render(request, self.template_name, context)
+
+    async def post(self, request):
+        return await sync_to_async(super().post)(request)
+
+
+def _review_filter_params(request) -> dict:
+    """Yorum filtrelerini GET parametrelerinden okur."""
+    has_reply_str = request.GET.get("has_reply")
+    has_reply = None
+    if has_reply_str == "true":
+        has_reply = True
+    elif has_reply_str == "false":
+        has_reply = False
+
+    return {
+        "doctor_id": request.GET.get("doctor") or None,
+        "min_rating": int(request.GET.get("min_rating")) if request.GET.get("min_rating") else None,
+        "max_rating": int(request.GET.get("max_rating")) if request.GET.get("max_rating") else None,
+        "date_from": request.GET.get("date_from") or None,
+        "date_to": request.GET.get("date_to") or None,
+        "has_reply": has_reply,
+        "q": (request.GET.get("q") or "").strip()[:200] or None,
+    }
+
+
+def _review_page_size() -> int:
+    """Sayfa başına yorum sayısını görünüm ayarlarından alır."""
+    appearance = settings_service.get_settings().get("appearance", {})
+    try:
+        return max(int(appearance.get("records_per_page") or 20), 1)
+    except (TypeError, ValueError):
+        return 20
+
+
+def _parse_iso_datetime(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (ValueError, AttributeError):
+        return None
+
+
+def _build_review_cards(reviews):
+    """Sadece sayfadaki yorumlar için tarih ve yanıt formu hazırlar."""
+    review_cards = []
+    for review in reviews:
+        # Tarih formatını düzelt (ISO string'den datetime'a)
+        review["created_at_dt"] = _parse_iso_datetime(review.get("createdAt", ""))
+        review["replied_at_dt"] = _parse_iso_datetime(review.get("repliedAt", ""))
+
+        reply_form = ReviewReplyForm(initial={
+            "review_id": review["id"],
+            "reply": review.get("reply", ""),
+        })
+        review_cards.append({
+            "data": review,
+            "reply_form": reply_form,
+        })
+    return review_cards
+
+
+@require_GET
+@login_required
+def review_page(request):
+    """Sonsuz kaydırma için yorumların sonraki sayfasını HTML parçası olarak döndürür."""
+    try:
+        page_data = review_service.get_reviews_page(
+            cursor=request.GET.get("cursor") or None,
+            page_size=_review_page_size(),
+            with_statistics=False,
+            request=request,
+            **_review_filter_params(request),
+        )
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return _review_page_response(request, page_data)
+
+
+@require_GET
+@login_required
+async def areview_page(request):
+    """`review_page`'in ASGI karşılığı (bkz. PANEL_ASYNC_VIEWS)."""
+    try:
+        page_data = await review_service.aget_reviews_page(
+            cursor=request.GET.get("cursor") or None,
+            page_size=_review_page_size(),
+            with_statistics=False,
+            request=request,
+            **_review_filter_params(request),
+        )
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return _review_page_response(request, page_data)
+
+
+def _review_page_response(request, page_data):
+    # Parça şablon hastane bilgisini kullanmaz; context processor'ın sorgusu atlanır
+    request.panel_hospital = None
+    html = render_to_string(
+        "panel/includes/review_cards.html",
+        {"review_cards": _build_review_cards(page_data["reviews"])},
+        request=request,
+    )
+    return JsonResponse({"html": html, "next_cursor": page_data["next_cursor"]})
+
+
 class SettingsView(View):
     template_name = "panel/settings.html"
     
@@ -1178,3 +1449,33 @@ def location_districts(request, province_id: str):
 @require_GET
 def location_neighborhoods(request, district_id: str):
     return JsonResponse({"results": location_service.get_neighborhoods(district_id)})
+
+
+# Müsaitlik sorgusunda izin verilen en uzun aralık (gün)
+AVAILABILITY_MAX_DAYS = 31
+
+
+@require_GET
+@login_required
+def schedule_availability(request):
+    """Doktorların boş randevu slotlarını JSON olarak döndürür (randevu seçici için)."""
+    try:
+        start_date = datetime.strptime(request.GET["start"], "%Y-%m-%d").date() if request.GET.get("start") else date.today()
+        days = min(max(int(request.GET.get("days", 7)), 1), AVAILABILITY_MAX_DAYS)
+        slot_minutes = int(request.GET.get("slot", schedule_service.SLOT_MINUTES))
+    except ValueError:
+        return JsonResponse({"error": "Geçersiz parametre."}, status=400)
+    if slot_minutes not in (10, 15, 20, 30, 45, 60):
+        return JsonResponse({"error": "Geçersiz slot süresi."}, status=400)
+
+    doctor_ids = request.GET.getlist("doctor") or None
+    end_date = start_date + timedelta(days=days - 1)
+    results = schedule_service.get_free_slots(
+        start_date, end_date, doctor_ids, slot_minutes=slot_minutes, request=request
+    )
+    return JsonResponse({
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "slot_minutes": slot_minutes,
+        "results": results,
+    })
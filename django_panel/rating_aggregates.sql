@@ -0,0 +1,151 @@
+-- Hastane ve doktor puan özetleri (adet, toplam, 1-5 histogramı)
+-- ratings tablosuna yapılan her ekleme/güncelleme/silme özet tablolarına
+-- trigger ile artımlı olarak yansıtılır; panel sayfaları puanları yeniden
+-- hesaplamak yerine bu tablolardan tek satır okur.
+-- Bu SQL komutlarını Supabase Dashboard > SQL Editor'de çalıştırın
+
+-- 1. Özet tabloları
+CREATE TABLE IF NOT EXISTS public.hospital_rating_stats (
+    hospital_id UUID PRIMARY KEY,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum INTEGER NOT NULL DEFAULT 0,
+    rating_1 INTEGER NOT NULL DEFAULT 0,
+    rating_2 INTEGER NOT NULL DEFAULT 0,
+    rating_3 INTEGER NOT NULL DEFAULT 0,
+    rating_4 INTEGER NOT NULL DEFAULT 0,
+    rating_5 INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS public.doctor_rating_stats (
+    doctor_id UUID PRIMARY KEY,
+    hospital_id UUID,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum INTEGER NOT NULL DEFAULT 0,
+    rating_1 INTEGER NOT NULL DEFAULT 0,
+    rating_2 INTEGER NOT NULL DEFAULT 0,
+    rating_3 INTEGER NOT NULL DEFAULT 0,
+    rating_4 INTEGER NOT NULL DEFAULT 0,
+    rating_5 INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS doctor_rating_stats_hospital_idx
+ON public.doctor_rating_stats (hospital_id);
+
+-- 2. Tek bir puanı (+1 / -1 yönünde) özet tablosuna uygulayan yardımcılar
+CREATE OR REPLACE FUNCTION public.apply_hospital_rating(p_hospital_id UUID, p_rating INTEGER, p_sign INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    IF p_hospital_id IS NULL OR p_rating IS NULL OR p_rating NOT BETWEEN 1 AND 5 THEN
+        RETURN;
+    END IF;
+    INSERT INTO public.hospital_rating_stats AS s (hospital_id, rating_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+    VALUES (
+        p_hospital_id, p_sign, p_sign * p_rating,
+        CASE WHEN p_rating = 1 THEN p_sign ELSE 0 END,
+        CASE WHEN p_rating = 2 THEN p_sign ELSE 0 END,
+        CASE WHEN p_rating = 3 THEN p_sign ELSE 0 END,
+        CASE WHEN p_rating = 4 THEN p_sign ELSE 0 END,
+        CASE WHEN p_rating = 5 THEN p_sign ELSE 0 END
+    )
+    ON CONFLICT (hospital_id) DO UPDATE SET
+        rating_count = s.rating_count + EXCLUDED.rating_count,
+        rating_sum = s.rating_sum + EXCLUDED.rating_sum,
+        rating_1 = s.rating_1 + EXCLUDED.rating_1,
+        rating_2 = s.rating_2 + EXCLUDED.rating_2,
+        rating_3 = s.rating_3 + EXCLUDED.rating_3,
+        rating_4 = s.rating_4 + EXCLUDED.rating_4,
+        rating_5 = s.rating_5 + EXCLUDED.rating_5,
+        updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.apply_doctor_rating(p_doctor_id UUID, p_hospital_id UUID, p_rating INTEGER, p_sign INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    IF p_doctor_id IS NULL OR p_rating IS NULL OR p_rating NOT BETWEEN 1 AND 5 THEN
+        RETURN;
+    END IF;
+    INSERT INTO public.doctor_rating_stats AS s (doctor_id, hospital_id, rating_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+    VALUES (
+        p_doctor_id, p_hospital_id, p_sign, p_sign * p_rating,
+        CASE WHEN p_rating = 1 THEN p_sign ELSE 0 END,
+        CASE WHEN p_rating = 2 THEN p_sign ELSE 0 END,
+        CASE WHEN p_rating = 3 THEN p_sign ELSE 0 END,
+        CASE WHEN p_rating = 4 THEN p_sign ELSE 0 END,
+        CASE WHEN p_rating = 5 THEN p_sign ELSE 0 END
+    )
+    ON CONFLICT (doctor_id) DO UPDATE SET
+        hospital_id = COALESCE(EXCLUDED.hospital_id, s.hospital_id),
+        rating_count = s.rating_count + EXCLUDED.rating_count,
+        rating_sum = s.rating_sum + EXCLUDED.rating_sum,
+        rating_1 = s.rating_1 + EXCLUDED.rating_1,
+        rating_2 = s.rating_2 + EXCLUDED.rating_2,
+        rating_3 = s.rating_3 + EXCLUDED.rating_3,
+        rating_4 = s.rating_4 + EXCLUDED.rating_4,
+        rating_5 = s.rating_5 + EXCLUDED.rating_5,
+        updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. ratings tablosu trigger'ı: eski satırı geri al, yeni satırı uygula
+CREATE OR REPLACE FUNCTION public.ratings_rollup_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM public.apply_hospital_rating(OLD.hospital_id, OLD.hospital_rating, -1);
+        PERFORM public.apply_doctor_rating(OLD.doctor_id, OLD.hospital_id, OLD.doctor_rating, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM public.apply_hospital_rating(NEW.hospital_id, NEW.hospital_rating, 1);
+        PERFORM public.apply_doctor_rating(NEW.doctor_id, NEW.hospital_id, NEW.doctor_rating, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger kurulumu ve doldurma tek transaction'dır: araya giren puan yazmaları
+-- ya trigger'dan ya da doldurmadan geçer, iki kez sayılmaz veya kaybolmaz.
+-- Hata olursa özet tabloları yarım dolu kalmaz, her şey geri alınır.
+BEGIN;
+LOCK TABLE public.ratings IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS ratings_rollup ON public.ratings;
+CREATE TRIGGER ratings_rollup
+AFTER INSERT OR UPDATE OR DELETE ON public.ratings
+FOR EACH ROW EXECUTE FUNCTION public.ratings_rollup_trigger();
+
+-- 4. Mevcut puanlarla özet tablolarını doldur (tek seferlik; tekrar çalıştırılabilir)
+TRUNCATE public.hospital_rating_stats;
+INSERT INTO public.hospital_rating_stats (hospital_id, rating_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+SELECT
+    hospital_id,
+    COUNT(*),
+    SUM(hospital_rating),
+    COUNT(*) FILTER (WHERE hospital_rating = 1),
+    COUNT(*) FILTER (WHERE hospital_rating = 2),
+    COUNT(*) FILTER (WHERE hospital_rating = 3),
+    COUNT(*) FILTER (WHERE hospital_rating = 4),
+    COUNT(*) FILTER (WHERE hospital_rating = 5)
+FROM public.ratings
+WHERE hospital_id IS NOT NULL AND hospital_rating BETWEEN 1 AND 5
+GROUP BY hospital_id;
+
+TRUNCATE public.doctor_rating_stats;
+INSERT INTO public.doctor_rating_stats (doctor_id, hospital_id, rating_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+SELECT
+    doctor_id,
+    MAX(hospital_id::TEXT)::UUID,
+    COUNT(*),
+    SUM(doctor_rating),
+    COUNT(*) FILTER (WHERE doctor_rating = 1),
+    COUNT(*) FILTER (WHERE doctor_rating = 2),
+    COUNT(*) FILTER (WHERE doctor_rating = 3),
+    COUNT(*) FILTER (WHERE doctor_rating = 4),
+    COUNT(*) FILTER (WHERE doctor_rating = 5)
+FROM public.ratings
+WHERE doctor_id IS NOT NULL AND doctor_rating BETWEEN 1 AND 5
+GROUP BY doctor_id;
+
+COMMIT;
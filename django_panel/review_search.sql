@@ -0,0 +1,67 @@
+-- Yorum ve yanıt metinlerinde tam metin arama (Türkçe)
+-- reviews tablosuna comment/reply üzerinden üretilen tsvector sütunu, GIN index
+-- ve sonuçları ts_rank ile sıralayan search_reviews fonksiyonu ekler.
+-- Bu SQL komutlarını Supabase Dashboard > SQL Editor'de çalıştırın
+
+-- 1. Arama sütunu (yorum metni yanıttan daha ağırlıklı)
+ALTER TABLE public.reviews
+ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('turkish', COALESCE(comment, '')), 'A') ||
+    setweight(to_tsvector('turkish', COALESCE(reply, '')), 'B')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS reviews_search_vector_idx
+ON public.reviews USING GIN (search_vector);
+
+-- 2. Sıralı arama fonksiyonu (panelden supabase.rpc("search_reviews", ...) ile çağrılır)
+CREATE OR REPLACE FUNCTION public.search_reviews(
+    p_hospital_id UUID,
+    p_query TEXT,
+    p_doctor_id UUID DEFAULT NULL,
+    p_date_from DATE DEFAULT NULL,
+    p_date_to DATE DEFAULT NULL,
+    p_has_reply BOOLEAN DEFAULT NULL,
+    p_limit INTEGER DEFAULT 20,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+    id UUID,
+    user_id UUID,
+    hospital_id UUID,
+    doctor_id UUID,
+    appointment_id UUID,
+    comment TEXT,
+    reply TEXT,
+    replied_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ,
+    doctor_rating INTEGER,
+    hospital_rating INTEGER,
+    rank REAL
+) AS $$
+    SELECT
+        r.id, r.user_id, r.hospital_id, r.doctor_id, r.appointment_id,
+        r.comment, r.reply, r.replied_at, r.created_at,
+        rt.doctor_rating, rt.hospital_rating,
+        ts_rank(r.search_vector, q) AS rank
+    FROM public.reviews r
+    CROSS JOIN websearch_to_tsquery('turkish', p_query) q
+    LEFT JOIN LATERAL (
+        SELECT doctor_rating, hospital_rating
+        FROM public.ratings
+        WHERE ratings.appointment_id = r.appointment_id
+        LIMIT 1
+    ) rt ON TRUE
+    WHERE r.hospital_id = p_hospital_id
+      AND r.search_vector @@ q
+      AND (p_doctor_id IS NULL OR r.doctor_id = p_doctor_id)
+      AND (p_date_from IS NULL OR r.created_at >= p_date_from)
+      AND (p_date_to IS NULL OR r.created_at < p_date_to + 1)
+      AND (
+          p_has_reply IS NULL
+          OR (p_has_reply AND COALESCE(r.reply, '') <> '')
+          OR (NOT p_has_reply AND COALESCE(r.reply, '') = '')
+      )
+    ORDER BY rank DESC, r.created_at DESC, r.id DESC
+    LIMIT p_limit OFFSET p_offset;
+$$ LANGUAGE sql STABLE;
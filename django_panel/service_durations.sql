@@ -0,0 +1,9 @@
+-- Hizmet süreleri: müsaitlik hesabında bir randevu, hizmetinin süresi boyunca
+-- çakıştığı tüm slotları doldurur. Süresi girilmemiş hizmetler (ve bu kolon
+-- eklenmemişse tüm hizmetler) bir slot uzunluğunda (30 dk) sayılır.
+-- Bu SQL komutunu Supabase Dashboard > SQL Editor'de çalıştırın
+
+ALTER TABLE public.services
+ADD COLUMN IF NOT EXISTS duration_minutes INTEGER CHECK (duration_minutes > 0);
+
+COMMENT ON COLUMN public.services.duration_minutes IS 'Hizmetin randevu süresi (dakika); NULL ise bir slot uzunluğu kullanılır';